@@ -1,9 +1,11 @@
 from __future__ import annotations
 
 import argparse
+import json
 from pathlib import Path
 from typing import List
 
+from cflow_platform.core.code_intel.extraction import default_jobs
 from cflow_platform.core.code_intel.function_indexer import FunctionIndexer
 from cflow_platform.core.code_intel.callgraph_builder import build_call_edges
 from cflow_platform.core.code_intel.callgraph_store import FileCallGraphStore, StoredEdge
@@ -18,10 +20,8 @@ def _cmd_index(args: argparse.Namespace) -> int:
         import subprocess
         try:
             out = subprocess.check_output(["git", "diff", "--name-only", "HEAD"], text=True).strip()
-            for line in out.splitlines():
-                p = Path(line)
-                if p.exists() and p.is_file():
-                    paths.append(p)
+            # Deleted files are passed too so their functions leave the index
+            paths.extend(Path.cwd() / line for line in out.splitlines() if line.strip())
         except Exception:
             pass
     else:
@@ -29,7 +29,7 @@ def _cmd_index(args: argparse.Namespace) -> int:
         for p in root.rglob("*"):
             if p.is_file():
                 paths.append(p)
-    res = idx.index_paths(paths)
+    res = idx.index_paths(paths, jobs=args.jobs or default_jobs())
     print({"status": "success", **res})
     return 0
 
@@ -109,14 +109,35 @@ def _cmd_build_graph(args: argparse.Namespace) -> int:
     return 0
 
 
+def _cmd_sync(args: argparse.Namespace) -> int:
+    idx = FunctionIndexer()
+    res = idx.sync(Path(args.root) if args.root else None, jobs=args.jobs or default_jobs())
+    if args.json:
+        print(json.dumps({"status": "success", **res}))
+    else:
+        print(
+            f"files_indexed={res['files_indexed']} files_unchanged={res['files_unchanged']} "
+            f"files_removed={res['files_removed']} files_failed={res['files_failed']} "
+            f"functions_embedded={res['indexed']} functions_removed={res['functions_removed']} "
+            f"call_edges={res.get('call_edges', 'unchanged')} elapsed={res['elapsed_seconds']}s"
+        )
+    return 0 if not res["files_failed"] else 1
+
+
 def build_parser() -> argparse.ArgumentParser:
     p = argparse.ArgumentParser(prog="cflow-code-intel", description="Code intelligence utilities")
     sub = p.add_subparsers(dest="cmd", required=True)
     p_index = sub.add_parser("index-functions", help="Index functions and embed summaries")
     p_index.add_argument("--changed-only", action="store_true", help="Index only changed files (git)")
+    p_index.add_argument("--jobs", type=int, default=None, help="Extraction processes (default: one per CPU)")
     p_index.set_defaults(func=_cmd_index)
     p_graph = sub.add_parser("build-callgraph", help="Build a call graph and persist to local store")
     p_graph.set_defaults(func=_cmd_build_graph)
+    p_sync = sub.add_parser("sync", help="Incrementally re-index changed files and update the call graph")
+    p_sync.add_argument("--root", default=None, help="Repository root (defaults to CWD)")
+    p_sync.add_argument("--json", action="store_true", help="Emit JSON result")
+    p_sync.add_argument("--jobs", type=int, default=None, help="Extraction processes (default: one per CPU)")
+    p_sync.set_defaults(func=_cmd_sync)
     return p
 
 
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from cflow_platform.core.code_intel.extraction import CODE_SUFFIXES, default_jobs, scan_paths
+from cflow_platform.core.services.codebase_vectorization_pipeline import discover_files
+
+
+def run_benchmark(root: Path, jobs: List[int], limit: Optional[int] = None) -> Dict[str, Any]:
+    """Files/sec of code-intel extraction (read, hash, functions and call edges) per pool size.
+
+    Embedding and storage are not included; the manifest is bypassed, so
+    every file is extracted on every run.
+    """
+    root = root.resolve()
+    files = [str(root / rel) for rel in discover_files(root) if Path(rel).suffix.lower() in CODE_SUFFIXES]
+    if limit:
+        files = files[:limit]
+    tasks = [(f, None) for f in files]
+    runs: Dict[str, Dict[str, Any]] = {}
+    baseline = None
+    for n in jobs:
+        start = time.perf_counter()
+        functions = edges = 0
+        for scanned in scan_paths(tasks, n):
+            functions += len(scanned.functions)
+            edges += len(scanned.edges)
+        elapsed = time.perf_counter() - start
+        rate = len(files) / elapsed if elapsed > 0 else 0.0
+        baseline = baseline or rate
+        runs[str(n)] = {
+            "seconds": round(elapsed, 3),
+            "files_per_second": round(rate, 1),
+            "functions": functions,
+            "edges": edges,
+            "speedup": round(rate / baseline, 2) if baseline else 0.0,
+        }
+    return {"root": str(root), "files": len(files), "jobs": runs}
+
+
+def cli() -> int:
+    p = argparse.ArgumentParser(description="Benchmark code-intel extraction throughput (files/sec)")
+    p.add_argument("--root", default=".", help="tree to extract (defaults to CWD)")
+    p.add_argument("--jobs", type=int, nargs="*", default=None, help="pool sizes to compare (default: 1 and one per CPU)")
+    p.add_argument("--limit", type=int, default=None, help="only the first N files")
+    args = p.parse_args()
+    jobs = args.jobs or sorted({1, default_jobs()})
+    print(json.dumps(run_benchmark(Path(args.root), jobs, args.limit), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(cli())
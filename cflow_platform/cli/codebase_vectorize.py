@@ -3,40 +3,75 @@ from __future__ import annotations
 import argparse
 import asyncio
 import json
+import sys
 from typing import Any
 
+from cflow_platform.core.services.codebase_vectorization_pipeline import PipelineConfig
 from cflow_platform.core.services.enterprise_codebase_vectorization_service import (
     CoreCodebaseVectorizer,
 )
 
 
+def _progress(report: dict[str, Any]) -> None:
+    done = report["files_processed"] + report["files_unchanged"] + report["files_failed"]
+    print(
+        f"\r{done}/{report['files_total']} files  {report['chunks_embedded']} chunks embedded  "
+        f"{report['files_per_second']} files/s",
+        end="",
+        file=sys.stderr,
+        flush=True,
+    )
+
+
 async def _run(commit: str, repo: str | None, chroma_path: str | None) -> dict[str, Any]:
     svc = CoreCodebaseVectorizer(chroma_path=chroma_path)
     return await svc.process_commit(commit_hash=commit, repo_path=repo)
 
 
+async def _run_all(repo: str | None, chroma_path: str | None, config: PipelineConfig, quiet: bool) -> dict[str, Any]:
+    svc = CoreCodebaseVectorizer(chroma_path=chroma_path)
+    result = await svc.vectorize_repository(repo or ".", config=config, progress=None if quiet else _progress)
+    if not quiet:
+        print(file=sys.stderr)
+    return result
+
+
 def cli() -> int:
     parser = argparse.ArgumentParser(description="CFlow codebase vectorization (core)")
-    parser.add_argument("--commit", required=True, help="Git commit hash to process")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--commit", help="Git commit hash to process")
+    target.add_argument("--all", action="store_true", help="Index the whole repository (resumes from the manifest)")
     parser.add_argument("--repo", default=None, help="Path to git repo (defaults to CWD)")
     parser.add_argument("--chroma-path", default=None, help="Chroma persistence path")
+    parser.add_argument("--workers", type=int, default=None, help="Read/chunk processes for --all")
+    parser.add_argument("--embed-batch", type=int, default=None, help="Chunks per embedding batch for --all")
     parser.add_argument("--json", action="store_true", help="Emit JSON result")
     args = parser.parse_args()
 
-    result = asyncio.get_event_loop().run_until_complete(
-        _run(args.commit, args.repo, args.chroma_path)
-    )
+    if args.all:
+        config = PipelineConfig()
+        if args.workers:
+            config.workers = args.workers
+        if args.embed_batch:
+            config.embed_batch_size = args.embed_batch
+        coro = _run_all(args.repo, args.chroma_path, config, quiet=args.json)
+    else:
+        coro = _run(args.commit, args.repo, args.chroma_path)
+    result = asyncio.get_event_loop().run_until_complete(coro)
     if args.json:
         print(json.dumps(result))
     else:
         print(
             f"commit={result.get('commit')} files_processed={result.get('files_processed')} "
-            f"vectors_written={result.get('vectors_written')}"
+            f"vectors_written={result.get('vectors_written')} chunks_unchanged={result.get('chunks_unchanged')} "
+            f"chunks_deleted={result.get('chunks_deleted')}"
         )
+        if args.all:
+            print(f"elapsed={result.get('elapsed_seconds')}s files_per_second={result.get('files_per_second')}")
+            for name, stage in result.get("stages", {}).items():
+                print(f"  {name}: {stage['items']} items, {stage['items_per_second']}/s busy")
     return 0
 
 
 if __name__ == "__main__":
     raise SystemExit(cli())
-
-
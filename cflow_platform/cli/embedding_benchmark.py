@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import argparse
+import json
+import random
+from typing import List
+
+
+_WORDS = [
+    "def", "return", "vector", "embedding", "index", "cache", "task", "query", "result",
+    "config", "handler", "async", "await", "batch", "token", "model", "thread", "node",
+]
+
+
+def _synthetic_texts(count: int, seed: int = 0) -> List[str]:
+    """Mixed short and long texts, roughly like code chunks and queries"""
+    rng = random.Random(seed)
+    texts = []
+    for _ in range(count):
+        words = rng.choice([rng.randint(4, 16), rng.randint(40, 120), rng.randint(200, 400)])
+        texts.append(" ".join(rng.choice(_WORDS) for _ in range(words)))
+    return texts
+
+
+def cli() -> int:
+    p = argparse.ArgumentParser(description="Benchmark embedding models or CPU backend variants")
+    p.add_argument("--mode", choices=["models", "cpu"], default="cpu", help="compare models or CPU variants")
+    p.add_argument("--count", type=int, default=256, help="synthetic texts to embed")
+    p.add_argument("--texts-file", default=None, help="newline-separated texts to embed instead")
+    args = p.parse_args()
+
+    from cflow_platform.core.embeddings.enhanced_apple_silicon_accelerator import get_enhanced_accelerator
+
+    if args.texts_file:
+        with open(args.texts_file, encoding="utf-8") as f:
+            texts = [line.rstrip("\n") for line in f if line.strip()]
+    else:
+        texts = _synthetic_texts(args.count)
+    print(json.dumps(get_enhanced_accelerator().benchmark_models(texts, mode=args.mode), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(cli())
@@ -23,16 +23,28 @@ def _client():
     return create_client(url, key)
 
 
-def _embed_text(text: str) -> List[float]:
+def _embed_texts(texts: List[str]) -> List[Any]:
+    """Embed texts in one model call; if it fails, every entry comes back as the exception"""
     import asyncio
     from cflow_platform.core.services.ai.embedding_service import get_embedding_service  # type: ignore
 
-    async def _go(t: str):
-        svc = get_embedding_service()
-        vecs = await svc.generate_embeddings([t])
-        return vecs[0] if vecs else []
+    async def _go(ts: List[str]):
+        # Bulk input goes straight to the model: the micro-batcher would only
+        # split it into sequential max_batch_size calls
+        try:
+            service = await asyncio.to_thread(get_embedding_service)
+            return list(await asyncio.to_thread(service.embed_documents, ts))
+        except Exception as e:
+            return [e] * len(ts)
+
+    return asyncio.run(_go(texts)) if texts else []
+
 
-    return asyncio.run(_go(text))
+def _embed_text(text: str) -> List[float]:
+    emb = _embed_texts([text])[0]
+    if isinstance(emb, BaseException):
+        raise emb
+    return emb
 
 
 def run_etl(limit: int = 100) -> Dict[str, Any]:
@@ -45,6 +57,9 @@ def run_etl(limit: int = 100) -> Dict[str, Any]:
         return {"success": False, "error": f"fetch_tasks: {e}"}
     inserted = 0
     errors: List[str] = []
+    # Embed every task up front so the model sees full batches, not one text per call
+    texts = list(dict.fromkeys(c for c in ((r.get("description") or "").strip() for r in rows) if c))
+    embeddings = dict(zip(texts, _embed_texts(texts)))
     for r in rows:
         try:
             tid = str(r.get("id"))
@@ -64,7 +79,9 @@ def run_etl(limit: int = 100) -> Dict[str, Any]:
             kid = (ki_rows[0] or {}).get("id") if ki_rows else None
             if not kid:
                 continue
-            emb = _embed_text(content)
+            emb = embeddings[content]
+            if isinstance(emb, BaseException):
+                raise emb
             client.table("knowledge_embeddings").insert({
                 "knowledge_item_id": kid,
                 "tenant_id": tenant_id,
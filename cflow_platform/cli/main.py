@@ -30,6 +30,26 @@ def cli():
 cli.add_command(bmad_cli, name="bmad")
 
 
+@cli.group(name="code-intel")
+def code_intel():
+    """Code intelligence index (functions and call graph)."""
+    pass
+
+
+@code_intel.command(name="sync")
+@click.option("--root", default=None, help="Repository root (defaults to CWD)")
+@click.option("--json", "as_json", is_flag=True, help="Emit JSON result")
+@click.option("--jobs", type=int, default=None, help="Extraction processes (default: one per CPU)")
+def code_intel_sync(root, as_json, jobs):
+    """Re-index files changed since the last sync and update the call graph."""
+    from .code_intel import build_parser
+
+    argv = ["sync"] + (["--root", root] if root else []) + (["--json"] if as_json else [])
+    argv += ["--jobs", str(jobs)] if jobs else []
+    args = build_parser().parse_args(argv)
+    sys.exit(args.func(args))
+
+
 @cli.command()
 def version():
     """Show version information."""
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+from cflow_platform.core.memory.local_store import LocalMemoryStore
+
+
+_WORDS = [
+    "cache", "eviction", "vector", "embedding", "task", "checkpoint", "episode", "planner",
+    "sandbox", "query", "index", "segment", "latency", "memory", "graph", "callgraph",
+]
+
+
+def _build(root: Path, items: int, dim: int, dtype: str, batch: int, seed: int) -> LocalMemoryStore:
+    rng = np.random.default_rng(seed)
+    store = LocalMemoryStore(root, vector_dtype=dtype)
+    for start in range(0, items, batch):
+        count = min(batch, items - start)
+        words = rng.integers(0, len(_WORDS), size=(count, 6))
+        records = [
+            {"id": f"M{start + i}", "user_id": "system", "content": " ".join(_WORDS[w] for w in row), "metadata": {}}
+            for i, row in enumerate(words)
+        ]
+        store.add_many(records, rng.standard_normal((count, dim), dtype=np.float32))
+    return store
+
+
+def _timed(fn, queries: int) -> Dict[str, float]:
+    samples: List[float] = []
+    for _ in range(queries):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        "p50_ms": round(statistics.median(samples), 2),
+        "p95_ms": round(samples[int(0.95 * (len(samples) - 1))], 2),
+    }
+
+
+def run_benchmark(items: int, dim: int, dtype: str, queries: int, limit: int, seed: int = 0) -> Dict[str, object]:
+    """Build a synthetic store and time lexical, vector and hybrid searches"""
+    rng = np.random.default_rng(seed + 1)
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        store = _build(Path(tmp), items, dim, dtype, batch=10_000, seed=seed)
+        build_s = time.perf_counter() - start
+        query_vector = rng.standard_normal(dim).astype(np.float32).tolist()
+        results: Dict[str, object] = {
+            "items": items,
+            "dim": dim,
+            "dtype": dtype,
+            "build_s": round(build_s, 2),
+            "lexical": _timed(lambda: store.search("cache eviction", limit=limit), queries),
+            "vector": _timed(lambda: store.search("", limit=limit, query_vector=query_vector), queries),
+            "hybrid": _timed(
+                lambda: store.search("cache eviction", limit=limit, query_vector=query_vector, hybrid_weight=0.7),
+                queries,
+            ),
+        }
+        store.close()
+    return results
+
+
+def cli() -> int:
+    p = argparse.ArgumentParser(description="Benchmark local memory search (BM25, cosine, hybrid)")
+    p.add_argument("--items", type=int, default=100_000, help="synthetic memories to index")
+    p.add_argument("--dim", type=int, default=384, help="embedding dimension")
+    p.add_argument("--dtype", choices=["float32", "float16"], default="float32")
+    p.add_argument("--queries", type=int, default=50, help="queries per mode")
+    p.add_argument("--limit", type=int, default=10)
+    args = p.parse_args()
+    print(json.dumps(run_benchmark(args.items, args.dim, args.dtype, args.queries, args.limit), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(cli())
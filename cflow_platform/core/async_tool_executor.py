@@ -8,6 +8,7 @@ response streaming, connection pooling, and memory monitoring.
 import asyncio
 import logging
 import time
+import uuid
 from typing import Any, Dict, List, Optional, Callable, Awaitable
 from dataclasses import dataclass
 from enum import Enum
@@ -16,6 +17,8 @@ import aiohttp
 import redis.asyncio as redis
 from contextlib import asynccontextmanager
 
+from .direct_client import execute_mcp_tool
+
 logger = logging.getLogger(__name__)
 
 
@@ -57,7 +60,8 @@ class AsyncToolExecutor:
         self,
         max_concurrent: int = 1000,
         max_memory_mb: int = 512,
-        connection_pool_size: int = 100
+        connection_pool_size: int = 100,
+        max_thread_workers: Optional[int] = None
     ):
         self.max_concurrent = max_concurrent
         self.max_memory_mb = max_memory_mb
@@ -77,12 +81,23 @@ class AsyncToolExecutor:
         self.connection_pool = None
         self.redis_pool = None
         
-        # Execution tracking
-        self.active_executions = {}
+        # Long-lived pool for sync handlers
+        self.thread_pool = ThreadPoolExecutor(
+            max_workers=max_thread_workers,
+            thread_name_prefix="async-tool"
+        )
+        
+        # Execution tracking: request_id -> future resolved by the worker,
+        # request_id -> task currently running the handler
+        self.pending_results: Dict[str, asyncio.Future] = {}
+        self.active_executions: Dict[str, asyncio.Task] = {}
+        self.workers: List[asyncio.Task] = []
         self.execution_stats = {
             "total_executions": 0,
             "successful_executions": 0,
             "failed_executions": 0,
+            "cancelled_executions": 0,
+            "timed_out_executions": 0,
             "average_execution_time": 0.0,
             "current_memory_usage": 0.0
         }
@@ -134,61 +149,83 @@ class AsyncToolExecutor:
         """Start execution workers for each priority queue"""
         for priority in Priority:
             for worker_id in range(2):  # 2 workers per priority
-                asyncio.create_task(self._execution_worker(priority, worker_id))
+                self.workers.append(asyncio.create_task(self._execution_worker(priority, worker_id)))
         
         logger.info("Execution workers started")
     
     async def _start_memory_monitoring(self):
         """Start memory monitoring task"""
-        asyncio.create_task(self._memory_monitor_task())
+        self.workers.append(asyncio.create_task(self._memory_monitor_task()))
         logger.info("Memory monitoring started")
     
     async def _execution_worker(self, priority: Priority, worker_id: int):
         """Execution worker for a specific priority queue"""
         logger.info(f"Starting execution worker {worker_id} for priority {priority.name}")
         
+        queue = self.execution_queues[priority]
         while True:
+            request = await queue.get()
             try:
-                # Get request from queue
-                request = await self.execution_queues[priority].get()
+                future = self.pending_results.get(request.request_id)
+                if future is None or future.done():
+                    # Cancelled or timed out while still queued
+                    continue
                 
                 # Execute with semaphore and memory monitoring
                 async with self.semaphore:
                     await self.memory_monitor.acquire()
                     try:
-                        result = await self._execute_tool(request)
-                        await self._handle_execution_result(result)
+                        task = asyncio.create_task(self._execute_tool(request))
+                        self.active_executions[request.request_id] = task
+                        await asyncio.wait({task})
                     finally:
-                        self.memory_monitor.release()
+                        self.active_executions.pop(request.request_id, None)
+                        await self.memory_monitor.release()
                 
-                # Mark task as done
-                self.execution_queues[priority].task_done()
+                if task.cancelled():
+                    self.execution_stats["cancelled_executions"] += 1
+                    continue
+                result = task.result()
+                await self._handle_execution_result(result)
+                if not future.done():
+                    future.set_result(result)
                 
+            except asyncio.CancelledError:
+                raise
             except Exception as e:
                 logger.error(f"Execution worker {worker_id} error: {e}")
-                await asyncio.sleep(1)  # Brief pause before retry
+                future = self.pending_results.get(request.request_id)
+                if future is not None and not future.done():
+                    future.set_result(ToolExecutionResult(
+                        request_id=request.request_id,
+                        tool_name=request.tool_name,
+                        result=None,
+                        execution_time=0.0,
+                        success=False,
+                        error=str(e)
+                    ))
+            finally:
+                queue.task_done()
     
     async def _execute_tool(self, request: ToolExecutionRequest) -> ToolExecutionResult:
         """Execute a single tool request"""
         start_time = time.time()
-        request_id = request.request_id or f"{request.tool_name}_{int(start_time * 1000)}"
+        request_id = request.request_id
         
         try:
-            # Get tool handler
+            # Registered handlers take precedence; anything else goes through
+            # the direct client dispatch table
             handler = self.tool_handlers.get(request.tool_name)
-            if not handler:
-                raise ValueError(f"Tool handler not found: {request.tool_name}")
-            
-            # Execute tool
-            if asyncio.iscoroutinefunction(handler):
+            if handler is None:
+                result = await execute_mcp_tool(request.tool_name, **request.arguments)
+            elif asyncio.iscoroutinefunction(handler):
                 result = await handler(request.arguments)
             else:
-                # Run sync handler in thread pool
-                loop = asyncio.get_event_loop()
-                with ThreadPoolExecutor() as executor:
-                    result = await loop.run_in_executor(
-                        executor, handler, request.arguments
-                    )
+                # Run sync handler in the shared thread pool
+                loop = asyncio.get_running_loop()
+                result = await loop.run_in_executor(
+                    self.thread_pool, handler, request.arguments
+                )
             
             execution_time = time.time() - start_time
             
@@ -266,35 +303,70 @@ class AsyncToolExecutor:
         timeout: float = 30.0,
         request_id: str = None
     ) -> ToolExecutionResult:
-        """Execute a tool asynchronously"""
+        """Execute a tool asynchronously and wait for its result.
+        
+        The request is queued by priority and resolved by an execution worker.
+        If no result arrives within ``timeout`` seconds the request is
+        cancelled and a failed result is returned.
+        """
+        if not self.workers:
+            await self._start_execution_workers()
+        
+        request_id = request_id or f"{tool_name}_{uuid.uuid4().hex}"
+        if request_id in self.pending_results:
+            raise ValueError(f"Request already in flight: {request_id}")
+        
         request = ToolExecutionRequest(
             tool_name=tool_name,
-            arguments=arguments,
+            arguments=arguments or {},
             priority=priority,
             timeout=timeout,
             request_id=request_id
         )
+        future = asyncio.get_running_loop().create_future()
+        self.pending_results[request_id] = future
         
-        # Add to appropriate queue
-        await self.execution_queues[priority].put(request)
-        
-        # Wait for execution to complete
-        # Note: In a real implementation, you'd want to track the request
-        # and return the result when it's ready
-        return await self._wait_for_result(request_id or f"{tool_name}_{int(time.time() * 1000)}")
+        try:
+            # Add to appropriate queue
+            await self.execution_queues[priority].put(request)
+            return await self._wait_for_result(request, future)
+        except asyncio.CancelledError:
+            self.cancel(request_id)
+            raise
+        finally:
+            self.pending_results.pop(request_id, None)
     
-    async def _wait_for_result(self, request_id: str) -> ToolExecutionResult:
-        """Wait for execution result (simplified implementation)"""
-        # This is a simplified implementation
-        # In practice, you'd want to use a more sophisticated result tracking system
-        await asyncio.sleep(0.1)  # Brief pause to simulate async execution
-        return ToolExecutionResult(
-            request_id=request_id,
-            tool_name="unknown",
-            result={"status": "executed"},
-            execution_time=0.1,
-            success=True
-        )
+    async def _wait_for_result(
+        self,
+        request: ToolExecutionRequest,
+        future: asyncio.Future
+    ) -> ToolExecutionResult:
+        """Wait for the worker to resolve the request's future"""
+        start_time = time.time()
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), request.timeout)
+        except asyncio.TimeoutError:
+            self.cancel(request.request_id)
+            self.execution_stats["timed_out_executions"] += 1
+            return ToolExecutionResult(
+                request_id=request.request_id,
+                tool_name=request.tool_name,
+                result=None,
+                execution_time=time.time() - start_time,
+                success=False,
+                error=f"Tool execution timeout after {request.timeout}s"
+            )
+    
+    def cancel(self, request_id: str) -> bool:
+        """Cancel a queued or running request. Returns False if it is unknown or finished."""
+        future = self.pending_results.get(request_id)
+        if future is None or future.done():
+            return False
+        future.cancel()
+        task = self.active_executions.get(request_id)
+        if task is not None:
+            task.cancel()
+        return True
     
     def register_tool_handler(self, tool_name: str, handler: Callable):
         """Register a tool handler"""
@@ -307,18 +379,29 @@ class AsyncToolExecutor:
     
     async def get_queue_status(self) -> Dict[str, Any]:
         """Get queue status information"""
-        return {
+        status = {
             priority.name: {
                 "size": queue.qsize(),
                 "maxsize": queue.maxsize
             }
             for priority, queue in self.execution_queues.items()
         }
+        status["pending"] = len(self.pending_results)
+        status["running"] = len(self.active_executions)
+        return status
     
     async def shutdown(self):
         """Shutdown the async tool executor"""
         logger.info("Shutting down AsyncToolExecutor...")
         
+        for request_id in list(self.pending_results):
+            self.cancel(request_id)
+        for worker in self.workers:
+            worker.cancel()
+        await asyncio.gather(*self.workers, return_exceptions=True)
+        self.workers.clear()
+        self.thread_pool.shutdown(wait=False)
+        
         # Close connection pools
         if self.connection_pool:
             await self.connection_pool.close()
@@ -384,6 +467,7 @@ class StreamingResponse:
 
 # Module-level functions for backward compatibility and convenience
 _executor_instance: Optional[AsyncToolExecutor] = None
+_executor_loop: Optional[asyncio.AbstractEventLoop] = None
 
 
 async def execute_tool_async(
@@ -406,15 +490,6 @@ async def execute_tool_async(
     """
     executor = await get_executor()
     
-    # Create execution request
-    request = ToolExecutionRequest(
-        tool_name=tool_name,
-        arguments=kwargs,
-        priority=priority,
-        timeout=timeout_seconds,
-        request_id=f"{tool_name}_{int(time.time() * 1000)}"
-    )
-    
     # Execute the tool
     return await executor.execute_tool(
         tool_name=tool_name,
@@ -431,10 +506,16 @@ async def get_executor() -> AsyncToolExecutor:
     Returns:
         AsyncToolExecutor instance
     """
-    global _executor_instance
+    global _executor_instance, _executor_loop
     
-    if _executor_instance is None:
+    loop = asyncio.get_running_loop()
+    if _executor_instance is None or _executor_loop is not loop:
+        # Workers are tasks on the loop that created them; a new loop (e.g. a
+        # fresh asyncio.run in a CLI) needs its own executor
+        if _executor_instance is not None:
+            _executor_instance.thread_pool.shutdown(wait=False)
         _executor_instance = AsyncToolExecutor()
+        _executor_loop = loop
         await _executor_instance.initialize()
     
     return _executor_instance
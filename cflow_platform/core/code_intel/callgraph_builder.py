@@ -2,11 +2,16 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import List, Optional, Tuple
 import ast
 import subprocess
 
-from cflow_platform.core.code_intel.function_extractor import extract_functions, FunctionInfo
+from cflow_platform.core.code_intel.function_extractor import (
+    FunctionInfo,
+    extract_functions,
+    parse_python,
+    python_function_info,
+)
 
 
 @dataclass
@@ -16,56 +21,88 @@ class CallEdge:
     caller: FunctionInfo
 
 
-def _python_call_edges(file_path: Path, content: str, functions: List[FunctionInfo]) -> List[CallEdge]:
-    results: List[CallEdge] = []
-    try:
-        tree = ast.parse(content)
-    except Exception:
-        return results
-
-    # Build quick lookup of function spans to map calls to caller function
-    spans: List[Tuple[FunctionInfo, int, int]] = []
-    for f in functions:
-        if f.language != "python":
-            continue
-        spans.append((f, f.start_line, f.end_line))
-
-    class Visitor(ast.NodeVisitor):
-        def __init__(self) -> None:
-            super().__init__()
-            self.current_line = 1
-
-        def visit(self, node: ast.AST) -> None:  # type: ignore[override]
-            self.current_line = getattr(node, "lineno", self.current_line)
-            super().visit(node)
-
-        def visit_Call(self, node: ast.Call) -> None:  # type: ignore[override]
+def _caller_id(f: FunctionInfo) -> str:
+    return f"{f.file_path}:{f.name}:{f.start_line}-{f.end_line}"
+
+
+class _FunctionCallVisitor(ast.NodeVisitor):
+    """One pass collecting functions and the calls made directly inside each.
+
+    An explicit stack of enclosing functions attributes every call to the
+    innermost function whose body contains it. Decorators, default values
+    and annotations run in the enclosing scope, so they are visited before
+    the function is pushed.
+    """
+
+    def __init__(self, file_path: Path) -> None:
+        super().__init__()
+        self.file_path = file_path
+        self.functions: List[FunctionInfo] = []
+        self.edges: List[CallEdge] = []
+        self._stack: List[Tuple[FunctionInfo, str]] = []
+        # Names of the enclosing classes and functions, for qualified names
+        self._scope: List[str] = []
+
+    def visit_ClassDef(self, node: ast.ClassDef) -> None:  # type: ignore[override]
+        self._scope.append(node.name)
+        self.generic_visit(node)
+        self._scope.pop()
+
+    def visit_FunctionDef(self, node: ast.FunctionDef) -> None:  # type: ignore[override]
+        info = python_function_info(node, self.file_path, self._scope)
+        self.functions.append(info)
+        for expr in node.decorator_list:
+            self.visit(expr)
+        self.visit(node.args)
+        if node.returns is not None:
+            self.visit(node.returns)
+        self._stack.append((info, _caller_id(info)))
+        self._scope.append(node.name)
+        for stmt in node.body:
+            self.visit(stmt)
+        self._scope.pop()
+        self._stack.pop()
+
+    def visit_Call(self, node: ast.Call) -> None:  # type: ignore[override]
+        if self._stack:
             name = None
             if isinstance(node.func, ast.Name):
                 name = node.func.id
             elif isinstance(node.func, ast.Attribute):
                 name = node.func.attr
             if name:
-                # find enclosing function by line
-                for f, start, end in spans:
-                    if start <= self.current_line <= end:
-                        results.append(CallEdge(caller_id=f"{f.file_path}:{f.name}:{f.start_line}-{f.end_line}", callee_name=name, caller=f))
-                        break
-            self.generic_visit(node)
+                info, caller_id = self._stack[-1]
+                self.edges.append(CallEdge(caller_id=caller_id, callee_name=name, caller=info))
+        self.generic_visit(node)
+
 
+def python_functions_and_edges(
+    file_path: Path, content: Optional[str] = None, tree: Optional[ast.AST] = None
+) -> Tuple[List[FunctionInfo], List[CallEdge]]:
+    """Functions and call edges of a Python file from a single parse (or the given ``tree``)"""
+    if tree is None:
+        if content is None:
+            try:
+                content = file_path.read_text(encoding="utf-8", errors="ignore")
+            except Exception:
+                return [], []
+        tree = parse_python(content)
+        if tree is None:
+            return [], []
+    visitor = _FunctionCallVisitor(file_path)
     try:
-        Visitor().visit(tree)
+        visitor.visit(tree)
     except RecursionError:
-        return results
-    return results
+        pass
+    return visitor.functions, visitor.edges
 
 
-def build_call_edges(file_path: Path, content: str) -> List[CallEdge]:
+def build_call_edges(file_path: Path, content: Optional[str] = None, tree: Optional[ast.AST] = None) -> List[CallEdge]:
+    if file_path.suffix.lower() == ".py":
+        return python_functions_and_edges(file_path, content, tree)[1]
     fns = extract_functions(file_path, content)
     if not fns:
         return []
-    if file_path.suffix.lower() == ".py":
-        return _python_call_edges(file_path, content, fns)
     if file_path.suffix.lower() in {".ts", ".tsx"}:
         # Use ts-morph via a small Node helper if available (optional)
         try:
@@ -0,0 +1,358 @@
+"""
+Call Graph Index
+
+Compact, memory-mapped form of the call graph that answers "who calls X"
+without loading or re-parsing the edge list:
+- Every function name, path and caller id is interned once in a sorted
+  string table; lookups binary-search it in place
+- Edges are stored CSR-style (offset array plus target array) in both
+  directions: callee name -> calling edges, caller name -> callee names
+- One file of native-endian uint32 arrays behind a small header, written
+  atomically and opened with mmap, so loading costs no parsing and the OS
+  pages in only what a query touches
+- ``bounded_call_paths`` walks callers breadth-first, visiting each edge
+  at most once, with a frontier capped at ``max_paths`` chains and a depth
+  cap of ``max_depth``
+- The header records the size and mtime of the JSONL edge list the index
+  was built from, so a stale index is detected without reading either file
+"""
+
+from __future__ import annotations
+
+import logging
+import mmap
+import os
+import struct
+import sys
+import threading
+from array import array
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Collection, Dict, Hashable, Iterable, List, Optional, Sequence, Set, Tuple, TypeVar
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"CFCGIDX1"
+INDEX_VERSION = 1
+DEFAULT_MAX_PATHS = 200
+
+# magic, version, byte order (0 little / 1 big), strings, callers, edges, forward edges,
+# blob bytes, source size, source mtime_ns
+_HEADER = struct.Struct("<8sIIIIIIIqq")
+_BYTE_ORDER = 0 if sys.byteorder == "little" else 1
+
+H = TypeVar("H", bound=Hashable)
+
+
+@dataclass(frozen=True)
+class IndexedEdge:
+    """A call edge resolved from the index (same fields as ``StoredEdge``)"""
+    caller_id: str
+    caller_name: str
+    caller_path: str
+    callee_name: str
+
+
+class CallGraphIndexError(Exception):
+    """The index file is missing, truncated or written by another format version"""
+
+
+def bounded_call_paths(
+    starts: Sequence[H],
+    callers_of: Callable[[H], Sequence[H]],
+    caller: Callable[[H], Hashable],
+    max_depth: int = 6,
+    max_paths: int = DEFAULT_MAX_PATHS,
+) -> List[List[H]]:
+    """Up to ``max_paths`` caller chains ending in ``starts``, shortest first.
+
+    ``caller`` names the calling function of an edge; a chain never visits
+    the same function twice. A chain ends at a function nobody calls, when
+    every caller was already expanded by another chain (or would close a
+    cycle), or at ``max_depth`` edges. The frontier never holds more chains
+    than can still be reported, so the walk touches at most
+    ``max_paths * max_depth`` edges however wide the graph is.
+    """
+    if max_paths <= 0:
+        return []
+    # Entries are (edge, parent entry index, depth, calling function); chains
+    # are rebuilt from parent links only for the paths actually reported
+    entries: List[Tuple[H, int, int, Hashable]] = []
+    seen = set()
+    queue: deque = deque()
+    for edge in starts:
+        if len(queue) >= max_paths:
+            break
+        if edge not in seen:
+            seen.add(edge)
+            entries.append((edge, -1, 1, caller(edge)))
+            queue.append(len(entries) - 1)
+
+    def on_chain(idx: int, node: Hashable) -> bool:
+        while idx >= 0:
+            if entries[idx][3] == node:
+                return True
+            idx = entries[idx][1]
+        return False
+
+    paths: List[List[H]] = []
+    while queue:
+        idx = queue.popleft()
+        edge, _, depth, _ = entries[idx]
+        room = max_paths - len(paths) - len(queue)
+        extended = False
+        if depth < max_depth:
+            for up in callers_of(edge):
+                if room <= 0:
+                    break
+                if up in seen:
+                    continue
+                node = caller(up)
+                if on_chain(idx, node):
+                    continue
+                seen.add(up)
+                entries.append((up, idx, depth + 1, node))
+                queue.append(len(entries) - 1)
+                room -= 1
+                extended = True
+        if not extended:
+            chain: List[H] = []
+            while idx >= 0:
+                chain.append(entries[idx][0])
+                idx = entries[idx][1]
+            chain.reverse()
+            paths.append(chain)
+    return paths
+
+
+def _signature(source: Optional[Path]) -> Tuple[int, int]:
+    """(size, mtime_ns) of ``source``; (-1, -1) when absent"""
+    try:
+        st = Path(source).stat() if source is not None else None
+    except OSError:
+        st = None
+    return (st.st_size, st.st_mtime_ns) if st is not None else (-1, -1)
+
+
+def _csr(keys: Sequence[int], size: int) -> array:
+    """Offsets for ``keys`` (already sorted) over ``size`` slots"""
+    offsets = array("I", bytes(4 * (size + 1)))
+    for k in keys:
+        offsets[k + 1] += 1
+    for i in range(size):
+        offsets[i + 1] += offsets[i]
+    return offsets
+
+
+def write_index(edges: Iterable, path: Path, source: Optional[Path] = None) -> Dict[str, int]:
+    """Build the index for ``edges`` (objects with the ``StoredEdge`` fields) and write it to ``path``.
+
+    ``source`` is the edge list the edges were read from; its signature is
+    recorded so ``CallGraphIndex.is_current_for`` can tell when it changed.
+    """
+    source_size, source_mtime = _signature(source)
+    records = {(e.caller_id, e.caller_name, e.caller_path, e.callee_name) for e in edges}
+    strings = sorted({s.encode("utf-8") for r in records for s in r})
+    sid = {s: i for i, s in enumerate(strings)}
+
+    def intern(text: str) -> int:
+        return sid[text.encode("utf-8")]
+
+    callers = sorted({(intern(r[0]), intern(r[1]), intern(r[2])) for r in records})
+    caller_idx = {c[0]: i for i, c in enumerate(callers)}
+    # Edges sorted by callee so each callee's calling edges are contiguous
+    rev = sorted((intern(r[3]), caller_idx[intern(r[0])]) for r in records)
+    fwd = sorted({(callers[c][1], callee) for callee, c in rev})
+
+    str_offsets = array("I", [0])
+    for s in strings:
+        str_offsets.append(str_offsets[-1] + len(s))
+    arrays = [
+        str_offsets,
+        array("I", [c[0] for c in callers]),
+        array("I", [c[1] for c in callers]),
+        array("I", [c[2] for c in callers]),
+        array("I", [callee for callee, _ in rev]),
+        array("I", [c for _, c in rev]),
+        _csr([callee for callee, _ in rev], len(strings)),
+        _csr([name for name, _ in fwd], len(strings)),
+        array("I", [callee for _, callee in fwd]),
+    ]
+    blob = b"".join(strings)
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.tmp-{os.getpid()}")
+    with tmp.open("wb") as f:
+        f.write(_HEADER.pack(
+            MAGIC, INDEX_VERSION, _BYTE_ORDER, len(strings), len(callers), len(rev), len(fwd), len(blob),
+            source_size, source_mtime,
+        ))
+        for a in arrays:
+            a.tofile(f)
+        f.write(blob)
+    os.replace(tmp, path)
+    return {"strings": len(strings), "callers": len(callers), "edges": len(rev), "forward_edges": len(fwd)}
+
+
+class CallGraphIndex:
+    """Read-only view over an index file written by ``write_index``"""
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        with self.path.open("rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < _HEADER.size:
+                raise CallGraphIndexError(f"{self.path}: truncated header")
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, order, n_str, n_callers, n_edges, n_fwd, n_blob, src_size, src_mtime = _HEADER.unpack_from(
+            self._mm, 0
+        )
+        if magic != MAGIC or version != INDEX_VERSION or order != _BYTE_ORDER:
+            self._mm.close()
+            raise CallGraphIndexError(f"{self.path}: unsupported index format")
+        lengths = [n_str + 1, n_callers, n_callers, n_callers, n_edges, n_edges, n_str + 1, n_str + 1, n_fwd]
+        if _HEADER.size + 4 * sum(lengths) + n_blob != size:
+            self._mm.close()
+            raise CallGraphIndexError(f"{self.path}: size does not match header")
+
+        view = memoryview(self._mm)
+        pos = _HEADER.size
+        parts = []
+        for n in lengths:
+            parts.append(view[pos : pos + 4 * n].cast("I"))
+            pos += 4 * n
+        (
+            self._str_offsets,
+            self._caller_key,
+            self._caller_name,
+            self._caller_path,
+            self._edge_callee,
+            self._edge_caller,
+            self._rev_offsets,
+            self._fwd_offsets,
+            self._fwd_targets,
+        ) = parts
+        self._blob = view[pos : pos + n_blob]
+        self.num_strings = n_str
+        self.num_edges = n_edges
+        self.source_signature = (src_size, src_mtime)
+
+    def is_current_for(self, source: Path) -> bool:
+        """Whether the index was built from ``source`` as it is now"""
+        return self.source_signature == _signature(source)
+
+    # ---- string table -----------------------------------------------------------
+
+    def _bytes(self, i: int) -> bytes:
+        return self._blob[self._str_offsets[i] : self._str_offsets[i + 1]].tobytes()
+
+    def _string(self, i: int) -> str:
+        return self._bytes(i).decode("utf-8")
+
+    def _lookup(self, text: str) -> Optional[int]:
+        key = text.encode("utf-8")
+        lo, hi = 0, self.num_strings
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._bytes(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.num_strings and self._bytes(lo) == key:
+            return lo
+        return None
+
+    # ---- queries ----------------------------------------------------------------
+
+    def _edges_calling(self, name_id: int) -> range:
+        return range(self._rev_offsets[name_id], self._rev_offsets[name_id + 1])
+
+    def string_ids(self, texts: Iterable[str]) -> Set[int]:
+        """String table ids of those ``texts`` the index contains"""
+        return {i for i in (self._lookup(t) for t in texts) if i is not None}
+
+    def calling_edge_ids(self, name: str, skip_paths: Collection[int] = ()) -> List[int]:
+        """Ids of the edges calling ``name``, leaving out callers whose path id is in ``skip_paths``"""
+        name_id = self._lookup(name)
+        if name_id is None:
+            return []
+        edges = self._edges_calling(name_id)
+        if not skip_paths:
+            return list(edges)
+        return [e for e in edges if self._caller_path[self._edge_caller[e]] not in skip_paths]
+
+    def edge_caller_name(self, e: int) -> str:
+        return self._string(self._caller_name[self._edge_caller[e]])
+
+    def edge(self, e: int) -> IndexedEdge:
+        c = self._edge_caller[e]
+        return IndexedEdge(
+            caller_id=self._string(self._caller_key[c]),
+            caller_name=self._string(self._caller_name[c]),
+            caller_path=self._string(self._caller_path[c]),
+            callee_name=self._string(self._edge_callee[e]),
+        )
+
+    def callers_of(self, name: str) -> List[IndexedEdge]:
+        """Edges whose callee is ``name`` ("who calls X")"""
+        name_id = self._lookup(name)
+        if name_id is None:
+            return []
+        return [self.edge(e) for e in self._edges_calling(name_id)]
+
+    def callees_of(self, name: str) -> List[str]:
+        """Names called by any function called ``name``"""
+        name_id = self._lookup(name)
+        if name_id is None:
+            return []
+        lo, hi = self._fwd_offsets[name_id], self._fwd_offsets[name_id + 1]
+        return [self._string(t) for t in self._fwd_targets[lo:hi]]
+
+    def call_paths_to(
+        self, target_name: str, max_depth: int = 6, max_paths: int = DEFAULT_MAX_PATHS
+    ) -> List[List[IndexedEdge]]:
+        """Caller chains ending in ``target_name``; each chain starts with the edge calling the target"""
+        target = self._lookup(target_name)
+        if target is None:
+            return []
+        chains = bounded_call_paths(
+            list(self._edges_calling(target)),
+            lambda e: self._edges_calling(self._caller_name[self._edge_caller[e]]),
+            lambda e: self._caller_name[self._edge_caller[e]],
+            max_depth=max_depth,
+            max_paths=max_paths,
+        )
+        resolved: Dict[int, IndexedEdge] = {}
+        return [[resolved.setdefault(e, self.edge(e)) for e in chain] for chain in chains]
+
+    def close(self) -> None:
+        parts = [
+            self._str_offsets, self._caller_key, self._caller_name, self._caller_path,
+            self._edge_callee, self._edge_caller, self._rev_offsets, self._fwd_offsets,
+            self._fwd_targets, self._blob,
+        ]
+        for part in parts:
+            part.release()
+        self._mm.close()
+
+
+_open_indexes: Dict[str, Tuple[Tuple[int, int, int], CallGraphIndex]] = {}
+_open_lock = threading.Lock()
+
+
+def open_index(path: Path) -> CallGraphIndex:
+    """Shared ``CallGraphIndex`` for ``path``, reopened when the file is rewritten"""
+    path = Path(path)
+    st = path.stat()
+    signature = (st.st_ino, st.st_size, st.st_mtime_ns)
+    key = str(path.resolve())
+    with _open_lock:
+        cached = _open_indexes.get(key)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        index = CallGraphIndex(path)
+        # The replaced index stays mapped; queries still holding it keep working
+        _open_indexes[key] = (signature, index)
+        return index
@@ -1,9 +1,26 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Dict, List, Set, Tuple, Optional
+from typing import Dict, List, Optional, Union
 from pathlib import Path
 import json
+import logging
+
+from cflow_platform.core.code_intel.callgraph_index import (
+    DEFAULT_MAX_PATHS,
+    CallGraphIndex,
+    CallGraphIndexError,
+    IndexedEdge,
+    bounded_call_paths,
+    open_index,
+    write_index,
+)
+
+logger = logging.getLogger(__name__)
+
+# The delta log is folded into the edge list once it reaches this size, or a
+# quarter of the edge list if that is larger
+DELTA_COMPACT_MIN_BYTES = 256 * 1024
 
 
 @dataclass
@@ -17,65 +34,162 @@ class StoredEdge:
 class InMemoryCallGraph:
     def __init__(self) -> None:
         self.adj: Dict[str, List[StoredEdge]] = {}
+        self.edges: List[StoredEdge] = []
+        # callee name -> indices into self.edges, maintained as edges are added
+        self._rev: Dict[str, List[int]] = {}
 
     def add_edge(self, edge: StoredEdge) -> None:
         self.adj.setdefault(edge.caller_id, []).append(edge)
+        self._rev.setdefault(edge.callee_name, []).append(len(self.edges))
+        self.edges.append(edge)
 
     def reverse_index(self) -> Dict[str, List[StoredEdge]]:
-        rev: Dict[str, List[StoredEdge]] = {}
-        for edges in self.adj.values():
+        return {name: [self.edges[i] for i in ids] for name, ids in self._rev.items()}
+
+    def calling_edge_ids(self, name: str) -> List[int]:
+        """Indices into ``self.edges`` of the edges calling ``name``"""
+        return self._rev.get(name, [])
+
+    def call_paths_to(
+        self, target_name: str, max_depth: int = 6, max_paths: int = DEFAULT_MAX_PATHS
+    ) -> List[List[StoredEdge]]:
+        # Walk backwards along caller chains based on name match only (best-effort)
+        chains = bounded_call_paths(
+            self.calling_edge_ids(target_name),
+            lambda i: self.calling_edge_ids(self.edges[i].caller_name),
+            lambda i: self.edges[i].caller_name,
+            max_depth=max_depth,
+            max_paths=max_paths,
+        )
+        return [[self.edges[i] for i in chain] for chain in chains]
+
+
+class OverlayCallGraph:
+    """A call graph index with the edges of some files replaced.
+
+    Index edges keep their (non-negative) edge id and replacement edges are
+    addressed as ``-1 - i``, so both are walked by ``bounded_call_paths``
+    together; index edges from replaced files are skipped.
+    """
+
+    def __init__(self, index: CallGraphIndex, replaced: Dict[str, List[StoredEdge]]) -> None:
+        self.index = index
+        self._skip = index.string_ids(replaced)
+        self._delta = InMemoryCallGraph()
+        for edges in replaced.values():
             for e in edges:
-                rev.setdefault(e.callee_name, []).append(e)
-        return rev
-
-    def call_paths_to(self, target_name: str, max_depth: int = 6) -> List[List[StoredEdge]]:
-        rev = self.reverse_index()
-        starts = rev.get(target_name, [])
-        # DFS backwards along caller chains based on name match only (best-effort)
-        paths: List[List[StoredEdge]] = []
-        visited: Set[Tuple[str, str]] = set()
-
-        def dfs(edge: StoredEdge, path: List[StoredEdge], depth: int) -> None:
-            if depth > max_depth:
-                paths.append(list(path))
-                return
-            key = (edge.caller_id, edge.callee_name)
-            if key in visited:
-                paths.append(list(path))
-                return
-            visited.add(key)
-            # find callers of this caller by matching callee_name == caller name
-            callers = rev.get(edge.caller_name, [])
-            if not callers:
-                paths.append(list(path))
-                return
-            for up in callers:
-                path.append(up)
-                dfs(up, path, depth + 1)
-                path.pop()
-
-        for s in starts:
-            dfs(s, [s], 1)
-        return paths
+                self._delta.add_edge(e)
+
+    def _calling(self, name: str) -> List[int]:
+        ids = self.index.calling_edge_ids(name, self._skip)
+        ids.extend(-1 - i for i in self._delta.calling_edge_ids(name))
+        return ids
+
+    def _edge(self, h: int) -> Union[IndexedEdge, StoredEdge]:
+        return self.index.edge(h) if h >= 0 else self._delta.edges[-1 - h]
+
+    def _caller_name(self, h: int) -> str:
+        return self.index.edge_caller_name(h) if h >= 0 else self._delta.edges[-1 - h].caller_name
+
+    def callers_of(self, name: str) -> List[Union[IndexedEdge, StoredEdge]]:
+        return [self._edge(h) for h in self._calling(name)]
+
+    def call_paths_to(
+        self, target_name: str, max_depth: int = 6, max_paths: int = DEFAULT_MAX_PATHS
+    ) -> List[List[Union[IndexedEdge, StoredEdge]]]:
+        chains = bounded_call_paths(
+            self._calling(target_name),
+            lambda h: self._calling(self._caller_name(h)),
+            self._caller_name,
+            max_depth=max_depth,
+            max_paths=max_paths,
+        )
+        return [[self._edge(h) for h in chain] for chain in chains]
+
+
+def _edge_dict(e: StoredEdge) -> Dict[str, str]:
+    return {
+        "caller_id": e.caller_id,
+        "caller_name": e.caller_name,
+        "caller_path": e.caller_path,
+        "callee_name": e.callee_name,
+    }
 
 
 class FileCallGraphStore:
+    """Call edges as JSONL plus the memory-mapped index built from them (``callgraph.idx``).
+
+    Incremental updates append each changed file's complete edge list to a
+    delta log (``callgraph.delta.jsonl``, last entry per file wins) instead
+    of rewriting both files; readers overlay it on the index, and it is
+    folded back into the edge list once it grows past a fraction of it.
+    """
+
     def __init__(self, path: Optional[Path] = None) -> None:
         base = path or Path.cwd() / ".cerebraflow" / "core" / "storage" / "callgraph.jsonl"
         self.path = base
+        self.index_path = base.with_suffix(".idx")
+        self.delta_path = base.with_suffix(".delta.jsonl")
         self.path.parent.mkdir(parents=True, exist_ok=True)
 
     def save_edges(self, edges: List[StoredEdge]) -> None:
         with self.path.open("w", encoding="utf-8") as f:
             for e in edges:
+                f.write(json.dumps(_edge_dict(e)) + "\n")
+        write_index(edges, self.index_path, source=self.path)
+        # Replaying a leftover delta would be harmless (it replaces whole files)
+        self.delta_path.unlink(missing_ok=True)
+
+    def replace_file_edges(self, changes: Dict[str, List[StoredEdge]]) -> int:
+        """Record ``changes`` (file path -> all of its edges now; empty when removed).
+
+        Only the changed files are written (they become the whole edge list
+        when there is none yet); returns the number of edges recorded.
+        """
+        if not self.path.exists():
+            edges = [e for file_edges in changes.values() for e in file_edges]
+            self.save_edges(edges)
+            return len(edges)
+        with self.delta_path.open("a", encoding="utf-8") as f:
+            for file_path, file_edges in changes.items():
                 f.write(json.dumps({
-                    "caller_id": e.caller_id,
-                    "caller_name": e.caller_name,
-                    "caller_path": e.caller_path,
-                    "callee_name": e.callee_name,
+                    "path": file_path,
+                    "edges": [[e.caller_id, e.caller_name, e.callee_name] for e in file_edges],
                 }) + "\n")
+        try:
+            delta_size, base_size = self.delta_path.stat().st_size, self.path.stat().st_size
+        except OSError:
+            delta_size = base_size = 0
+        if delta_size > max(DELTA_COMPACT_MIN_BYTES, base_size // 4):
+            self.compact()
+        return sum(len(file_edges) for file_edges in changes.values())
+
+    def compact(self) -> int:
+        """Fold the delta log into the edge list and index; returns the number of edges"""
+        replaced = self.load_delta()
+        edges = [e for e in self.load_edges().edges if e.caller_path not in replaced]
+        edges.extend(e for file_edges in replaced.values() for e in file_edges)
+        self.save_edges(edges)
+        return len(edges)
+
+    def load_delta(self) -> Dict[str, List[StoredEdge]]:
+        """Files replaced since the edge list was written, with their current edges"""
+        replaced: Dict[str, List[StoredEdge]] = {}
+        if not self.delta_path.exists():
+            return replaced
+        with self.delta_path.open("r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    obj = json.loads(line)
+                    path = obj["path"]
+                    replaced[path] = [StoredEdge(cid, name, path, callee) for cid, name, callee in obj["edges"]]
+                except Exception:
+                    # A line still being appended by another process
+                    continue
+        return replaced
 
-    def load_graph(self) -> InMemoryCallGraph:
+    def load_edges(self) -> InMemoryCallGraph:
+        """Parse the JSONL edge list (used to (re)build the index); the delta log is not applied"""
         g = InMemoryCallGraph()
         if not self.path.exists():
             return g
@@ -93,4 +207,34 @@ class FileCallGraphStore:
                     continue
         return g
 
-
+    def load_graph(self) -> Union[CallGraphIndex, InMemoryCallGraph, OverlayCallGraph]:
+        """The call graph index (rebuilt once from JSONL when missing or stale) with the delta log applied"""
+        if not self.path.exists() and not self.index_path.exists():
+            return InMemoryCallGraph()
+        replaced = self.load_delta()
+        try:
+            try:
+                index = open_index(self.index_path) if self.index_path.exists() else None
+            except CallGraphIndexError as e:
+                logger.warning(f"Rebuilding call graph index: {e}")
+                index = None
+            if index is None or (self.path.exists() and not index.is_current_for(self.path)):
+                write_index(self.load_edges().edges, self.index_path, source=self.path)
+                index = open_index(self.index_path)
+            return OverlayCallGraph(index, replaced) if replaced else index
+        except (OSError, CallGraphIndexError) as e:
+            logger.warning(f"Call graph index unavailable ({e}); using the JSONL edge list")
+            return self._merged(self.load_edges(), replaced)
+
+    @staticmethod
+    def _merged(base: InMemoryCallGraph, replaced: Dict[str, List[StoredEdge]]) -> InMemoryCallGraph:
+        if not replaced:
+            return base
+        g = InMemoryCallGraph()
+        for e in base.edges:
+            if e.caller_path not in replaced:
+                g.add_edge(e)
+        for file_edges in replaced.values():
+            for e in file_edges:
+                g.add_edge(e)
+        return g
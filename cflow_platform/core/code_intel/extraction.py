@@ -0,0 +1,98 @@
+"""
+Code Intel Extraction
+
+The CPU-bound half of function indexing: read a source file, hash it and
+extract its functions and call edges from a single parse. Kept free of
+model and vector-store imports so process-pool workers start quickly:
+- ``scan_file`` returns a compact ``ScannedFile`` (``FunctionInfo`` records
+  and edge tuples) that pickles cheaply back to the parent
+- ``scan_paths`` shards files over a spawn process pool in groups of
+  ``FILES_PER_TASK`` and yields results in input order, so the parent can
+  embed and record them while workers keep extracting
+"""
+
+from __future__ import annotations
+
+import hashlib
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+from cflow_platform.core.code_intel.callgraph_builder import build_call_edges, python_functions_and_edges
+from cflow_platform.core.code_intel.function_extractor import FunctionInfo, extract_functions
+from cflow_platform.core.code_intel.index_manifest import EdgeRow
+
+CODE_SUFFIXES = {".py", ".ts", ".tsx", ".js", ".jsx"}
+# Files per process-pool task; enough to amortise pickling, small enough to balance
+FILES_PER_TASK = 32
+
+
+def default_jobs() -> int:
+    """Extraction processes for CLI runs (``CFLOW_CODE_INTEL_JOBS``, else one per CPU)"""
+    try:
+        configured = int(os.getenv("CFLOW_CODE_INTEL_JOBS", "0"))
+    except ValueError:
+        configured = 0
+    if configured > 0:
+        return configured
+    from cflow_platform.core.embeddings.cpu_backend import available_cpus
+
+    return max(1, available_cpus())
+
+
+@dataclass
+class ScannedFile:
+    """Extraction result for one file, as returned by pool workers"""
+    file_path: str
+    mtime_ns: int = 0
+    size: int = 0
+    content_hash: str = ""
+    functions: List[FunctionInfo] = field(default_factory=list)
+    edges: List[EdgeRow] = field(default_factory=list)
+    unchanged: bool = False  # content hash matched the manifest
+    unreadable: bool = False
+
+
+def scan_file(file_path: str, known_hash: Optional[str] = None) -> ScannedFile:
+    """Read, hash and extract one file (functions and call edges from a single parse)"""
+    p = Path(file_path)
+    try:
+        st = p.stat()
+        content = p.read_text(encoding="utf-8", errors="ignore")
+    except Exception:
+        return ScannedFile(file_path, unreadable=True)
+    digest = hashlib.sha256(content.encode("utf-8")).hexdigest()
+    result = ScannedFile(file_path, st.st_mtime_ns, st.st_size, digest)
+    if digest == known_hash:
+        result.unchanged = True
+        return result
+    if p.suffix.lower() == ".py":
+        result.functions, edges = python_functions_and_edges(p, content)
+    else:
+        result.functions, edges = extract_functions(p, content), build_call_edges(p, content)
+    result.edges = [(e.caller_id, e.caller.name, e.callee_name) for e in edges]
+    return result
+
+
+def scan_files(tasks: Sequence[Tuple[str, Optional[str]]]) -> List[ScannedFile]:
+    """Process-pool task: ``scan_file`` for a group of (path, known content hash)"""
+    return [scan_file(path, known) for path, known in tasks]
+
+
+def scan_paths(tasks: Sequence[Tuple[str, Optional[str]]], jobs: int = 1) -> Iterator[ScannedFile]:
+    """Scan ``tasks`` in order, across ``jobs`` processes when there is enough work to share"""
+    if jobs <= 1 or len(tasks) <= FILES_PER_TASK:
+        for path, known in tasks:
+            yield scan_file(path, known)
+        return
+    groups = [tasks[i : i + FILES_PER_TASK] for i in range(0, len(tasks), FILES_PER_TASK)]
+    # spawn, not fork: the parent may hold model threads and SQLite connections
+    with ProcessPoolExecutor(jobs, mp_context=multiprocessing.get_context("spawn")) as pool:
+        # All groups are submitted up front, so workers keep extracting while
+        # the caller embeds the files already returned
+        for results in pool.map(scan_files, groups):
+            yield from results
+
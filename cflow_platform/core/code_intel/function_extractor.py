@@ -2,8 +2,9 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import List, Optional, Sequence, Tuple
 import ast
+import hashlib
 import re
 
 
@@ -16,6 +17,10 @@ class FunctionInfo:
     end_line: int
     signature: str
     docstring: Optional[str]
+    # Enclosing classes/functions joined with "." (empty when not tracked)
+    qualified_name: str = ""
+    # Hash of the definition itself, independent of where it sits in the file
+    content_hash: str = ""
 
 
 def _read_file(path: Path) -> str:
@@ -25,46 +30,69 @@ def _read_file(path: Path) -> str:
         return ""
 
 
-def _extract_python_functions(file_path: Path, content: str) -> List[FunctionInfo]:
-    results: List[FunctionInfo] = []
+def python_function_info(node: ast.FunctionDef, file_path: Path, scope: Sequence[str] = ()) -> FunctionInfo:
+    doc = ast.get_docstring(node)
+    # Build a simple signature string
     try:
-        tree = ast.parse(content)
+        args = []
+        for a in node.args.args:
+            args.append(a.arg)
+        if node.args.vararg is not None:
+            args.append("*" + node.args.vararg.arg)
+        for a in node.args.kwonlyargs:
+            args.append(a.arg)
+        if node.args.kwarg is not None:
+            args.append("**" + node.args.kwarg.arg)
+        signature = f"{node.name}({', '.join(args)})"
     except Exception:
-        return results
+        signature = node.name + "(...)"
+
+    # end_lineno is available in py3.8+ when ast.parse is given full content
+    start_line = getattr(node, "lineno", 1)
+    end_line = getattr(node, "end_lineno", start_line)
+    return FunctionInfo(
+        name=node.name,
+        file_path=str(file_path),
+        language="python",
+        start_line=start_line,
+        end_line=end_line,
+        signature=signature,
+        docstring=doc,
+        qualified_name=".".join([*scope, node.name]),
+        # ast.dump leaves out line/column attributes, so moving code keeps the hash
+        content_hash=hashlib.sha256(ast.dump(node).encode("utf-8")).hexdigest(),
+    )
+
+
+def parse_python(content: str) -> Optional[ast.Module]:
+    try:
+        return ast.parse(content)
+    except Exception:
+        return None
+
+
+def _extract_python_functions(file_path: Path, content: str, tree: Optional[ast.AST] = None) -> List[FunctionInfo]:
+    results: List[FunctionInfo] = []
+    if tree is None:
+        tree = parse_python(content)
+        if tree is None:
+            return results
 
     class Visitor(ast.NodeVisitor):
-        def visit_FunctionDef(self, node: ast.FunctionDef) -> None:  # type: ignore[override]
-            doc = ast.get_docstring(node)
-            # Build a simple signature string
-            try:
-                args = []
-                for a in node.args.args:
-                    args.append(a.arg)
-                if node.args.vararg is not None:
-                    args.append("*" + node.args.vararg.arg)
-                for a in node.args.kwonlyargs:
-                    args.append(a.arg)
-                if node.args.kwarg is not None:
-                    args.append("**" + node.args.kwarg.arg)
-                signature = f"{node.name}({', '.join(args)})"
-            except Exception:
-                signature = node.name + "(...)"
-
-            # end_lineno is available in py3.8+ when ast.parse is given full content
-            start_line = getattr(node, "lineno", 1)
-            end_line = getattr(node, "end_lineno", start_line)
-            results.append(
-                FunctionInfo(
-                    name=node.name,
-                    file_path=str(file_path),
-                    language="python",
-                    start_line=start_line,
-                    end_line=end_line,
-                    signature=signature,
-                    docstring=doc,
-                )
-            )
+        def __init__(self) -> None:
+            self.scope: List[str] = []
+
+        def _nested(self, node: ast.AST, name: str) -> None:
+            self.scope.append(name)
             self.generic_visit(node)
+            self.scope.pop()
+
+        def visit_ClassDef(self, node: ast.ClassDef) -> None:  # type: ignore[override]
+            self._nested(node, node.name)
+
+        def visit_FunctionDef(self, node: ast.FunctionDef) -> None:  # type: ignore[override]
+            results.append(python_function_info(node, file_path, self.scope))
+            self._nested(node, node.name)
 
     try:
         Visitor().visit(tree)
@@ -107,11 +135,13 @@ def _line_spans(content: str, name: str, start_index: int) -> Tuple[int, int]:
 
 def _extract_ts_js_functions(file_path: Path, content: str, language: str) -> List[FunctionInfo]:
     results: List[FunctionInfo] = []
+    lines = content.splitlines()
     for m in _TS_FUNC_RE.finditer(content):
         name = m.group("name")
         args = m.group("args")
         start, end = _line_spans(content, name, m.start())
         signature = f"{name}({args.strip()})"
+        body = "\n".join(lines[start - 1 : end])
         results.append(
             FunctionInfo(
                 name=name,
@@ -121,15 +151,20 @@ def _extract_ts_js_functions(file_path: Path, content: str, language: str) -> Li
                 end_line=end,
                 signature=signature,
                 docstring=None,
+                qualified_name=name,
+                content_hash=hashlib.sha256(body.encode("utf-8")).hexdigest(),
             )
         )
     return results
 
 
-def extract_functions(file_path: Path, content: Optional[str] = None) -> List[FunctionInfo]:
+def extract_functions(file_path: Path, content: Optional[str] = None, tree: Optional[ast.AST] = None) -> List[FunctionInfo]:
+    """Functions defined in ``file_path``; Python files may pass an already parsed ``tree``"""
+    suffix = file_path.suffix.lower()
+    if suffix == ".py" and tree is not None:
+        return _extract_python_functions(file_path, "", tree)
     if content is None:
         content = _read_file(file_path)
-    suffix = file_path.suffix.lower()
     if suffix == ".py":
         return _extract_python_functions(file_path, content)
     if suffix in {".ts", ".tsx"}:
@@ -139,3 +174,40 @@ def extract_functions(file_path: Path, content: Optional[str] = None) -> List[Fu
     return []
 
 
+_TS_CLASS_RE = re.compile(
+    r"^[ \t]*(?:export\s+)?(?:default\s+)?(?:abstract\s+)?class\s+(?P<name>[A-Za-z_\$][A-Za-z0-9_\$]*)",
+    re.MULTILINE,
+)
+
+
+def _python_definition_spans(content: str) -> List[Tuple[int, int]]:
+    tree = parse_python(content)
+    if tree is None:
+        return []
+    spans: List[Tuple[int, int]] = []
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            # Decorators belong to the definition they decorate
+            start = min([node.lineno] + [d.lineno for d in node.decorator_list])
+            spans.append((start, getattr(node, "end_lineno", node.lineno)))
+    return spans
+
+
+def definition_spans(file_path: Path, content: Optional[str] = None) -> List[Tuple[int, int]]:
+    """(start_line, end_line) of every function and class, nested ones included, sorted by position.
+
+    Python covers async functions and classes (with decorators); TS/JS uses
+    the same best-effort brace matching as ``extract_functions``.
+    """
+    if content is None:
+        content = _read_file(file_path)
+    suffix = file_path.suffix.lower()
+    if suffix == ".py":
+        spans = _python_definition_spans(content)
+    elif suffix in {".ts", ".tsx", ".js", ".jsx"}:
+        language = "typescript" if suffix in {".ts", ".tsx"} else "javascript"
+        spans = [(f.start_line, f.end_line) for f in _extract_ts_js_functions(file_path, content, language)]
+        spans.extend(_line_spans(content, m.group("name"), m.start()) for m in _TS_CLASS_RE.finditer(content))
+    else:
+        return []
+    return sorted(set(spans), key=lambda s: (s[0], -s[1]))
@@ -2,12 +2,28 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime
+import hashlib
+import logging
 import os
+import time
 
-from cflow_platform.core.code_intel.function_extractor import extract_functions, FunctionInfo
+from cflow_platform.core.code_intel.callgraph_store import FileCallGraphStore, StoredEdge
+from cflow_platform.core.code_intel.extraction import CODE_SUFFIXES, ScannedFile, scan_paths
+from cflow_platform.core.code_intel.function_extractor import FunctionInfo
 from cflow_platform.core.code_intel.function_summarizer import summarize_function, embed_summaries, summary_id
+from cflow_platform.core.code_intel.index_manifest import CodeIntelManifest, FileEntry
+from cflow_platform.core.code_intel.supabase_writer import CodeFunctionWriter
+from cflow_platform.core.services.codebase_vectorization_pipeline import discover_files
+
+logger = logging.getLogger(__name__)
+
+# Files whose functions are embedded and recorded together
+INDEX_BATCH_FILES = 256
+
+# The anon-key-only warning is logged once per process
+_warned_anon_only = False
 
 
 try:
@@ -33,9 +49,20 @@ class IndexedFunction:
 
 
 class FunctionIndexer:
-    def __init__(self, chroma_path: Optional[str] = None) -> None:
+    def __init__(
+        self,
+        chroma_path: Optional[str] = None,
+        manifest_path: Optional[Path] = None,
+        callgraph_path: Optional[Path] = None,
+    ) -> None:
         self.collection = None
         self._supa = None
+        storage = Path.cwd() / ".cerebraflow" / "core" / "storage"
+        self._manifest_path = Path(manifest_path) if manifest_path else storage / "code_intel_manifest.sqlite3"
+        self._manifest: Optional[CodeIntelManifest] = None
+        self.callgraph = FileCallGraphStore(Path(callgraph_path) if callgraph_path else None)
+        # Files whose call edges changed since the call graph was last updated
+        self._edge_changes: Dict[str, List[StoredEdge]] = {}
         if CHROMA_AVAILABLE:
             path = chroma_path or ".cerebraflow/core/storage/chromadb"
             client = chromadb.PersistentClient(path=path, settings=Settings(anonymized_telemetry=False, is_persistent=True))  # type: ignore
@@ -54,8 +81,15 @@ class FunctionIndexer:
         except Exception:
             pass
         url = (os.getenv("SUPABASE_URL") or os.getenv("NEXT_PUBLIC_SUPABASE_URL") or os.getenv("SUPABASE_REST_URL") or "").strip()
-        key = (os.getenv("SUPABASE_SERVICE_ROLE_KEY") or os.getenv("SUPABASE_ANON_KEY") or "").strip()
+        # Upserts update existing rows, which RLS only allows the service role
+        key = (os.getenv("SUPABASE_SERVICE_ROLE_KEY") or "").strip()
         if not (url and key):
+            global _warned_anon_only
+            if url and os.getenv("SUPABASE_ANON_KEY") and not _warned_anon_only:
+                _warned_anon_only = True
+                logger.warning(
+                    "Supabase dual-write disabled: upserts need SUPABASE_SERVICE_ROLE_KEY, only SUPABASE_ANON_KEY is set"
+                )
             return None
         try:
             self._supa = create_client(url, key)
@@ -63,107 +97,179 @@ class FunctionIndexer:
         except Exception:
             return None
 
-    def _supa_find_or_create_function(self, supa: Any, f: FunctionInfo, summary: str) -> Optional[str]:
-        try:
-            sel = supa.table("code_functions").select("id").eq("path", f.file_path).eq("name", f.name).eq("start_line", f.start_line).eq("end_line", f.end_line).limit(1).execute()
-            data = getattr(sel, "data", None) or []
-            if data:
-                return str(data[0]["id"])  # type: ignore[index]
-            tenant_id = os.getenv("CFLOW_TENANT_ID") or None
-            user_id = os.getenv("CFLOW_USER_ID") or None
-            project_id = os.getenv("CFLOW_PROJECT_ID") or None
-            ins = supa.table("code_functions").insert({
-                "repo": os.getenv("CFLOW_REPO_NAME", ""),
-                "path": f.file_path,
-                "name": f.name,
-                "language": f.language,
-                "signature": f.signature,
-                "start_line": f.start_line,
-                "end_line": f.end_line,
-                "summary": summary,
-                "tenant_id": tenant_id,
-                "user_id": user_id,
-                "project_id": project_id,
-                "metadata": {
-                    "source": "cflow",
-                    "ts": datetime.utcnow().isoformat() + "Z",
-                    "tenant_id": tenant_id,
-                    "user_id": user_id,
-                    "project_id": project_id,
-                },
-            }).execute()
-            data2 = getattr(ins, "data", None) or []
-            if data2:
-                return str(data2[0]["id"])  # type: ignore[index]
-            return None
-        except Exception:
-            return None
+    @property
+    def manifest(self) -> CodeIntelManifest:
+        if self._manifest is None:
+            self._manifest = CodeIntelManifest(self._manifest_path)
+        return self._manifest
 
-    def _supa_insert_embedding(self, supa: Any, function_id: str, embedding: List[float]) -> None:
-        try:
-            tenant_id = os.getenv("CFLOW_TENANT_ID") or None
-            user_id = os.getenv("CFLOW_USER_ID") or None
-            project_id = os.getenv("CFLOW_PROJECT_ID") or None
-            supa.table("code_function_embeddings").insert({
-                "function_id": function_id,
-                "embedding": embedding,
-                "dims": len(embedding),
-                "model": os.getenv("CFLOW_EMBED_MODEL", "mps-local-384"),
-                "tenant_id": tenant_id,
-                "user_id": user_id,
-                "project_id": project_id,
-            }).execute()
-        except Exception:
-            pass
+    def _remove(self, key: str) -> int:
+        ids = list(self.manifest.functions(key))
+        if ids and self.collection is not None:
+            try:
+                self.collection.delete(ids=ids)  # type: ignore
+            except Exception as e:
+                logger.warning(f"Function vector delete failed for {key}: {e}")
+                return 0
+        self.manifest.remove_file(key)
+        self._edge_changes[key] = []
+        return len(ids)
 
-    def index_paths(self, paths: List[Path]) -> Dict[str, int]:
-        indexed = 0
-        functions = 0
+    @staticmethod
+    def _metadata(f: FunctionInfo) -> Dict[str, object]:
+        return {
+            "file_path": f.file_path,
+            "language": f.language,
+            "name": f.name,
+            "signature": f.signature,
+            "start": f.start_line,
+            "end": f.end_line,
+            "ts": datetime.utcnow().isoformat() + "Z",
+        }
+
+    def _index_batch(self, scanned: List[ScannedFile], stats: Dict[str, int]) -> None:
+        entries: List[FileEntry] = []
         fns: List[FunctionInfo] = []
+        ids: List[str] = []
+        summaries: List[str] = []
+        kept: List[Tuple[str, FunctionInfo]] = []
+        stale: List[str] = []
+        for sf in scanned:
+            entry = FileEntry(sf.file_path, sf.mtime_ns, sf.size, sf.content_hash, edges=sf.edges)
+            previous = self.manifest.functions(entry.file_path)
+            occurrences: Dict[str, int] = {}
+            for f in sf.functions:
+                s = summarize_function(f)
+                fid = summary_id(f)
+                seen = occurrences.get(fid, 0)
+                occurrences[fid] = seen + 1
+                if seen:
+                    fid = summary_id(f, seen)
+                h = hashlib.sha256(s.encode("utf-8")).hexdigest()
+                entry.functions[fid] = h
+                # Only new functions and ones whose summary changed are embedded;
+                # the rest may have moved, so only their metadata is refreshed
+                if previous.get(fid) != h:
+                    fns.append(f)
+                    ids.append(fid)
+                    summaries.append(s)
+                else:
+                    kept.append((fid, f))
+            stale.extend(fid for fid in previous if fid not in entry.functions)
+            entries.append(entry)
+
+        embeddings: List[List[float]] = []
+        if summaries:
+            try:
+                embeddings = embed_summaries(summaries)
+            except Exception as e:
+                logger.warning(f"Embedding failed for {len(entries)} files ({e}); they will be retried on the next run")
+                stats["files_failed"] += len(entries)
+                return
+        if self.collection is not None:
+            try:
+                if ids:
+                    metadatas = [self._metadata(f) for f in fns]
+                    self.collection.upsert(ids=ids, documents=summaries, embeddings=embeddings, metadatas=metadatas)  # type: ignore
+                if kept:
+                    self.collection.update(ids=[fid for fid, _ in kept], metadatas=[self._metadata(f) for _, f in kept])  # type: ignore
+                if stale:
+                    self.collection.delete(ids=stale)  # type: ignore
+            except Exception as e:
+                logger.warning(f"Function vector store update failed: {e}")
+                stats["files_failed"] += len(entries)
+                return
+        # Dual-write to Supabase when available (best-effort, batched upserts)
+        supa = self._ensure_supabase()
+        if supa is not None and fns:
+            written = CodeFunctionWriter(supa).write(list(zip(fns, summaries, embeddings)))
+            if written["batches_failed"]:
+                stats["supabase_batches_failed"] = stats.get("supabase_batches_failed", 0) + written["batches_failed"]
+        self.manifest.replace_files(entries)
+        for e in entries:
+            self._edge_changes[e.file_path] = [StoredEdge(cid, name, e.file_path, callee) for cid, name, callee in e.edges]
+        stats["files_indexed"] += len(entries)
+        stats["indexed"] += len(ids)
+        stats["functions"] += sum(len(e.functions) for e in entries)
+        stats["functions_removed"] += len(stale)
+
+    def index_paths(self, paths: List[Path], jobs: int = 1) -> Dict[str, int]:
+        """Index the given files, skipping ones the manifest shows unchanged.
+
+        Paths that no longer exist but were indexed before are removed from
+        the index. With ``jobs`` > 1 extraction runs in a process pool while
+        this process embeds and records the results in batches. ``indexed``
+        counts the functions actually (re-)embedded.
+        """
+        stats = {
+            "indexed": 0,
+            "functions": 0,
+            "files_indexed": 0,
+            "files_unchanged": 0,
+            "files_removed": 0,
+            "files_failed": 0,
+            "functions_removed": 0,
+        }
+        known = self.manifest.records()
+        tasks: List[Tuple[str, Optional[str]]] = []
         for p in paths:
-            if not p.exists() or not p.is_file():
+            if p.suffix.lower() not in CODE_SUFFIXES:
                 continue
-            if p.suffix.lower() not in {".py", ".ts", ".tsx", ".js", ".jsx"}:
+            key = str(p)
+            record = known.get(key)
+            try:
+                st = p.stat()
+            except OSError:
+                st = None
+            if st is None or not p.is_file():
+                if record is not None:
+                    stats["functions_removed"] += self._remove(key)
+                    stats["files_removed"] += 1
                 continue
-            funcs = extract_functions(p)
-            if not funcs:
+            if record is not None and (record.mtime_ns, record.size) == (st.st_mtime_ns, st.st_size):
+                stats["files_unchanged"] += 1
                 continue
-            fns.extend(funcs)
-        if not fns:
-            return {"indexed": 0, "functions": 0}
-
-        summaries = [summarize_function(f) for f in fns]
-        embeddings = embed_summaries(summaries)
-        ids = [summary_id(f) for f in fns]
-        metadatas: List[Dict[str, object]] = []
-        documents: List[str] = []
-        for f, s in zip(fns, summaries):
-            meta: Dict[str, object] = {
-                "file_path": f.file_path,
-                "language": f.language,
-                "name": f.name,
-                "signature": f.signature,
-                "start": f.start_line,
-                "end": f.end_line,
-                "ts": datetime.utcnow().isoformat() + "Z",
-            }
-            documents.append(s)
-            metadatas.append(meta)
-        if self.collection is not None:
-            # best-effort add (ignore duplicates)
-            try:
-                self.collection.add(ids=ids, documents=documents, embeddings=embeddings, metadatas=metadatas)  # type: ignore
-            except Exception:
-                pass
-        # Dual-write to Supabase when available
-        supa = self._ensure_supabase()
-        if supa is not None:
-            for f, s, e in zip(fns, summaries, embeddings):
-                fid = self._supa_find_or_create_function(supa, f, s)
-                if fid:
-                    self._supa_insert_embedding(supa, fid, e)
-        indexed = len(ids)
-        functions = len(fns)
-        return {"indexed": indexed, "functions": functions}
+            tasks.append((key, record.content_hash if record is not None else None))
+
+        batch: List[ScannedFile] = []
+        for scanned in scan_paths(tasks, jobs):
+            if scanned.unreadable:
+                continue
+            if scanned.unchanged:
+                self.manifest.touch(scanned.file_path, scanned.mtime_ns, scanned.size)
+                stats["files_unchanged"] += 1
+                continue
+            batch.append(scanned)
+            if len(batch) >= INDEX_BATCH_FILES:
+                self._index_batch(batch, stats)
+                batch = []
+        if batch:
+            self._index_batch(batch, stats)
+        return stats
+
+    def write_call_graph(self) -> int:
+        """Rewrite the call graph store from the edges recorded in the manifest"""
+        edges = [StoredEdge(*row) for row in self.manifest.call_edges()]
+        self.callgraph.save_edges(edges)
+        return len(edges)
 
+    def sync(self, root: Optional[Path] = None, jobs: int = 1) -> Dict[str, Any]:
+        """Bring the function index and call graph in line with the files under ``root``.
 
+        Only the call edges of changed files are written; ``call_edges``
+        counts them (every edge when the call graph had to be built).
+        """
+        started = time.perf_counter()
+        root = (root or Path.cwd()).resolve()
+        current = [root / rel for rel in discover_files(root) if Path(rel).suffix.lower() in CODE_SUFFIXES]
+        present = {str(p) for p in current}
+        # Files indexed earlier that are gone (deleted, renamed or now ignored)
+        gone = [Path(k) for k in self.manifest.files() if k not in present and Path(k).is_relative_to(root)]
+        stats: Dict[str, Any] = self.index_paths(current + gone, jobs=jobs)
+        changes, self._edge_changes = self._edge_changes, {}
+        if not (self.callgraph.path.exists() and self.callgraph.index_path.exists()):
+            stats["call_edges"] = self.write_call_graph()
+        elif changes:
+            stats["call_edges"] = self.callgraph.replace_file_edges(changes)
+        stats["elapsed_seconds"] = round(time.perf_counter() - started, 3)
+        return stats
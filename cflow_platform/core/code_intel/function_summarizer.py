@@ -4,7 +4,7 @@ from typing import List
 import hashlib
 
 from cflow_platform.core.code_intel.function_extractor import FunctionInfo
-from cflow_platform.core.services.shared.singleton_embedding_service import (
+from cflow_platform.core.services.ai.embedding_service import (
     get_embedding_service,
 )
 
@@ -12,7 +12,9 @@ from cflow_platform.core.services.shared.singleton_embedding_service import (
 def summarize_function(fn: FunctionInfo) -> str:
     # Compact, deterministic summary string used for embeddings and search
     doc = (fn.docstring or "").strip().replace("\n", " ")
-    base = f"name: {fn.name}\nfile: {fn.file_path}\nlanguage: {fn.language}\nsignature: {fn.signature}\nspan: {fn.start_line}-{fn.end_line}"
+    # Line numbers stay in the vector metadata: code moving within its file
+    # must not change the text that was embedded
+    base = f"name: {fn.name}\nfile: {fn.file_path}\nlanguage: {fn.language}\nsignature: {fn.signature}"
     if doc:
         base += f"\ndoc: {doc[:400]}"
     return base
@@ -24,8 +26,15 @@ def embed_summaries(summaries: List[str]) -> List[List[float]]:
     return svc.embed_documents(summaries)
 
 
-def summary_id(fn: FunctionInfo) -> str:
-    payload = f"{fn.file_path}:{fn.name}:{fn.start_line}:{fn.end_line}:{fn.language}"
+def summary_id(fn: FunctionInfo, occurrence: int = 0) -> str:
+    """Vector id from path, qualified name and content hash; stable while the function is unchanged.
+
+    ``occurrence`` tells apart identical definitions in the same file (the
+    second one found gets 1, and so on).
+    """
+    payload = f"{fn.file_path}:{fn.qualified_name or fn.name}:{fn.content_hash}:{fn.language}"
+    if occurrence:
+        payload += f":{occurrence}"
     return hashlib.md5(payload.encode()).hexdigest()
 
 
@@ -0,0 +1,186 @@
+"""
+Code Intel Index Manifest
+
+Records what the function indexer has already done for each source file,
+so re-indexing only touches files that changed:
+- Per file: mtime, size and content hash; a file whose stat matches is
+  skipped without reading it, and one whose content hash matches only has
+  its stat refreshed
+- Per function: the vector id and a hash of the summary that was embedded,
+  so unchanged functions in an edited file are not re-embedded
+- Per file: the call edges extracted from it, so the call graph can be
+  rewritten after a commit without re-parsing untouched files
+- Opened through ``sqlite_wal``; losing the file only means the next run
+  treats every source file as new
+"""
+
+import logging
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from cflow_platform.core.sqlite_wal import open_wal_database, rollback
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS files (
+    file_path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    content_hash TEXT NOT NULL,
+    indexed_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS functions (
+    file_path TEXT NOT NULL,
+    function_id TEXT NOT NULL,
+    summary_hash TEXT NOT NULL,
+    PRIMARY KEY (file_path, function_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS call_edges (
+    file_path TEXT NOT NULL,
+    caller_id TEXT NOT NULL,
+    caller_name TEXT NOT NULL,
+    callee_name TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS call_edges_file ON call_edges (file_path);
+"""
+
+# (caller_id, caller_name, callee_name); the caller path is the file itself
+EdgeRow = Tuple[str, str, str]
+
+
+@dataclass
+class FileRecord:
+    mtime_ns: int
+    size: int
+    content_hash: str
+
+
+@dataclass
+class FileEntry:
+    """Everything recorded for one indexed file"""
+    file_path: str
+    mtime_ns: int
+    size: int
+    content_hash: str
+    functions: Dict[str, str] = field(default_factory=dict)  # function id -> summary hash
+    edges: List[EdgeRow] = field(default_factory=list)
+
+
+class CodeIntelManifest:
+    """SQLite-backed record of indexed files, functions and call edges (thread-safe)"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._open()
+
+    def _open(self):
+        self._conn, _ = open_wal_database(self.path, _SCHEMA, SCHEMA_VERSION, ("files", "functions", "call_edges"), "Code intel manifest")
+
+    # ---- reads ----------------------------------------------------------------
+
+    def lookup(self, file_path: str) -> Optional[FileRecord]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT mtime_ns, size, content_hash FROM files WHERE file_path = ?", (file_path,)
+            ).fetchone()
+        return FileRecord(*row) if row else None
+
+    def records(self) -> Dict[str, FileRecord]:
+        """Stat and content hash of every indexed file, in one query"""
+        with self._lock:
+            return {
+                r[0]: FileRecord(*r[1:])
+                for r in self._conn.execute("SELECT file_path, mtime_ns, size, content_hash FROM files")
+            }
+
+    def functions(self, file_path: str) -> Dict[str, str]:
+        with self._lock:
+            return dict(self._conn.execute(
+                "SELECT function_id, summary_hash FROM functions WHERE file_path = ?", (file_path,)
+            ))
+
+    def files(self) -> List[str]:
+        with self._lock:
+            return [r[0] for r in self._conn.execute("SELECT file_path FROM files")]
+
+    def call_edges(self) -> List[Tuple[str, str, str, str]]:
+        """Every recorded edge as (caller_id, caller_name, caller_path, callee_name)"""
+        with self._lock:
+            return [
+                (r[1], r[2], r[0], r[3])
+                for r in self._conn.execute(
+                    "SELECT file_path, caller_id, caller_name, callee_name FROM call_edges ORDER BY rowid"
+                )
+            ]
+
+    # ---- writes ---------------------------------------------------------------
+
+    def touch(self, file_path: str, mtime_ns: int, size: int):
+        """Refresh the stat of a file whose content did not change"""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE files SET mtime_ns = ?, size = ? WHERE file_path = ?", (mtime_ns, size, file_path)
+            )
+
+    def replace_files(self, entries: Sequence[FileEntry]):
+        """Record ``entries`` as the complete state of their files, in one transaction"""
+        now = time.time()
+        with self._lock:
+            try:
+                self._conn.execute("BEGIN IMMEDIATE")
+                for e in entries:
+                    self._delete(e.file_path)
+                    self._conn.executemany(
+                        "INSERT INTO functions VALUES (?, ?, ?)",
+                        [(e.file_path, fid, h) for fid, h in e.functions.items()],
+                    )
+                    self._conn.executemany(
+                        "INSERT INTO call_edges VALUES (?, ?, ?, ?)",
+                        [(e.file_path, *edge) for edge in e.edges],
+                    )
+                    self._conn.execute(
+                        "INSERT INTO files VALUES (?, ?, ?, ?, ?)",
+                        (e.file_path, e.mtime_ns, e.size, e.content_hash, now),
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                rollback(self._conn)
+                raise
+
+    def remove_file(self, file_path: str):
+        with self._lock:
+            try:
+                self._conn.execute("BEGIN IMMEDIATE")
+                self._delete(file_path)
+                self._conn.execute("COMMIT")
+            except Exception:
+                rollback(self._conn)
+                raise
+
+    def _delete(self, file_path: str):
+        for table in ("functions", "call_edges", "files"):
+            self._conn.execute(f"DELETE FROM {table} WHERE file_path = ?", (file_path,))
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = {
+                table: self._conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                for table in ("files", "functions", "call_edges")
+            }
+        return {"path": str(self.path), **counts}
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
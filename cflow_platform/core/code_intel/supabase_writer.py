@@ -0,0 +1,197 @@
+"""
+Code Intel Supabase Writer
+
+Batched dual-write of indexed functions to Supabase. The old path made a
+SELECT plus an INSERT per function and another INSERT per embedding, so
+10k functions cost ~30k sequential HTTP round trips:
+- Functions are upserted in chunks of ``CFLOW_SUPABASE_BATCH_SIZE`` rows
+  on their natural key (tenant_id, repo, path, name, start_line, end_line);
+  the returned rows supply the ids
+- Each chunk's embeddings are then upserted in one request on
+  (function_id, model), so re-indexing replaces rather than duplicates them
+- Up to ``CFLOW_SUPABASE_CONCURRENCY`` chunks are in flight at once
+- Transient failures (network errors, 5xx, timeouts) are retried with
+  exponential backoff; request errors (bad payload, missing constraint)
+  fail the chunk immediately
+- Needs the unique indexes from docs/agentic-plan/sql/007_code_intel_upsert_keys.sql
+  and a service-role client: anon may only select and insert these tables
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from cflow_platform.core.code_intel.function_extractor import FunctionInfo
+
+logger = logging.getLogger(__name__)
+
+FUNCTIONS_TABLE = "code_functions"
+EMBEDDINGS_TABLE = "code_function_embeddings"
+FUNCTION_KEY = ("tenant_id", "repo", "path", "name", "start_line", "end_line")
+EMBEDDING_KEY = ("function_id", "model")
+
+# PostgREST request errors and Postgres data/integrity/syntax classes; retrying cannot help
+_PERMANENT_CODE_PREFIXES = ("PGRST", "22", "23", "42")
+
+# (function, summary, embedding or None)
+FunctionRow = Tuple[FunctionInfo, str, Optional[List[float]]]
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        value = int(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+    return value if value > 0 else default
+
+
+def _is_retryable(error: Exception) -> bool:
+    code = str(getattr(error, "code", "") or "")
+    return not code.startswith(_PERMANENT_CODE_PREFIXES)
+
+
+def _minimal_returning() -> Dict[str, Any]:
+    try:
+        from postgrest.types import ReturnMethod  # type: ignore
+
+        return {"returning": ReturnMethod.minimal}
+    except Exception:
+        return {}
+
+
+class CodeFunctionWriter:
+    """Chunked, concurrent, retrying upserts of functions and their embeddings"""
+
+    def __init__(
+        self,
+        client: Any,
+        batch_size: Optional[int] = None,
+        concurrency: Optional[int] = None,
+        max_retries: int = 3,
+        backoff_seconds: float = 0.5,
+    ) -> None:
+        self.client = client
+        self.batch_size = batch_size or _env_int("CFLOW_SUPABASE_BATCH_SIZE", 500)
+        self.concurrency = concurrency or _env_int("CFLOW_SUPABASE_CONCURRENCY", 4)
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.model = os.getenv("CFLOW_EMBED_MODEL", "mps-local-384")
+        self.tenant_id = os.getenv("CFLOW_TENANT_ID") or None
+        self.user_id = os.getenv("CFLOW_USER_ID") or None
+        self.project_id = os.getenv("CFLOW_PROJECT_ID") or None
+        self.repo = os.getenv("CFLOW_REPO_NAME", "")
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.retries = 0
+
+    # ---- rows -------------------------------------------------------------------
+
+    def _tenancy(self) -> Dict[str, Any]:
+        return {"tenant_id": self.tenant_id, "user_id": self.user_id, "project_id": self.project_id}
+
+    def _function_row(self, f: FunctionInfo, summary: str) -> Dict[str, Any]:
+        return {
+            "repo": self.repo,
+            "path": f.file_path,
+            "name": f.name,
+            "language": f.language,
+            "signature": f.signature,
+            "start_line": f.start_line,
+            "end_line": f.end_line,
+            "summary": summary,
+            **self._tenancy(),
+            "metadata": {"source": "cflow", "ts": datetime.utcnow().isoformat() + "Z", **self._tenancy()},
+        }
+
+    def _embedding_row(self, function_id: str, embedding: List[float]) -> Dict[str, Any]:
+        return {
+            "function_id": function_id,
+            "embedding": embedding,
+            "dims": len(embedding),
+            "model": self.model,
+            **self._tenancy(),
+        }
+
+    # ---- requests ---------------------------------------------------------------
+
+    def _execute(self, build: Callable[[], Any]) -> List[Dict[str, Any]]:
+        """Run a request, retrying transient failures with exponential backoff and jitter"""
+        attempt = 0
+        while True:
+            with self._lock:
+                self.requests += 1
+            try:
+                return getattr(build().execute(), "data", None) or []
+            except Exception as e:
+                if attempt >= self.max_retries or not _is_retryable(e):
+                    raise
+                delay = self.backoff_seconds * (2 ** attempt) * (0.5 + random.random() / 2)
+                attempt += 1
+                with self._lock:
+                    self.retries += 1
+                logger.debug(f"Supabase request failed ({e}); retry {attempt}/{self.max_retries} in {delay:.2f}s")
+                time.sleep(delay)
+
+    def _write_chunk(self, chunk: Sequence[FunctionRow]) -> Tuple[int, int]:
+        rows = [self._function_row(f, s) for f, s, _ in chunk]
+        returned = self._execute(
+            lambda: self.client.table(FUNCTIONS_TABLE).upsert(rows, on_conflict=",".join(FUNCTION_KEY))
+        )
+        # Every row of a chunk shares this writer's tenant and repo
+        ids = {
+            (r.get("path"), r.get("name"), r.get("start_line"), r.get("end_line")): str(r["id"])
+            for r in returned
+            if r.get("id") is not None
+        }
+        embeddings = []
+        for f, _, e in chunk:
+            fid = ids.get((f.file_path, f.name, f.start_line, f.end_line))
+            if fid and e is not None:
+                embeddings.append(self._embedding_row(fid, e))
+        if embeddings:
+            self._execute(
+                lambda: self.client.table(EMBEDDINGS_TABLE).upsert(
+                    embeddings, on_conflict=",".join(EMBEDDING_KEY), **_minimal_returning()
+                )
+            )
+        return len(ids), len(embeddings)
+
+    def write(self, items: Sequence[FunctionRow]) -> Dict[str, int]:
+        """Upsert ``items``; failed chunks are logged and counted, never raised"""
+        # One row per natural key: Postgres rejects an upsert that touches a row twice
+        unique: Dict[Tuple[str, str, int, int], FunctionRow] = {}
+        for item in items:
+            f = item[0]
+            unique[(f.file_path, f.name, f.start_line, f.end_line)] = item
+        rows = list(unique.values())
+        chunks = [rows[i : i + self.batch_size] for i in range(0, len(rows), self.batch_size)]
+        stats = {"functions": 0, "embeddings": 0, "batches": len(chunks), "batches_failed": 0}
+
+        def run(chunk: Sequence[FunctionRow]) -> Optional[Tuple[int, int]]:
+            try:
+                return self._write_chunk(chunk)
+            except Exception as e:
+                logger.warning(f"Supabase upsert of {len(chunk)} functions failed: {e}")
+                return None
+
+        if len(chunks) <= 1 or self.concurrency <= 1:
+            results = [run(c) for c in chunks]
+        else:
+            with ThreadPoolExecutor(min(self.concurrency, len(chunks)), thread_name_prefix="cflow-supa") as pool:
+                results = list(pool.map(run, chunks))
+        for result in results:
+            if result is None:
+                stats["batches_failed"] += 1
+            else:
+                stats["functions"] += result[0]
+                stats["embeddings"] += result[1]
+        stats["requests"] = self.requests
+        stats["retries"] = self.retries
+        return stats
@@ -0,0 +1,348 @@
+"""
+Persistent Disk Cache Tier for WebMCP Tool-Result Caches
+
+This module provides an optional SQLite-backed L2 tier that sits behind the
+in-memory caches (IntelligentCache, PerformanceCache, PredictiveCache) so
+warm entries survive process restarts:
+- One database file per cache namespace under ``.cerebraflow/cache/``
+- Per-entry TTLs with lazy expiry on read and periodic purges
+- Byte-size cap with least-recently-accessed eviction
+- Tag index for invalidating entries that are not resident in memory
+- Crash-safe writes, one transaction each (see ``sqlite_wal`` for the
+  journal settings and corrupt-file recovery)
+"""
+
+import logging
+import os
+import pickle
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from .sqlite_wal import open_wal_database, rollback
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    compressed INTEGER NOT NULL DEFAULT 0,
+    size_bytes INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    expires_at REAL,
+    last_accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_entries_expires ON entries(expires_at);
+CREATE INDEX IF NOT EXISTS idx_entries_accessed ON entries(last_accessed);
+CREATE TABLE IF NOT EXISTS entry_tags (
+    tag TEXT NOT NULL,
+    key TEXT NOT NULL,
+    PRIMARY KEY (tag, key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_entry_tags_key ON entry_tags(key);
+CREATE TABLE IF NOT EXISTS meta (
+    name TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+def default_cache_dir() -> Path:
+    """Cache directory: ``CFLOW_CACHE_DIR`` or ``.cerebraflow/cache`` under the cwd"""
+    override = os.getenv("CFLOW_CACHE_DIR", "").strip()
+    if override:
+        return Path(override)
+    return Path.cwd() / ".cerebraflow" / "cache"
+
+
+def disk_cache_enabled() -> bool:
+    """Whether the global caches should attach a disk tier (``CFLOW_CACHE_DISK``)"""
+    return os.getenv("CFLOW_CACHE_DISK", "").strip().lower() in {"1", "true", "yes", "on"}
+
+
+class DiskCacheTier:
+    """
+    SQLite-backed key/value tier with TTLs and a size cap.
+
+    Values are pickled (and zlib-compressed above ``compression_threshold``
+    bytes). All methods are synchronous and thread-safe; a single connection
+    is shared behind a lock.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        cache_dir: Optional[Path] = None,
+        max_size_mb: float = 256,
+        default_ttl_seconds: Optional[float] = 3600.0,
+        compression_threshold: int = 4096,
+        touch_interval_seconds: float = 60.0
+    ):
+        self.namespace = namespace
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else default_cache_dir()
+        self.path = self.cache_dir / f"{namespace}.sqlite3"
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+        self.default_ttl_seconds = default_ttl_seconds
+        self.compression_threshold = compression_threshold
+        self.touch_interval_seconds = touch_interval_seconds
+
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._total_size = 0
+        self.stats = {"hits": 0, "misses": 0, "sets": 0, "evictions": 0, "expired": 0, "errors": 0}
+        self._open()
+
+    def _open(self):
+        self._conn, _ = open_wal_database(self.path, _SCHEMA, SCHEMA_VERSION, ("entries", "entry_tags"), "Disk cache")
+        row = self._conn.execute("SELECT COALESCE(SUM(size_bytes), 0) FROM entries").fetchone()
+        self._total_size = int(row[0])
+
+    def _serialize(self, value: Any):
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(data) >= self.compression_threshold:
+            packed = zlib.compress(data, level=6)
+            if len(packed) < len(data) * 0.8:
+                return packed, True
+        return data, False
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the stored value, or None if missing or expired"""
+        entry = self.get_entry(key)
+        return None if entry is None else entry["value"]
+
+    def get_entry(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return ``{"value", "created_at", "expires_at", "tags"}`` for a live key"""
+        now = time.time()
+        with self._lock:
+            try:
+                row = self._conn.execute(
+                    "SELECT value, compressed, created_at, expires_at, last_accessed, size_bytes FROM entries WHERE key = ?",
+                    (key,)
+                ).fetchone()
+                if row is None:
+                    self.stats["misses"] += 1
+                    return None
+                blob, compressed, created_at, expires_at, last_accessed, size_bytes = row
+                if expires_at is not None and expires_at <= now:
+                    self._delete_keys([key])
+                    self.stats["expired"] += 1
+                    self.stats["misses"] += 1
+                    return None
+                if now - last_accessed >= self.touch_interval_seconds:
+                    # Coarse recency for eviction; avoids a write on every read
+                    self._conn.execute("UPDATE entries SET last_accessed = ? WHERE key = ?", (now, key))
+                value = pickle.loads(zlib.decompress(blob) if compressed else blob)
+                tags = [r[0] for r in self._conn.execute("SELECT tag FROM entry_tags WHERE key = ?", (key,))]
+            except Exception as e:
+                self.stats["errors"] += 1
+                logger.warning(f"Disk cache read failed for {self.namespace}: {e}")
+                return None
+            self.stats["hits"] += 1
+            return {"value": value, "created_at": created_at, "expires_at": expires_at, "tags": tags}
+
+    def set(
+        self,
+        key: str,
+        value: Any,
+        ttl_seconds: Optional[float] = None,
+        tags: Optional[Iterable[str]] = None
+    ) -> bool:
+        """Store a value; ``ttl_seconds`` of None uses the default, inf never expires"""
+        if ttl_seconds is None:
+            ttl_seconds = self.default_ttl_seconds
+        if ttl_seconds is not None and ttl_seconds <= 0:
+            return False
+        try:
+            blob, compressed = self._serialize(value)
+        except Exception as e:
+            logger.debug(f"Disk cache skipped unpicklable value: {e}")
+            return False
+        size = len(blob)
+        if size > self.max_size_bytes:
+            return False
+        now = time.time()
+        expires_at = None if ttl_seconds is None or ttl_seconds == float("inf") else now + ttl_seconds
+        tag_list = sorted(set(tags or ()))
+        with self._lock:
+            try:
+                self._conn.execute("BEGIN IMMEDIATE")
+                old = self._conn.execute("SELECT size_bytes FROM entries WHERE key = ?", (key,)).fetchone()
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO entries(key, value, compressed, size_bytes, created_at, expires_at, last_accessed) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (key, blob, int(compressed), size, now, expires_at, now)
+                )
+                self._conn.execute("DELETE FROM entry_tags WHERE key = ?", (key,))
+                if tag_list:
+                    self._conn.executemany(
+                        "INSERT OR IGNORE INTO entry_tags(tag, key) VALUES (?, ?)",
+                        [(tag, key) for tag in tag_list]
+                    )
+                self._conn.execute("COMMIT")
+            except Exception as e:
+                rollback(self._conn)
+                self.stats["errors"] += 1
+                logger.warning(f"Disk cache write failed for {self.namespace}: {e}")
+                return False
+            self._total_size += size - (old[0] if old else 0)
+            self.stats["sets"] += 1
+            if self._total_size > self.max_size_bytes:
+                self._evict_to(int(self.max_size_bytes * 0.9))
+            return True
+
+    def delete(self, key: str) -> bool:
+        with self._lock:
+            return self._delete_keys([key]) > 0
+
+    def delete_many(self, keys: Iterable[str]) -> int:
+        with self._lock:
+            return self._delete_keys(list(keys))
+
+    def delete_tags(self, tags: Iterable[str]) -> int:
+        """Delete every entry carrying any of ``tags``"""
+        with self._lock:
+            keys = set()
+            for tag in tags:
+                keys.update(r[0] for r in self._conn.execute("SELECT key FROM entry_tags WHERE tag = ?", (tag,)))
+            return self._delete_keys(list(keys))
+
+    def delete_tag_prefix(self, prefix: str) -> int:
+        """Delete every entry carrying a tag that starts with ``prefix``"""
+        with self._lock:
+            # Range scan on the (tag, key) primary key
+            keys = {r[0] for r in self._conn.execute(
+                "SELECT key FROM entry_tags WHERE tag >= ? AND tag < ?", (prefix, prefix + "\U0010ffff")
+            )}
+            return self._delete_keys(list(keys))
+
+    def delete_matching(self, pattern: str) -> int:
+        """Delete entries whose key contains ``pattern``"""
+        with self._lock:
+            escaped = pattern.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            keys = [r[0] for r in self._conn.execute(
+                "SELECT key FROM entries WHERE key LIKE ? ESCAPE '\\'", (f"%{escaped}%",)
+            )]
+            return self._delete_keys(keys)
+
+    def purge_expired(self) -> int:
+        """Remove all expired entries"""
+        with self._lock:
+            keys = [r[0] for r in self._conn.execute(
+                "SELECT key FROM entries WHERE expires_at IS NOT NULL AND expires_at <= ?", (time.time(),)
+            )]
+            removed = self._delete_keys(keys)
+            self.stats["expired"] += removed
+            return removed
+
+    def clear(self):
+        with self._lock:
+            try:
+                self._conn.execute("BEGIN IMMEDIATE")
+                self._conn.execute("DELETE FROM entries")
+                self._conn.execute("DELETE FROM entry_tags")
+                self._conn.execute("COMMIT")
+                self._total_size = 0
+            except Exception as e:
+                rollback(self._conn)
+                logger.warning(f"Disk cache clear failed for {self.namespace}: {e}")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return int(self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0])
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self.stats,
+                "path": str(self.path),
+                "total_size_bytes": self._total_size,
+                "max_size_bytes": self.max_size_bytes,
+            }
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                try:
+                    self._conn.execute("PRAGMA optimize")
+                except Exception:
+                    pass
+                self._conn.close()
+                self._conn = None
+
+    def _delete_keys(self, keys: List[str]) -> int:
+        """Delete keys in one transaction; caller holds the lock"""
+        if not keys:
+            return 0
+        removed = 0
+        freed = 0
+        try:
+            self._conn.execute("BEGIN IMMEDIATE")
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                marks = ",".join("?" * len(chunk))
+                row = self._conn.execute(
+                    f"SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM entries WHERE key IN ({marks})", chunk
+                ).fetchone()
+                removed += int(row[0])
+                freed += int(row[1])
+                self._conn.execute(f"DELETE FROM entries WHERE key IN ({marks})", chunk)
+                self._conn.execute(f"DELETE FROM entry_tags WHERE key IN ({marks})", chunk)
+            self._conn.execute("COMMIT")
+        except Exception as e:
+            rollback(self._conn)
+            self.stats["errors"] += 1
+            logger.warning(f"Disk cache delete failed for {self.namespace}: {e}")
+            return 0
+        self._total_size -= freed
+        return removed
+
+    def _evict_to(self, target_bytes: int):
+        """Drop expired entries, then least recently accessed, down to target"""
+        # Other processes may share the file; resync before deciding
+        row = self._conn.execute("SELECT COALESCE(SUM(size_bytes), 0) FROM entries").fetchone()
+        self._total_size = int(row[0])
+        now = time.time()
+        expired = [r[0] for r in self._conn.execute(
+            "SELECT key FROM entries WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,)
+        )]
+        self.stats["expired"] += self._delete_keys(expired)
+        while self._total_size > target_bytes:
+            victims = []
+            excess = self._total_size - target_bytes
+            for key, size in self._conn.execute(
+                "SELECT key, size_bytes FROM entries ORDER BY last_accessed LIMIT 256"
+            ):
+                victims.append(key)
+                excess -= size
+                if excess <= 0:
+                    break
+            if not victims:
+                break
+            removed = self._delete_keys(victims)
+            if removed == 0:
+                # Rows vanished under us or the delete failed; resync and stop
+                # rather than spin while holding the lock
+                row = self._conn.execute("SELECT COALESCE(SUM(size_bytes), 0) FROM entries").fetchone()
+                self._total_size = int(row[0])
+                break
+            self.stats["evictions"] += removed
+
+
+_tiers: Dict[str, DiskCacheTier] = {}
+_tiers_lock = threading.Lock()
+
+
+def get_disk_tier(namespace: str, **kwargs: Any) -> DiskCacheTier:
+    """Get the process-wide disk tier for a namespace"""
+    with _tiers_lock:
+        tier = _tiers.get(namespace)
+        if tier is None:
+            tier = DiskCacheTier(namespace, **kwargs)
+            _tiers[namespace] = tier
+        return tier
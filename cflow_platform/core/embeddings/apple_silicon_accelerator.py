@@ -17,6 +17,9 @@ from typing import Dict, List, Optional, Any, Union, Tuple, Callable
 from dataclasses import dataclass, field
 from enum import Enum
 
+from cflow_platform.core.embeddings.batch_autotuner import autotune_enabled, encode_with_autotune
+from cflow_platform.core.embeddings.model_registry import ModelRegistry, get_model_registry
+
 logger = logging.getLogger(__name__)
 
 try:
@@ -60,16 +63,6 @@ class AcceleratorMetrics:
     last_updated: datetime = field(default_factory=datetime.now)
 
 
-@dataclass
-class ModelCache:
-    model: Any
-    device: str
-    load_time: float
-    last_used: datetime
-    usage_count: int = 0
-    memory_mb: float = 0.0
-
-
 class CerebraFlowAppleSiliconAccelerator:
     def __init__(self) -> None:
         self.logger = logging.getLogger("CerebraFlow.AppleSilicon")
@@ -77,10 +70,7 @@ class CerebraFlowAppleSiliconAccelerator:
         self.available_devices = self._detect_devices()
         self.optimal_device = self._select_optimal_device()
         self.metrics: Dict[str, AcceleratorMetrics] = {}
-        self.model_cache: Dict[str, ModelCache] = {}
         self.config = {
-            "max_models_cached": 5,
-            "cache_timeout_minutes": 30,
             "batch_size_optimization": True,
             "memory_optimization": True,
             "performance_monitoring": True,
@@ -160,69 +150,134 @@ class CerebraFlowAppleSiliconAccelerator:
             return "cuda"
         return "cpu"
 
-    def create_sentence_transformer(self, model_name: str = "all-MiniLM-L6-v2") -> Optional[Any]:
+    def create_sentence_transformer(self, model_name: str = "all-MiniLM-L6-v2", lease: bool = False) -> Optional[Any]:
+        """Shared model from the process-wide registry; ``lease`` pins it until ``release_model``"""
         if not SENTENCE_TRANSFORMERS_AVAILABLE:
             self.logger.warning("Sentence Transformers not available - returning None")
             return None
-        cache_key = f"sentence_transformer_{model_name}"
-        if cache_key in self.model_cache:
-            mc = self.model_cache[cache_key]
-            mc.last_used = datetime.now()
-            mc.usage_count += 1
-            self.logger.info(f"Using cached sentence transformer: {model_name}")
-            return mc.model
-        start_time = time.time()
+        registry = get_model_registry()
+        resolve = registry.acquire if lease else registry.get
         try:
-            model = SentenceTransformer(model_name)  # type: ignore[name-defined]
-            device_str = self.get_device_string()
-            if device_str != "cpu":
-                model = model.to(device_str)
-                self.logger.info(f"Model moved to {device_str}")
-            load_time = time.time() - start_time
-            self.model_cache[cache_key] = ModelCache(
-                model=model,
-                device=device_str,
-                load_time=load_time,
-                last_used=datetime.now(),
-            )
-            self._clean_model_cache()
-            self.logger.info(f"Sentence transformer loaded in {load_time:.3f}s on {device_str}")
-            return model
+            return resolve(self._model_key(model_name), lambda: self._load_sentence_transformer(model_name))
         except Exception as e:
             self.logger.error(f"Failed to load sentence transformer: {e}")
             return None
 
+    def release_model(self, model_name: str) -> None:
+        get_model_registry().release(self._model_key(model_name))
+
+    def _model_key(self, model_name: str) -> Tuple[str, str, str]:
+        cpu_backend = self._cpu_backend()
+        variant = "int8" if cpu_backend is not None and cpu_backend.profile.quantize else ""
+        return ModelRegistry.key(model_name, self.get_device_string(), variant)
+
+    def _load_sentence_transformer(self, model_name: str) -> Any:
+        model = SentenceTransformer(model_name)  # type: ignore[name-defined]
+        device_str = self.get_device_string()
+        if device_str != "cpu":
+            model = model.to(device_str)
+            self.logger.info(f"Model moved to {device_str}")
+        elif self._cpu_backend() is not None:
+            model = self._cpu_backend().prepare_model(model)
+        return model
+
     def generate_embeddings(
         self,
         texts: Union[str, List[str]],
         model_name: str = "all-MiniLM-L6-v2",
         batch_size: Optional[int] = None,
+        allow_fallback: bool = True,
     ) -> Optional[Union[List[float], List[List[float]]]]:
+        """Embeddings for ``texts``; None on failure.
+
+        Without a model this returns placeholder vectors unless
+        ``allow_fallback`` is False, which callers that persist the vectors
+        (and would otherwise never replace them) must pass.
+        """
         start_time = time.time()
         is_single = isinstance(texts, str)
         if is_single:
             texts = [texts]
-        model = self.create_sentence_transformer(model_name)
+        model = self.create_sentence_transformer(model_name, lease=True)
         if model is None:
+            if not allow_fallback:
+                self.logger.warning(f"Embedding model {model_name} unavailable; not returning placeholder vectors")
+                return None
             if NUMPY_AVAILABLE:
                 return [np.random.uniform(-1, 1, 384).tolist() for _ in texts]  # type: ignore[name-defined]
             return [[0.0] * 384 for _ in texts]
         try:
-            if batch_size is None:
-                batch_size = self._get_optimal_batch_size(len(texts))
-            if TORCH_AVAILABLE:
-                embeddings = model.encode(texts, convert_to_tensor=True, batch_size=batch_size)
-                if embeddings.device.type != "cpu":
-                    embeddings = embeddings.cpu()
-                embeddings = embeddings.numpy().tolist()
-            else:
-                embeddings = model.encode(texts, batch_size=batch_size).tolist()
+            # Only real model output is cached; the fallbacks above never are
+            cache = self._embedding_cache(model_name, model)
+            embeddings = cache.get_many(texts) if cache is not None else [None] * len(texts)
+            missing = [i for i, e in enumerate(embeddings) if e is None]
+            if missing:
+                pending = [texts[i] for i in missing]
+                if batch_size is None and autotune_enabled():
+                    cpu_backend = self._cpu_backend()
+                    encoded = encode_with_autotune(
+                        lambda size: self._encode(model, pending, size),
+                        model_name,
+                        self.get_device_string(),
+                        pending,
+                        batch_limit=cpu_backend.batch_limit if cpu_backend is not None else None,
+                    )
+                else:
+                    if batch_size is None:
+                        batch_size = self._get_optimal_batch_size(len(pending))
+                    encoded = self._encode(model, pending, batch_size)
+                for i, vector in zip(missing, encoded):
+                    embeddings[i] = vector
+                if cache is not None:
+                    try:
+                        cache.put_many(pending, encoded)
+                    except Exception as e:
+                        self.logger.warning(f"Failed to persist embeddings: {e}")
             processing_time = time.time() - start_time
             self._record_metrics("embeddings", len(texts), processing_time)
             return embeddings[0] if is_single else embeddings
         except Exception as e:
             self.logger.error(f"Embedding generation failed: {e}")
             return None
+        finally:
+            self.release_model(model_name)
+
+    def _encode(self, model: Any, texts: List[str], batch_size: int) -> List[List[float]]:
+        cpu_backend = self._cpu_backend()
+        if cpu_backend is not None:
+            return cpu_backend.encode(model, texts, max_batch_size=batch_size).tolist()
+        if TORCH_AVAILABLE:
+            encoded = model.encode(texts, convert_to_tensor=True, batch_size=batch_size)
+            if encoded.device.type != "cpu":
+                encoded = encoded.cpu()
+            return encoded.numpy().tolist()
+        return model.encode(texts, batch_size=batch_size).tolist()
+
+    def _embedding_cache(self, model_name: str, model: Any) -> Optional[Any]:
+        """Persistent embedding cache for ``model``, or None when disabled/unavailable"""
+        from cflow_platform.core.embeddings.embedding_cache import (
+            embedding_cache_enabled,
+            get_embedding_cache,
+        )
+
+        if not embedding_cache_enabled():
+            return None
+        try:
+            dim = model.get_sentence_embedding_dimension()
+            cpu_backend = self._cpu_backend()
+            namespace = cpu_backend.namespace(model_name) if cpu_backend is not None else model_name
+            return get_embedding_cache(namespace, dim) if dim else None
+        except Exception as e:
+            self.logger.warning(f"Embedding cache unavailable, continuing without it: {e}")
+            return None
+
+    def _cpu_backend(self) -> Optional[Any]:
+        """Tuned CPU backend when inference runs on the CPU, else None"""
+        if self.get_device_string() != "cpu":
+            return None
+        from cflow_platform.core.embeddings.cpu_backend import cpu_backend_enabled, get_cpu_backend
+
+        return get_cpu_backend() if cpu_backend_enabled() else None
 
     def _get_optimal_batch_size(self, total_items: int) -> int:
         if self.optimal_device == AcceleratorDevice.MPS:
@@ -250,16 +305,6 @@ class CerebraFlowAppleSiliconAccelerator:
             m.operations_per_second = n / t if t > 0 else 0.0
             m.last_updated = datetime.now()
 
-    def _clean_model_cache(self) -> None:
-        if len(self.model_cache) <= self.config["max_models_cached"]:
-            return
-        items = list(self.model_cache.items())
-        items.sort(key=lambda x: x[1].last_used)
-        while len(self.model_cache) > self.config["max_models_cached"]:
-            oldest = items.pop(0)[0]
-            del self.model_cache[oldest]
-            self.logger.info(f"Removed cached model: {oldest}")
-
     def get_performance_metrics(self) -> Dict[str, Any]:
         return {
             "system_info": self.system_info,
@@ -275,7 +320,7 @@ class CerebraFlowAppleSiliconAccelerator:
                 }
                 for k, v in self.metrics.items()
             },
-            "cached_models": len(self.model_cache),
+            "model_registry": get_model_registry().get_stats(),
             "config": self.config,
         }
 
@@ -295,8 +340,8 @@ def create_accelerated_sentence_transformer(model_name: str = "all-MiniLM-L6-v2"
 
 
 def generate_accelerated_embeddings(
-    texts: Union[str, List[str]], model_name: str = "all-MiniLM-L6-v2"
+    texts: Union[str, List[str]], model_name: str = "all-MiniLM-L6-v2", allow_fallback: bool = True
 ) -> Optional[Union[List[float], List[List[float]]]]:
-    return get_apple_silicon_accelerator().generate_embeddings(texts, model_name)
+    return get_apple_silicon_accelerator().generate_embeddings(texts, model_name, allow_fallback=allow_fallback)
 
 
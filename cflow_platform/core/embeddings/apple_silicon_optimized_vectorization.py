@@ -23,7 +23,7 @@ import sys
 # Add the backend-python directory to Python path
 sys.path.insert(0, str(Path(__file__).parent))
 
-from shared.enhanced_apple_silicon_accelerator import EnhancedAppleSiliconAccelerator
+from shared.enhanced_apple_silicon_accelerator import get_enhanced_accelerator
 from shared.hybrid_tenant_service import HybridTenantService
 from shared.security.classification import SecurityClassifier
 
@@ -97,7 +97,7 @@ class AppleSiliconOptimizedVectorizer:
             logger.info(" Initializing Apple Silicon M4 Pro Neural Engine Optimized Vectorizer...")
             
             # Initialize Apple Silicon accelerator
-            self.accelerator = EnhancedAppleSiliconAccelerator()
+            self.accelerator = get_enhanced_accelerator()
             
             # Get system capabilities for validation
             if hasattr(self.accelerator, 'chip_info'):
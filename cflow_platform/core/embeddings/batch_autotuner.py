@@ -0,0 +1,415 @@
+"""
+Online Batch-Size Autotuner for Embedding Generation
+
+A static batch size cannot suit both 200-character function summaries and
+50-line code chunks, nor every model/device pair. The autotuner learns it
+from real workloads:
+- Throughput (items/sec, EWMA) and memory growth are recorded per batch
+  size for each (model, device, text-length bucket)
+- ``suggest`` hill-climbs over power-of-two candidates: it measures the
+  current best size's neighbours and settles once neither beats it, then
+  re-checks the neighbours periodically to follow drift. Candidates larger
+  than any call seen so far cannot be measured and are not explored until
+  a call big enough arrives, and callers can cap a bucket at the largest
+  batch their encoder actually forms (the CPU backend's token budget)
+- Under memory pressure (system memory above ``CFLOW_EMBED_MEM_PRESSURE_PCT``)
+  suggestions are halved, and an out-of-memory failure caps the bucket
+  below the size that failed
+- Results persist to ``.cerebraflow/cache/embed_batch_tuning.json`` so new
+  processes start from the converged size
+"""
+
+import atexit
+import json
+import logging
+import os
+import statistics
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, TypeVar
+
+from cflow_platform.core.disk_cache import default_cache_dir
+
+logger = logging.getLogger(__name__)
+
+try:
+    import psutil  # type: ignore
+    PSUTIL_AVAILABLE = True
+except Exception:
+    PSUTIL_AVAILABLE = False
+
+T = TypeVar("T")
+
+DEFAULT_CANDIDATES = (4, 8, 16, 32, 64, 128)
+
+# Median text length (characters) -> bucket name
+LENGTH_BUCKETS = ((256, "le256"), (1024, "le1k"), (4096, "le4k"))
+
+
+def length_bucket(texts: Sequence[str]) -> str:
+    if not texts:
+        return LENGTH_BUCKETS[0][1]
+    median = statistics.median(len(t) for t in texts)
+    for limit, name in LENGTH_BUCKETS:
+        if median <= limit:
+            return name
+    return "gt4k"
+
+
+def bucket_max_chars(bucket: str) -> Optional[int]:
+    """Upper median text length of ``bucket`` in characters (None for the open-ended bucket)"""
+    for limit, name in LENGTH_BUCKETS:
+        if name == bucket:
+            return limit
+    return None
+
+
+def autotune_enabled() -> bool:
+    """Whether accelerators use the autotuner (``CFLOW_EMBED_AUTOTUNE``, on by default)"""
+    return os.getenv("CFLOW_EMBED_AUTOTUNE", "1").strip().lower() not in {"0", "false", "no", "off"}
+
+
+def is_out_of_memory(error: BaseException) -> bool:
+    return isinstance(error, MemoryError) or "out of memory" in str(error).lower()
+
+
+@dataclass
+class BatchSizeStats:
+    items_per_second: float = 0.0
+    samples: int = 0
+    peak_memory_mb: float = 0.0
+
+
+@dataclass
+class TuningState:
+    sizes: Dict[int, BatchSizeStats] = field(default_factory=dict)
+    best: Optional[int] = None
+    cap: Optional[int] = None
+    calls: int = 0
+    # Largest number of texts seen in one call; 0 when callers do not say
+    max_items: int = 0
+
+
+class BatchSizeAutotuner:
+    """
+    Per-(model, device, length bucket) batch-size tuner.
+
+    Thread-safe. ``suggest`` returns the batch size to use; callers report
+    each timed call with ``record`` (and failures with ``record_oom``).
+    """
+
+    def __init__(
+        self,
+        candidates: Sequence[int] = DEFAULT_CANDIDATES,
+        default: int = 32,
+        min_samples: int = 3,
+        reexplore_every: int = 500,
+        state_path: Optional[Path] = None,
+        memory_pressure_pct: Optional[float] = None,
+        ewma_alpha: float = 0.3,
+    ):
+        self.candidates = tuple(sorted(set(int(c) for c in candidates)))
+        self.default = min(self.candidates, key=lambda c: abs(c - default))
+        self.min_samples = min_samples
+        self.reexplore_every = reexplore_every
+        self.ewma_alpha = ewma_alpha
+        self.state_path = state_path
+        if memory_pressure_pct is None:
+            try:
+                memory_pressure_pct = float(os.getenv("CFLOW_EMBED_MEM_PRESSURE_PCT", "90"))
+            except ValueError:
+                memory_pressure_pct = 90.0
+        self.memory_pressure_pct = memory_pressure_pct
+
+        self._lock = threading.Lock()
+        self._states: Dict[Tuple[str, str, str], TuningState] = {}
+        self._dirty = 0
+        if self.state_path is not None:
+            self._load()
+
+    # ---- suggestions ---------------------------------------------------------
+
+    def memory_pressure(self) -> bool:
+        if not PSUTIL_AVAILABLE:
+            return False
+        try:
+            return psutil.virtual_memory().percent >= self.memory_pressure_pct
+        except Exception:
+            return False
+
+    def _allowed(self, state: TuningState, limit: Optional[int] = None) -> List[int]:
+        allowed = [
+            c for c in self.candidates
+            if (state.cap is None or c <= state.cap) and (limit is None or c <= limit)
+        ]
+        return allowed or [self.candidates[0]]
+
+    def _measured(self, state: TuningState, size: int) -> bool:
+        stats = state.sizes.get(size)
+        return stats is not None and stats.samples >= self.min_samples
+
+    def suggest(
+        self,
+        model: str,
+        device: str,
+        bucket: str,
+        items: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> int:
+        """Batch size for the next call.
+
+        ``items`` is the number of texts it will encode; ``limit`` is the
+        largest batch the encoder really forms for this bucket; bigger
+        candidates would run as smaller batches and are never suggested.
+        """
+        with self._lock:
+            state = self._states.setdefault((model, device, bucket), TuningState())
+            state.calls += 1
+            allowed = self._allowed(state, limit)
+            if items is not None and items > state.max_items:
+                if state.best is not None and any(
+                    state.max_items < n <= items for n in self._neighbours(allowed, state.best)
+                ):
+                    # A neighbour that could not be measured before now can be
+                    state.best = None
+                state.max_items = items
+            if state.best is not None and state.calls % self.reexplore_every == 0:
+                # Let the neighbours of the settled size be measured again
+                for size in self._neighbours(allowed, state.best):
+                    if size in state.sizes:
+                        state.sizes[size].samples = min(state.sizes[size].samples, self.min_samples - 1)
+                state.best = None
+            choice = self._climb(state, allowed)
+            if self.memory_pressure():
+                choice = max(allowed[0], choice // 2)
+            return choice
+
+    @staticmethod
+    def _neighbours(allowed: List[int], size: int) -> List[int]:
+        if size not in allowed:
+            return []
+        i = allowed.index(size)
+        return [allowed[j] for j in (i - 1, i + 1) if 0 <= j < len(allowed)]
+
+    def _climb(self, state: TuningState, allowed: List[int]) -> int:
+        if state.best is not None and state.best in allowed:
+            return state.best
+        # Sizes above the largest call would only ever see partial batches
+        explorable = [s for s in allowed if not state.max_items or s <= state.max_items] or allowed[:1]
+        measured = [s for s in allowed if self._measured(state, s)]
+        if not measured:
+            start = [s for s in explorable if s <= self.default]
+            return start[-1] if start else explorable[0]
+        current = max(measured, key=lambda s: state.sizes[s].items_per_second)
+        for neighbour in self._neighbours(allowed, current):
+            if neighbour in explorable and not self._measured(state, neighbour):
+                return neighbour
+        state.best = current
+        self._dirty += 1
+        logger.info(f"Embedding batch size settled at {current}")
+        return current
+
+    # ---- observations ----------------------------------------------------------
+
+    def record(
+        self,
+        model: str,
+        device: str,
+        bucket: str,
+        batch_size: int,
+        items: int,
+        seconds: float,
+        peak_memory_mb: float = 0.0,
+    ):
+        """Report one encode call made with ``batch_size``.
+
+        Calls with fewer items than the batch size say nothing about that
+        size and are ignored.
+        """
+        if items < batch_size or seconds <= 0:
+            return
+        rate = items / seconds
+        with self._lock:
+            state = self._states.setdefault((model, device, bucket), TuningState())
+            stats = state.sizes.setdefault(batch_size, BatchSizeStats())
+            if stats.samples == 0:
+                stats.items_per_second = rate
+            else:
+                stats.items_per_second += self.ewma_alpha * (rate - stats.items_per_second)
+            stats.samples += 1
+            stats.peak_memory_mb = max(stats.peak_memory_mb, peak_memory_mb)
+            self._dirty += 1
+        self._maybe_save()
+
+    def record_oom(self, model: str, device: str, bucket: str, batch_size: int) -> int:
+        """Cap the bucket below ``batch_size`` after it ran out of memory; returns the new cap"""
+        with self._lock:
+            state = self._states.setdefault((model, device, bucket), TuningState())
+            smaller = [c for c in self.candidates if c < batch_size]
+            state.cap = smaller[-1] if smaller else self.candidates[0]
+            if state.best is not None and state.best > state.cap:
+                state.best = None
+            for size in [s for s in state.sizes if s > state.cap]:
+                del state.sizes[size]
+            self._dirty += 1
+            cap = state.cap
+        logger.warning(f"Embedding batch {batch_size} ran out of memory; capping {model}/{device}/{bucket} at {cap}")
+        self.save()
+        return cap
+
+    @contextmanager
+    def measure(self, device: str) -> Iterator[Dict[str, float]]:
+        """Time a block and estimate its peak memory in MB (device memory on CUDA, RSS growth otherwise)"""
+        result = {"seconds": 0.0, "peak_memory_mb": 0.0}
+        torch = _torch()
+        rss_before = _rss_mb()
+        if device == "cuda" and torch is not None:
+            torch.cuda.reset_peak_memory_stats()
+        start = time.perf_counter()
+        try:
+            yield result
+        finally:
+            result["seconds"] = time.perf_counter() - start
+            if device == "cuda" and torch is not None:
+                result["peak_memory_mb"] = torch.cuda.max_memory_allocated() / (1024 * 1024)
+            elif device == "mps" and torch is not None and hasattr(torch, "mps"):
+                result["peak_memory_mb"] = torch.mps.current_allocated_memory() / (1024 * 1024)
+            else:
+                result["peak_memory_mb"] = max(0.0, _rss_mb() - rss_before)
+
+    # ---- persistence ---------------------------------------------------------
+
+    def _load(self):
+        try:
+            data = json.loads(self.state_path.read_text())
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable batch tuning state {self.state_path}: {e}")
+            return
+        for key, raw in data.get("entries", {}).items():
+            parts = tuple(key.split("|"))
+            if len(parts) != 3:
+                continue
+            self._states[parts] = TuningState(
+                sizes={int(s): BatchSizeStats(**v) for s, v in raw.get("sizes", {}).items()},
+                best=raw.get("best"),
+                cap=raw.get("cap"),
+                max_items=raw.get("max_items", 0),
+            )
+
+    def save(self):
+        if self.state_path is None:
+            return
+        with self._lock:
+            payload = {
+                "version": 1,
+                "entries": {
+                    "|".join(key): {
+                        "best": state.best,
+                        "cap": state.cap,
+                        "max_items": state.max_items,
+                        "sizes": {str(s): vars(v) for s, v in sorted(state.sizes.items())},
+                    }
+                    for key, state in self._states.items()
+                },
+            }
+            self._dirty = 0
+        try:
+            self.state_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.state_path.with_suffix(f".tmp-{os.getpid()}")
+            tmp.write_text(json.dumps(payload, indent=2))
+            tmp.replace(self.state_path)
+        except OSError as e:
+            logger.warning(f"Could not persist batch tuning state: {e}")
+
+    def _maybe_save(self):
+        if self._dirty >= 20:
+            self.save()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "|".join(key): {
+                    "best": state.best,
+                    "cap": state.cap,
+                    "calls": state.calls,
+                    "max_items": state.max_items,
+                    "sizes": {s: vars(v) for s, v in sorted(state.sizes.items())},
+                }
+                for key, state in self._states.items()
+            }
+
+
+def encode_with_autotune(
+    encode: Callable[[int], T],
+    model: str,
+    device: str,
+    texts: Sequence[str],
+    on_oom: Optional[Callable[[], None]] = None,
+    tuner: Optional[BatchSizeAutotuner] = None,
+    batch_limit: Optional[Callable[[str], Optional[int]]] = None,
+) -> T:
+    """Run ``encode(batch_size)`` with a tuned batch size and report the timing.
+
+    ``batch_limit(bucket)`` gives the largest batch ``encode`` actually runs
+    for a length bucket (e.g. ``CPUEmbeddingBackend.batch_limit``).
+    Out-of-memory failures cap the bucket and retry with a smaller size
+    (calling ``on_oom`` first, e.g. to empty a device cache) until the
+    smallest candidate also fails.
+    """
+    tuner = tuner or get_batch_autotuner()
+    key = (model, device, length_bucket(texts))
+    limit = batch_limit(key[2]) if batch_limit is not None else None
+    tuned = tuner.suggest(*key, items=len(texts), limit=limit)
+    while True:
+        batch_size = max(1, min(tuned, len(texts)))
+        try:
+            with tuner.measure(device) as measured:
+                result = encode(batch_size)
+        except Exception as e:
+            if not is_out_of_memory(e):
+                raise
+            cap = tuner.record_oom(*key, tuned)
+            if cap >= tuned:
+                raise
+            tuned = cap
+            if on_oom is not None:
+                on_oom()
+            continue
+        tuner.record(*key, tuned, len(texts), measured["seconds"], measured["peak_memory_mb"])
+        return result
+
+
+def _torch() -> Optional[Any]:
+    try:
+        import torch  # type: ignore
+        return torch
+    except Exception:
+        return None
+
+
+def _rss_mb() -> float:
+    if not PSUTIL_AVAILABLE:
+        return 0.0
+    try:
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    except Exception:
+        return 0.0
+
+
+_tuner: Optional[BatchSizeAutotuner] = None
+_tuner_lock = threading.Lock()
+
+
+def get_batch_autotuner() -> BatchSizeAutotuner:
+    """Process-wide autotuner persisted under the cache directory"""
+    global _tuner
+    with _tuner_lock:
+        if _tuner is None:
+            _tuner = BatchSizeAutotuner(state_path=default_cache_dir() / "embed_batch_tuning.json")
+            atexit.register(_tuner.save)
+        return _tuner
@@ -0,0 +1,314 @@
+"""
+CPU Embedding Backend for Linux Servers
+
+The accelerators are tuned for MPS and the Neural Engine; on Linux nodes
+they fall back to a plain ``model.encode`` with PyTorch's default threading.
+This backend profile is applied whenever the model runs on the CPU:
+- Intra-op threads sized from the cgroup CPU quota (containers otherwise
+  see every host core and oversubscribe), inter-op threads kept small
+- Optional dynamic int8 quantization of the transformer's Linear layers
+  (``CFLOW_EMBED_QUANTIZE=1``)
+- Length-bucketed batching under a token budget: texts are sorted by
+  length and grouped so each batch pads to a similar length, with short
+  texts packed into larger batches than long ones
+- ``benchmark_cpu_variants`` to compare fp32/int8 and bucketed/unbucketed
+  encoding on the current node
+"""
+
+import logging
+import math
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from cflow_platform.core.embeddings.batch_autotuner import bucket_max_chars
+
+logger = logging.getLogger(__name__)
+
+try:
+    import torch  # type: ignore
+    TORCH_AVAILABLE = True
+except Exception:
+    TORCH_AVAILABLE = False
+
+_CGROUP_ROOT = Path("/sys/fs/cgroup")
+
+# Rough characters-per-token ratio for English text and source code
+_CHARS_PER_TOKEN = 4
+
+
+def _env_flag(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in {"1", "true", "yes", "on"}
+
+
+def _env_int(name: str) -> Optional[int]:
+    try:
+        value = int(os.getenv(name, ""))
+    except ValueError:
+        return None
+    return value if value > 0 else None
+
+
+def cgroup_cpu_limit(cgroup_root: Path = _CGROUP_ROOT) -> Optional[float]:
+    """CPU quota in cores from cgroup v2 ``cpu.max`` or v1 CFS files; None if unlimited"""
+    try:
+        v2 = cgroup_root / "cpu.max"
+        if v2.exists():
+            quota, _, period = v2.read_text().strip().partition(" ")
+            if quota == "max":
+                return None
+            return int(quota) / int(period or 100000)
+        v1 = cgroup_root / "cpu" / "cpu.cfs_quota_us"
+        if v1.exists():
+            quota_us = int(v1.read_text().strip())
+            if quota_us <= 0:
+                return None
+            period_us = int((cgroup_root / "cpu" / "cpu.cfs_period_us").read_text().strip())
+            return quota_us / period_us
+    except (OSError, ValueError) as e:
+        logger.debug(f"Could not read cgroup CPU quota: {e}")
+    return None
+
+
+def available_cpus(cgroup_root: Path = _CGROUP_ROOT) -> int:
+    """Cores this process may actually use: affinity mask capped by the cgroup quota"""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except (AttributeError, OSError):
+        cpus = os.cpu_count() or 1
+    limit = cgroup_cpu_limit(cgroup_root)
+    if limit is not None:
+        cpus = min(cpus, max(1, math.ceil(limit)))
+    return max(1, cpus)
+
+
+@dataclass
+class CPUBackendProfile:
+    """Thread, quantization and batching settings for CPU inference"""
+    intra_op_threads: int
+    inter_op_threads: int
+    quantize: bool = False
+    bucket_by_length: bool = True
+    token_budget: int = 8192
+    max_batch_size: int = 64
+    max_seq_tokens: int = 512
+
+    @classmethod
+    def from_environment(cls, cgroup_root: Path = _CGROUP_ROOT) -> "CPUBackendProfile":
+        cpus = available_cpus(cgroup_root)
+        return cls(
+            intra_op_threads=_env_int("CFLOW_EMBED_CPU_THREADS") or cpus,
+            # One batch runs at a time; a second inter-op thread only helps on larger nodes
+            inter_op_threads=_env_int("CFLOW_EMBED_INTEROP_THREADS") or (1 if cpus <= 4 else 2),
+            quantize=_env_flag("CFLOW_EMBED_QUANTIZE", False),
+            bucket_by_length=_env_flag("CFLOW_EMBED_BUCKETING", True),
+            token_budget=_env_int("CFLOW_EMBED_TOKEN_BUDGET") or 8192,
+            max_batch_size=_env_int("CFLOW_EMBED_CPU_BATCH") or 64,
+        )
+
+
+def estimate_tokens(text: str, max_seq_tokens: int = 512) -> int:
+    return min(max_seq_tokens, len(text) // _CHARS_PER_TOKEN + 2)
+
+
+def length_buckets(
+    texts: Sequence[str],
+    token_budget: int = 8192,
+    max_batch_size: int = 64,
+    max_seq_tokens: int = 512,
+) -> List[List[int]]:
+    """Group text indices into batches of similar length.
+
+    Indices are sorted longest first and a batch is closed once
+    ``len(batch) * longest_in_batch`` would exceed ``token_budget`` (the
+    padded token count the model actually processes).
+    """
+    lengths = [estimate_tokens(t, max_seq_tokens) for t in texts]
+    order = sorted(range(len(texts)), key=lambda i: -lengths[i])
+    batches: List[List[int]] = []
+    current: List[int] = []
+    for i in order:
+        longest = lengths[current[0]] if current else lengths[i]
+        if current and (len(current) >= max_batch_size or (len(current) + 1) * longest > token_budget):
+            batches.append(current)
+            current = []
+        current.append(i)
+    if current:
+        batches.append(current)
+    return batches
+
+
+_threads_lock = threading.Lock()
+_threads_applied: Optional[tuple] = None
+
+
+def apply_thread_settings(profile: CPUBackendProfile) -> bool:
+    """Size PyTorch's thread pools once per process; returns whether settings were applied"""
+    global _threads_applied
+    if not TORCH_AVAILABLE:
+        return False
+    with _threads_lock:
+        wanted = (profile.intra_op_threads, profile.inter_op_threads)
+        if _threads_applied == wanted:
+            return True
+        torch.set_num_threads(profile.intra_op_threads)
+        try:
+            torch.set_num_interop_threads(profile.inter_op_threads)
+        except RuntimeError:
+            # Only settable before the first parallel op; keep whatever is active
+            logger.debug("Inter-op thread count already fixed for this process")
+        _threads_applied = wanted
+        logger.info(f"CPU embedding threads: intra-op={wanted[0]} inter-op={torch.get_num_interop_threads()}")
+        return True
+
+
+def quantize_model(model: Any) -> Any:
+    """Dynamic int8 quantization of Linear layers; returns the original model on failure"""
+    if not TORCH_AVAILABLE:
+        return model
+    try:
+        quantized = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        logger.info("Applied dynamic int8 quantization to embedding model")
+        return quantized
+    except Exception as e:
+        logger.warning(f"Dynamic quantization failed, using fp32 model: {e}")
+        return model
+
+
+class CPUEmbeddingBackend:
+    """Applies a CPUBackendProfile to sentence-transformer models and encodes with it"""
+
+    def __init__(self, profile: Optional[CPUBackendProfile] = None):
+        self.profile = profile or CPUBackendProfile.from_environment()
+
+    def namespace(self, model_name: str) -> str:
+        """Cache namespace for vectors produced by this backend (int8 output differs from fp32)"""
+        return f"{model_name}-int8" if self.profile.quantize else model_name
+
+    def prepare_model(self, model: Any) -> Any:
+        apply_thread_settings(self.profile)
+        if self.profile.quantize:
+            model = quantize_model(model)
+        return model
+
+    def batch_limit(self, bucket: str) -> Optional[int]:
+        """Largest batch bucketed encoding forms for texts in an autotuner length bucket.
+
+        The token budget packs ``token_budget // tokens_per_text`` texts per
+        batch, so tuned sizes above that would run as smaller batches.
+        """
+        if not self.profile.bucket_by_length:
+            return None
+        chars = bucket_max_chars(bucket)
+        tokens = self.profile.max_seq_tokens
+        if chars is not None:
+            tokens = min(tokens, chars // _CHARS_PER_TOKEN + 2)
+        return max(1, self.profile.token_budget // tokens)
+
+    def encode(
+        self,
+        model: Any,
+        texts: Sequence[str],
+        bucketed: Optional[bool] = None,
+        max_batch_size: Optional[int] = None,
+    ) -> np.ndarray:
+        """Encode ``texts`` in input order (``max_batch_size`` overrides the profile's)"""
+        texts = list(texts)
+        max_batch_size = max_batch_size or self.profile.max_batch_size
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        if not (self.profile.bucket_by_length if bucketed is None else bucketed):
+            return np.asarray(
+                model.encode(texts, batch_size=max_batch_size, convert_to_numpy=True),
+                dtype=np.float32,
+            )
+        out: Optional[np.ndarray] = None
+        for batch in length_buckets(texts, self.profile.token_budget, max_batch_size, self.profile.max_seq_tokens):
+            vectors = np.asarray(
+                model.encode([texts[i] for i in batch], batch_size=len(batch), convert_to_numpy=True),
+                dtype=np.float32,
+            )
+            if out is None:
+                out = np.empty((len(texts), vectors.shape[1]), dtype=np.float32)
+            out[batch] = vectors
+        return out
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            **asdict(self.profile),
+            "available_cpus": available_cpus(),
+            "cgroup_cpu_limit": cgroup_cpu_limit(),
+        }
+
+
+def benchmark_cpu_variants(
+    model: Any,
+    texts: Sequence[str],
+    profile: Optional[CPUBackendProfile] = None,
+    repeats: int = 3,
+) -> Dict[str, Any]:
+    """Throughput of fp32/int8 x plain/bucketed encoding on this node.
+
+    Each variant reports embeddings per second (best of ``repeats``) and,
+    for int8, the mean cosine similarity to the fp32 vectors so the
+    quality cost of quantization is visible next to its speedup.
+    """
+    profile = profile or CPUBackendProfile.from_environment()
+    fp32 = CPUEmbeddingBackend(CPUBackendProfile(**{**asdict(profile), "quantize": False}))
+    int8 = CPUEmbeddingBackend(CPUBackendProfile(**{**asdict(profile), "quantize": True}))
+    models = {"fp32": fp32.prepare_model(model)}
+    quantized = int8.prepare_model(model)
+    if quantized is not model:
+        models["int8"] = quantized
+
+    reference: Optional[np.ndarray] = None
+    results: Dict[str, Any] = {}
+    for precision, variant_model in models.items():
+        backend = fp32 if precision == "fp32" else int8
+        for bucketed in (False, True):
+            name = f"{precision}_{'bucketed' if bucketed else 'plain'}"
+            best = float("inf")
+            vectors = None
+            for _ in range(max(1, repeats)):
+                start = time.perf_counter()
+                vectors = backend.encode(variant_model, texts, bucketed=bucketed)
+                best = min(best, time.perf_counter() - start)
+            entry: Dict[str, Any] = {
+                "seconds": round(best, 4),
+                "embeddings_per_second": round(len(texts) / best, 1) if best > 0 else 0.0,
+            }
+            if reference is None:
+                reference = vectors
+            elif vectors is not None and vectors.shape == reference.shape:
+                a = reference / np.maximum(np.linalg.norm(reference, axis=1, keepdims=True), 1e-12)
+                b = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+                entry["cosine_vs_fp32"] = round(float(np.mean(np.sum(a * b, axis=1))), 5)
+            results[name] = entry
+    baseline = results.get("fp32_plain", {}).get("embeddings_per_second") or 0.0
+    for entry in results.values():
+        entry["speedup"] = round(entry["embeddings_per_second"] / baseline, 2) if baseline else 0.0
+    return {"profile": asdict(profile), "texts": len(texts), "variants": results}
+
+
+_backend: Optional[CPUEmbeddingBackend] = None
+
+
+def get_cpu_backend() -> CPUEmbeddingBackend:
+    """Process-wide CPU backend configured from the environment"""
+    global _backend
+    if _backend is None:
+        _backend = CPUEmbeddingBackend()
+    return _backend
+
+
+def cpu_backend_enabled() -> bool:
+    """Whether CPU inference uses the tuned backend (``CFLOW_EMBED_CPU_BACKEND``, on by default)"""
+    return _env_flag("CFLOW_EMBED_CPU_BACKEND", True)
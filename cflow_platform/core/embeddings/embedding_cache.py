@@ -0,0 +1,377 @@
+"""
+Persistent Content-Addressed Embedding Cache
+
+Embeddings are a pure function of (model, text), so they are cached on disk
+and shared by every process on the machine; re-indexing unchanged content
+costs a hash and a row copy instead of a model forward pass:
+- One directory per model/dimension namespace under
+  ``.cerebraflow/cache/embeddings/``
+- Vectors stored as rows of a memory-mapped float16 matrix
+  (``vectors.f16``); a SQLite index (WAL) maps the 128-bit BLAKE2b digest
+  of the text to its row and last-use time
+- A parallel ``slots.u64`` array holds the digest prefix of each row's
+  owner. Writers clear it before overwriting a row and set it after, so a
+  reader that races with eviction sees a mismatch and treats the lookup as
+  a miss instead of returning another text's vector
+- Least-recently-used rows are evicted and reused once the byte budget is
+  reached; last-use updates are buffered so lookups stay read-only
+"""
+
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from cflow_platform.core.disk_cache import default_cache_dir
+from cflow_platform.core.sqlite_wal import open_wal_database, rollback
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key BLOB PRIMARY KEY,
+    slot INTEGER NOT NULL UNIQUE,
+    last_used REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_entries_last_used ON entries(last_used);
+CREATE TABLE IF NOT EXISTS meta (
+    name TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+_INITIAL_SLOTS = 1024
+_LOOKUP_CHUNK = 500
+_TOUCH_FLUSH = 256
+
+
+def embedding_cache_enabled() -> bool:
+    """Whether embedding services should use the persistent cache (``CFLOW_EMBED_CACHE``, on by default)"""
+    return os.getenv("CFLOW_EMBED_CACHE", "1").strip().lower() not in {"0", "false", "no", "off"}
+
+
+def _default_max_size_mb() -> float:
+    try:
+        return float(os.getenv("CFLOW_EMBED_CACHE_MB", "512"))
+    except ValueError:
+        return 512.0
+
+
+def _namespace_slug(model: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", model) or "default"
+
+
+def content_key(text: str) -> bytes:
+    """128-bit content address of a text"""
+    return hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+
+
+def _slot_tag(key: bytes) -> int:
+    # Never zero: zero marks a row that is empty or being rewritten
+    return int.from_bytes(key[:8], "little") | 1
+
+
+class EmbeddingCache:
+    """
+    Disk-backed embedding cache for one model and dimension.
+
+    ``get_many``/``put_many`` are synchronous and thread-safe. Any number of
+    processes may read and write the same namespace: SQLite serializes the
+    writers, and readers validate every row against its slot tag.
+    """
+
+    def __init__(
+        self,
+        model: str,
+        dim: int,
+        cache_dir: Optional[Path] = None,
+        max_size_mb: Optional[float] = None,
+    ):
+        self.model = model or "default"
+        self.dim = int(dim)
+        if self.dim <= 0:
+            raise ValueError(f"Invalid embedding dimension: {dim}")
+        base = Path(cache_dir) if cache_dir is not None else default_cache_dir() / "embeddings"
+        self.path = base / f"{_namespace_slug(self.model)}-{self.dim}"
+        self.index_path = self.path / "index.sqlite3"
+        self.vectors_path = self.path / "vectors.f16"
+        self.slots_path = self.path / "slots.u64"
+        self._row_bytes = self.dim * 2
+        max_bytes = (max_size_mb if max_size_mb is not None else _default_max_size_mb()) * 1024 * 1024
+        self.max_slots = max(1, int(max_bytes // self._row_bytes))
+
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._capacity = 0
+        self._vectors: Optional[np.memmap] = None
+        self._slots: Optional[np.memmap] = None
+        self._touched: Dict[bytes, float] = {}
+        self.stats = {"hits": 0, "misses": 0, "sets": 0, "evictions": 0, "stale": 0}
+        self._open()
+
+    # ---- setup ----------------------------------------------------------
+
+    def _open(self):
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.vectors_path.touch()
+        self.slots_path.touch()
+        self._conn, recreated = open_wal_database(
+            self.index_path, _SCHEMA, SCHEMA_VERSION, ("entries",), "Embedding cache index"
+        )
+        if recreated:
+            # Rows are unreachable without the index; invalidate every slot tag
+            self._remap()
+            if self._slots is not None:
+                self._slots[:] = 0
+                self._slots.flush()
+        self._remap()
+
+    def _file_capacity(self) -> int:
+        return min(self.vectors_path.stat().st_size // self._row_bytes, self.slots_path.stat().st_size // 8)
+
+    def _remap(self):
+        capacity = self._file_capacity()
+        if capacity == self._capacity and self._vectors is not None:
+            return
+        self._capacity = capacity
+        if capacity == 0:
+            self._vectors = self._slots = None
+            return
+        self._vectors = np.memmap(self.vectors_path, dtype="<f2", mode="r+", shape=(capacity, self.dim))
+        self._slots = np.memmap(self.slots_path, dtype="<u8", mode="r+", shape=(capacity,))
+
+    def _grow(self, needed: int):
+        """Extend both files to hold at least ``needed`` rows (writer transaction held)"""
+        self._remap()
+        if needed <= self._capacity:
+            return
+        capacity = min(self.max_slots, max(needed, _INITIAL_SLOTS, self._capacity * 2))
+        # Slot tags first: new rows are only reachable once both files cover them
+        for path, size in ((self.slots_path, capacity * 8), (self.vectors_path, capacity * self._row_bytes)):
+            with path.open("r+b") as f:
+                f.truncate(size)
+        self._remap()
+
+    # ---- reads ----------------------------------------------------------
+
+    def _read_rows(self, found: Dict[bytes, int]) -> Dict[bytes, List[float]]:
+        """Copy the rows of ``found`` keys, dropping any whose slot tag does not match"""
+        if not found:
+            return {}
+        keys = list(found)
+        slots = np.fromiter(found.values(), dtype=np.int64, count=len(keys))
+        if int(slots.max()) >= self._capacity:
+            self._remap()
+        in_range = slots < self._capacity
+        keys = [k for k, ok in zip(keys, in_range) if ok]
+        slots = slots[in_range]
+        if not keys:
+            return {}
+        expected = np.fromiter((_slot_tag(k) for k in keys), dtype=np.uint64, count=len(keys))
+        before = np.asarray(self._slots[slots])
+        rows = np.asarray(self._vectors[slots], dtype=np.float32)
+        # A writer may have reused a slot while we copied it
+        valid = (before == expected) & (np.asarray(self._slots[slots]) == expected)
+        return {key: row for key, row, ok in zip(keys, rows.tolist(), valid) if ok}
+
+    def get_many(self, texts: Sequence[str]) -> List[Optional[List[float]]]:
+        """Cached vectors for ``texts`` (``None`` for misses), in order"""
+        keys = [content_key(t) for t in texts]
+        with self._lock:
+            found: Dict[bytes, int] = {}
+            unique = list(dict.fromkeys(keys))
+            for start in range(0, len(unique), _LOOKUP_CHUNK):
+                chunk = unique[start:start + _LOOKUP_CHUNK]
+                marks = ",".join("?" * len(chunk))
+                found.update(self._conn.execute(f"SELECT key, slot FROM entries WHERE key IN ({marks})", chunk).fetchall())
+            rows = self._read_rows(found)
+            self.stats["stale"] += len(found) - len(rows)
+            now = time.time()
+            for key in rows:
+                self._touched[key] = now
+            results = [rows.get(key) for key in keys]
+            hits = sum(1 for r in results if r is not None)
+            self.stats["hits"] += hits
+            self.stats["misses"] += len(results) - hits
+            if len(self._touched) >= _TOUCH_FLUSH:
+                self._flush_touches()
+        return results
+
+    def get(self, text: str) -> Optional[List[float]]:
+        return self.get_many([text])[0]
+
+    # ---- writes ---------------------------------------------------------
+
+    def _flush_touches(self, in_transaction: bool = False):
+        if not self._touched:
+            return
+        updates = [(ts, key) for key, ts in self._touched.items()]
+        self._touched.clear()
+        try:
+            if not in_transaction:
+                self._conn.execute("BEGIN IMMEDIATE")
+            self._conn.executemany("UPDATE entries SET last_used = MAX(last_used, ?) WHERE key = ?", updates)
+            if not in_transaction:
+                self._conn.execute("COMMIT")
+        except sqlite3.Error as e:
+            # Recency is advisory; a busy index must not fail a lookup
+            logger.debug(f"Embedding cache touch skipped: {e}")
+            if not in_transaction:
+                rollback(self._conn)
+
+    def put_many(self, texts: Sequence[str], vectors: Sequence[Sequence[float]]) -> int:
+        """Store vectors for ``texts``; returns the number of new rows written"""
+        if len(texts) != len(vectors):
+            raise ValueError("vectors must align with texts")
+        if not texts:
+            return 0
+        matrix = np.asarray(vectors, dtype=np.float32)
+        if matrix.ndim != 2 or matrix.shape[1] != self.dim:
+            raise ValueError(f"Expected {self.dim}-dimensional vectors, got shape {matrix.shape}")
+
+        batch: Dict[bytes, int] = {}
+        for i, text in enumerate(texts):
+            batch[content_key(text)] = i
+        if len(batch) > self.max_slots:
+            batch = dict(list(batch.items())[-self.max_slots:])
+
+        with self._lock:
+            try:
+                self._conn.execute("BEGIN IMMEDIATE")
+                self._flush_touches(in_transaction=True)
+                keys = list(batch)
+                existing = set()
+                for start in range(0, len(keys), _LOOKUP_CHUNK):
+                    chunk = keys[start:start + _LOOKUP_CHUNK]
+                    marks = ",".join("?" * len(chunk))
+                    existing.update(
+                        k for (k,) in self._conn.execute(f"SELECT key FROM entries WHERE key IN ({marks})", chunk)
+                    )
+                new_keys = [k for k in keys if k not in existing]
+                slots = self._allocate(len(new_keys), exclude=existing)
+                now = time.time()
+                for key, slot in zip(new_keys, slots):
+                    self._slots[slot] = 0
+                    self._vectors[slot] = matrix[batch[key]]
+                    self._slots[slot] = _slot_tag(key)
+                if new_keys:
+                    self._vectors.flush()
+                    self._slots.flush()
+                self._conn.executemany(
+                    "INSERT INTO entries(key, slot, last_used) VALUES (?, ?, ?)",
+                    [(key, slot, now) for key, slot in zip(new_keys, slots)],
+                )
+                self._conn.executemany(
+                    "UPDATE entries SET last_used = ? WHERE key = ?", [(now, key) for key in existing]
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                rollback(self._conn)
+                raise
+            self.stats["sets"] += len(new_keys)
+            return len(new_keys)
+
+    def put(self, text: str, vector: Sequence[float]) -> bool:
+        return self.put_many([text], [vector]) == 1
+
+    def _allocate(self, count: int, exclude: set) -> List[int]:
+        """Free slots for ``count`` new rows, evicting least-recently-used entries
+        (writer transaction held)"""
+        if count == 0:
+            return []
+        row = self._conn.execute("SELECT COUNT(*), COALESCE(MAX(slot), -1) FROM entries").fetchone()
+        used, highest = int(row[0]), int(row[1])
+        slots: List[int] = []
+        if used == highest + 1:
+            # Dense: append past the end while the budget allows
+            fresh = min(count, self.max_slots - used)
+            if fresh > 0:
+                slots = list(range(used, used + fresh))
+                self._grow(used + fresh)
+        else:
+            # Holes left by clear()/deletes: reuse them
+            taken = {s for (s,) in self._conn.execute("SELECT slot FROM entries")}
+            slots = [s for s in range(min(self.max_slots, max(self._capacity, highest + 1 + count))) if s not in taken][:count]
+            if slots:
+                self._grow(max(slots) + 1)
+        shortfall = count - len(slots)
+        if shortfall > 0:
+            victims = [
+                (key, slot)
+                for key, slot in self._conn.execute(
+                    "SELECT key, slot FROM entries ORDER BY last_used LIMIT ?", (shortfall + len(exclude),)
+                )
+                if key not in exclude
+            ][:shortfall]
+            self._conn.executemany("DELETE FROM entries WHERE key = ?", [(key,) for key, _ in victims])
+            slots.extend(slot for _, slot in victims)
+            self.stats["evictions"] += len(victims)
+        return slots
+
+    def clear(self):
+        with self._lock:
+            try:
+                self._conn.execute("BEGIN IMMEDIATE")
+                self._conn.execute("DELETE FROM entries")
+                self._remap()
+                if self._slots is not None:
+                    self._slots[:] = 0
+                    self._slots.flush()
+                self._conn.execute("COMMIT")
+            except Exception:
+                rollback(self._conn)
+                raise
+            self._touched.clear()
+
+    # ---- introspection ----------------------------------------------------
+
+    def __len__(self) -> int:
+        with self._lock:
+            return int(self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0])
+
+    def get_stats(self) -> Dict[str, Any]:
+        entries = len(self)
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "model": self.model,
+            "dimensions": self.dim,
+            "entries": entries,
+            "capacity": self._capacity,
+            "max_entries": self.max_slots,
+            "size_bytes": entries * self._row_bytes,
+            "hit_rate": round(self.stats["hits"] / lookups, 4) if lookups else 0.0,
+            "path": str(self.path),
+        }
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._flush_touches()
+                self._conn.close()
+                self._conn = None
+            self._vectors = self._slots = None
+            self._capacity = 0
+
+
+_caches: Dict[Tuple[str, int], EmbeddingCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_embedding_cache(model: str, dim: int, **kwargs: Any) -> EmbeddingCache:
+    """Get the process-wide embedding cache for a model and dimension"""
+    with _caches_lock:
+        cache = _caches.get((model, int(dim)))
+        if cache is None:
+            cache = EmbeddingCache(model, dim, **kwargs)
+            _caches[(model, int(dim))] = cache
+        return cache
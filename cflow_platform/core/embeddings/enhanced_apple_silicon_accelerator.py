@@ -38,6 +38,9 @@ from enum import Enum
 import json
 import hashlib
 
+from cflow_platform.core.embeddings.batch_autotuner import autotune_enabled, encode_with_autotune
+from cflow_platform.core.embeddings.model_registry import ModelRegistry, get_model_registry
+
 # Configure logging
 logger = logging.getLogger(__name__)
 
@@ -138,7 +141,6 @@ class EnhancedAppleSiliconAccelerator:
         self.optimal_device = self._select_optimal_device()
         
         # Model management
-        self.model_cache: Dict[str, Any] = {}
         self.current_model: Optional[str] = None
         self.current_dimensions: int = 384
         
@@ -150,7 +152,6 @@ class EnhancedAppleSiliconAccelerator:
         self.config = {
             "auto_optimize_batch_size": True,
             "enable_hybrid_processing": True,
-            "max_models_cached": 3,
             "performance_monitoring": True,
             "cache_timeout_minutes": 30
         }
@@ -564,51 +565,65 @@ class EnhancedAppleSiliconAccelerator:
         else:
             return "cpu"
     
-    def create_optimized_model(self, model_name: Optional[str] = None, target_dimensions: Optional[int] = None) -> Optional[Any]:
-        """Create optimized sentence transformer model"""
+    def _cpu_backend(self) -> Optional[Any]:
+        """Tuned CPU backend when inference runs on the CPU, else None"""
+        if self.get_device_string() != "cpu":
+            return None
+        from cflow_platform.core.embeddings.cpu_backend import cpu_backend_enabled, get_cpu_backend
+
+        return get_cpu_backend() if cpu_backend_enabled() else None
+
+    def cache_namespace(self) -> str:
+        """Embedding-cache namespace for the current model and backend"""
+        model_name = self.current_model or "default"
+        cpu_backend = self._cpu_backend()
+        return cpu_backend.namespace(model_name) if cpu_backend is not None else model_name
+
+    def create_optimized_model(self, model_name: Optional[str] = None, target_dimensions: Optional[int] = None,
+                               lease: bool = False) -> Optional[Any]:
+        """Create optimized sentence transformer model.
+
+        Models are shared through the process-wide registry, so every
+        accelerator (and every ``target_dimensions``) uses one resident copy
+        per model and device. ``lease`` pins the model until ``release_model``.
+        """
         if not SENTENCE_TRANSFORMERS_AVAILABLE:
             self.logger.warning("[INFO] Sentence Transformers not available")
             return None
         
         # Use provided model or select optimal
         if model_name is None:
-            optimal_model = self._select_optimal_model()
-            model_name = optimal_model.name
-            target_dimensions = optimal_model.dimensions
-        
-        cache_key = f"{model_name}_{target_dimensions}"
-        
-        # Check cache
-        if cache_key in self.model_cache:
-            cached_model = self.model_cache[cache_key]
-            self.logger.info(f" Using cached model: {model_name}")
-            return cached_model
+            model_name = self._select_optimal_model().name
         
+        registry = get_model_registry()
+        resolve = registry.acquire if lease else registry.get
         try:
-            start_time = time.time()
-            self.logger.info(f" Loading model: {model_name}")
-            
-            model = SentenceTransformer(model_name)
-            
-            # Move to optimal device
-            device_str = self.get_device_string()
-            if device_str != "cpu" and TORCH_AVAILABLE:
-                model = model.to(device_str)
-                self.logger.info(f" Model moved to {device_str}")
-            
-            load_time = time.time() - start_time
-            
-            # Cache the model
-            self.model_cache[cache_key] = model
-            self._clean_model_cache()
-            
-            self.logger.info(f" Model loaded in {load_time:.3f}s on {device_str}")
-            return model
-            
+            return resolve(self._model_key(model_name), lambda: self._load_model(model_name))
         except Exception as e:
             self.logger.error(f" Failed to load model {model_name}: {e}")
             return None
     
+    def release_model(self, model_name: str):
+        get_model_registry().release(self._model_key(model_name))
+    
+    def _model_key(self, model_name: str) -> Tuple[str, str, str]:
+        cpu_backend = self._cpu_backend()
+        variant = "int8" if cpu_backend is not None and cpu_backend.profile.quantize else ""
+        return ModelRegistry.key(model_name, self.get_device_string(), variant)
+    
+    def _load_model(self, model_name: str) -> Any:
+        self.logger.info(f" Loading model: {model_name}")
+        model = SentenceTransformer(model_name)
+        
+        # Move to optimal device
+        device_str = self.get_device_string()
+        if device_str != "cpu" and TORCH_AVAILABLE:
+            model = model.to(device_str)
+            self.logger.info(f" Model moved to {device_str}")
+        elif self._cpu_backend() is not None:
+            model = self._cpu_backend().prepare_model(model)
+        return model
+    
     def generate_embeddings(self, texts: Union[str, List[str]], 
                           model_name: Optional[str] = None,
                           target_dimensions: Optional[int] = None,
@@ -621,35 +636,32 @@ class EnhancedAppleSiliconAccelerator:
         if is_single:
             texts = [texts]
         
-        # Get optimal model
-        model = self.create_optimized_model(model_name, target_dimensions)
+        # Get optimal model, pinned in the registry while it encodes
+        model_name = model_name or self._select_optimal_model().name
+        model = self.create_optimized_model(model_name, target_dimensions, lease=True)
         if model is None:
             self.logger.error(" Failed to create model")
             return None
         
         try:
-            # Optimize batch size
-            if batch_size is None:
-                batch_size = self._get_optimal_batch_size(len(texts))
-            
-            # Generate embeddings with hardware acceleration
-            self.logger.info(f" Generating {len(texts)} embeddings with batch size {batch_size}")
-            
-            if TORCH_AVAILABLE:
-                embeddings = model.encode(
+            # Generate embeddings with hardware acceleration. The batch size is
+            # learned online per model/device/text length unless given.
+            if batch_size is None and autotune_enabled():
+                device_str = self.get_device_string()
+                cpu_backend = self._cpu_backend()
+                embeddings = encode_with_autotune(
+                    lambda size: self._encode(model, texts, size),
+                    model_name,
+                    device_str,
                     texts,
-                    convert_to_tensor=True,
-                    batch_size=batch_size,
-                    show_progress_bar=len(texts) > 50
+                    on_oom=lambda: self._clear_device_cache(device_str),
+                    batch_limit=cpu_backend.batch_limit if cpu_backend is not None else None,
                 )
-                
-                # Move to CPU for return
-                if embeddings.device.type != "cpu":
-                    embeddings = embeddings.cpu()
-                
-                embeddings = embeddings.numpy().tolist()
             else:
-                embeddings = model.encode(texts, batch_size=batch_size).tolist()
+                if batch_size is None:
+                    batch_size = self._get_optimal_batch_size(len(texts))
+                self.logger.info(f" Generating {len(texts)} embeddings with batch size {batch_size}")
+                embeddings = self._encode(model, texts, batch_size)
             
             # Record performance metrics
             processing_time = time.time() - start_time
@@ -664,6 +676,38 @@ class EnhancedAppleSiliconAccelerator:
             self.logger.error(f" Embedding generation failed: {e}")
             self.metrics.failed_operations += 1
             return None
+        finally:
+            self.release_model(model_name)
+    
+    def _encode(self, model: Any, texts: List[str], batch_size: int) -> List[List[float]]:
+        cpu_backend = self._cpu_backend()
+        if cpu_backend is not None:
+            return cpu_backend.encode(model, texts, max_batch_size=batch_size).tolist()
+        if TORCH_AVAILABLE:
+            embeddings = model.encode(
+                texts,
+                convert_to_tensor=True,
+                batch_size=batch_size,
+                show_progress_bar=len(texts) > 50
+            )
+            
+            # Move to CPU for return
+            if embeddings.device.type != "cpu":
+                embeddings = embeddings.cpu()
+            
+            return embeddings.numpy().tolist()
+        return model.encode(texts, batch_size=batch_size).tolist()
+    
+    def _clear_device_cache(self, device_str: str):
+        if not TORCH_AVAILABLE:
+            return
+        try:
+            if device_str == "cuda":
+                torch.cuda.empty_cache()
+            elif device_str == "mps":
+                torch.mps.empty_cache()
+        except Exception:
+            pass
     
     def _get_optimal_batch_size(self, total_items: int) -> int:
         """Calculate optimal batch size based on hardware and data"""
@@ -721,25 +765,20 @@ class EnhancedAppleSiliconAccelerator:
                 last_updated=datetime.now()
             ))
     
-    def _clean_model_cache(self):
-        """Clean old models from cache"""
-        if len(self.model_cache) <= self.config["max_models_cached"]:
-            return
-        
-        # Remove oldest models (simple approach)
-        while len(self.model_cache) > self.config["max_models_cached"]:
-            oldest_key = next(iter(self.model_cache))
-            del self.model_cache[oldest_key]
-            self.logger.info(f"[INFO] Removed cached model: {oldest_key}")
-    
-    def benchmark_models(self, test_texts: Optional[List[str]] = None) -> Dict[str, Any]:
-        """Benchmark available models for optimal selection"""
+    def benchmark_models(self, test_texts: Optional[List[str]] = None, mode: str = "models") -> Dict[str, Any]:
+        """Benchmark available models for optimal selection.
+
+        ``mode="cpu"`` instead compares CPU backend variants (fp32/int8,
+        plain/length-bucketed batching) of the current model.
+        """
         if test_texts is None:
             test_texts = [
                 "Apple Silicon provides incredible performance for machine learning workloads",
                 "The Neural Engine accelerates transformer models with high efficiency",
                 "CerebraFlow leverages hardware optimization for enterprise AI applications"
             ]
+        if mode == "cpu":
+            return self._benchmark_cpu_variants(test_texts)
         
         results = {}
         
@@ -790,6 +829,23 @@ class EnhancedAppleSiliconAccelerator:
             "recommendation": self._get_model_recommendation(results)
         }
     
+    def _benchmark_cpu_variants(self, test_texts: List[str]) -> Dict[str, Any]:
+        """Compare CPU backend variants of the current model"""
+        from cflow_platform.core.embeddings.cpu_backend import benchmark_cpu_variants, get_cpu_backend
+
+        if not SENTENCE_TRANSFORMERS_AVAILABLE:
+            return {"status": "failed", "error": "Sentence Transformers not available"}
+        model_name = self.current_model or self._select_optimal_model().name
+        try:
+            # Fresh fp32 copy: the cached model may already be quantized
+            model = SentenceTransformer(model_name, device="cpu")
+        except Exception as e:
+            return {"status": "failed", "error": str(e)}
+        report = benchmark_cpu_variants(model, test_texts, get_cpu_backend().profile)
+        report["model"] = model_name
+        report["status"] = "success"
+        return report
+
     def _get_model_recommendation(self, benchmark_results: Dict[str, Any]) -> Dict[str, Any]:
         """Get model recommendation based on benchmark results"""
         best_model = None
@@ -859,10 +915,7 @@ class EnhancedAppleSiliconAccelerator:
                 }
                 for model in self.hardware_profile.recommended_models
             ],
-            "cache_status": {
-                "cached_models": len(self.model_cache),
-                "max_cache_size": self.config["max_models_cached"]
-            }
+            "model_registry": get_model_registry().get_stats()
         }
 
 # Global enhanced accelerator instance
@@ -886,9 +939,9 @@ def get_hardware_recommendation() -> Dict[str, Any]:
     accelerator = get_enhanced_accelerator()
     return accelerator._get_model_recommendation({})
 
-def benchmark_current_hardware() -> Dict[str, Any]:
-    """Benchmark current hardware capabilities"""
-    return get_enhanced_accelerator().benchmark_models()
+def benchmark_current_hardware(mode: str = "models") -> Dict[str, Any]:
+    """Benchmark current hardware capabilities (``mode="cpu"`` compares CPU variants)"""
+    return get_enhanced_accelerator().benchmark_models(mode=mode)
 
 def get_optimal_dimensions() -> int:
     """Get optimal embedding dimensions for current hardware"""
@@ -0,0 +1,345 @@
+"""
+Process-Wide Embedding Model Registry
+
+The accelerators each kept a private ``model_cache``, so a process running
+WebMCP and the code-intel indexer could hold the same sentence-transformer
+two or three times. Every accelerator now resolves models here:
+- One resident copy per (model name, device, variant); concurrent first
+  requests share a single load
+- Reference counts (``lease``) keep a model resident while it is encoding
+- Idle models (no leases, unused for ``CFLOW_MODEL_IDLE_SECONDS``) are
+  unloaded by an opportunistic sweep or the optional reaper thread, and
+  at most ``CFLOW_MAX_RESIDENT_MODELS`` idle models are kept
+- ``start_model_warmup`` preloads ``CFLOW_PRELOAD_MODELS`` (default: the
+  selected model, ``none`` to disable) when a server starts, so the first
+  request does not pay the load
+- Per-model memory (parameter and buffer bytes, RSS growth as a fallback)
+  and load/hit counters are reported by ``get_stats``
+"""
+
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+try:
+    import psutil  # type: ignore
+    PSUTIL_AVAILABLE = True
+except Exception:
+    PSUTIL_AVAILABLE = False
+
+ModelKey = Tuple[str, str, str]
+Loader = Callable[[], Any]
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+def _rss_bytes() -> int:
+    if not PSUTIL_AVAILABLE:
+        return 0
+    try:
+        return psutil.Process().memory_info().rss
+    except Exception:
+        return 0
+
+
+def model_memory_bytes(model: Any) -> int:
+    """Bytes held by a torch module's parameters and buffers (0 if unknown)"""
+    total = 0
+    for attr in ("parameters", "buffers"):
+        tensors = getattr(model, attr, None)
+        if not callable(tensors):
+            continue
+        try:
+            total += sum(t.numel() * t.element_size() for t in tensors())
+        except Exception:
+            return 0
+    return total
+
+
+@dataclass
+class ResidentModel:
+    key: ModelKey
+    model: Any
+    load_seconds: float
+    memory_bytes: int
+    loaded_at: float = field(default_factory=time.time)
+    last_used: float = field(default_factory=time.time)
+    refcount: int = 0
+    hits: int = 0
+
+
+class ModelRegistry:
+    """Thread-safe registry of loaded embedding models shared by all accelerators"""
+
+    def __init__(self, idle_seconds: Optional[float] = None, max_idle_models: Optional[int] = None):
+        self.idle_seconds = idle_seconds if idle_seconds is not None else _env_float("CFLOW_MODEL_IDLE_SECONDS", 1800.0)
+        self.max_idle_models = int(
+            max_idle_models if max_idle_models is not None else _env_float("CFLOW_MAX_RESIDENT_MODELS", 3)
+        )
+        self._lock = threading.Lock()
+        self._models: Dict[ModelKey, ResidentModel] = {}
+        self._loading: Dict[ModelKey, threading.Lock] = {}
+        self._last_sweep = time.monotonic()
+        self._reaper: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.stats = {"loads": 0, "load_failures": 0, "unloads": 0}
+
+    @staticmethod
+    def key(name: str, device: str = "cpu", variant: str = "") -> ModelKey:
+        return (name, device, variant)
+
+    # ---- access -----------------------------------------------------------
+
+    def get(self, key: ModelKey, loader: Loader) -> Any:
+        """Resident model for ``key``, loading it with ``loader`` on first use"""
+        return self._resolve(key, loader, lease=False)
+
+    def acquire(self, key: ModelKey, loader: Loader) -> Any:
+        """Like ``get`` but pins the model until ``release``"""
+        return self._resolve(key, loader, lease=True)
+
+    def release(self, key: ModelKey):
+        with self._lock:
+            entry = self._models.get(key)
+            if entry is not None and entry.refcount > 0:
+                entry.refcount -= 1
+                entry.last_used = time.time()
+
+    @contextmanager
+    def lease(self, key: ModelKey, loader: Loader) -> Iterator[Any]:
+        model = self.acquire(key, loader)
+        try:
+            yield model
+        finally:
+            self.release(key)
+
+    def _resolve(self, key: ModelKey, loader: Loader, lease: bool) -> Any:
+        self._maybe_sweep()
+        with self._lock:
+            entry = self._hit(key, lease)
+            if entry is not None:
+                return entry.model
+            load_lock = self._loading.setdefault(key, threading.Lock())
+        with load_lock:
+            try:
+                with self._lock:
+                    # Another thread may have finished the load while we waited
+                    entry = self._hit(key, lease)
+                    if entry is not None:
+                        return entry.model
+                model = self._load(key, loader, lease)
+            finally:
+                # Also after a failed load, so the lock does not outlive it
+                with self._lock:
+                    if self._loading.get(key) is load_lock:
+                        del self._loading[key]
+        if model is not None:
+            self._enforce_idle_limit()
+        return model
+
+    def _load(self, key: ModelKey, loader: Loader, lease: bool) -> Any:
+        rss_before = _rss_bytes()
+        start = time.perf_counter()
+        try:
+            model = loader()
+        except Exception:
+            with self._lock:
+                self.stats["load_failures"] += 1
+            raise
+        if model is None:
+            with self._lock:
+                self.stats["load_failures"] += 1
+            return None
+        load_seconds = time.perf_counter() - start
+        memory = model_memory_bytes(model) or max(0, _rss_bytes() - rss_before)
+        with self._lock:
+            self._models[key] = ResidentModel(key, model, load_seconds, memory, refcount=1 if lease else 0)
+            self.stats["loads"] += 1
+        logger.info(
+            f"Loaded embedding model {key[0]} ({key[1]}{'/' + key[2] if key[2] else ''}) "
+            f"in {load_seconds:.2f}s, ~{memory / (1024 * 1024):.0f} MB"
+        )
+        return model
+
+    def _hit(self, key: ModelKey, lease: bool) -> Optional[ResidentModel]:
+        entry = self._models.get(key)
+        if entry is None:
+            return None
+        entry.hits += 1
+        entry.last_used = time.time()
+        if lease:
+            entry.refcount += 1
+        return entry
+
+    # ---- unloading ------------------------------------------------------------
+
+    def unload(self, key: ModelKey, force: bool = False) -> bool:
+        with self._lock:
+            entry = self._models.get(key)
+            if entry is None or (entry.refcount > 0 and not force):
+                return False
+            del self._models[key]
+            self.stats["unloads"] += 1
+        logger.info(f"Unloaded embedding model {key[0]} ({key[1]})")
+        _release_device_memory(key[1])
+        return True
+
+    def unload_idle(self, idle_seconds: Optional[float] = None) -> int:
+        """Unload unleased models unused for ``idle_seconds``; returns how many"""
+        cutoff = time.time() - (self.idle_seconds if idle_seconds is None else idle_seconds)
+        with self._lock:
+            idle = [k for k, e in self._models.items() if e.refcount == 0 and e.last_used <= cutoff]
+        return sum(1 for k in idle if self.unload(k))
+
+    def _enforce_idle_limit(self):
+        with self._lock:
+            idle = sorted(
+                (e for e in self._models.values() if e.refcount == 0), key=lambda e: e.last_used
+            )
+            excess = [e.key for e in idle[:max(0, len(idle) - self.max_idle_models)]]
+        for key in excess:
+            self.unload(key)
+
+    def _maybe_sweep(self):
+        now = time.monotonic()
+        if now - self._last_sweep < 60.0:
+            return
+        self._last_sweep = now
+        self.unload_idle()
+
+    def start_reaper(self, interval_seconds: float = 60.0):
+        """Unload idle models from a daemon thread (for long-lived servers)"""
+        if self._reaper is not None and self._reaper.is_alive():
+            return
+
+        def _run():
+            while not self._stop.wait(interval_seconds):
+                try:
+                    self.unload_idle()
+                except Exception as e:
+                    logger.debug(f"Model reaper sweep failed: {e}")
+
+        self._stop.clear()
+        self._reaper = threading.Thread(target=_run, name="cflow-model-reaper", daemon=True)
+        self._reaper.start()
+
+    def stop_reaper(self):
+        self._stop.set()
+
+    # ---- warmup and introspection ---------------------------------------------
+
+    def preload(self, loaders: Dict[ModelKey, Loader]) -> Dict[str, Any]:
+        results: Dict[str, Any] = {}
+        for key, loader in loaders.items():
+            try:
+                ok = self.get(key, loader) is not None
+                results[key[0]] = "loaded" if ok else "unavailable"
+            except Exception as e:
+                results[key[0]] = f"failed: {e}"
+        return results
+
+    def __contains__(self, key: ModelKey) -> bool:
+        return key in self._models
+
+    def __len__(self) -> int:
+        return len(self._models)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            models = [
+                {
+                    "name": e.key[0],
+                    "device": e.key[1],
+                    "variant": e.key[2] or None,
+                    "memory_mb": round(e.memory_bytes / (1024 * 1024), 1),
+                    "load_seconds": round(e.load_seconds, 3),
+                    "refcount": e.refcount,
+                    "hits": e.hits,
+                    "idle_seconds": round(time.time() - e.last_used, 1),
+                }
+                for e in self._models.values()
+            ]
+            return {
+                **self.stats,
+                "resident_models": len(models),
+                "resident_memory_mb": round(sum(m["memory_mb"] for m in models), 1),
+                "idle_unload_seconds": self.idle_seconds,
+                "max_idle_models": self.max_idle_models,
+                "models": models,
+            }
+
+
+def _release_device_memory(device: str):
+    try:
+        import torch  # type: ignore
+        if device == "cuda" and torch.cuda.is_available():
+            torch.cuda.empty_cache()
+        elif device == "mps" and hasattr(torch, "mps"):
+            torch.mps.empty_cache()
+    except Exception:
+        pass
+
+
+_registry: Optional[ModelRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_model_registry() -> ModelRegistry:
+    """Get the process-wide model registry"""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ModelRegistry()
+        return _registry
+
+
+def _configured_preload_models() -> Optional[List[str]]:
+    """Names from ``CFLOW_PRELOAD_MODELS``; None means the default model, [] disables preloading"""
+    configured = os.getenv("CFLOW_PRELOAD_MODELS", "").strip()
+    if not configured:
+        return None
+    if configured.lower() in {"0", "none", "off", "false"}:
+        return []
+    return [m.strip() for m in configured.split(",") if m.strip()]
+
+
+def preload_embedding_models(model_names: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Load ``model_names`` (default: the enhanced accelerator's selected model) into the registry"""
+    from cflow_platform.core.embeddings.enhanced_apple_silicon_accelerator import get_enhanced_accelerator
+
+    accelerator = get_enhanced_accelerator()
+    if not model_names:
+        model_names = [accelerator.current_model or "all-MiniLM-L6-v2"]
+    return {
+        name: "loaded" if accelerator.create_optimized_model(name) is not None else "unavailable"
+        for name in model_names
+    }
+
+
+def start_model_warmup() -> Optional[threading.Thread]:
+    """Server start hook: preload embedding models in the background and start the idle reaper"""
+    get_model_registry().start_reaper()
+    model_names = _configured_preload_models()
+    if model_names == []:
+        return None
+
+    def _warm():
+        try:
+            logger.info(f"Embedding model preload: {preload_embedding_models(model_names)}")
+        except Exception as e:
+            logger.warning(f"Embedding model preload failed: {e}")
+
+    thread = threading.Thread(target=_warm, name="cflow-model-preload", daemon=True)
+    thread.start()
+    return thread
@@ -33,6 +33,7 @@ from .async_tool_executor import (
     get_performance_metrics,
     get_health_status
 )
+from .embeddings.model_registry import start_model_warmup
 from .connection_pool import (
     ConnectionPoolManager,
     get_pool_manager,
@@ -153,6 +154,9 @@ async def lifespan(app: FastAPI):
         # Initialize async tool executor
         _executor = await get_executor()
         
+        # Warm embedding models in the background
+        start_model_warmup()
+        
         logger.info("Enhanced WebMCP Server started successfully")
         
         yield
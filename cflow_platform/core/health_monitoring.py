@@ -425,7 +425,7 @@ class BMADMasterHealthMonitoring:
             from cflow_platform.core.tool_registry import ToolRegistry
             
             start_time = time.time()
-            tools = ToolRegistry.get_tools_for_mcp()
+            tools = ToolRegistry.get_snapshot()
             response_time = (time.time() - start_time) * 1000  # milliseconds
             
             # Create response time metric
@@ -283,12 +283,12 @@ class CrossComponentIntegrationEngine:
             # Test tool registry functionality
             from .tool_registry import ToolRegistry
             
-            tools = ToolRegistry.get_tools_for_mcp()
+            tools = ToolRegistry.get_snapshot()
             
             return {
                 "registry_status": "operational",
                 "total_tools": len(tools),
-                "bmad_tools": len([t for t in tools if t.get("name", "").startswith("bmad_")]),
+                "bmad_tools": len(tools.bmad_tools),
                 "tools_loaded": True
             }
             
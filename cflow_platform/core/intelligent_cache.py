@@ -7,6 +7,9 @@ This module provides sophisticated caching capabilities including:
 - Cache invalidation and refresh mechanisms
 - Tool-specific caching strategies
 - Memory-efficient storage with cleanup
+- Optional persistent disk tier (see ``disk_cache``) behind the memory tier
+- Indexed invalidation by tool-name prefix, tag, dependency and entity
+  change events (see ``invalidation_index``)
 """
 
 import asyncio
@@ -15,13 +18,22 @@ import json
 import logging
 import time
 import zlib
-from typing import Any, Dict, List, Optional, Tuple, Union
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple, Union
 from dataclasses import dataclass, field
-from collections import defaultdict, OrderedDict
+from collections import defaultdict, deque, OrderedDict
 from enum import Enum
 import pickle
 import threading
 
+from .disk_cache import DiskCacheTier, disk_cache_enabled, get_disk_tier
+from .invalidation_index import (
+    EntityEvent,
+    InvalidationIndex,
+    derive_dependencies,
+    entity_dependency,
+    write_events,
+)
+
 logger = logging.getLogger(__name__)
 
 
@@ -35,6 +47,175 @@ class CacheStrategy(Enum):
     INTELLIGENT = "intelligent"     # Dynamic TTL based on usage patterns
 
 
+# Tool-specific cache strategies. Tools listed here with any strategy other
+# than NO_CACHE are read-only, which is also what opts them in to single-flight
+# coalescing of concurrent identical calls.
+DEFAULT_TOOL_STRATEGIES: Dict[str, CacheStrategy] = {
+    # System tools - short term
+    "sys_test": CacheStrategy.SHORT_TERM,
+    "sys_stats": CacheStrategy.SHORT_TERM,
+    "sys_debug": CacheStrategy.SHORT_TERM,
+    "sys_version": CacheStrategy.PERSISTENT,
+    
+    # Task tools - medium term
+    "task_list": CacheStrategy.SHORT_TERM,
+    "task_get": CacheStrategy.MEDIUM_TERM,
+    "task_next": CacheStrategy.SHORT_TERM,
+    "task_add": CacheStrategy.NO_CACHE,
+    "task_update": CacheStrategy.NO_CACHE,
+    
+    # Research tools - medium term
+    "doc_research": CacheStrategy.MEDIUM_TERM,
+    "research": CacheStrategy.MEDIUM_TERM,
+    
+    # Linting tools - short term
+    "lint_full": CacheStrategy.SHORT_TERM,
+    "lint_bg": CacheStrategy.SHORT_TERM,
+    "lint_status": CacheStrategy.SHORT_TERM,
+    
+    # Memory tools - medium term
+    "memory_search": CacheStrategy.MEDIUM_TERM,
+    "memory_stats": CacheStrategy.SHORT_TERM,
+    
+    # BMAD tools - intelligent caching
+    "bmad_prd_get": CacheStrategy.LONG_TERM,
+    "bmad_arch_get": CacheStrategy.LONG_TERM,
+    "bmad_story_get": CacheStrategy.LONG_TERM,
+    "bmad_doc_list": CacheStrategy.SHORT_TERM,
+    "bmad_workflow_list": CacheStrategy.MEDIUM_TERM,
+    "bmad_workflow_get": CacheStrategy.LONG_TERM,
+    
+    # Code intelligence - medium term
+    "code.search_functions": CacheStrategy.MEDIUM_TERM,
+    "code.index_functions": CacheStrategy.LONG_TERM,
+    "code.call_paths": CacheStrategy.MEDIUM_TERM,
+    
+    # Default strategy
+    "default": CacheStrategy.INTELLIGENT
+}
+
+
+def logical_cache_key(tool_name: str, arguments: Dict[str, Any]) -> str:
+    """Readable ``tool_name:arguments`` form that cache keys are hashed from"""
+    # Sort arguments for consistent key generation
+    sorted_args = json.dumps(arguments, sort_keys=True, default=str)
+    return f"{tool_name}:{sorted_args}"
+
+
+def generate_cache_key(tool_name: str, arguments: Dict[str, Any]) -> str:
+    """Generate a cache key for tool execution"""
+    # Create hash of tool name and arguments
+    return hashlib.sha256(logical_cache_key(tool_name, arguments).encode()).hexdigest()
+
+
+def single_flight_enabled(tool_name: str, strategies: Optional[Dict[str, CacheStrategy]] = None) -> bool:
+    """Whether concurrent identical calls to a tool may share one execution"""
+    strategy = (DEFAULT_TOOL_STRATEGIES if strategies is None else strategies).get(tool_name)
+    return tool_name != "default" and strategy is not None and strategy != CacheStrategy.NO_CACHE
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical async calls onto one execution.
+    
+    The first caller for a key starts the work as a task; callers arriving
+    while it runs await the same task and share its result or exception.
+    The task is shielded, so a cancelled caller does not cancel the work for
+    the others. Keys are forgotten as soon as the task finishes; this is not
+    a cache.
+    """
+    
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Task] = {}
+        self.executions = 0
+        self.coalesced = 0
+    
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Run ``fn`` unless a call for ``key`` is already in flight"""
+        loop = asyncio.get_running_loop()
+        task = self._calls.get(key)
+        if task is None or task.done() or task.get_loop() is not loop:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda t, k=key: self._forget(k, t))
+            self.executions += 1
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+    
+    def _forget(self, key: str, task: asyncio.Task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+    
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+
+# Halves every counter in one C-level pass (used to age the sketch)
+_HALVE = bytes(i >> 1 for i in range(256))
+
+
+class FrequencySketch:
+    """
+    Count-min sketch of recent access frequency for TinyLFU admission.
+    
+    Four rows of saturating 4-bit counters stored in bytearrays. After
+    ``sample_size`` recorded accesses every counter is halved, so estimates
+    follow recent popularity instead of all-time totals.
+    """
+    
+    DEPTH = 4
+    MAX_COUNT = 15
+    
+    def __init__(self, capacity: int):
+        width = 16
+        while width < capacity:
+            width <<= 1
+        self._mask = width - 1
+        self._rows = [bytearray(width) for _ in range(self.DEPTH)]
+        self.sample_size = 10 * width
+        self._additions = 0
+    
+    @staticmethod
+    def _hash(key: str) -> int:
+        try:
+            # Cache keys are already sha256 hex digests
+            return int(key[:32], 16)
+        except ValueError:
+            return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=16).digest(), "big")
+    
+    def increment(self, key: str):
+        # Unrolled over the four rows; this runs on every get and set
+        h = self._hash(key)
+        mask = self._mask
+        r0, r1, r2, r3 = self._rows
+        i0, i1, i2, i3 = h & mask, (h >> 32) & mask, (h >> 64) & mask, (h >> 96) & mask
+        added = False
+        if r0[i0] < 15:
+            r0[i0] += 1
+            added = True
+        if r1[i1] < 15:
+            r1[i1] += 1
+            added = True
+        if r2[i2] < 15:
+            r2[i2] += 1
+            added = True
+        if r3[i3] < 15:
+            r3[i3] += 1
+            added = True
+        if added:
+            self._additions += 1
+            if self._additions >= self.sample_size:
+                self._rows = [row.translate(_HALVE) for row in self._rows]
+                self._additions //= 2
+    
+    def frequency(self, key: str) -> int:
+        h = self._hash(key)
+        mask = self._mask
+        r0, r1, r2, r3 = self._rows
+        return min(r0[h & mask], r1[(h >> 32) & mask], r2[(h >> 64) & mask], r3[(h >> 96) & mask])
+
+
 @dataclass
 class CacheEntry:
     """Individual cache entry with metadata"""
@@ -63,6 +244,7 @@ class CacheStats:
     compression_ratio: float = 0.0
     average_access_time: float = 0.0
     hit_rate: float = 0.0
+    coalesced_count: int = 0
 
 
 class IntelligentCache:
@@ -72,11 +254,15 @@ class IntelligentCache:
     Features:
     - Multiple caching strategies
     - Automatic compression for large entries
-    - LRU eviction with size-based policies
+    - W-TinyLFU eviction (window LRU, segmented main LRU, frequency-sketch
+      admission) with size-based limits; ``eviction_policy="lru"`` keeps a
+      plain LRU
     - Tag-based invalidation
     - Dependency tracking
     - Usage pattern analysis
     - Memory-efficient storage
+    - Optional write-through disk tier: memory misses fall back to it and
+      hits are promoted with their remaining TTL
     """
     
     def __init__(
@@ -85,25 +271,47 @@ class IntelligentCache:
         max_entries: int = 10000,
         compression_threshold_kb: int = 10,
         enable_compression: bool = True,
-        cleanup_interval_seconds: float = 300.0
+        cleanup_interval_seconds: float = 300.0,
+        eviction_policy: str = "tinylfu",
+        window_ratio: float = 0.01,
+        disk_tier: Optional[DiskCacheTier] = None
     ):
+        if eviction_policy not in ("tinylfu", "lru"):
+            raise ValueError(f"Unknown eviction policy: {eviction_policy}")
         self.max_size_bytes = max_size_mb * 1024 * 1024
         self.max_entries = max_entries
         self.compression_threshold_bytes = compression_threshold_kb * 1024
         self.enable_compression = enable_compression
         self.cleanup_interval_seconds = cleanup_interval_seconds
+        self.eviction_policy = eviction_policy
+        self.disk_tier = disk_tier
         
-        # Storage
-        self._cache: OrderedDict[str, CacheEntry] = OrderedDict()
-        self._tag_index: Dict[str, set] = defaultdict(set)
-        self._dependency_index: Dict[str, set] = defaultdict(set)
+        # Storage: entries by key, ordering lives in the segments below
+        self._cache: Dict[str, CacheEntry] = {}
+        self._index = InvalidationIndex()
+        
+        # New keys enter the window LRU; its victims compete for a slot in
+        # the main area (probation + protected) on estimated frequency.
+        if eviction_policy == "lru":
+            self._window_capacity = max_entries
+        else:
+            self._window_capacity = max(1, int(max_entries * window_ratio))
+        self._main_capacity = max_entries - self._window_capacity
+        self._protected_capacity = int(self._main_capacity * 0.8)
+        self._window: OrderedDict[str, None] = OrderedDict()
+        self._probation: OrderedDict[str, None] = OrderedDict()
+        self._protected: OrderedDict[str, None] = OrderedDict()
+        self._sketch = FrequencySketch(max_entries)
         
         # Statistics
         self._stats = CacheStats()
-        self._access_times: List[float] = []
+        self._access_times: deque = deque(maxlen=1000)
         
         # Thread safety
         self._lock = threading.RLock()
+        # Bumped by every invalidation, so a disk write that was still in
+        # flight when one ran can be undone
+        self._disk_epoch = 0
         
         # Background tasks
         self._cleanup_task: Optional[asyncio.Task] = None
@@ -112,55 +320,16 @@ class IntelligentCache:
         # Tool-specific cache strategies
         self._tool_strategies = self._initialize_tool_strategies()
         
+        # Coalesces concurrent misses for the same key
+        self._single_flight = SingleFlight()
+        
         # Usage pattern analysis
         self._access_patterns: Dict[str, List[float]] = defaultdict(list)
         self._pattern_analysis_interval = 3600.0  # 1 hour
         
     def _initialize_tool_strategies(self) -> Dict[str, CacheStrategy]:
         """Initialize cache strategies for different tool types"""
-        return {
-            # System tools - short term
-            "sys_test": CacheStrategy.SHORT_TERM,
-            "sys_stats": CacheStrategy.SHORT_TERM,
-            "sys_debug": CacheStrategy.SHORT_TERM,
-            "sys_version": CacheStrategy.PERSISTENT,
-            
-            # Task tools - medium term
-            "task_list": CacheStrategy.SHORT_TERM,
-            "task_get": CacheStrategy.MEDIUM_TERM,
-            "task_next": CacheStrategy.SHORT_TERM,
-            "task_add": CacheStrategy.NO_CACHE,
-            "task_update": CacheStrategy.NO_CACHE,
-            
-            # Research tools - medium term
-            "doc_research": CacheStrategy.MEDIUM_TERM,
-            "research": CacheStrategy.MEDIUM_TERM,
-            
-            # Linting tools - short term
-            "lint_full": CacheStrategy.SHORT_TERM,
-            "lint_bg": CacheStrategy.SHORT_TERM,
-            "lint_status": CacheStrategy.SHORT_TERM,
-            
-            # Memory tools - medium term
-            "memory_search": CacheStrategy.MEDIUM_TERM,
-            "memory_stats": CacheStrategy.SHORT_TERM,
-            
-            # BMAD tools - intelligent caching
-            "bmad_prd_get": CacheStrategy.LONG_TERM,
-            "bmad_arch_get": CacheStrategy.LONG_TERM,
-            "bmad_story_get": CacheStrategy.LONG_TERM,
-            "bmad_doc_list": CacheStrategy.SHORT_TERM,
-            "bmad_workflow_list": CacheStrategy.MEDIUM_TERM,
-            "bmad_workflow_get": CacheStrategy.LONG_TERM,
-            
-            # Code intelligence - medium term
-            "code.search_functions": CacheStrategy.MEDIUM_TERM,
-            "code.index_functions": CacheStrategy.LONG_TERM,
-            "code.call_paths": CacheStrategy.MEDIUM_TERM,
-            
-            # Default strategy
-            "default": CacheStrategy.INTELLIGENT
-        }
+        return dict(DEFAULT_TOOL_STRATEGIES)
     
     async def start(self):
         """Start background tasks"""
@@ -178,12 +347,7 @@ class IntelligentCache:
     
     def _generate_cache_key(self, tool_name: str, arguments: Dict[str, Any]) -> str:
         """Generate a cache key for tool execution"""
-        # Sort arguments for consistent key generation
-        sorted_args = json.dumps(arguments, sort_keys=True, default=str)
-        
-        # Create hash of tool name and arguments
-        key_data = f"{tool_name}:{sorted_args}"
-        return hashlib.sha256(key_data.encode()).hexdigest()
+        return generate_cache_key(tool_name, arguments)
     
     def _get_tool_strategy(self, tool_name: str) -> CacheStrategy:
         """Get cache strategy for a tool"""
@@ -223,30 +387,28 @@ class IntelligentCache:
         ttl = max(60.0, min(3600.0, avg_interval * 2))
         return ttl
     
-    def _compress_value(self, value: Any) -> Tuple[Any, bool]:
-        """Compress value if beneficial"""
-        if not self.enable_compression:
-            return value, False
-        
+    def _prepare_value(self, value: Any) -> Tuple[Any, bool, int, int]:
+        """Serialize once; return (stored value, compressed, stored size, raw size)"""
         try:
-            # Serialize to bytes
             serialized = pickle.dumps(value)
-            
-            if len(serialized) < self.compression_threshold_bytes:
-                return value, False
-            
-            # Compress
+        except Exception as e:
+            logger.warning(f"Serialization failed: {e}")
+            return value, False, 0, 0
+        
+        raw_size = len(serialized)
+        if not self.enable_compression or raw_size < self.compression_threshold_bytes:
+            return value, False, raw_size, raw_size
+        
+        try:
             compressed = zlib.compress(serialized, level=6)
-            
-            # Only use compression if it saves significant space
-            if len(compressed) < len(serialized) * 0.8:
-                return compressed, True
-            
-            return value, False
-            
         except Exception as e:
             logger.warning(f"Compression failed: {e}")
-            return value, False
+            return value, False, raw_size, raw_size
+        
+        # Only use compression if it saves significant space
+        if len(compressed) < raw_size * 0.8:
+            return compressed, True, len(compressed), raw_size
+        return value, False, raw_size, raw_size
     
     def _decompress_value(self, value: Any, compressed: bool) -> Any:
         """Decompress value if needed"""
@@ -260,53 +422,62 @@ class IntelligentCache:
             logger.error(f"Decompression failed: {e}")
             return None
     
-    def _calculate_size(self, entry: CacheEntry) -> int:
-        """Calculate size of cache entry"""
-        try:
-            if entry.compressed:
-                return len(entry.value)
-            else:
-                return len(pickle.dumps(entry.value))
-        except Exception:
-            return 0
-    
-    def _should_evict(self) -> bool:
-        """Check if eviction is needed"""
-        return (
-            len(self._cache) >= self.max_entries or
-            self._stats.total_size_bytes >= self.max_size_bytes
-        )
-    
-    def _evict_entries(self, target_size: int = 0):
-        """Evict entries using LRU policy"""
-        evicted_count = 0
-        
-        while self._should_evict():
-            if not self._cache:
-                break
-            
-            # Remove least recently used entry
-            key, entry = self._cache.popitem(last=False)
-            
-            # Update statistics
-            self._stats.eviction_count += 1
-            self._stats.total_entries -= 1
-            self._stats.total_size_bytes -= entry.size_bytes
-            
-            # Remove from indexes
-            for tag in entry.tags:
-                self._tag_index[tag].discard(key)
-            
-            for dep in entry.dependencies:
-                self._dependency_index[dep].discard(key)
-            
-            evicted_count += 1
-            
-            if target_size > 0 and self._stats.total_size_bytes <= target_size:
+    def _remove_entry(self, key: str) -> Optional[CacheEntry]:
+        """Drop an entry from storage, its segment and the indexes"""
+        entry = self._cache.pop(key, None)
+        if entry is None:
+            return None
+        for segment in (self._window, self._probation, self._protected):
+            if key in segment:
+                del segment[key]
                 break
         
-        if evicted_count > 0:
-            logger.debug(f"Evicted {evicted_count} cache entries")
+        self._stats.total_entries -= 1
+        self._stats.total_size_bytes -= entry.size_bytes
+        self._index.remove(key)
+        return entry
+    
+    def _evict(self, key: str):
+        if self._remove_entry(key) is not None:
+            self._stats.eviction_count += 1
+    
+    def _on_hit(self, key: str):
+        """Update recency for a key that is in the cache"""
+        if key in self._window:
+            self._window.move_to_end(key)
+        elif key in self._probation:
+            # Second hit while on probation: promote to the protected segment
+            del self._probation[key]
+            self._protected[key] = None
+            if len(self._protected) > self._protected_capacity:
+                demoted, _ = self._protected.popitem(last=False)
+                self._probation[demoted] = None
+        else:
+            self._protected.move_to_end(key)
+    
+    def _evict_for_capacity(self):
+        """Move window overflow into the main area, admitting by frequency"""
+        while len(self._window) > self._window_capacity:
+            candidate, _ = self._window.popitem(last=False)
+            if self._main_capacity <= 0:
+                self._evict(candidate)
+                continue
+            if len(self._probation) + len(self._protected) < self._main_capacity:
+                self._probation[candidate] = None
+                continue
+            segment = self._probation or self._protected
+            victim = next(iter(segment))
+            if self._sketch.frequency(candidate) > self._sketch.frequency(victim):
+                self._evict(victim)
+                self._probation[candidate] = None
+            else:
+                self._evict(candidate)
+    
+    def _evict_for_size(self):
+        """Evict until the stored bytes fit, coldest segment first"""
+        while self._stats.total_size_bytes > self.max_size_bytes and self._cache:
+            segment = self._probation or self._window or self._protected
+            self._evict(next(iter(segment)))
     
     async def get(self, tool_name: str, arguments: Dict[str, Any]) -> Optional[Any]:
         """Get cached result for tool execution"""
@@ -315,27 +486,28 @@ class IntelligentCache:
         with self._lock:
             key = self._generate_cache_key(tool_name, arguments)
             
-            if key not in self._cache:
-                self._stats.miss_count += 1
-                return None
-            
-            entry = self._cache[key]
-            
-            # Check if expired
-            if time.time() - entry.created_at > entry.ttl_seconds:
-                del self._cache[key]
-                self._stats.miss_count += 1
-                self._stats.total_entries -= 1
-                self._stats.total_size_bytes -= entry.size_bytes
-                return None
+            # Misses count too: admission compares how often keys are requested
+            self._sketch.increment(key)
+            
+            entry = self._cache.get(key)
+            if entry is not None and time.time() - entry.created_at > entry.ttl_seconds:
+                self._remove_entry(key)
+                entry = None
+            if entry is None:
+                value = self._load_from_disk(key, tool_name, arguments)
+                if value is None:
+                    self._stats.miss_count += 1
+                    return None
+                self._stats.hit_count += 1
+                self._access_times.append(time.time() - start_time)
+                return value
             
             # Update access statistics
             entry.last_accessed = time.time()
             entry.access_count += 1
             self._stats.hit_count += 1
             
-            # Move to end (most recently used)
-            self._cache.move_to_end(key)
+            self._on_hit(key)
             
             # Record access pattern
             self._access_patterns[tool_name].append(time.time())
@@ -346,8 +518,6 @@ class IntelligentCache:
             # Update access time statistics
             access_time = time.time() - start_time
             self._access_times.append(access_time)
-            if len(self._access_times) > 1000:
-                self._access_times.pop(0)
             
             return value
     
@@ -362,7 +532,8 @@ class IntelligentCache:
     ) -> bool:
         """Cache tool execution result"""
         with self._lock:
-            key = self._generate_cache_key(tool_name, arguments)
+            logical_key = logical_cache_key(tool_name, arguments)
+            key = hashlib.sha256(logical_key.encode()).hexdigest()
             
             # Get cache strategy
             strategy = self._get_tool_strategy(tool_name)
@@ -373,100 +544,248 @@ class IntelligentCache:
             if ttl_seconds is None:
                 ttl_seconds = self._calculate_ttl(tool_name, strategy)
             
-            # Compress if beneficial
-            compressed_value, is_compressed = self._compress_value(result)
+            # Entity dependencies implied by the tool and its arguments
+            dependencies = list(dependencies or []) + derive_dependencies(tool_name, arguments)
             
-            # Create cache entry
-            entry = CacheEntry(
-                key=key,
-                value=compressed_value,
-                created_at=time.time(),
-                last_accessed=time.time(),
-                ttl_seconds=ttl_seconds,
-                strategy=strategy,
-                compressed=is_compressed,
-                tags=tags or [],
-                dependencies=dependencies or []
+            self._sketch.increment(key)
+            stored = self._store(
+                key, tool_name, logical_key, result, ttl_seconds, strategy, tags or [], dependencies
             )
-            
-            # Calculate size
-            entry.size_bytes = self._calculate_size(entry)
-            
-            # Check if we need to evict
-            if self._should_evict():
-                self._evict_entries()
-            
-            # Add to cache
+            epoch = self._disk_epoch
+        
+        if self.disk_tier is not None:
+            # SQLite commit off the event loop and outside the cache lock
+            disk_tags = list(tags or []) + [f"dep:{dep}" for dep in dependencies] + [f"tool:{tool_name}"]
+            await asyncio.to_thread(self.disk_tier.set, key, result, ttl_seconds, tags=disk_tags)
+            with self._lock:
+                raced = self._disk_epoch != epoch
+            if raced:
+                # An invalidation may have run before the write landed
+                await asyncio.to_thread(self.disk_tier.delete, key)
+        
+        return stored
+    
+    def _store(
+        self,
+        key: str,
+        tool_name: str,
+        logical_key: str,
+        result: Any,
+        ttl_seconds: float,
+        strategy: CacheStrategy,
+        tags: List[str],
+        dependencies: List[str],
+        created_at: Optional[float] = None
+    ) -> bool:
+        """Insert or replace an entry in the memory tier (lock held)"""
+        now = time.time()
+        
+        # Serialize once: the stored size is measured here and never again
+        stored_value, is_compressed, size_bytes, original_size = self._prepare_value(result)
+        
+        # Create cache entry
+        entry = CacheEntry(
+            key=key,
+            value=stored_value,
+            created_at=created_at if created_at is not None else now,
+            last_accessed=now,
+            ttl_seconds=ttl_seconds,
+            strategy=strategy,
+            compressed=is_compressed,
+            size_bytes=size_bytes,
+            tags=tags,
+            dependencies=dependencies
+        )
+        
+        previous = self._cache.get(key)
+        if previous is not None:
+            # Replace in place, keeping the key's segment
+            self._stats.total_size_bytes -= previous.size_bytes
             self._cache[key] = entry
+            self._stats.total_size_bytes += entry.size_bytes
+            self._on_hit(key)
+        else:
+            self._cache[key] = entry
+            self._window[key] = None
             self._stats.total_entries += 1
             self._stats.total_size_bytes += entry.size_bytes
-            
-            # Update indexes
-            for tag in entry.tags:
-                self._tag_index[tag].add(key)
-            
-            for dep in entry.dependencies:
-                self._dependency_index[dep].add(key)
-            
-            # Update compression ratio
-            if is_compressed:
-                original_size = len(pickle.dumps(result))
-                self._stats.compression_ratio = (
-                    (self._stats.compression_ratio * (self._stats.total_entries - 1) + 
-                     (original_size - entry.size_bytes) / original_size) / 
-                    self._stats.total_entries
-                )
-            
-            return True
+        
+        # Update indexes (replaces whatever the key was indexed under before)
+        self._index.add(key, tool_name, logical_key, entry.tags, entry.dependencies)
+        
+        self._evict_for_capacity()
+        self._evict_for_size()
+        
+        # Update compression ratio
+        if is_compressed and self._stats.total_entries > 0:
+            self._stats.compression_ratio = (
+                (self._stats.compression_ratio * (self._stats.total_entries - 1) + 
+                 (original_size - entry.size_bytes) / original_size) / 
+                self._stats.total_entries
+            )
+        
+        return key in self._cache
+    
+    def _load_from_disk(self, key: str, tool_name: str, arguments: Dict[str, Any]) -> Optional[Any]:
+        """Promote a disk-tier hit into memory with its remaining TTL (lock held)"""
+        if self.disk_tier is None:
+            return None
+        disk_entry = self.disk_tier.get_entry(key)
+        if disk_entry is None:
+            return None
+        created_at = disk_entry["created_at"]
+        expires_at = disk_entry["expires_at"]
+        ttl_seconds = float("inf") if expires_at is None else expires_at - created_at
+        tags = [t for t in disk_entry["tags"] if not t.startswith(("dep:", "tool:"))]
+        dependencies = [t[4:] for t in disk_entry["tags"] if t.startswith("dep:")]
+        value = disk_entry["value"]
+        self._store(
+            key, tool_name, logical_cache_key(tool_name, arguments), value, ttl_seconds,
+            self._get_tool_strategy(tool_name), tags, dependencies, created_at
+        )
+        return value
+    
+    def should_coalesce(self, tool_name: str) -> bool:
+        """Whether concurrent misses for this tool share one execution"""
+        return single_flight_enabled(tool_name, self._tool_strategies)
+    
+    async def get_or_execute(
+        self,
+        tool_name: str,
+        arguments: Dict[str, Any],
+        execute: Callable[[], Awaitable[Any]],
+        ttl_seconds: Optional[float] = None,
+        tags: Optional[List[str]] = None,
+        dependencies: Optional[List[str]] = None
+    ) -> Any:
+        """Return the cached result, or execute once and cache it.
+        
+        Concurrent misses for the same key of a coalescing tool await a single
+        execution instead of each running the tool. Error results are returned
+        but not cached.
+        """
+        cached = await self.get(tool_name, arguments)
+        if cached is not None:
+            return cached
+        
+        async def _load() -> Any:
+            result = await execute()
+            if not (isinstance(result, dict) and result.get("status") == "error"):
+                await self.set(tool_name, arguments, result, ttl_seconds, tags, dependencies)
+            return result
+        
+        if not self.should_coalesce(tool_name):
+            return await _load()
+        return await self._single_flight.do(self._generate_cache_key(tool_name, arguments), _load)
     
-    async def invalidate(self, pattern: str = None, tags: List[str] = None, dependencies: List[str] = None):
-        """Invalidate cache entries"""
+    async def invalidate(self, pattern: str = None, tags: List[str] = None, dependencies: List[str] = None) -> int:
+        """Invalidate cache entries.
+        
+        ``pattern`` is a prefix of ``tool_name:arguments`` (a trailing ``*``
+        is allowed, e.g. ``"task_*"``) or an exact cache key. Dependencies
+        follow the edges added with ``link_dependencies``. Returns the number
+        of in-memory entries removed.
+        """
         with self._lock:
             keys_to_remove = set()
             
             if pattern:
-                # Pattern-based invalidation
-                for key in self._cache:
-                    if pattern in key:
-                        keys_to_remove.add(key)
+                # Prefix-based invalidation through the tool-name trie
+                keys_to_remove.update(self._index.match_pattern(pattern))
             
             if tags:
                 # Tag-based invalidation
-                for tag in tags:
-                    keys_to_remove.update(self._tag_index.get(tag, set()))
+                keys_to_remove.update(self._index.keys_for_tags(tags))
             
-            if dependencies:
+            expanded = self._index.expand(dependencies) if dependencies else set()
+            if expanded:
                 # Dependency-based invalidation
-                for dep in dependencies:
-                    keys_to_remove.update(self._dependency_index.get(dep, set()))
+                keys_to_remove.update(self._index.keys_for_dependencies(expanded))
             
             # Remove entries
             for key in keys_to_remove:
-                if key in self._cache:
-                    entry = self._cache[key]
-                    del self._cache[key]
-                    
-                    self._stats.total_entries -= 1
-                    self._stats.total_size_bytes -= entry.size_bytes
-                    
-                    # Remove from indexes
-                    for tag in entry.tags:
-                        self._tag_index[tag].discard(key)
-                    
-                    for dep in entry.dependencies:
-                        self._dependency_index[dep].discard(key)
+                self._remove_entry(key)
+            
+            # The disk tier may hold entries that are not resident in memory
+            if self.disk_tier is not None:
+                self._disk_epoch += 1
+                if pattern:
+                    self._invalidate_disk_pattern(pattern)
+                disk_tags = list(tags or []) + [f"dep:{dep}" for dep in expanded]
+                if disk_tags:
+                    self.disk_tier.delete_tags(disk_tags)
             
             if keys_to_remove:
                 logger.info(f"Invalidated {len(keys_to_remove)} cache entries")
+            return len(keys_to_remove)
+    
+    def _invalidate_disk_pattern(self, pattern: str):
+        if self.disk_tier.delete(pattern):
+            # An exact cache key
+            return
+        prefix = pattern[:-1] if pattern.endswith("*") else pattern
+        tool_part, sep, _ = prefix.partition(":")
+        if sep:
+            # Disk entries are indexed by tool only; drop the whole tool
+            self.disk_tier.delete_tags([f"tool:{tool_part}"])
+        else:
+            self.disk_tier.delete_tag_prefix(f"tool:{prefix}")
+    
+    async def invalidate_entities(self, events: Iterable[EntityEvent]) -> int:
+        """Bulk invalidation for entity change events.
+        
+        Each event is ``(kind, id)``, e.g. ``("task", "42")`` for "task 42
+        changed": entries for that entity and the kind's collection reads
+        (``task_list``) are dropped. ``(kind, None)`` drops every entry of
+        the kind. Returns the number of in-memory entries removed.
+        """
+        events = list(events)
+        if not events:
+            return 0
+        with self._lock:
+            keys_to_remove = self._index.keys_for_events(events)
+            for key in keys_to_remove:
+                self._remove_entry(key)
+            
+            if self.disk_tier is not None:
+                self._disk_epoch += 1
+                disk_tags = set()
+                for kind, entity_id in events:
+                    if entity_id is None:
+                        self.disk_tier.delete_tag_prefix(f"dep:{kind}:")
+                    else:
+                        disk_tags.add(entity_dependency(kind, entity_id))
+                        disk_tags.add(entity_dependency(kind))
+                disk_tags = self._index.expand(disk_tags)
+                if disk_tags:
+                    self.disk_tier.delete_tags(f"dep:{dep}" for dep in disk_tags)
+            
+            if keys_to_remove:
+                logger.debug(f"Invalidated {len(keys_to_remove)} cache entries for {len(events)} events")
+            return len(keys_to_remove)
+    
+    async def invalidate_for_write(self, tool_name: str, arguments: Dict[str, Any]) -> int:
+        """Invalidate whatever a successful call to write tool ``tool_name`` made stale"""
+        return await self.invalidate_entities(write_events(tool_name, arguments))
+    
+    def link_dependencies(self, upstream: str, downstream: str):
+        """Make invalidating ``upstream`` also invalidate ``downstream``"""
+        with self._lock:
+            self._index.link(upstream, downstream)
     
     async def clear(self):
         """Clear all cache entries"""
         with self._lock:
             self._cache.clear()
-            self._tag_index.clear()
-            self._dependency_index.clear()
+            self._window.clear()
+            self._probation.clear()
+            self._protected.clear()
+            self._index.clear()
             self._stats.total_entries = 0
             self._stats.total_size_bytes = 0
+            if self.disk_tier is not None:
+                self._disk_epoch += 1
+                self.disk_tier.clear()
             logger.info("Cache cleared")
     
     def get_stats(self) -> CacheStats:
@@ -482,6 +801,8 @@ class IntelligentCache:
             if self._access_times:
                 self._stats.average_access_time = sum(self._access_times) / len(self._access_times)
             
+            self._stats.coalesced_count = self._single_flight.coalesced
+            
             return self._stats
     
     async def _cleanup_loop(self):
@@ -506,21 +827,13 @@ class IntelligentCache:
                     expired_keys.append(key)
             
             for key in expired_keys:
-                entry = self._cache[key]
-                del self._cache[key]
-                
-                self._stats.total_entries -= 1
-                self._stats.total_size_bytes -= entry.size_bytes
-                
-                # Remove from indexes
-                for tag in entry.tags:
-                    self._tag_index[tag].discard(key)
-                
-                for dep in entry.dependencies:
-                    self._dependency_index[dep].discard(key)
+                self._remove_entry(key)
             
             if expired_keys:
                 logger.debug(f"Cleaned up {len(expired_keys)} expired cache entries")
+        
+        if self.disk_tier is not None:
+            self.disk_tier.purge_expired()
     
     async def _stats_loop(self):
         """Background task for statistics updates"""
@@ -554,7 +867,8 @@ async def get_cache() -> IntelligentCache:
     """Get the global intelligent cache instance"""
     global _cache
     if _cache is None:
-        _cache = IntelligentCache()
+        disk_tier = get_disk_tier("intelligent_cache") if disk_cache_enabled() else None
+        _cache = IntelligentCache(disk_tier=disk_tier)
         await _cache.start()
     return _cache
 
@@ -581,6 +895,19 @@ async def get_cached_result(
     return await cache.get(tool_name, arguments)
 
 
+async def get_or_execute_cached(
+    tool_name: str,
+    arguments: Dict[str, Any],
+    execute: Callable[[], Awaitable[Any]],
+    ttl_seconds: Optional[float] = None,
+    tags: Optional[List[str]] = None,
+    dependencies: Optional[List[str]] = None
+) -> Any:
+    """Get a cached tool result, executing (coalesced) on a miss"""
+    cache = await get_cache()
+    return await cache.get_or_execute(tool_name, arguments, execute, ttl_seconds, tags, dependencies)
+
+
 async def invalidate_cache(
     pattern: str = None,
     tags: List[str] = None,
@@ -591,6 +918,17 @@ async def invalidate_cache(
     await cache.invalidate(pattern, tags, dependencies)
 
 
+async def invalidate_cache_for_write(tool_name: str, arguments: Dict[str, Any]) -> int:
+    """Invalidate cached reads made stale by a successful write tool call"""
+    if not write_events(tool_name, arguments):
+        return 0
+    if _cache is None and not disk_cache_enabled():
+        # Nothing has been cached in this process and nothing persists
+        return 0
+    cache = await get_cache()
+    return await cache.invalidate_for_write(tool_name, arguments)
+
+
 async def get_cache_stats() -> CacheStats:
     """Get cache statistics"""
     cache = await get_cache()
@@ -0,0 +1,333 @@
+"""
+Invalidation Index for WebMCP Tool-Result Caches
+
+Cache keys are opaque hashes, so invalidating "everything from task_*" or
+"everything that depends on task 42" must not mean scanning every entry.
+This module keeps the reverse indexes that make invalidation cost
+proportional to the number of affected entries:
+- Prefix trie over tool names for ``pattern`` invalidation ("task_*")
+- Tag and dependency sets, removed together with their entry
+- Dependency edges between entities ("doc:Y" -> "epic:Z") followed
+  transitively when an entity changes
+- Entity rules that derive dependencies from tool arguments on reads and
+  change events from write tools, so "task X changed" drops ``task_get``
+  for X and every ``task_list`` without touching unrelated entries
+"""
+
+import logging
+from collections import defaultdict, deque
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# (entity kind, entity id); an id of None means "every entity of this kind"
+EntityEvent = Tuple[str, Optional[str]]
+
+COLLECTION = "*"
+
+
+def entity_dependency(kind: str, entity_id: Optional[str] = None) -> str:
+    """Dependency name for one entity, or for the collection of a kind"""
+    return f"{kind}:{COLLECTION if entity_id is None else entity_id}"
+
+
+@dataclass(frozen=True)
+class EntityRule:
+    """How a tool relates to an entity kind.
+
+    Read tools with ``id_argument`` depend on that single entity; read tools
+    without one depend on the whole collection. Write tools emit a change
+    event for the entity named by ``id_argument`` (or the whole kind).
+    """
+    kind: str
+    id_argument: Optional[str] = None
+    writes: bool = False
+
+
+def _bmad_doc_rules() -> Dict[str, EntityRule]:
+    rules: Dict[str, EntityRule] = {}
+    for doc in ("prd", "arch", "story", "epic"):
+        rules[f"bmad_{doc}_get"] = EntityRule("doc", "doc_id")
+        rules[f"bmad_{doc}_update"] = EntityRule("doc", "doc_id", writes=True)
+        rules[f"bmad_{doc}_create"] = EntityRule("doc", writes=True)
+    rules["bmad_doc_list"] = EntityRule("doc")
+    rules["bmad_epic_list"] = EntityRule("doc")
+    rules["bmad_doc_approve"] = EntityRule("doc", "doc_id", writes=True)
+    rules["bmad_doc_reject"] = EntityRule("doc", "doc_id", writes=True)
+    return rules
+
+
+DEFAULT_ENTITY_RULES: Dict[str, EntityRule] = {
+    # Task reads
+    "task_get": EntityRule("task", "taskId"),
+    "task_list": EntityRule("task"),
+    "task_next": EntityRule("task"),
+    # Task writes
+    "task_add": EntityRule("task", writes=True),
+    "task_update": EntityRule("task", "taskId", writes=True),
+    "task_status": EntityRule("task", "taskId", writes=True),
+    "task_sub_add": EntityRule("task", "parentId", writes=True),
+    "task_sub_upd": EntityRule("task", "taskId", writes=True),
+    "task_remove": EntityRule("task", "taskId", writes=True),
+    "task_multi": EntityRule("task", writes=True),
+    # Memory
+    "memory_search": EntityRule("memory"),
+    "memory_stats": EntityRule("memory"),
+    "memory_add": EntityRule("memory", writes=True),
+    "memory_store_procedure": EntityRule("memory", writes=True),
+    "memory_store_episode": EntityRule("memory", writes=True),
+    # Code intelligence
+    "code.search_functions": EntityRule("code"),
+    "code.call_paths": EntityRule("code"),
+    "code.index_functions": EntityRule("code", writes=True),
+    **_bmad_doc_rules(),
+}
+
+
+def _entity_id(rule: EntityRule, arguments: Dict[str, Any]) -> Optional[str]:
+    if rule.id_argument is None:
+        return None
+    value = arguments.get(rule.id_argument)
+    return None if value is None else str(value)
+
+
+def derive_dependencies(
+    tool_name: str,
+    arguments: Dict[str, Any],
+    rules: Optional[Dict[str, EntityRule]] = None
+) -> List[str]:
+    """Entity dependencies of a cached read-tool result"""
+    rule = (rules or DEFAULT_ENTITY_RULES).get(tool_name)
+    if rule is None or rule.writes:
+        return []
+    return [entity_dependency(rule.kind, _entity_id(rule, arguments))]
+
+
+def write_events(
+    tool_name: str,
+    arguments: Dict[str, Any],
+    rules: Optional[Dict[str, EntityRule]] = None
+) -> List[EntityEvent]:
+    """Entity change events caused by a write tool call"""
+    rule = (rules or DEFAULT_ENTITY_RULES).get(tool_name)
+    if rule is None or not rule.writes:
+        return []
+    return [(rule.kind, _entity_id(rule, arguments))]
+
+
+class _TrieNode:
+    __slots__ = ("children", "keys")
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.keys: Set[str] = set()
+
+
+class PrefixTrie:
+    """Character trie mapping strings to sets of keys, with prefix lookup"""
+
+    def __init__(self):
+        self._root = _TrieNode()
+
+    def add(self, name: str, key: str):
+        node = self._root
+        for ch in name:
+            child = node.children.get(ch)
+            if child is None:
+                child = node.children[ch] = _TrieNode()
+            node = child
+        node.keys.add(key)
+
+    def discard(self, name: str, key: str):
+        path = [self._root]
+        node = self._root
+        for ch in name:
+            node = node.children.get(ch)
+            if node is None:
+                return
+            path.append(node)
+        node.keys.discard(key)
+        # Prune empty branches so dead tool names do not accumulate
+        for depth in range(len(name), 0, -1):
+            current = path[depth]
+            if current.keys or current.children:
+                break
+            del path[depth - 1].children[name[depth - 1]]
+
+    def exact(self, name: str) -> Set[str]:
+        node = self._find(name)
+        return set(node.keys) if node is not None else set()
+
+    def with_prefix(self, prefix: str) -> Set[str]:
+        """All keys stored under names starting with ``prefix``"""
+        node = self._find(prefix)
+        if node is None:
+            return set()
+        found: Set[str] = set()
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            found.update(current.keys)
+            stack.extend(current.children.values())
+        return found
+
+    def _find(self, name: str) -> Optional[_TrieNode]:
+        node = self._root
+        for ch in name:
+            node = node.children.get(ch)
+            if node is None:
+                return None
+        return node
+
+
+class InvalidationIndex:
+    """
+    Reverse indexes from tool names, tags and dependencies to cache keys.
+
+    Every indexed key remembers what it was indexed under, so ``remove``
+    (called for evictions, expiry and invalidation alike) leaves no stale
+    references behind.
+    """
+
+    def __init__(self):
+        self._tools = PrefixTrie()
+        self._dependencies = PrefixTrie()
+        self._tags: Dict[str, Set[str]] = defaultdict(set)
+        self._entries: Dict[str, Tuple[str, str, Tuple[str, ...], Tuple[str, ...]]] = {}
+        self._edges: Dict[str, Set[str]] = defaultdict(set)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def add(
+        self,
+        key: str,
+        tool_name: str,
+        logical_key: str = "",
+        tags: Iterable[str] = (),
+        dependencies: Iterable[str] = ()
+    ):
+        """Index ``key``; re-adding a key replaces its previous index entries"""
+        if key in self._entries:
+            self.remove(key)
+        tags = tuple(dict.fromkeys(tags))
+        dependencies = tuple(dict.fromkeys(dependencies))
+        self._entries[key] = (tool_name, logical_key, tags, dependencies)
+        self._tools.add(tool_name, key)
+        for tag in tags:
+            self._tags[tag].add(key)
+        for dep in dependencies:
+            self._dependencies.add(dep, key)
+
+    def remove(self, key: str) -> bool:
+        indexed = self._entries.pop(key, None)
+        if indexed is None:
+            return False
+        tool_name, _, tags, dependencies = indexed
+        self._tools.discard(tool_name, key)
+        for tag in tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+        for dep in dependencies:
+            self._dependencies.discard(dep, key)
+        return True
+
+    def clear(self):
+        self._tools = PrefixTrie()
+        self._dependencies = PrefixTrie()
+        self._tags.clear()
+        self._entries.clear()
+
+    def has_tag(self, tag: str) -> bool:
+        return tag in self._tags
+
+    def match_pattern(self, pattern: str) -> Set[str]:
+        """Keys whose ``tool_name:arguments`` starts with ``pattern``.
+
+        A trailing ``*`` is accepted and ignored. Matching walks the tool
+        trie; only a pattern that reaches into the arguments looks at the
+        logical keys of the one matching tool. A pattern equal to a cache
+        key matches that key.
+        """
+        if pattern in self._entries:
+            return {pattern}
+        prefix = pattern[:-1] if pattern.endswith("*") else pattern
+        tool_part, sep, _ = prefix.partition(":")
+        if not sep:
+            return self._tools.with_prefix(prefix)
+        return {
+            key for key in self._tools.exact(tool_part)
+            if self._entries[key][1].startswith(prefix)
+        }
+
+    def keys_for_tags(self, tags: Iterable[str]) -> Set[str]:
+        found: Set[str] = set()
+        for tag in tags:
+            found.update(self._tags.get(tag, ()))
+        return found
+
+    def keys_for_dependencies(self, dependencies: Iterable[str]) -> Set[str]:
+        """Keys depending on any of ``dependencies`` or on entities linked
+        downstream of them"""
+        found: Set[str] = set()
+        for dep in self.expand(dependencies):
+            found.update(self._dependencies.exact(dep))
+        return found
+
+    def keys_for_events(self, events: Iterable[EntityEvent]) -> Set[str]:
+        """Keys affected by entity change events.
+
+        ``(kind, id)`` hits entries for that entity and the collection reads
+        of the kind; ``(kind, None)`` hits every entry of the kind.
+        """
+        found: Set[str] = set()
+        dependencies: Set[str] = set()
+        for kind, entity_id in events:
+            if entity_id is None:
+                found.update(self._dependencies.with_prefix(f"{kind}:"))
+                dependencies.update(d for d in self._edges if d.startswith(f"{kind}:"))
+            else:
+                dependencies.add(entity_dependency(kind, entity_id))
+                dependencies.add(entity_dependency(kind))
+        found.update(self.keys_for_dependencies(dependencies))
+        return found
+
+    def link(self, upstream: str, downstream: str):
+        """Record that a change to ``upstream`` also invalidates ``downstream``"""
+        if upstream != downstream:
+            self._edges[upstream].add(downstream)
+
+    def unlink(self, upstream: str, downstream: Optional[str] = None):
+        if downstream is None:
+            self._edges.pop(upstream, None)
+            return
+        targets = self._edges.get(upstream)
+        if targets is not None:
+            targets.discard(downstream)
+            if not targets:
+                del self._edges[upstream]
+
+    def expand(self, dependencies: Iterable[str]) -> Set[str]:
+        """Transitive closure of ``dependencies`` over the dependency edges"""
+        seen = set(dependencies)
+        queue = deque(seen)
+        while queue:
+            for downstream in self._edges.get(queue.popleft(), ()):
+                if downstream not in seen:
+                    seen.add(downstream)
+                    queue.append(downstream)
+        return seen
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            "indexed_keys": len(self._entries),
+            "tags": len(self._tags),
+            "dependency_edges": sum(len(v) for v in self._edges.values()),
+        }
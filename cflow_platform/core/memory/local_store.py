@@ -0,0 +1,640 @@
+from __future__ import annotations
+
+import heapq
+import json
+import logging
+import math
+import mmap
+import os
+import pickle
+import re
+import threading
+from array import array
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .vector_index import VectorMatrix
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms
+    fcntl = None  # type: ignore[assignment]
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_VERSION = 1
+INDEX_VERSION = 1
+
+_TOKEN_RE = re.compile(r"[a-z0-9_]+")
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+
+def _default_segment_bytes() -> int:
+    return int(float(os.getenv("CFLOW_MEMORY_SEGMENT_MB", "64") or "64") * 1024 * 1024)
+
+
+class LocalMemoryStore:
+    """Append-only, segmented memory log with an in-memory inverted index.
+
+    Records are JSON lines appended to ``segment-NNNNNN.jsonl`` files under
+    ``root``; a segment is sealed once it reaches ``segment_max_bytes`` and
+    its slice of the index is written next to it (``.idx``) so a restart
+    loads postings instead of re-tokenizing the log. The index holds only
+    numbers per record (segment, byte offset, length, user) plus term, user
+    and run_id postings; record bodies stay on disk and are read through
+    ``mmap`` at their offsets when they are returned. ``manifest.json`` keeps
+    segment sizes and item/user/run counts.
+
+    Search ranks by BM25 over record content, or by cosine similarity when
+    records were added with embeddings (see ``VectorMatrix``), optionally
+    blended with BM25. Writers from several processes are serialized with an
+    advisory file lock and pick up each other's appends before writing.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        segment_max_bytes: Optional[int] = None,
+        legacy_path: Optional[Path] = None,
+        k1: float = 1.2,
+        b: float = 0.75,
+        vector_dtype: Optional[str] = None,
+    ) -> None:
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.segment_max_bytes = segment_max_bytes or _default_segment_bytes()
+        self.legacy_path = Path(legacy_path) if legacy_path is not None else None
+        self.k1 = k1
+        self.b = b
+        self.vector_dtype = vector_dtype or os.getenv("CFLOW_MEMORY_VECTOR_DTYPE", "float32")
+        self._vectors: Optional[VectorMatrix] = None
+        self._lock = threading.RLock()
+        self._maps: Dict[int, mmap.mmap] = {}
+        self._legacy_offset = 0
+
+        # Per-record columns, indexed by doc id (global append order)
+        self._doc_segment = array("I")
+        self._doc_offset = array("Q")
+        self._doc_length = array("I")
+        self._doc_user = array("I")
+        self._total_length = 0
+        self._user_ids: Dict[str, int] = {}
+        self._user_names: List[str] = []
+
+        # Postings: doc ids in ascending order (plus term frequencies)
+        self._postings: Dict[str, Tuple[array, array]] = {}
+        self._user_postings: Dict[str, array] = {}
+        self._run_postings: Dict[str, array] = {}
+
+        # [{"id", "first_doc", "records", "bytes"}]; the last one is active
+        self._segments: List[Dict[str, int]] = []
+
+        with self._lock, self._file_lock():
+            self._open()
+
+    # ------------------------------------------------------------------
+    # Paths and locking
+    # ------------------------------------------------------------------
+
+    def _segment_path(self, segment_id: int) -> Path:
+        return self.root / f"segment-{segment_id:06d}.jsonl"
+
+    def _index_path(self, segment_id: int) -> Path:
+        return self.root / f"segment-{segment_id:06d}.idx"
+
+    @property
+    def manifest_path(self) -> Path:
+        return self.root / "manifest.json"
+
+    @contextmanager
+    def _file_lock(self) -> Iterator[None]:
+        if fcntl is None:
+            yield
+            return
+        with (self.root / "store.lock").open("a+b") as handle:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
+    # ------------------------------------------------------------------
+    # Opening and recovery
+    # ------------------------------------------------------------------
+
+    def _open(self) -> None:
+        manifest = self._read_manifest()
+        self._legacy_offset = int((manifest.get("legacy") or {}).get("offset", 0))
+        segment_ids = sorted(
+            int(p.name[len("segment-"):-len(".jsonl")]) for p in self.root.glob("segment-*.jsonl")
+        )
+        if not segment_ids:
+            segment_ids = [1]
+            self._segment_path(1).touch()
+        for position, segment_id in enumerate(segment_ids):
+            segment = {"id": segment_id, "first_doc": len(self._doc_offset), "records": 0, "bytes": 0}
+            self._segments.append(segment)
+            sealed = position < len(segment_ids) - 1
+            if not (sealed and self._load_segment_index(segment)):
+                self._scan_segment(segment)
+                if sealed:
+                    self._write_segment_index(segment)
+        self._truncate_partial_tail()
+        vectors = manifest.get("vectors")
+        if vectors:
+            self._vectors = VectorMatrix(self.root, vectors["dim"], vectors["dtype"], vectors["namespace"])
+            self._vectors.recover()
+        if not manifest and len(self._doc_offset) and self.legacy_path is not None and self.legacy_path.exists():
+            # Manifest lost after an import: never import the legacy file twice
+            self._legacy_offset = self.legacy_path.stat().st_size
+        self._import_legacy()
+        self._write_manifest()
+
+    def _read_manifest(self) -> Dict[str, Any]:
+        try:
+            manifest = json.loads(self.manifest_path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logger.warning(f"Memory manifest unreadable ({e}); rebuilding from segments")
+            return {}
+        if manifest.get("version") != MANIFEST_VERSION:
+            return {}
+        return manifest
+
+    def _scan_segment(self, segment: Dict[str, int]) -> None:
+        """Index complete lines of a segment past what is already indexed"""
+        path = self._segment_path(segment["id"])
+        start = segment["bytes"]
+        with path.open("rb") as f:
+            f.seek(start)
+            data = f.read()
+        position = 0
+        while True:
+            end = data.find(b"\n", position)
+            if end < 0:
+                break
+            line = data[position:end]
+            if line.strip():
+                try:
+                    item = json.loads(line)
+                except ValueError:
+                    item = None
+                if isinstance(item, dict):
+                    self._index_record(item, segment, start + position)
+            position = end + 1
+        segment["bytes"] = start + position
+
+    def _truncate_partial_tail(self) -> None:
+        # A writer that crashed mid-append leaves a line without a newline
+        segment = self._segments[-1]
+        path = self._segment_path(segment["id"])
+        if path.stat().st_size > segment["bytes"]:
+            with path.open("r+b") as f:
+                f.truncate(segment["bytes"])
+            self._drop_map(segment["id"])
+
+    def _refresh(self) -> None:
+        """Pick up records other processes appended since the last look"""
+        while True:
+            segment = self._segments[-1]
+            path = self._segment_path(segment["id"])
+            try:
+                size = path.stat().st_size
+            except FileNotFoundError:
+                size = 0
+            if size > segment["bytes"]:
+                self._scan_segment(segment)
+            if not self._segment_path(segment["id"] + 1).exists():
+                break
+            self._segments.append(
+                {"id": segment["id"] + 1, "first_doc": len(self._doc_offset), "records": 0, "bytes": 0}
+            )
+        if self._vectors is None:
+            vectors = self._read_manifest().get("vectors")
+            if vectors:
+                self._vectors = VectorMatrix(self.root, vectors["dim"], vectors["dtype"], vectors["namespace"])
+        else:
+            self._vectors.refresh()
+
+    def _import_legacy(self) -> None:
+        """Append records from the old flat ``memory_items.jsonl`` once"""
+        if self.legacy_path is None or not self.legacy_path.exists():
+            return
+        size = self.legacy_path.stat().st_size
+        if size <= self._legacy_offset:
+            return
+        with self.legacy_path.open("rb") as f:
+            f.seek(self._legacy_offset)
+            data = f.read()
+        complete = data.rfind(b"\n") + 1
+        items = []
+        for line in data[:complete].splitlines():
+            try:
+                item = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(item, dict):
+                items.append(item)
+        self._append(items)
+        self._legacy_offset += complete
+        logger.info(f"Imported {len(items)} memory items from {self.legacy_path}")
+
+    # ------------------------------------------------------------------
+    # Indexing
+    # ------------------------------------------------------------------
+
+    def _intern_user(self, user_id: str) -> int:
+        uid = self._user_ids.get(user_id)
+        if uid is None:
+            uid = len(self._user_names)
+            self._user_ids[user_id] = uid
+            self._user_names.append(user_id)
+        return uid
+
+    def _index_record(self, item: Dict[str, Any], segment: Dict[str, int], offset: int) -> int:
+        doc = len(self._doc_offset)
+        terms = Counter(tokenize(str(item.get("content", ""))))
+        length = sum(terms.values())
+        user_id = str(item.get("user_id", ""))
+        self._doc_segment.append(segment["id"])
+        self._doc_offset.append(offset)
+        self._doc_length.append(length)
+        self._doc_user.append(self._intern_user(user_id))
+        self._total_length += length
+        for term, tf in terms.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = (array("I"), array("I"))
+            postings[0].append(doc)
+            postings[1].append(tf)
+        self._user_postings.setdefault(user_id, array("I")).append(doc)
+        metadata = item.get("metadata")
+        run_id = metadata.get("run_id") if isinstance(metadata, dict) else None
+        if run_id:
+            self._run_postings.setdefault(str(run_id), array("I")).append(doc)
+        segment["records"] += 1
+        return doc
+
+    def _write_segment_index(self, segment: Dict[str, int]) -> None:
+        """Persist the index slice of a sealed segment"""
+        lo = segment["first_doc"]
+        hi = lo + segment["records"]
+
+        def _slice(docs: array) -> Tuple[int, int]:
+            return bisect_left(docs, lo), bisect_left(docs, hi)
+
+        postings = {}
+        for term, (docs, tfs) in self._postings.items():
+            i, j = _slice(docs)
+            if i < j:
+                postings[term] = (docs[i:j].tobytes(), tfs[i:j].tobytes())
+        runs = {}
+        for run_id, docs in self._run_postings.items():
+            i, j = _slice(docs)
+            if i < j:
+                runs[run_id] = docs[i:j].tobytes()
+        payload = {
+            "version": INDEX_VERSION,
+            "first_doc": lo,
+            "records": segment["records"],
+            "bytes": segment["bytes"],
+            "offsets": self._doc_offset[lo:hi].tobytes(),
+            "lengths": self._doc_length[lo:hi].tobytes(),
+            "users": [self._user_names[u] for u in self._doc_user[lo:hi]],
+            "postings": postings,
+            "runs": runs,
+        }
+        path = self._index_path(segment["id"])
+        tmp = path.with_suffix(".idx.tmp")
+        with tmp.open("wb") as f:
+            pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+
+    def _load_segment_index(self, segment: Dict[str, int]) -> bool:
+        path = self._index_path(segment["id"])
+        try:
+            with path.open("rb") as f:
+                payload = pickle.load(f)
+            size = self._segment_path(segment["id"]).stat().st_size
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            logger.warning(f"Memory index {path} unreadable ({e}); rescanning segment")
+            return False
+        if (
+            payload.get("version") != INDEX_VERSION
+            or payload.get("first_doc") != segment["first_doc"]
+            or payload.get("bytes") != size
+        ):
+            return False
+        offsets = array("Q")
+        offsets.frombytes(payload["offsets"])
+        lengths = array("I")
+        lengths.frombytes(payload["lengths"])
+        self._doc_segment.extend([segment["id"]] * len(offsets))
+        self._doc_offset.extend(offsets)
+        self._doc_length.extend(lengths)
+        self._total_length += sum(lengths)
+        first = segment["first_doc"]
+        for position, user_id in enumerate(payload["users"]):
+            self._doc_user.append(self._intern_user(user_id))
+            self._user_postings.setdefault(user_id, array("I")).append(first + position)
+        for term, (doc_bytes, tf_bytes) in payload["postings"].items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = (array("I"), array("I"))
+            postings[0].frombytes(doc_bytes)
+            postings[1].frombytes(tf_bytes)
+        for run_id, doc_bytes in payload["runs"].items():
+            self._run_postings.setdefault(run_id, array("I")).frombytes(doc_bytes)
+        segment["records"] = payload["records"]
+        segment["bytes"] = payload["bytes"]
+        return True
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    def _append(self, items: List[Dict[str, Any]]) -> None:
+        """Append records to the active segment, sealing it when full (locks held)"""
+        position = 0
+        while position < len(items):
+            segment = self._segments[-1]
+            path = self._segment_path(segment["id"])
+            batch = []
+            size = segment["bytes"]
+            while position < len(items) and (size < self.segment_max_bytes or not batch):
+                line = (json.dumps(items[position], ensure_ascii=False) + "\n").encode("utf-8")
+                batch.append((items[position], size, line))
+                size += len(line)
+                position += 1
+            with path.open("ab") as f:
+                f.write(b"".join(line for _, _, line in batch))
+                f.flush()
+            for item, offset, _ in batch:
+                self._index_record(item, segment, offset)
+            segment["bytes"] = size
+            if size >= self.segment_max_bytes:
+                self._seal(segment)
+
+    def _seal(self, segment: Dict[str, int]) -> None:
+        self._write_segment_index(segment)
+        next_id = segment["id"] + 1
+        self._segment_path(next_id).touch()
+        self._segments.append({"id": next_id, "first_doc": len(self._doc_offset), "records": 0, "bytes": 0})
+
+    def _write_manifest(self) -> None:
+        manifest = {
+            "version": MANIFEST_VERSION,
+            "items": len(self._doc_offset),
+            "segments": [
+                {"id": s["id"], "records": s["records"], "bytes": s["bytes"]} for s in self._segments
+            ],
+            "users": {user: len(docs) for user, docs in self._user_postings.items()},
+            "runs": {run: len(docs) for run, docs in self._run_postings.items()},
+            "legacy": {"path": str(self.legacy_path) if self.legacy_path else None, "offset": self._legacy_offset},
+        }
+        if self._vectors is not None:
+            manifest["vectors"] = {
+                "namespace": self._vectors.namespace,
+                "dim": self._vectors.dim,
+                "dtype": self._vectors.dtype,
+                "rows": len(self._vectors),
+            }
+        tmp = self.manifest_path.with_suffix(".json.tmp")
+        tmp.write_text(json.dumps(manifest), encoding="utf-8")
+        os.replace(tmp, self.manifest_path)
+
+    def add(
+        self,
+        item: Dict[str, Any],
+        vector: Optional[Sequence[float]] = None,
+        vector_namespace: str = "default",
+    ) -> int:
+        """Append one record (with an optional embedding); returns its doc id"""
+        return self.add_many([item], None if vector is None else [vector], vector_namespace)[0]
+
+    def add_many(
+        self,
+        items: List[Dict[str, Any]],
+        vectors: Optional[Sequence[Sequence[float]]] = None,
+        vector_namespace: str = "default",
+    ) -> List[int]:
+        """Append records in one write (with optional embeddings); returns their doc ids.
+
+        Every vector in a store shares one namespace and dimension, fixed by
+        the first vector added; mismatching records are stored without one.
+        """
+        if vectors is not None and len(vectors) != len(items):
+            raise ValueError("vectors must align with items")
+        with self._lock, self._file_lock():
+            self._refresh()
+            self._truncate_partial_tail()
+            first = len(self._doc_offset)
+            self._append(items)
+            docs = list(range(first, first + len(items)))
+            if vectors is not None and items:
+                self._add_vectors(docs, vectors, vector_namespace)
+            self._write_manifest()
+            return docs
+
+    def _add_vectors(self, docs: List[int], vectors: Sequence[Sequence[float]], namespace: str) -> None:
+        dim = len(vectors[0])
+        if self._vectors is None:
+            self._vectors = VectorMatrix(self.root, dim, self.vector_dtype, namespace)
+            self._vectors.recover()
+        if any(len(v) != self._vectors.dim for v in vectors) or namespace != self._vectors.namespace:
+            logger.warning(
+                f"Memory vectors ({namespace}, {dim}D) do not match the store's "
+                f"({self._vectors.namespace}, {self._vectors.dim}D); stored without vectors"
+            )
+            return
+        self._vectors.append(docs, vectors)
+
+    @property
+    def vector_count(self) -> int:
+        return len(self._vectors) if self._vectors is not None else 0
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    def _drop_map(self, segment_id: int) -> None:
+        mapped = self._maps.pop(segment_id, None)
+        if mapped is not None:
+            mapped.close()
+
+    def _read_record(self, doc: int) -> Dict[str, Any]:
+        segment_id = self._doc_segment[doc]
+        offset = self._doc_offset[doc]
+        mapped = self._maps.get(segment_id)
+        if mapped is None or offset >= len(mapped):
+            # The active segment grows; remap to cover the new tail
+            self._drop_map(segment_id)
+            with self._segment_path(segment_id).open("rb") as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._maps[segment_id] = mapped
+        end = mapped.find(b"\n", offset)
+        return json.loads(mapped[offset:end if end >= 0 else len(mapped)])
+
+    def _filters(self, user_id: Optional[str], run_id: Optional[str]) -> Optional[Tuple[Optional[int], Optional[set]]]:
+        """Resolve user/run filters; None when they cannot match anything"""
+        uid = None
+        if user_id is not None:
+            uid = self._user_ids.get(user_id)
+            if uid is None:
+                return None
+        allowed = None
+        if run_id is not None:
+            run_docs = self._run_postings.get(run_id)
+            if run_docs is None:
+                return None
+            allowed = set(run_docs)
+        return uid, allowed
+
+    def _bm25_scores(self, query: str, uid: Optional[int], allowed: Optional[set]) -> Dict[int, float]:
+        total = len(self._doc_offset)
+        terms = set(tokenize(query))
+        if not total or not terms:
+            return {}
+        k1 = self.k1
+        b = self.b
+        avgdl = self._total_length / total or 1.0
+        doc_user = self._doc_user
+        doc_length = self._doc_length
+        scores: Dict[int, float] = defaultdict(float)
+        for term in terms:
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            docs, tfs = postings
+            df = len(docs)
+            idf = math.log(1.0 + (total - df + 0.5) / (df + 0.5))
+            for doc, tf in zip(docs, tfs):
+                if uid is not None and doc_user[doc] != uid:
+                    continue
+                if allowed is not None and doc not in allowed:
+                    continue
+                norm = k1 * (1.0 - b + b * doc_length[doc] / avgdl)
+                scores[doc] += idf * tf * (k1 + 1.0) / (tf + norm)
+        return scores
+
+    def _vector_similarities(
+        self, query_vector: Sequence[float], uid: Optional[int], allowed: Optional[set]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """(doc ids, cosine similarities) for every vector row, filtered rows at -inf"""
+        vectors = self._vectors
+        row_docs = vectors.row_docs
+        sims = vectors.similarities(query_vector)
+        if uid is not None:
+            row_users = np.frombuffer(self._doc_user, dtype=np.uint32)[row_docs]
+            sims = np.where(row_users == uid, sims, -np.inf)
+        if allowed is not None:
+            mask = np.isin(row_docs, np.fromiter(allowed, dtype=np.uint32, count=len(allowed)))
+            sims = np.where(mask, sims, -np.inf)
+        return row_docs, sims
+
+    def search(
+        self,
+        query: str,
+        user_id: Optional[str] = None,
+        limit: int = 20,
+        run_id: Optional[str] = None,
+        query_vector: Optional[Sequence[float]] = None,
+        hybrid_weight: Optional[float] = None,
+        min_similarity: Optional[float] = None,
+    ) -> List[Dict[str, Any]]:
+        """Ranked records for ``query``, best first.
+
+        Without ``query_vector`` (or before any vectors exist) records are
+        ranked by BM25. With it they are ranked by cosine similarity; a
+        ``hybrid_weight`` in [0, 1] blends ``weight * cosine + (1 - weight) *
+        bm25 / max(bm25)`` over the union of both candidate sets.
+        ``min_similarity`` drops records whose cosine similarity is lower.
+        ``user_id`` and ``run_id`` restrict results to that user's or run's
+        postings. Each returned record carries its ``score`` (and
+        ``similarity`` when vectors were used).
+        """
+        with self._lock:
+            self._refresh()
+            if limit <= 0 or not self._doc_offset:
+                return []
+            filters = self._filters(user_id, run_id)
+            if filters is None:
+                return []
+            uid, allowed = filters
+
+            if query_vector is None or not self.vector_count:
+                scores = self._bm25_scores(query, uid, allowed)
+                # Ties go to the most recent record
+                best = heapq.nlargest(limit, scores.items(), key=lambda kv: (kv[1], kv[0]))
+                return [self._hit(doc, score) for doc, score in best]
+
+            row_docs, sims = self._vector_similarities(query_vector, uid, allowed)
+            if min_similarity is not None:
+                sims = np.where(sims >= min_similarity, sims, -np.inf)
+            if hybrid_weight is None:
+                rows, top = VectorMatrix.top_k(sims, limit)
+                return [
+                    self._hit(int(row_docs[row]), float(sim), similarity=float(sim))
+                    for row, sim in zip(rows, top)
+                ]
+
+            weight = min(max(float(hybrid_weight), 0.0), 1.0)
+            rows, top = VectorMatrix.top_k(sims, limit * 4)
+            similarity = {int(row_docs[row]): float(sim) for row, sim in zip(rows, top)}
+            lexical = self._bm25_scores(query, uid, allowed)
+            if min_similarity is not None:
+                # Lexical-only hits have no similarity to compare
+                lexical = {doc: score for doc, score in lexical.items() if doc in similarity}
+            lexical_top = dict(heapq.nlargest(limit * 4, lexical.items(), key=lambda kv: kv[1]))
+            max_lexical = max(lexical_top.values(), default=0.0) or 1.0
+            blended = {}
+            for doc in set(similarity) | set(lexical_top):
+                blended[doc] = weight * similarity.get(doc, 0.0) + (1.0 - weight) * lexical.get(doc, 0.0) / max_lexical
+            best = heapq.nlargest(limit, blended.items(), key=lambda kv: (kv[1], kv[0]))
+            return [self._hit(doc, score, similarity=similarity.get(doc)) for doc, score in best]
+
+    def _hit(self, doc: int, score: float, similarity: Optional[float] = None) -> Dict[str, Any]:
+        record = self._read_record(doc)
+        record["score"] = round(score, 6)
+        if similarity is not None:
+            record["similarity"] = round(similarity, 6)
+        return record
+
+    def iter_records(self) -> Iterator[Dict[str, Any]]:
+        """Every stored record in append order (including other processes' appends so far)"""
+        with self._lock:
+            self._refresh()
+            total = len(self._doc_offset)
+        for doc in range(total):
+            with self._lock:
+                record = self._read_record(doc)
+            yield record
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._refresh()
+            return {
+                "items": len(self._doc_offset),
+                "segments": len(self._segments),
+                "bytes": sum(s["bytes"] for s in self._segments),
+                "users": len(self._user_postings),
+                "runs": len(self._run_postings),
+                "terms": len(self._postings),
+                "vectors": self.vector_count,
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            for segment_id in list(self._maps):
+                self._drop_map(segment_id)
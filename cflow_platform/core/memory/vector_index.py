@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import logging
+import re
+from pathlib import Path
+from typing import Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_DTYPES = ("float32", "float16")
+
+
+def _namespace_slug(namespace: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", namespace) or "default"
+
+
+class VectorMatrix:
+    """Append-only matrix of unit-normalized embeddings for one namespace.
+
+    Rows live in a flat little-endian ``.bin`` file (``float32`` or
+    ``float16``) next to a ``.rows`` file holding the owning record's doc id
+    per row, so cosine similarity is a single matrix-vector product. float32
+    files are searched in place through ``np.memmap`` (the page cache holds
+    the working set); float16 halves the file but NumPy has no fast float16
+    GEMV, so those rows are widened to float32 in memory once and extended
+    as rows are appended.
+
+    Appends must be serialized by the caller (LocalMemoryStore holds its
+    file lock); readers pick up rows appended by other processes on
+    ``refresh``.
+    """
+
+    def __init__(self, root: Path, dim: int, dtype: str = "float32", namespace: str = "default") -> None:
+        if dtype not in SUPPORTED_DTYPES:
+            raise ValueError(f"Unsupported vector dtype: {dtype}")
+        self.root = Path(root)
+        self.dim = int(dim)
+        self.dtype = dtype
+        self.namespace = namespace
+        stem = f"vectors-{_namespace_slug(namespace)}-{self.dim}-{dtype}"
+        self.path = self.root / f"{stem}.bin"
+        self.rows_path = self.root / f"{stem}.rows"
+        self._row_bytes = self.dim * np.dtype(dtype).itemsize
+        self._count = 0
+        self._row_docs = np.zeros(0, dtype=np.uint32)
+        self._matrix: Optional[np.ndarray] = None
+        self.path.touch()
+        self.rows_path.touch()
+        self.refresh()
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def row_docs(self) -> np.ndarray:
+        return self._row_docs
+
+    def _complete_rows(self) -> int:
+        return min(self.path.stat().st_size // self._row_bytes, self.rows_path.stat().st_size // 4)
+
+    def recover(self) -> None:
+        """Trim a torn append so both files hold the same number of rows (writer lock held)"""
+        rows = self._complete_rows()
+        for path, size in ((self.path, rows * self._row_bytes), (self.rows_path, rows * 4)):
+            if path.stat().st_size > size:
+                with path.open("r+b") as f:
+                    f.truncate(size)
+        self.refresh()
+
+    def refresh(self) -> None:
+        rows = self._complete_rows()
+        if rows == self._count:
+            return
+        self._row_docs = np.fromfile(self.rows_path, dtype="<u4", count=rows)
+        if rows == 0:
+            self._matrix = None
+        elif self.dtype == "float32":
+            self._matrix = np.memmap(self.path, dtype="<f4", mode="r", shape=(rows, self.dim))
+        else:
+            tail = np.fromfile(
+                self.path, dtype="<f2", count=(rows - self._count) * self.dim, offset=self._count * self._row_bytes
+            ).reshape(-1, self.dim).astype(np.float32)
+            self._matrix = tail if self._matrix is None else np.concatenate([self._matrix, tail])
+        self._count = rows
+
+    @staticmethod
+    def normalize(vectors: np.ndarray) -> np.ndarray:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.ndim == 1:
+            vectors = vectors[None, :]
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def append(self, doc_ids: Sequence[int], vectors: Iterable[Sequence[float]]) -> None:
+        matrix = self.normalize(np.asarray(list(vectors), dtype=np.float32))
+        if matrix.shape != (len(doc_ids), self.dim):
+            raise ValueError(f"Expected {len(doc_ids)} vectors of dimension {self.dim}, got {matrix.shape}")
+        # Rows first, doc ids second: a reader never sees a doc id without its row
+        with self.path.open("ab") as f:
+            f.write(matrix.astype(f"<{'f4' if self.dtype == 'float32' else 'f2'}").tobytes())
+        with self.rows_path.open("ab") as f:
+            f.write(np.asarray(doc_ids, dtype="<u4").tobytes())
+        self.refresh()
+
+    def similarities(self, query: Sequence[float]) -> np.ndarray:
+        """Cosine similarity of ``query`` with every row"""
+        if self._matrix is None:
+            return np.zeros(0, dtype=np.float32)
+        q = self.normalize(np.asarray(query, dtype=np.float32))[0]
+        if q.shape[0] != self.dim:
+            raise ValueError(f"Query dimension {q.shape[0]} does not match index dimension {self.dim}")
+        return self._matrix @ q
+
+    @staticmethod
+    def top_k(scores: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Row indices and scores of the ``k`` best finite scores, best first"""
+        finite = np.count_nonzero(np.isfinite(scores))
+        k = min(k, finite)
+        if k <= 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        if k < len(scores):
+            rows = np.argpartition(-scores, k - 1)[:k]
+        else:
+            rows = np.arange(len(scores))
+        rows = rows[np.argsort(-scores[rows], kind="stable")]
+        return rows, scores[rows]
@@ -3,7 +3,7 @@ BMAD Memory Migration
 
 DEPRECATED: This module is deprecated. Use cflow_platform.core.unified_database_schema instead.
 
-YOLO MODE: Fast migration from local JSONL to Supabase memory_items table.
+YOLO MODE: Fast migration from the local memory store to Supabase memory_items table.
 """
 
 import os
@@ -19,11 +19,14 @@ load_dotenv(Path(__file__).parent.parent.parent / ".env")
 
 
 class BMADMemoryMigration:
-    """YOLO Memory migration from JSONL to Supabase."""
+    """YOLO Memory migration from the local memory store to Supabase."""
     
     def __init__(self):
         self.supabase_client = None
-        self.memory_file = Path(__file__).parent.parent.parent / ".cerebraflow" / "memory_items.jsonl"
+        root = Path(__file__).parent.parent.parent / ".cerebraflow"
+        # memory_handlers writes segment-*.jsonl here; the flat file is only imported once
+        self.memory_dir = root / "memory"
+        self.memory_file = root / "memory_items.jsonl"
         self._ensure_supabase()
     
     def _ensure_supabase(self) -> None:
@@ -44,29 +47,28 @@ class BMADMemoryMigration:
         except Exception as e:
             print(f"[INFO][INFO] YOLO: Supabase setup failed: {e}")
     
+    def _has_local_memory(self) -> bool:
+        return self.memory_file.exists() or any(self.memory_dir.glob("segment-*.jsonl"))
+    
     def read_jsonl_memory(self) -> Iterator[Dict[str, Any]]:
-        """Read memory items from JSONL file (YOLO implementation)."""
+        """Read memory items through LocalMemoryStore (YOLO implementation)."""
         try:
-            if not self.memory_file.exists():
-                print(f"[INFO][INFO] YOLO: Memory file not found: {self.memory_file}")
+            if not self._has_local_memory():
+                print(f"[INFO][INFO] YOLO: Memory store not found: {self.memory_dir}")
                 return
             
-            with open(self.memory_file, 'r', encoding='utf-8') as f:
-                for line_num, line in enumerate(f, 1):
-                    line = line.strip()
-                    if not line:
-                        continue
-                    
-                    try:
-                        item = json.loads(line)
-                        item['_line_number'] = line_num
-                        yield item
-                    except json.JSONDecodeError as e:
-                        print(f"[INFO][INFO] YOLO: JSON decode error on line {line_num}: {e}")
-                        continue
+            from .memory.local_store import LocalMemoryStore
+            
+            store = LocalMemoryStore(self.memory_dir, legacy_path=self.memory_file)
+            try:
+                for record_num, item in enumerate(store.iter_records(), 1):
+                    item['_line_number'] = record_num
+                    yield item
+            finally:
+                store.close()
             
         except Exception as e:
-            print(f"[INFO] YOLO: Failed to read JSONL memory: {e}")
+            print(f"[INFO] YOLO: Failed to read local memory: {e}")
     
     def migrate_memory_to_supabase(self, batch_size: int = 100) -> Dict[str, Any]:
         """Migrate memory items to Supabase (YOLO implementation)."""
@@ -167,15 +169,15 @@ class BMADMemoryMigration:
         """Get memory statistics (YOLO implementation)."""
         try:
             stats = {
-                "jsonl_file_exists": self.memory_file.exists(),
+                "jsonl_file_exists": self._has_local_memory(),
                 "jsonl_file_size": 0,
                 "jsonl_item_count": 0,
                 "supabase_item_count": 0
             }
             
             # Count JSONL items
-            if self.memory_file.exists():
-                stats["jsonl_file_size"] = self.memory_file.stat().st_size
+            if stats["jsonl_file_exists"]:
+                stats["jsonl_file_size"] = sum(p.stat().st_size for p in self.memory_dir.glob("segment-*.jsonl"))
                 stats["jsonl_item_count"] = sum(1 for _ in self.read_jsonl_memory())
             
             # Count Supabase items
@@ -17,6 +17,8 @@ import redis.asyncio as redis
 import aiohttp
 from contextlib import asynccontextmanager
 
+from .disk_cache import DiskCacheTier
+
 logger = logging.getLogger(__name__)
 
 
@@ -53,8 +55,9 @@ class CacheEntry:
 class PerformanceCache:
     """High-performance caching system with multiple strategies"""
     
-    def __init__(self, config: CacheConfig):
+    def __init__(self, config: CacheConfig, disk_tier: Optional[DiskCacheTier] = None):
         self.config = config
+        self.disk_tier = disk_tier
         self.cache: Dict[str, CacheEntry] = {}
         self.access_order: List[str] = []
         self.redis_client = None
@@ -68,6 +71,7 @@ class PerformanceCache:
             "sets": 0,
             "deletes": 0,
             "evictions": 0,
+            "disk_hits": 0,
             "total_size": 0
         }
     
@@ -109,6 +113,28 @@ class PerformanceCache:
                 self.stats["hits"] += 1
                 return entry.value
             
+            # Persistent tier survives restarts; promote hits into memory
+            if self.disk_tier is not None:
+                disk_entry = self.disk_tier.get_entry(key)
+                if disk_entry is not None:
+                    now = time.time()
+                    expires_at = disk_entry["expires_at"]
+                    self.cache[key] = CacheEntry(
+                        key=key,
+                        value=disk_entry["value"],
+                        created_at=disk_entry["created_at"],
+                        accessed_at=now,
+                        access_count=1,
+                        ttl=None if expires_at is None else expires_at - disk_entry["created_at"]
+                    )
+                    self._update_access_order(key)
+                    if len(self.cache) > self.config.max_size:
+                        await self._evict_entries()
+                    self.stats["hits"] += 1
+                    self.stats["disk_hits"] += 1
+                    self.stats["total_size"] = len(self.cache)
+                    return disk_entry["value"]
+            
             self.stats["misses"] += 1
             return None
             
@@ -139,6 +165,10 @@ class PerformanceCache:
             self.cache[key] = entry
             self._update_access_order(key)
             
+            if self.disk_tier is not None:
+                # A falsy ttl never expires in memory, so it must not on disk either
+                await asyncio.to_thread(self.disk_tier.set, key, value, ttl or float("inf"))
+            
             # Check size limits
             if len(self.cache) > self.config.max_size:
                 await self._evict_entries()
@@ -151,13 +181,16 @@ class PerformanceCache:
             logger.error(f"Cache set error: {e}")
             return False
     
-    async def delete(self, key: str) -> bool:
-        """Delete value from cache"""
+    async def delete(self, key: str, keep_on_disk: bool = False) -> bool:
+        """Delete value from cache (``keep_on_disk`` for memory evictions)"""
         try:
             # Delete from Redis if available
             if self.redis_client:
                 await self.redis_client.delete(key)
             
+            if self.disk_tier is not None and not keep_on_disk:
+                self.disk_tier.delete(key)
+            
             # Delete from in-memory cache
             if key in self.cache:
                 del self.cache[key]
@@ -179,7 +212,7 @@ class PerformanceCache:
             while len(self.cache) > self.config.max_size:
                 if self.access_order:
                     oldest_key = self.access_order[0]
-                    await self.delete(oldest_key)
+                    await self.delete(oldest_key, keep_on_disk=True)
                     self.stats["evictions"] += 1
         
         elif self.config.strategy == CacheStrategy.LFU:
@@ -190,7 +223,7 @@ class PerformanceCache:
                         self.cache.keys(),
                         key=lambda k: self.cache[k].access_count
                     )
-                    await self.delete(least_used_key)
+                    await self.delete(least_used_key, keep_on_disk=True)
                     self.stats["evictions"] += 1
     
     def _update_access_order(self, key: str):
@@ -224,7 +257,8 @@ class PerformanceCache:
             "hit_rate_percent": hit_rate,
             "cache_size": len(self.cache),
             "max_size": self.config.max_size,
-            "utilization_percent": (len(self.cache) / self.config.max_size * 100)
+            "utilization_percent": (len(self.cache) / self.config.max_size * 100),
+            "disk": self.disk_tier.get_stats() if self.disk_tier is not None else None
         }
 
 
@@ -22,6 +22,8 @@ import statistics
 import hashlib
 from datetime import datetime, timedelta
 
+from .disk_cache import DiskCacheTier, disk_cache_enabled, get_disk_tier
+
 logger = logging.getLogger(__name__)
 
 
@@ -110,9 +112,11 @@ class PredictiveCache:
         l1_size_mb: int = 100,
         l2_size_mb: int = 500,
         l3_size_mb: int = 2000,
-        default_strategy: CacheStrategy = CacheStrategy.PREDICTIVE
+        default_strategy: CacheStrategy = CacheStrategy.PREDICTIVE,
+        disk_tier: Optional[DiskCacheTier] = None
     ):
         self.l1_size_mb = l1_size_mb
+        self.disk_tier = disk_tier
         self.l2_size_mb = l2_size_mb
         self.l3_size_mb = l3_size_mb
         
@@ -184,6 +188,9 @@ class PredictiveCache:
         # Check all tiers
         for tier in [CacheTier.L1, CacheTier.L2, CacheTier.L3]:
             entry = await self._get_from_tier(key, tier)
+            if entry and self._is_expired(entry):
+                del self._get_tier_cache(tier)[key]
+                entry = None
             if entry:
                 # Record access
                 await self._record_access(key, tier, context)
@@ -196,6 +203,26 @@ class PredictiveCache:
                 
                 return entry.value
         
+        # Persistent tier: entries written before a restart land back in L1
+        if self.disk_tier is not None:
+            disk_entry = self.disk_tier.get_entry(key)
+            if disk_entry is not None:
+                entry = CacheEntry(
+                    key=key,
+                    value=disk_entry["value"],
+                    tier=CacheTier.L1,
+                    created_at=disk_entry["created_at"],
+                    last_accessed=time.time(),
+                    context=context,
+                    dependencies={t[4:] for t in disk_entry["tags"] if t.startswith("dep:")},
+                    size_bytes=self._calculate_size(disk_entry["value"]),
+                    metadata={"expires_at": disk_entry["expires_at"]}
+                )
+                await self._add_to_tier(entry, CacheTier.L1)
+                await self._record_access(key, CacheTier.L1, context)
+                self._cache_stats["hits"]["disk"] += 1
+                return entry.value
+        
         # Cache miss
         self._cache_stats["misses"]["total"] += 1
         
@@ -210,27 +237,37 @@ class PredictiveCache:
         value: Any,
         tier: CacheTier = CacheTier.L1,
         context: Dict[str, Any] = None,
-        dependencies: Set[str] = None
+        dependencies: Set[str] = None,
+        ttl: Optional[float] = None
     ):
-        """Set value in cache with intelligent tier selection"""
+        """Set value in cache with intelligent tier selection (``ttl`` in seconds)"""
         context = context or {}
         dependencies = dependencies or set()
+        now = time.time()
         
         # Create cache entry
         entry = CacheEntry(
             key=key,
             value=value,
             tier=tier,
-            created_at=time.time(),
-            last_accessed=time.time(),
+            created_at=now,
+            last_accessed=now,
             context=context,
             dependencies=dependencies,
-            size_bytes=self._calculate_size(value)
+            size_bytes=self._calculate_size(value),
+            metadata={"expires_at": None if ttl is None else now + ttl}
         )
         
         # Add to appropriate tier
         await self._add_to_tier(entry, tier)
         
+        if self.disk_tier is not None:
+            # No ttl never expires in memory, so it must not on disk either
+            await asyncio.to_thread(
+                self.disk_tier.set, key, value, float("inf") if ttl is None else ttl,
+                tags=[f"dep:{dep}" for dep in dependencies]
+            )
+        
         # Update access frequency
         self._access_frequencies[key] = 1.0
         
@@ -238,6 +275,10 @@ class PredictiveCache:
         if self._prefetch_enabled:
             await self._trigger_prefetch(key, context)
     
+    def _is_expired(self, entry: CacheEntry) -> bool:
+        expires_at = entry.metadata.get("expires_at")
+        return expires_at is not None and expires_at <= time.time()
+    
     async def _get_from_tier(self, key: str, tier: CacheTier) -> Optional[CacheEntry]:
         """Get entry from specific tier"""
         cache = self._get_tier_cache(tier)
@@ -804,7 +845,8 @@ class PredictiveCache:
             "hit_rate": total_hits / max(total_hits + total_misses, 1),
             "total_keys_tracked": len(self._access_patterns),
             "prefetch_enabled": self._prefetch_enabled,
-            "prefetch_confidence_threshold": self._prefetch_confidence_threshold
+            "prefetch_confidence_threshold": self._prefetch_confidence_threshold,
+            "disk": self.disk_tier.get_stats() if self.disk_tier is not None else None
         }
 
 
@@ -816,7 +858,8 @@ async def get_predictive_cache() -> PredictiveCache:
     """Get the global predictive cache"""
     global _predictive_cache
     if _predictive_cache is None:
-        _predictive_cache = PredictiveCache()
+        disk_tier = get_disk_tier("predictive_cache") if disk_cache_enabled() else None
+        _predictive_cache = PredictiveCache(disk_tier=disk_tier)
         await _predictive_cache.start()
     return _predictive_cache
 
@@ -832,11 +875,12 @@ async def set_in_cache(
     value: Any,
     tier: CacheTier = CacheTier.L1,
     context: Dict[str, Any] = None,
-    dependencies: Set[str] = None
+    dependencies: Set[str] = None,
+    ttl: Optional[float] = None
 ):
     """Set value in predictive cache"""
     cache = await get_predictive_cache()
-    await cache.set(key, value, tier, context, dependencies)
+    await cache.set(key, value, tier, context, dependencies, ttl)
 
 
 async def get_cache_stats() -> Dict[str, Any]:
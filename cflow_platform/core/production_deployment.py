@@ -465,8 +465,8 @@ class BMADMasterProductionDeployment:
         """Health check for MCP tool registration"""
         try:
             from cflow_platform.core.tool_registry import ToolRegistry
-            tools = ToolRegistry.get_tools_for_mcp()
-            bmad_tools = [t for t in tools if t['name'].startswith('bmad_')]
+            tools = ToolRegistry.get_snapshot()
+            bmad_tools = tools.bmad_tools
             
             return {
                 'success': len(bmad_tools) > 0,
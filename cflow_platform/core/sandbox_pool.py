@@ -0,0 +1,328 @@
+"""
+Warm Worker Pool for sandbox.run_python
+
+Starting a fresh interpreter (optionally through ``uv run``) dominates the
+wall time of short sandbox snippets. This module keeps pre-started
+``sandbox_worker.py`` processes that act as warm templates: each job is handed
+to an idle worker, which forks a fresh child for it, so user code never runs
+in a process that outlives the job. Workers are recycled after a fixed
+number of jobs, or when the template stops answering.
+
+Workers are grouped by memory limit because the address-space limit is set
+as a hard limit once per process and cannot be raised again.
+"""
+
+import atexit
+import json
+import logging
+import os
+import selectors
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+WORKER_SCRIPT = Path(__file__).with_name("sandbox_worker.py")
+
+
+@dataclass
+class SandboxPoolConfig:
+    """Configuration for the sandbox worker pool"""
+    size: int = 2
+    max_runs_per_worker: int = 50
+    startup_timeout: float = 15.0
+
+    @classmethod
+    def from_env(cls) -> "SandboxPoolConfig":
+        return cls(
+            size=int(os.getenv("CFLOW_SANDBOX_POOL_SIZE", "2") or "2"),
+            max_runs_per_worker=int(os.getenv("CFLOW_SANDBOX_POOL_MAX_RUNS", "50") or "50"),
+        )
+
+
+def _default_runner() -> List[str]:
+    # Same interpreter selection as the one-shot sandbox path
+    try:
+        import importlib.util
+
+        if importlib.util.find_spec("uv") is not None:
+            return [sys.executable, "-m", "uv", "run", sys.executable]
+    except Exception:
+        pass
+    return [sys.executable]
+
+
+def sandbox_pool_enabled() -> bool:
+    return os.getenv("CFLOW_SANDBOX_POOL", "1").strip().lower() not in {"0", "false", "no", "off"}
+
+
+class SandboxWorker:
+    """One pre-started sandbox interpreter speaking JSON lines over a pipe"""
+
+    def __init__(self, mem_limit_mb: int, runner: List[str], env: Dict[str, str]):
+        self.mem_limit_mb = mem_limit_mb
+        self.runs = 0
+        self.created_at = time.time()
+        # Working directory for every job of this worker; emptied after each job
+        self.scratch = tempfile.mkdtemp(prefix="cflow_sandbox_")
+        self.process = subprocess.Popen(
+            runner + [str(WORKER_SCRIPT), str(mem_limit_mb), self.scratch],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            cwd=tempfile.gettempdir(),
+            env=env,
+        )
+
+    @property
+    def pid(self) -> int:
+        return self.process.pid
+
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    def _read_line(self, timeout: float) -> Optional[Dict[str, Any]]:
+        assert self.process.stdout is not None
+        with selectors.DefaultSelector() as selector:
+            selector.register(self.process.stdout, selectors.EVENT_READ)
+            if not selector.select(timeout):
+                return None
+        line = self.process.stdout.readline()
+        if not line:
+            return None
+        return json.loads(line)
+
+    def wait_ready(self, timeout: float) -> bool:
+        try:
+            ready = self._read_line(timeout)
+        except (OSError, ValueError):
+            return False
+        return bool(ready and ready.get("ready"))
+
+    def run(self, job: Dict[str, Any], timeout: float) -> Optional[Dict[str, Any]]:
+        """Run one job; returns None if the worker timed out or died"""
+        assert self.process.stdin is not None
+        self.runs += 1
+        try:
+            self.process.stdin.write(json.dumps(job).encode("utf-8") + b"\n")
+            self.process.stdin.flush()
+            return self._read_line(timeout)
+        except (OSError, ValueError):
+            return None
+
+    def kill(self) -> None:
+        if self.alive():
+            self.process.kill()
+        try:
+            self.process.wait(timeout=5)
+        except Exception:
+            pass
+        for stream in (self.process.stdin, self.process.stdout):
+            try:
+                if stream:
+                    stream.close()
+            except Exception:
+                pass
+        shutil.rmtree(self.scratch, ignore_errors=True)
+
+
+class SandboxWorkerPool:
+    """Pool of warm sandbox workers keyed by memory limit"""
+
+    def __init__(self, config: Optional[SandboxPoolConfig] = None, runner: Optional[List[str]] = None):
+        self.config = config or SandboxPoolConfig.from_env()
+        self.runner = runner or [sys.executable]
+        self._idle: Dict[int, List[SandboxWorker]] = {}
+        self._lock = threading.Lock()
+        self._closed = False
+        self.stats: Dict[str, Any] = {
+            "runs": 0,
+            "warm_runs": 0,
+            "workers_started": 0,
+            "worker_start_failures": 0,
+            "recycled": {},
+        }
+
+    def _env(self) -> Dict[str, str]:
+        env = os.environ.copy()
+        env.update(
+            {
+                "PYTHONWARNINGS": "ignore",
+                "PYTHONUNBUFFERED": "1",
+                "PYTHONSAFEPATH": "1",
+                "NO_PROXY": "*",
+                "no_proxy": "*",
+            }
+        )
+        return env
+
+    def _start_worker(self, mem_limit_mb: int) -> SandboxWorker:
+        worker = SandboxWorker(mem_limit_mb, self.runner, self._env())
+        if not worker.wait_ready(self.config.startup_timeout):
+            worker.kill()
+            with self._lock:
+                self.stats["worker_start_failures"] += 1
+            raise RuntimeError("sandbox worker failed to start")
+        with self._lock:
+            self.stats["workers_started"] += 1
+        return worker
+
+    def _acquire(self, mem_limit_mb: int) -> Tuple[SandboxWorker, bool]:
+        with self._lock:
+            idle = self._idle.setdefault(mem_limit_mb, [])
+            while idle:
+                worker = idle.pop()
+                if worker.alive():
+                    return worker, True
+                self._count_recycle("crashed")
+        return self._start_worker(mem_limit_mb), False
+
+    def _count_recycle(self, reason: str) -> None:
+        recycled = self.stats["recycled"]
+        recycled[reason] = recycled.get(reason, 0) + 1
+
+    def _release(self, worker: SandboxWorker, recycle: Optional[str]) -> None:
+        if recycle is None and worker.runs >= self.config.max_runs_per_worker:
+            recycle = "max_runs"
+        with self._lock:
+            if recycle is None and not self._closed:
+                idle = self._idle.setdefault(worker.mem_limit_mb, [])
+                if len(idle) < self.config.size:
+                    idle.append(worker)
+                    return
+                recycle = "surplus"
+            self._count_recycle(recycle or "closed")
+        worker.kill()
+        if recycle != "surplus":
+            self._replenish_async(worker.mem_limit_mb)
+
+    def _replenish_async(self, mem_limit_mb: int) -> None:
+        def _fill() -> None:
+            try:
+                self.prewarm(mem_limit_mb, 1)
+            except Exception as e:
+                logger.debug(f"Sandbox pool replenish failed: {e}")
+
+        threading.Thread(target=_fill, name="sandbox-pool-replenish", daemon=True).start()
+
+    def prewarm(self, mem_limit_mb: int = 256, count: Optional[int] = None) -> int:
+        """Start idle workers for a memory limit up to ``count`` (default: pool size)"""
+        target = self.config.size if count is None else count
+        started = 0
+        while True:
+            with self._lock:
+                if self._closed or len(self._idle.get(mem_limit_mb, [])) >= min(target, self.config.size):
+                    return started
+            worker = self._start_worker(mem_limit_mb)
+            with self._lock:
+                idle = self._idle.setdefault(mem_limit_mb, [])
+                if self._closed or len(idle) >= self.config.size:
+                    surplus = True
+                else:
+                    idle.append(worker)
+                    surplus = False
+            if surplus:
+                worker.kill()
+                return started
+            started += 1
+
+    def run(
+        self,
+        code: str,
+        time_limit_sec: int,
+        cpu_limit_sec: int,
+        mem_limit_mb: int,
+        fs_allowlist: List[str],
+    ) -> Dict[str, Any]:
+        """Execute ``code`` in a child forked from a warm worker.
+
+        The job runs in the worker's scratch directory, which is added to
+        ``fs_allowlist``. Returns ``exit_code``, ``stdout``, ``stderr``,
+        ``timed_out``, ``workdir`` and ``warm`` (whether an already running
+        worker served the job).
+        """
+        if self._closed:
+            raise RuntimeError("sandbox pool is closed")
+        worker, warm = self._acquire(mem_limit_mb)
+        job = {
+            "code": code,
+            "time_limit_sec": time_limit_sec,
+            "cpu_limit_sec": cpu_limit_sec,
+            "fs_allowlist": fs_allowlist,
+        }
+        # The worker kills an overrunning child itself; this only guards against
+        # a template that stopped answering.
+        response = worker.run(job, timeout=time_limit_sec + 5)
+        with self._lock:
+            self.stats["runs"] += 1
+            if warm:
+                self.stats["warm_runs"] += 1
+
+        if response is None:
+            timed_out = worker.alive()
+            self._release(worker, "timeout" if timed_out else "crashed")
+            if timed_out:
+                return {
+                    "exit_code": None,
+                    "stdout": "",
+                    "stderr": "",
+                    "timed_out": True,
+                    "workdir": worker.scratch,
+                    "warm": warm,
+                }
+            return {
+                "exit_code": worker.process.returncode,
+                "stdout": "",
+                "stderr": "",
+                "timed_out": False,
+                "workdir": worker.scratch,
+                "warm": warm,
+            }
+
+        self._release(worker, response.get("recycle"))
+        return {
+            "exit_code": response.get("exit_code", 1),
+            "stdout": response.get("stdout", ""),
+            "stderr": response.get("stderr", ""),
+            "timed_out": bool(response.get("timed_out")),
+            "workdir": worker.scratch,
+            "warm": warm,
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **{k: (dict(v) if isinstance(v, dict) else v) for k, v in self.stats.items()},
+                "idle_workers": {mem: len(ws) for mem, ws in self._idle.items()},
+                "size": self.config.size,
+                "max_runs_per_worker": self.config.max_runs_per_worker,
+            }
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._closed = True
+            workers = [w for ws in self._idle.values() for w in ws]
+            self._idle.clear()
+        for worker in workers:
+            worker.kill()
+
+
+_pool: Optional[SandboxWorkerPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_sandbox_pool() -> SandboxWorkerPool:
+    """Get the process-wide sandbox pool, creating it on first use"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = SandboxWorkerPool(runner=_default_runner())
+            atexit.register(_pool.shutdown)
+        return _pool
@@ -0,0 +1,302 @@
+"""
+Warm Sandbox Worker
+
+Standalone script (stdlib only, run by path rather than imported) that serves
+sandbox.run_python jobs for SandboxWorkerPool. The worker itself is a warm
+template: it pays interpreter start-up and stdlib imports once, applies the
+memory limit, and then forks one child per job read as JSON lines from its
+private copy of stdin. Only the child installs the network guard and
+filesystem allowlist hooks and runs user code, so nothing a job changes
+(globals, patched modules, signal handlers, os.environ, threads) survives
+into the next job. Each job is answered with one JSON line.
+
+fds 0/1/2 are pointed at /dev/null in the template and at per-worker scratch
+files in the child, so user code can neither read the protocol stream nor
+corrupt it by writing to stdout. User code runs in the worker's scratch
+directory, which is emptied after every job.
+"""
+
+import builtins
+import errno
+import json
+import os
+import pathlib
+import resource
+import select
+import shutil
+import signal
+import socket
+import sys
+import tempfile
+import time
+
+FS_ALLOWLIST = []
+
+# Extra wall time the template grants a child before killing it outright
+KILL_GRACE_SEC = 1.0
+
+
+class _LimitExceeded(Exception):
+    pass
+
+
+def _is_path_allowed(path):
+    try:
+        real = os.path.realpath(path)
+    except Exception:
+        return False
+    for allowed in FS_ALLOWLIST:
+        allowed_real = os.path.realpath(allowed)
+        if real.startswith(allowed_real + os.sep) or real == allowed_real:
+            return True
+    return False
+
+
+class _NetworkDisabledSocket:
+    def __init__(self, *args, **kwargs):
+        raise OSError(errno.EPERM, 'Network access is disabled in sandbox')
+
+
+_real_open = builtins.open
+_os_open = os.open
+_path_open = pathlib.Path.open
+
+
+def _guarded_open(file, *args, **kwargs):
+    path = str(file)
+    if not _is_path_allowed(path):
+        raise PermissionError(errno.EPERM, f'File access denied by sandbox: {path}')
+    return _real_open(file, *args, **kwargs)
+
+
+def _guarded_os_open(file, flags, mode=0o777, *args, **kwargs):
+    path = str(file)
+    if not _is_path_allowed(path):
+        raise PermissionError(errno.EPERM, f'File access denied by sandbox: {path}')
+    return _os_open(file, flags, mode, *args, **kwargs)
+
+
+def _guarded_path_open(self, *args, **kwargs):
+    path = str(self)
+    if not _is_path_allowed(path):
+        raise PermissionError(errno.EPERM, f'File access denied by sandbox: {path}')
+    return _path_open(self, *args, **kwargs)
+
+
+def _install_guards():
+    socket.socket = _NetworkDisabledSocket  # type: ignore
+    builtins.open = _guarded_open  # type: ignore
+    os.open = _guarded_os_open  # type: ignore
+    pathlib.Path.open = _guarded_path_open  # type: ignore
+
+
+def _set_memory_limit(mem_limit_mb):
+    # Hard limit: fixed for the lifetime of the worker and inherited by every child
+    try:
+        limit_bytes = max(mem_limit_mb, 16) * 1024 * 1024
+        if hasattr(resource, 'RLIMIT_AS'):
+            resource.setrlimit(resource.RLIMIT_AS, (limit_bytes, limit_bytes))
+        elif hasattr(resource, 'RLIMIT_DATA'):
+            resource.setrlimit(resource.RLIMIT_DATA, (limit_bytes, limit_bytes))
+    except Exception:
+        pass
+
+
+def _set_cpu_limit(cpu_limit_sec):
+    # A forked child starts with zero CPU time, so the limit is absolute. The
+    # hard limit one second later kills code that ignores SIGXCPU.
+    try:
+        soft = max(1, cpu_limit_sec)
+        resource.setrlimit(resource.RLIMIT_CPU, (soft, soft + 1))
+    except Exception:
+        pass
+
+
+def _on_time_limit(signum, frame):
+    raise _LimitExceeded('sandbox time limit exceeded')
+
+
+def _on_cpu_limit(signum, frame):
+    raise _LimitExceeded('sandbox cpu limit exceeded')
+
+
+class _Capture:
+    """Scratch files that stand in for fds 1 and 2 while a job runs"""
+
+    def __init__(self):
+        self.stdout = tempfile.TemporaryFile()
+        self.stderr = tempfile.TemporaryFile()
+        self.devnull = os.open(os.devnull, os.O_RDWR)
+
+    def reset(self):
+        for f in (self.stdout, self.stderr):
+            f.seek(0)
+            f.truncate()
+
+    def attach(self):
+        os.dup2(self.devnull, 0)
+        os.dup2(self.stdout.fileno(), 1)
+        os.dup2(self.stderr.fileno(), 2)
+
+    def read(self):
+        out = []
+        for f in (self.stdout, self.stderr):
+            f.seek(0)
+            out.append(f.read().decode('utf-8', errors='replace'))
+        return out
+
+
+def _child(job, capture, scratch, protocol_fds):
+    """Run one job in the forked child and exit with its status; never returns"""
+    exit_code = 1
+    try:
+        for fd in protocol_fds:
+            os.close(fd)
+        os.setpgid(0, 0)
+        capture.attach()
+        os.chdir(scratch)
+        FS_ALLOWLIST[:] = list(job.get('fs_allowlist') or []) + [scratch]
+        os.environ['CFLOW_SANDBOX_ALLOWLIST'] = json.dumps(FS_ALLOWLIST)
+        _install_guards()
+        signal.signal(signal.SIGALRM, _on_time_limit)
+        if hasattr(signal, 'SIGXCPU'):
+            signal.signal(signal.SIGXCPU, _on_cpu_limit)
+        _set_cpu_limit(int(job.get('cpu_limit_sec', 3)))
+        signal.alarm(max(1, int(job.get('time_limit_sec', 3))))
+        try:
+            code = compile(job['code'], filename='user_code.py', mode='exec')
+            exec(code, {'__name__': '__main__'}, None)
+            exit_code = 0
+        except _LimitExceeded as le:
+            print(str(le), file=sys.__stderr__)
+            exit_code = 124
+        except SystemExit as se:
+            if se.code is None:
+                exit_code = 0
+            elif isinstance(se.code, int):
+                exit_code = se.code
+            else:
+                print(str(se.code), file=sys.__stderr__)
+                exit_code = 1
+        except BaseException as e:
+            print(str(e), file=sys.__stderr__)
+            exit_code = 1
+        finally:
+            signal.alarm(0)
+        for stream in (sys.stdout, sys.stderr, sys.__stdout__, sys.__stderr__):
+            try:
+                stream.flush()
+            except BaseException:
+                pass
+    finally:
+        os._exit(exit_code & 0xFF)
+
+
+def _wait_child(pid, deadline):
+    """Wait for ``pid`` until ``deadline``; returns its wait status or None on timeout"""
+    pidfd = None
+    if hasattr(os, 'pidfd_open'):
+        try:
+            pidfd = os.pidfd_open(pid)
+        except OSError:
+            pidfd = None
+    try:
+        delay = 0.0005
+        while True:
+            done, status = os.waitpid(pid, os.WNOHANG)
+            if done:
+                return status
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            if pidfd is not None:
+                select.select([pidfd], [], [], remaining)
+            else:
+                time.sleep(min(delay, remaining))
+                delay = min(delay * 2, 0.01)
+    finally:
+        if pidfd is not None:
+            os.close(pidfd)
+
+
+def _clear_scratch(scratch):
+    for entry in os.scandir(scratch):
+        try:
+            if entry.is_dir(follow_symlinks=False):
+                shutil.rmtree(entry.path, ignore_errors=True)
+            else:
+                os.unlink(entry.path)
+        except OSError:
+            pass
+
+
+def _run_job(job, capture, scratch, protocol_fds):
+    capture.reset()
+    for stream in (sys.stdout, sys.stderr):
+        stream.flush()
+    deadline = time.monotonic() + max(1, int(job.get('time_limit_sec', 3))) + KILL_GRACE_SEC
+
+    pid = os.fork()
+    if pid == 0:
+        _child(job, capture, scratch, protocol_fds)
+
+    status = _wait_child(pid, deadline)
+    timed_out = status is None
+    # Take down anything the job left behind in its process group
+    try:
+        os.killpg(pid, signal.SIGKILL)
+    except OSError:
+        pass
+    if timed_out:
+        try:
+            os.kill(pid, signal.SIGKILL)
+        except OSError:
+            pass
+        os.waitpid(pid, 0)
+
+    stdout, stderr = capture.read()
+    _clear_scratch(scratch)
+    if timed_out:
+        return {'exit_code': None, 'stdout': stdout, 'stderr': stderr, 'timed_out': True}
+    if os.WIFSIGNALED(status):
+        exit_code = -os.WTERMSIG(status)
+    else:
+        exit_code = os.WEXITSTATUS(status)
+    return {'exit_code': exit_code, 'stdout': stdout, 'stderr': stderr, 'timed_out': False}
+
+
+def main():
+    mem_limit_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 256
+    scratch = os.path.realpath(sys.argv[2]) if len(sys.argv) > 2 else tempfile.mkdtemp(prefix='cflow_sandbox_')
+    proto_in = os.fdopen(os.dup(0), 'rb')
+    proto_out = os.fdopen(os.dup(1), 'wb')
+    capture = _Capture()
+    os.dup2(capture.devnull, 0)
+    os.dup2(capture.devnull, 1)
+    os.dup2(capture.devnull, 2)
+    protocol_fds = (proto_in.fileno(), proto_out.fileno())
+
+    _set_memory_limit(mem_limit_mb)
+
+    proto_out.write(json.dumps({'ready': True, 'pid': os.getpid()}).encode('utf-8') + b'\n')
+    proto_out.flush()
+    while True:
+        line = proto_in.readline()
+        if not line:
+            return
+        try:
+            response = _run_job(json.loads(line), capture, scratch, protocol_fds)
+        except Exception as e:
+            response = {
+                'exit_code': 1,
+                'stdout': '',
+                'stderr': f'sandbox worker error: {e}',
+                'timed_out': False,
+                'recycle': 'error',
+            }
+        proto_out.write(json.dumps(response).encode('utf-8') + b'\n')
+        proto_out.flush()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,21 @@
 import sys
+import os
+import json
 import asyncio
+import logging
 from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# JSON-RPC 2.0 error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+
+MethodHandler = Callable[[str, Dict[str, Any]], Awaitable[Any]]
 
 
 @asynccontextmanager
@@ -22,3 +37,279 @@ async def stdio_server():
         await writer.wait_closed()
 
 
+class JsonRpcError(Exception):
+    """Error raised by a method handler to produce a JSON-RPC error response"""
+
+    def __init__(self, code: int, message: str, data: Any = None):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+        self.data = data
+
+    def to_dict(self) -> Dict[str, Any]:
+        error: Dict[str, Any] = {"code": self.code, "message": self.message}
+        if self.data is not None:
+            error["data"] = self.data
+        return error
+
+
+class MessageFramer:
+    """Incremental newline-delimited message framer.
+
+    Bytes are fed as they arrive; complete messages are returned as soon as
+    their terminating newline is seen, so a large read never waits for the
+    rest of the stream. Oversized messages are reported as ``None`` and
+    discarded up to the next newline.
+    """
+
+    def __init__(self, max_message_bytes: int = 16 * 1024 * 1024):
+        self.max_message_bytes = max_message_bytes
+        self._buffer = bytearray()
+        self._discarding = False
+
+    def feed(self, data: bytes) -> List[Optional[bytes]]:
+        messages: List[Optional[bytes]] = []
+        self._buffer.extend(data)
+        start = 0
+        while True:
+            end = self._buffer.find(b"\n", start)
+            if end < 0:
+                break
+            if self._discarding:
+                self._discarding = False
+            else:
+                line = bytes(self._buffer[start:end]).strip()
+                if line:
+                    messages.append(line if len(line) <= self.max_message_bytes else None)
+            start = end + 1
+        del self._buffer[:start]
+        if len(self._buffer) > self.max_message_bytes:
+            if not self._discarding:
+                messages.append(None)
+            self._discarding = True
+            self._buffer.clear()
+        return messages
+
+    def flush(self) -> List[Optional[bytes]]:
+        """Return a trailing message that was not newline-terminated before EOF"""
+        line = bytes(self._buffer).strip()
+        self._buffer.clear()
+        if self._discarding or not line:
+            self._discarding = False
+            return []
+        return [line]
+
+
+def _error_response(request_id: Any, error: JsonRpcError) -> Dict[str, Any]:
+    return {"jsonrpc": "2.0", "id": request_id, "error": error.to_dict()}
+
+
+class JsonRpcStdioServer:
+    """Concurrent JSON-RPC 2.0 server loop over a stream reader/writer pair.
+
+    Requests are dispatched as independent tasks so a slow tool call does not
+    hold up later requests on the same pipe. At most ``max_in_flight``
+    requests run at once; once the limit is reached the read loop stops
+    consuming input until a slot frees up. Responses are written in completion
+    order through a bounded queue drained by a single writer task, and a
+    request keeps its slot until its response is queued, so a slow reader on
+    the other end throttles intake instead of letting responses pile up.
+    """
+
+    def __init__(
+        self,
+        handler: MethodHandler,
+        max_in_flight: Optional[int] = None,
+        max_pending_writes: int = 64,
+        read_chunk_size: int = 64 * 1024,
+        max_message_bytes: int = 16 * 1024 * 1024,
+    ):
+        if max_in_flight is None:
+            max_in_flight = int(os.getenv("CFLOW_STDIO_MAX_IN_FLIGHT", "16") or "16")
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be at least 1")
+        self.handler = handler
+        self.max_in_flight = max_in_flight
+        self.max_pending_writes = max_pending_writes
+        self.read_chunk_size = read_chunk_size
+        self.max_message_bytes = max_message_bytes
+        self.stats = {"requests": 0, "notifications": 0, "batches": 0, "errors": 0, "max_in_flight_seen": 0}
+        self._in_flight = 0
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._outbox: Optional[asyncio.Queue] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def serve(self, reader: asyncio.StreamReader, writer: Any) -> None:
+        """Serve until ``reader`` reaches EOF and all in-flight requests finish"""
+        self._slots = asyncio.Semaphore(self.max_in_flight)
+        self._outbox = asyncio.Queue(maxsize=self.max_pending_writes)
+        writer_task = asyncio.create_task(self._write_loop(writer))
+        framer = MessageFramer(self.max_message_bytes)
+        try:
+            while True:
+                chunk = await reader.read(self.read_chunk_size)
+                messages = framer.feed(chunk) if chunk else framer.flush()
+                for raw in messages:
+                    await self._handle_message(raw)
+                if not chunk:
+                    break
+            if self._tasks:
+                await asyncio.gather(*list(self._tasks), return_exceptions=True)
+            await self._outbox.put(None)
+            await writer_task
+        finally:
+            for task in list(self._tasks):
+                task.cancel()
+            if not writer_task.done():
+                writer_task.cancel()
+
+    async def _write_loop(self, writer: Any) -> None:
+        assert self._outbox is not None
+        while True:
+            payload = await self._outbox.get()
+            if payload is None:
+                return
+            writer.write(json.dumps(payload, separators=(",", ":"), default=str).encode("utf-8") + b"\n")
+            await writer.drain()
+
+    async def _emit(self, payload: Any) -> None:
+        assert self._outbox is not None
+        await self._outbox.put(payload)
+
+    async def _handle_message(self, raw: Optional[bytes]) -> None:
+        if raw is None:
+            self.stats["errors"] += 1
+            await self._emit(_error_response(None, JsonRpcError(INVALID_REQUEST, "Message too large")))
+            return
+        try:
+            message = json.loads(raw)
+        except ValueError as e:
+            self.stats["errors"] += 1
+            await self._emit(_error_response(None, JsonRpcError(PARSE_ERROR, f"Parse error: {e}")))
+            return
+
+        if isinstance(message, list):
+            if not message:
+                await self._emit(_error_response(None, JsonRpcError(INVALID_REQUEST, "Empty batch")))
+                return
+            self.stats["batches"] += 1
+            # A batch holds up to max_in_flight slots and runs its items under them
+            slots = min(len(message), self.max_in_flight)
+            await self._acquire(slots)
+            self._track(asyncio.create_task(self._finish_batch(message, slots)))
+            return
+
+        await self._acquire(1)
+        self._track(asyncio.create_task(self._finish_single(message)))
+
+    async def _acquire(self, count: int) -> None:
+        """Wait for ``count`` in-flight slots.
+
+        Only the read loop acquires, so taking several slots one at a time
+        cannot deadlock; slots are given back once the response is queued.
+        """
+        assert self._slots is not None
+        for _ in range(count):
+            await self._slots.acquire()
+        self._in_flight += count
+        self.stats["max_in_flight_seen"] = max(self.stats["max_in_flight_seen"], self._in_flight)
+
+    def _release(self, count: int) -> None:
+        assert self._slots is not None
+        self._in_flight -= count
+        for _ in range(count):
+            self._slots.release()
+
+    def _track(self, task: asyncio.Task) -> None:
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _finish_single(self, message: Any) -> None:
+        # The slot is held until the response is in the outbox, so a slow
+        # stdout reader stalls the read loop instead of piling up responses.
+        try:
+            response = await self._dispatch(message)
+            if response is not None:
+                await self._emit(response)
+        finally:
+            self._release(1)
+
+    async def _finish_batch(self, items: List[Any], slots: int) -> None:
+        gate = asyncio.Semaphore(slots)
+
+        async def run(item: Any) -> Optional[Dict[str, Any]]:
+            async with gate:
+                return await self._dispatch(item)
+
+        try:
+            responses = [r for r in await asyncio.gather(*(run(item) for item in items)) if r is not None]
+            if responses:
+                await self._emit(responses)
+        finally:
+            self._release(slots)
+
+    async def _dispatch(self, message: Any) -> Optional[Dict[str, Any]]:
+        """Run one request; returns the response, or None for notifications"""
+        if not isinstance(message, dict) or not isinstance(message.get("method"), str):
+            self.stats["errors"] += 1
+            request_id = message.get("id") if isinstance(message, dict) else None
+            return _error_response(request_id, JsonRpcError(INVALID_REQUEST, "Invalid Request"))
+
+        is_notification = "id" not in message
+        request_id = message.get("id")
+        self.stats["notifications" if is_notification else "requests"] += 1
+        params = message.get("params")
+        if params is None:
+            params = {}
+        try:
+            if not isinstance(params, dict):
+                raise JsonRpcError(INVALID_PARAMS, "params must be an object")
+            result = await self.handler(message["method"], params)
+        except JsonRpcError as e:
+            self.stats["errors"] += 1
+            return None if is_notification else _error_response(request_id, e)
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.exception(f"Unhandled error in JSON-RPC method {message['method']}")
+            return None if is_notification else _error_response(request_id, JsonRpcError(INTERNAL_ERROR, str(e)))
+        if is_notification:
+            return None
+        return {"jsonrpc": "2.0", "id": request_id, "result": result}
+
+
+async def mcp_method_handler(method: str, params: Dict[str, Any]) -> Any:
+    """Default MCP method handler backed by the tool registry and direct client"""
+    if method == "initialize":
+        return {
+            "protocolVersion": params.get("protocolVersion", "2024-11-05"),
+            "capabilities": {"tools": {"listChanged": False}},
+            "serverInfo": {"name": "cflow-platform", "version": "1.0.0"},
+        }
+    if method == "ping":
+        return {}
+    if method == "tools/list":
+        from cflow_platform.core.tool_registry import ToolRegistry
+
+        return {"tools": ToolRegistry.get_tools_for_mcp()}
+    if method == "tools/call":
+        from cflow_platform.core.direct_client import execute_mcp_tool
+
+        name = params.get("name")
+        if not isinstance(name, str):
+            raise JsonRpcError(INVALID_PARAMS, "tools/call requires a tool name")
+        result = await execute_mcp_tool(name, **(params.get("arguments") or {}))
+        is_error = isinstance(result, dict) and result.get("status") == "error"
+        return {
+            "content": [{"type": "text", "text": json.dumps(result, default=str)}],
+            "isError": is_error,
+        }
+    if method.startswith("notifications/"):
+        return None
+    raise JsonRpcError(METHOD_NOT_FOUND, f"Method not found: {method}")
+
+
+async def run_stdio_server(handler: MethodHandler = mcp_method_handler, **server_options: Any) -> None:
+    """Serve JSON-RPC requests over this process's stdin/stdout"""
+    server = JsonRpcStdioServer(handler, **server_options)
+    async with stdio_server() as (reader, writer):
+        await server.serve(reader, writer)
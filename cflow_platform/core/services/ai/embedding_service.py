@@ -6,15 +6,24 @@ Unified Embedding Service - Core Implementation
 Centralized service for generating vector embeddings using Apple Silicon
 accelerator with caching and thread-safe singleton access pattern.
 Consolidates all embedding functionality into a single service.
+Embeddings are cached on disk per model (see ``embedding_cache``), so
+short-lived CLIs and other processes reuse each other's work.
 """
 
-import hashlib
+import asyncio
 import logging
 import threading
 from typing import List, Dict, Optional, Any
 
+from cflow_platform.core.embeddings.embedding_batcher import get_embedding_batcher
+from cflow_platform.core.embeddings.embedding_cache import (
+    EmbeddingCache,
+    embedding_cache_enabled,
+    get_embedding_cache,
+)
 from cflow_platform.core.embeddings.enhanced_apple_silicon_accelerator import (
     EnhancedAppleSiliconAccelerator,
+    get_enhanced_accelerator,
 )
 
 logger = logging.getLogger(__name__)
@@ -26,7 +35,8 @@ class EmbeddingService:
     _instance: Optional["EmbeddingService"] = None
     _lock = threading.Lock()
     _accelerator: Optional[EnhancedAppleSiliconAccelerator] = None
-    _embedding_cache: Dict[str, List[float]] = {}
+    _embedding_cache: Optional[EmbeddingCache] = None
+    _cache_failed = False
     _initialized = False
 
     def __new__(cls) -> "EmbeddingService":
@@ -43,44 +53,66 @@ class EmbeddingService:
             if self._initialized:
                 return
             logger.info("Initializing Unified Embedding Service...")
-            self._accelerator = EnhancedAppleSiliconAccelerator()
+            self._accelerator = get_enhanced_accelerator()
             self._initialized = True
             logger.info("Unified Embedding Service initialized.")
 
     async def generate_embeddings(self, texts: List[str]) -> List[List[float]]:
-        """Generate embeddings for a list of texts (async interface)."""
-        return self.embed_documents(texts)
+        """Generate embeddings for a list of texts (async interface).
+
+        Small requests are micro-batched with other concurrent callers on the
+        same event loop; requests of at least a full batch go straight to the
+        model in one call. Either way the work runs off the loop.
+        """
+        batcher = get_embedding_batcher()
+        if len(texts) >= batcher.max_batch_size:
+            # Splitting bulk input into sequential max_batch_size calls only slows it down
+            return await asyncio.to_thread(self.embed_documents, list(texts))
+        return await batcher.embed_many(texts)
+
+    def _get_cache(self) -> Optional[EmbeddingCache]:
+        """Persistent cache for the active model, or None when disabled/unavailable."""
+        if self._cache_failed or not embedding_cache_enabled() or not self._accelerator:
+            return None
+        if self._embedding_cache is None:
+            namespace = self._accelerator.cache_namespace()
+            try:
+                self._embedding_cache = get_embedding_cache(namespace, self._accelerator.current_dimensions)
+            except Exception as e:
+                logger.warning("Embedding cache unavailable, continuing without it: %s", e)
+                self._cache_failed = True
+                return None
+        return self._embedding_cache
 
     def embed_documents(self, texts: List[str]) -> List[List[float]]:
         """Generate embeddings for a list of texts (sync interface)."""
         if not self._accelerator:
             raise RuntimeError("EmbeddingService is not initialized.")
 
-        results: List[Optional[List[float]]] = []
-        texts_to_process: List[str] = []
-        indices_to_process: List[int] = []
+        cache = self._get_cache()
+        results: List[Optional[List[float]]] = (
+            cache.get_many(texts) if cache is not None else [None] * len(texts)
+        )
 
-        # Cache lookup
+        # Generate for missing (each distinct text once)
+        missing: Dict[str, List[int]] = {}
         for i, text in enumerate(texts):
-            text_hash = hashlib.md5(text.encode()).hexdigest()
-            if text_hash in self._embedding_cache:
-                results.append(self._embedding_cache[text_hash])
-            else:
-                results.append(None)
-                texts_to_process.append(text)
-                indices_to_process.append(i)
-
-        # Generate for missing
-        if texts_to_process:
+            if results[i] is None:
+                missing.setdefault(text, []).append(i)
+        if missing:
+            texts_to_process = list(missing)
             logger.info("Generating embeddings for %d texts", len(texts_to_process))
             new_embeddings = self._accelerator.generate_embeddings(texts_to_process)
             if not new_embeddings or len(new_embeddings) != len(texts_to_process):
                 raise RuntimeError("Failed to generate embeddings for all texts.")
-            for i, embedding in enumerate(new_embeddings):
-                original_index = indices_to_process[i]
-                results[original_index] = embedding
-                text_hash = hashlib.md5(texts_to_process[i].encode()).hexdigest()
-                self._embedding_cache[text_hash] = embedding
+            for text, embedding in zip(texts_to_process, new_embeddings):
+                for original_index in missing[text]:
+                    results[original_index] = embedding
+            if cache is not None and len(new_embeddings[0]) == cache.dim:
+                try:
+                    cache.put_many(texts_to_process, new_embeddings)
+                except Exception as e:
+                    logger.warning("Failed to persist embeddings: %s", e)
 
         if any(r is None for r in results):
             raise RuntimeError("Failed to generate embeddings for some texts.")
@@ -90,11 +122,19 @@ class EmbeddingService:
         """Generate embedding for a single query text."""
         return self.embed_documents([text])[0]
 
+    async def embed_query_async(self, text: str) -> List[float]:
+        """Generate embedding for a single query text, batched with concurrent callers."""
+        return await get_embedding_batcher().embed(text)
+
     def get_model_info(self) -> Dict[str, Any]:
         """Get model and cache information."""
+        cache = self._get_cache()
         return {
-            "cache_size": len(self._embedding_cache),
+            "cache_size": len(cache) if cache is not None else 0,
+            "cache": cache.get_stats() if cache is not None else None,
             "accelerator_type": "EnhancedAppleSiliconAccelerator",
+            "model_name": getattr(self._accelerator, "current_model", None),
+            "dimensions": getattr(self._accelerator, "current_dimensions", None),
             "initialized": self._initialized
         }
 
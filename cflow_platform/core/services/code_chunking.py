@@ -0,0 +1,238 @@
+"""
+Code Chunking for Codebase Vectorization
+
+File selection, language detection and chunking shared by the codebase
+vectorizer and its parallel pipeline. Kept free of model and vector-store
+imports so process-pool workers can import it cheaply.
+
+Python, TypeScript and JavaScript are chunked along their structure
+(``chunk_source``), using the definition spans from
+``code_intel.function_extractor``:
+- Chunks are cut at function and class boundaries, never inside a
+  definition that fits the budget; comments directly above a definition
+  stay with it
+- Definitions of at least ``STANDALONE_CHARS`` get a chunk of their own;
+  runs of smaller definitions and the module code between them are packed
+  together up to ``MAX_CHUNK_CHARS``
+- Oversized classes are split at their methods, and only an oversized
+  leaf is split into consecutive line windows
+- No overlap, so no text is embedded twice; because boundaries follow the
+  code, editing one function leaves the other chunks (and their content
+  hashes) unchanged
+Other languages keep the fixed overlapping line window (``chunk_lines``).
+"""
+
+import hashlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, List, Sequence, Tuple
+
+from cflow_platform.core.code_intel.function_extractor import definition_spans
+
+EXCLUDED_PARTS = (
+    "__pycache__",
+    ".git/",
+    "node_modules",
+    ".venv",
+    "venv",
+    ".DS_Store",
+)
+
+# Roughly the text of the old 50-line window; definitions of at least half
+# that size are embedded on their own
+MAX_CHUNK_CHARS = 3072
+STANDALONE_CHARS = 1536
+
+STRUCTURED_LANGUAGES = {"python", "typescript", "javascript"}
+
+# Bump when chunk boundaries change so indexed files are re-chunked once
+CHUNKER_VERSION = 2
+
+_COMMENT_PREFIXES = {
+    "python": ("#",),
+    "typescript": ("//", "/*", "*"),
+    "javascript": ("//", "/*", "*"),
+}
+
+LANGUAGES = {
+    ".py": "python",
+    ".ts": "typescript",
+    ".tsx": "typescript",
+    ".js": "javascript",
+    ".jsx": "javascript",
+    ".rs": "rust",
+    ".go": "go",
+    ".java": "java",
+    ".cpp": "cpp",
+    ".c": "c",
+    ".h": "c",
+    ".hpp": "cpp",
+    ".sql": "sql",
+    ".md": "markdown",
+    ".json": "json",
+    ".yaml": "yaml",
+    ".yml": "yaml",
+    ".toml": "toml",
+}
+
+
+@dataclass
+class CodeChunk:
+    content: str
+    file_path: str
+    start_line: int
+    end_line: int
+    language: str
+    hash: str
+
+
+def should_index(file_path: str) -> bool:
+    if any(x in file_path for x in EXCLUDED_PARTS):
+        return False
+    return Path(file_path).suffix.lower() in LANGUAGES
+
+
+def language_for(file_path: str) -> str:
+    return LANGUAGES.get(Path(file_path).suffix.lower(), "unknown")
+
+
+def _make_chunk(text: str, file_path: str, start: int, end: int, language: str) -> CodeChunk:
+    return CodeChunk(
+        content=text,
+        file_path=file_path,
+        start_line=start,
+        end_line=end,
+        language=language,
+        hash=hashlib.sha256(text.encode("utf-8")).hexdigest(),
+    )
+
+
+def chunk_lines(content: str, file_path: str, language: str, size: int = 50, overlap: int = 5) -> List[CodeChunk]:
+    """Fixed windows of ``size`` lines, each overlapping the previous by ``overlap``"""
+    lines = content.split("\n")
+    chunks: List[CodeChunk] = []
+    i = 0
+    while i < len(lines):
+        part = lines[i : i + size]
+        txt = "\n".join(part)
+        if txt.strip():
+            chunks.append(_make_chunk(txt, file_path, i + 1, min(i + size, len(lines)), language))
+        i += size - overlap
+    return chunks
+
+
+def read_source(path: Path) -> str:
+    return path.read_text(encoding="utf-8", errors="ignore")
+
+
+def source_hash(content: str) -> str:
+    """File fingerprint recorded in the manifest; covers the chunker version too"""
+    return hashlib.sha256(f"{CHUNKER_VERSION}\0{content}".encode("utf-8")).hexdigest()
+
+
+Span = Tuple[int, int]
+
+
+def _with_leading_comments(spans: Sequence[Span], lines: Sequence[str], language: str) -> List[Span]:
+    prefixes = _COMMENT_PREFIXES.get(language, ())
+    extended: List[Span] = []
+    for start, end in spans:
+        while start > 1 and lines[start - 2].strip().startswith(prefixes):
+            start -= 1
+        extended.append((start, end))
+    return extended
+
+
+def _outermost(spans: Sequence[Span], lo: int, hi: int) -> List[Span]:
+    """Definitions directly inside ``lo..hi`` (nested and overlapping spans dropped)"""
+    result: List[Span] = []
+    for start, end in sorted(spans, key=lambda s: (s[0], -s[1])):
+        if start < lo or end > hi or (start, end) == (lo, hi):
+            continue
+        if result and start <= result[-1][1]:
+            continue
+        result.append((start, end))
+    return result
+
+
+def _windows(lo: int, hi: int, size: Callable[[int, int], int], max_chars: int) -> List[Span]:
+    windows: List[Span] = []
+    start = lo
+    for line in range(lo, hi + 1):
+        if line > start and size(start, line) > max_chars:
+            windows.append((start, line - 1))
+            start = line
+    windows.append((start, hi))
+    return windows
+
+
+def _units(lo: int, hi: int, spans: Sequence[Span], size: Callable[[int, int], int], max_chars: int) -> List[Tuple[int, int, bool]]:
+    """Cover ``lo..hi`` with (start, end, is_definition) units that each fit ``max_chars``"""
+    units: List[Tuple[int, int, bool]] = []
+    cursor = lo
+    for start, end in _outermost(spans, lo, hi):
+        if start > cursor:
+            units.append((cursor, start - 1, False))
+        units.append((start, end, True))
+        cursor = end + 1
+    if cursor <= hi:
+        units.append((cursor, hi, False))
+
+    fitted: List[Tuple[int, int, bool]] = []
+    for start, end, is_def in units:
+        if size(start, end) <= max_chars:
+            fitted.append((start, end, is_def))
+        elif is_def and _outermost(spans, start, end):
+            fitted.extend(_units(start, end, spans, size, max_chars))
+        else:
+            fitted.extend((a, b, is_def) for a, b in _windows(start, end, size, max_chars))
+    return fitted
+
+
+def chunk_source(
+    content: str,
+    file_path: str,
+    language: str,
+    max_chars: int = MAX_CHUNK_CHARS,
+    standalone_chars: int = STANDALONE_CHARS,
+) -> List[CodeChunk]:
+    """Structure-aware chunks for Python/TS/JS; line windows for other languages"""
+    if language not in STRUCTURED_LANGUAGES:
+        return chunk_lines(content, file_path, language)
+    lines = content.split("\n")
+    offsets = [0]
+    for line in lines:
+        offsets.append(offsets[-1] + len(line) + 1)
+
+    def size(start: int, end: int) -> int:
+        return offsets[end] - offsets[start - 1] - 1
+
+    spans = _with_leading_comments(definition_spans(Path(file_path), content), lines, language)
+    ranges: List[Span] = []
+    current: List[int] = []
+    for start, end, is_def in _units(1, len(lines), spans, size, max_chars):
+        if not "".join(lines[start - 1 : end]).strip():
+            continue
+        if is_def and size(start, end) >= standalone_chars:
+            if current:
+                ranges.append((current[0], current[1]))
+                current = []
+            ranges.append((start, end))
+        elif current and size(current[0], end) <= max_chars:
+            current[1] = end
+        else:
+            if current:
+                ranges.append((current[0], current[1]))
+            current = [start, end]
+    if current:
+        ranges.append((current[0], current[1]))
+
+    chunks: List[CodeChunk] = []
+    for start, end in ranges:
+        # Trim blank edges so spacing changes do not alter the content hash
+        while not lines[start - 1].strip():
+            start += 1
+        while not lines[end - 1].strip():
+            end -= 1
+        chunks.append(_make_chunk("\n".join(lines[start - 1 : end]), file_path, start, end, language))
+    return chunks
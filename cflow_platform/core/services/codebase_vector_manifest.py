@@ -0,0 +1,202 @@
+"""
+Codebase Vector Manifest
+
+Records which chunk vectors the codebase vectorizer has stored for each
+file, so a commit only costs embeddings for chunks that actually changed:
+- Per file: content hash of the whole file (unchanged files are skipped
+  without chunking) and the commit that last indexed it
+- Per chunk: a stable id derived from file path and chunk content hash,
+  plus its current line range
+- ``diff`` compares a file's fresh chunks with the manifest and returns the
+  chunks to embed, the unchanged chunks whose line range moved (metadata
+  update only) and the ids of chunks that disappeared
+- Kept beside the Chroma store it describes; if it has to be discarded,
+  the following commit re-embeds every chunk once
+"""
+
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from cflow_platform.core.sqlite_wal import open_wal_database, rollback
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS files (
+    file_path TEXT PRIMARY KEY,
+    content_hash TEXT NOT NULL,
+    commit_hash TEXT,
+    indexed_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS chunks (
+    file_path TEXT NOT NULL,
+    chunk_id TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    start_line INTEGER NOT NULL,
+    end_line INTEGER NOT NULL,
+    PRIMARY KEY (file_path, chunk_id)
+) WITHOUT ROWID;
+"""
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def chunk_id(file_path: str, chunk_hash: str, ordinal: int = 0) -> str:
+    """Stable vector id for a chunk; ``ordinal`` separates identical chunks within one file"""
+    return hashlib.sha256(f"{file_path}\0{chunk_hash}\0{ordinal}".encode("utf-8")).hexdigest()
+
+
+@dataclass
+class ManifestChunk:
+    chunk_id: str
+    content_hash: str
+    start_line: int
+    end_line: int
+
+
+@dataclass
+class ChunkDiff:
+    """What has to change in the vector store for one file"""
+    added: List[int] = field(default_factory=list)  # indices into the fresh chunk list
+    moved: List[int] = field(default_factory=list)  # same content, new line range
+    unchanged: int = 0
+    removed: List[str] = field(default_factory=list)  # chunk ids
+
+
+def manifest_chunks(file_path: str, chunks: Sequence[Any]) -> List[ManifestChunk]:
+    """Manifest rows for chunks exposing ``hash``, ``start_line`` and ``end_line``"""
+    seen: Dict[str, int] = {}
+    rows: List[ManifestChunk] = []
+    for chunk in chunks:
+        ordinal = seen.get(chunk.hash, 0)
+        seen[chunk.hash] = ordinal + 1
+        rows.append(ManifestChunk(chunk_id(file_path, chunk.hash, ordinal), chunk.hash, chunk.start_line, chunk.end_line))
+    return rows
+
+
+class CodebaseVectorManifest:
+    """SQLite-backed record of the chunk vectors stored per file (thread-safe)"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._open()
+
+    def _open(self):
+        self._conn, _ = open_wal_database(self.path, _SCHEMA, SCHEMA_VERSION, ("files", "chunks"), "Vector manifest")
+
+    # ---- reads ----------------------------------------------------------------
+
+    def file_hash(self, file_path: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT content_hash FROM files WHERE file_path = ?", (file_path,)).fetchone()
+        return row[0] if row else None
+
+    def chunks(self, file_path: str) -> Dict[str, ManifestChunk]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT chunk_id, content_hash, start_line, end_line FROM chunks WHERE file_path = ?",
+                (file_path,),
+            ).fetchall()
+        return {r[0]: ManifestChunk(*r) for r in rows}
+
+    def files(self) -> List[str]:
+        with self._lock:
+            return [r[0] for r in self._conn.execute("SELECT file_path FROM files")]
+
+    def diff(self, file_path: str, fresh: Sequence[ManifestChunk]) -> ChunkDiff:
+        stored = self.chunks(file_path)
+        result = ChunkDiff()
+        for i, chunk in enumerate(fresh):
+            previous = stored.pop(chunk.chunk_id, None)
+            if previous is None:
+                result.added.append(i)
+            elif (previous.start_line, previous.end_line) != (chunk.start_line, chunk.end_line):
+                result.moved.append(i)
+            else:
+                result.unchanged += 1
+        result.removed = list(stored)
+        return result
+
+    # ---- writes ---------------------------------------------------------------
+
+    def file_hashes(self) -> Dict[str, str]:
+        """Content hash of every indexed file (used to resume a full-repository run)"""
+        with self._lock:
+            return dict(self._conn.execute("SELECT file_path, content_hash FROM files"))
+
+    def replace_file(
+        self,
+        file_path: str,
+        file_hash: str,
+        chunks: Iterable[ManifestChunk],
+        commit_hash: Optional[str] = None,
+    ):
+        """Record ``chunks`` as the complete set of stored vectors for ``file_path``"""
+        self.replace_files([(file_path, file_hash, chunks, commit_hash)])
+
+    def replace_files(self, entries: Sequence[Tuple[str, str, Iterable[ManifestChunk], Optional[str]]]):
+        """``replace_file`` for several files in one transaction"""
+        now = time.time()
+        with self._lock:
+            try:
+                self._conn.execute("BEGIN IMMEDIATE")
+                for file_path, file_hash, chunks, commit_hash in entries:
+                    self._conn.execute("DELETE FROM chunks WHERE file_path = ?", (file_path,))
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO chunks VALUES (?, ?, ?, ?, ?)",
+                        [(file_path, c.chunk_id, c.content_hash, c.start_line, c.end_line) for c in chunks],
+                    )
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)",
+                        (file_path, file_hash, commit_hash, now),
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                rollback(self._conn)
+                raise
+
+    def remove_file(self, file_path: str) -> List[str]:
+        """Forget ``file_path``; returns the chunk ids that were stored for it"""
+        with self._lock:
+            try:
+                self._conn.execute("BEGIN IMMEDIATE")
+                ids = [r[0] for r in self._conn.execute("SELECT chunk_id FROM chunks WHERE file_path = ?", (file_path,))]
+                self._conn.execute("DELETE FROM chunks WHERE file_path = ?", (file_path,))
+                self._conn.execute("DELETE FROM files WHERE file_path = ?", (file_path,))
+                self._conn.execute("COMMIT")
+            except Exception:
+                rollback(self._conn)
+                raise
+        return ids
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            files = self._conn.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+            chunks = self._conn.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+        return {"path": str(self.path), "files": files, "chunks": chunks}
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def default_manifest_path(chroma_path: str) -> Path:
+    """Manifest location for a Chroma store: a sibling file named after the store"""
+    store = Path(chroma_path)
+    return store.parent / f"{store.name}_manifest.sqlite3"
+
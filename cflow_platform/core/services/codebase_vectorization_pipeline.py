@@ -0,0 +1,451 @@
+"""
+Parallel Codebase Vectorization Pipeline
+
+Full-repository indexing used to read, chunk, embed and write one file at a
+time, so a large box sat mostly idle. The pipeline runs four stages joined
+by bounded queues, so disk I/O, chunking and model inference overlap:
+1. Discovery: ``git ls-files`` (or a directory walk), filtered like commit
+   processing
+2. Read + chunk in a process pool, a few files per task. Files whose
+   content hash matches the manifest are dropped here, so an interrupted
+   run resumes where it stopped
+3. Embedding in batches of ``embed_batch_size`` new/modified chunks, one
+   batch in flight (the model already uses every core or the GPU)
+4. Batched upserts into the vector store. A file is recorded in the
+   manifest only once all of its vectors are written, and files that no
+   longer exist are removed at the end
+- Progress callbacks plus per-stage item counts, busy time and throughput
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import subprocess
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from cflow_platform.core.services.code_chunking import (
+    CodeChunk,
+    EXCLUDED_PARTS,
+    chunk_source,
+    language_for,
+    read_source,
+    should_index,
+    source_hash,
+)
+from cflow_platform.core.services.codebase_vector_manifest import (
+    ChunkDiff,
+    ManifestChunk,
+    manifest_chunks,
+)
+
+logger = logging.getLogger(__name__)
+
+EmbedFn = Callable[[List[str]], Optional[List[List[float]]]]
+ProgressFn = Callable[[Dict[str, Any]], None]
+
+_DONE = object()
+
+
+def _default_workers() -> int:
+    try:
+        configured = int(os.getenv("CFLOW_VECTORIZE_WORKERS", "0"))
+    except ValueError:
+        configured = 0
+    if configured > 0:
+        return configured
+    from cflow_platform.core.embeddings.cpu_backend import available_cpus
+
+    # Leave a core for the embedding stage
+    return max(1, available_cpus() - 1)
+
+
+@dataclass
+class PipelineConfig:
+    workers: int = field(default_factory=_default_workers)
+    files_per_task: int = 16
+    embed_batch_size: int = 256
+    write_batch_size: int = 512
+    queue_depth: int = 8
+    prune_deleted: bool = True
+
+
+@dataclass
+class StageMetrics:
+    items: int = 0
+    busy_seconds: float = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "items": self.items,
+            "busy_seconds": round(self.busy_seconds, 3),
+            "items_per_second": round(self.items / self.busy_seconds, 1) if self.busy_seconds > 0 else 0.0,
+        }
+
+
+@dataclass
+class ChunkedFile:
+    """Result of the read + chunk stage for one file"""
+    rel_path: str
+    file_hash: str = ""
+    chunks: List[CodeChunk] = field(default_factory=list)
+    unchanged: bool = False
+    unreadable: bool = False
+
+
+def discover_files(repo_root: Path) -> List[str]:
+    """Indexable files under ``repo_root`` as repo-relative POSIX paths"""
+    try:
+        out = subprocess.check_output(
+            ["git", "ls-files", "-z", "--cached", "--others", "--exclude-standard"],
+            cwd=repo_root,
+            stderr=subprocess.DEVNULL,
+        )
+        candidates = [p for p in out.decode("utf-8", errors="replace").split("\0") if p]
+    except (OSError, subprocess.CalledProcessError):
+        candidates = []
+        for root, dirs, files in os.walk(repo_root):
+            dirs[:] = [d for d in dirs if not any(x.rstrip("/") == d for x in EXCLUDED_PARTS)]
+            rel_root = Path(root).relative_to(repo_root)
+            candidates.extend((rel_root / f).as_posix() for f in files)
+    return sorted(p for p in candidates if should_index(p) and (repo_root / p).is_file())
+
+
+def read_and_chunk(repo_root: str, rel_paths: Sequence[str], known_hashes: Dict[str, str]) -> List[ChunkedFile]:
+    """Process-pool task: read, hash and chunk a group of files"""
+    results: List[ChunkedFile] = []
+    for rel in rel_paths:
+        try:
+            content = read_source(Path(repo_root) / rel)
+        except OSError:
+            results.append(ChunkedFile(rel, unreadable=True))
+            continue
+        file_hash = source_hash(content)
+        if known_hashes.get(rel) == file_hash:
+            results.append(ChunkedFile(rel, file_hash, unchanged=True))
+            continue
+        chunks = chunk_source(content, rel, language_for(rel)) if content.strip() else []
+        results.append(ChunkedFile(rel, file_hash, chunks))
+    return results
+
+
+def _timed_read_and_chunk(repo_root: str, rel_paths: Sequence[str], known_hashes: Dict[str, str]):
+    start = time.perf_counter()
+    results = read_and_chunk(repo_root, rel_paths, known_hashes)
+    return results, time.perf_counter() - start
+
+
+def _default_embed_fn(texts: List[str]) -> Optional[List[List[float]]]:
+    """Model embeddings, or None when no model is available (no placeholder vectors)"""
+    from cflow_platform.core.embeddings.apple_silicon_accelerator import generate_accelerated_embeddings
+
+    return generate_accelerated_embeddings(texts, allow_fallback=False)
+
+
+@dataclass
+class _FileWork:
+    chunked: ChunkedFile
+    rows: List[ManifestChunk]
+    diff: ChunkDiff
+    pending: int
+    failed: bool = False
+
+
+@dataclass
+class _Slice:
+    """Part of one file's new chunks travelling through embed and write"""
+    work: _FileWork
+    indices: List[int]
+    vectors: List[Any] = field(default_factory=list)
+
+
+class CodebaseVectorizationPipeline:
+    """
+    Staged full-repository indexer for a ``CoreCodebaseVectorizer``.
+
+    Uses the vectorizer's collection, manifest and metadata; ``embed_fn``
+    defaults to the core accelerator.
+    """
+
+    def __init__(
+        self,
+        vectorizer: Any,
+        config: Optional[PipelineConfig] = None,
+        embed_fn: Optional[EmbedFn] = None,
+        progress: Optional[ProgressFn] = None,
+    ):
+        self.vectorizer = vectorizer
+        self.config = config or PipelineConfig()
+        self.embed_fn = embed_fn or _default_embed_fn
+        self.progress = progress
+        self.metrics = {name: StageMetrics() for name in ("discover", "read_chunk", "embed", "write")}
+        self.counts = {
+            "files_total": 0,
+            "files_processed": 0,
+            "files_unchanged": 0,
+            "files_deleted": 0,
+            "chunks_embedded": 0,
+            "chunks_moved": 0,
+            "chunks_unchanged": 0,
+            "chunks_deleted": 0,
+        }
+        self._failed_files: set = set()
+        self._label = ""
+        self._started = 0.0
+
+    # ---- driver -----------------------------------------------------------------
+
+    async def run(self, repo_path: str, label: Optional[str] = None) -> Dict[str, Any]:
+        self._started = time.perf_counter()
+        repo = Path(repo_path).resolve()
+        self._label = label or _head_commit(repo) or "worktree"
+
+        start = time.perf_counter()
+        files = await asyncio.to_thread(discover_files, repo)
+        self.metrics["discover"] = StageMetrics(len(files), time.perf_counter() - start)
+        self.counts["files_total"] = len(files)
+        manifest = self.vectorizer.manifest
+        known = manifest.file_hashes() if manifest is not None else {}
+
+        # Files are queued one by one, batches of chunks as lists
+        chunked_q: asyncio.Queue = asyncio.Queue(maxsize=self.config.queue_depth * self.config.files_per_task)
+        embedded_q: asyncio.Queue = asyncio.Queue(maxsize=self.config.queue_depth)
+        tasks = [
+            asyncio.create_task(self._read_stage(repo, files, known, chunked_q)),
+            asyncio.create_task(self._embed_stage(chunked_q, embedded_q)),
+            asyncio.create_task(self._write_stage(embedded_q)),
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
+        if self.config.prune_deleted and manifest is not None:
+            present = set(files)
+            for rel in (r for r in known if r not in present):
+                removed = self.vectorizer._remove_file(rel)
+                # 0 also means the vector delete failed; the file then stays
+                # in the manifest and is pruned on the next run
+                if manifest.file_hash(rel) is None:
+                    self.counts["files_deleted"] += 1
+                    self.counts["chunks_deleted"] += removed
+        return self.report()
+
+    def report(self) -> Dict[str, Any]:
+        elapsed = time.perf_counter() - self._started
+        done = self.counts["files_processed"] + self.counts["files_unchanged"]
+        return {
+            "commit": self._label,
+            "vectors_written": self.counts["chunks_embedded"],
+            **self.counts,
+            "files_failed": len(self._failed_files),
+            "elapsed_seconds": round(elapsed, 3),
+            "files_per_second": round(done / elapsed, 1) if elapsed > 0 else 0.0,
+            "workers": self.config.workers,
+            "stages": {name: m.as_dict() for name, m in self.metrics.items()},
+        }
+
+    def _emit_progress(self):
+        if self.progress is None:
+            return
+        try:
+            self.progress(self.report())
+        except Exception as e:
+            logger.debug(f"Progress callback failed: {e}")
+
+    # ---- stage 2: read + chunk ------------------------------------------------
+
+    def _executor(self) -> Executor:
+        if self.config.workers > 1:
+            return ProcessPoolExecutor(self.config.workers, mp_context=multiprocessing.get_context("spawn"))
+        return ThreadPoolExecutor(1)
+
+    async def _read_stage(self, repo: Path, files: List[str], known: Dict[str, str], out: asyncio.Queue):
+        loop = asyncio.get_running_loop()
+        size = max(1, self.config.files_per_task)
+        groups = [files[i : i + size] for i in range(0, len(files), size)]
+        in_flight: set = set()
+        with self._executor() as pool:
+            try:
+                for group in groups:
+                    if len(in_flight) >= self.config.workers * 2:
+                        in_flight = await self._drain(in_flight, out, asyncio.FIRST_COMPLETED)
+                    hashes = {rel: known[rel] for rel in group if rel in known}
+                    in_flight.add(loop.run_in_executor(pool, _timed_read_and_chunk, str(repo), group, hashes))
+                while in_flight:
+                    in_flight = await self._drain(in_flight, out, asyncio.FIRST_COMPLETED)
+            finally:
+                for future in in_flight:
+                    future.cancel()
+        await out.put(_DONE)
+
+    async def _drain(self, in_flight: set, out: asyncio.Queue, when: str) -> set:
+        done, pending = await asyncio.wait(in_flight, return_when=when)
+        for future in done:
+            results, seconds = future.result()
+            metrics = self.metrics["read_chunk"]
+            metrics.items += len(results)
+            metrics.busy_seconds += seconds
+            for chunked in results:
+                await out.put(chunked)
+        return pending
+
+    # ---- stage 3: embed ---------------------------------------------------------
+
+    def _plan(self, chunked: ChunkedFile) -> Optional[_FileWork]:
+        if chunked.unchanged:
+            self.counts["files_unchanged"] += 1
+            return None
+        if chunked.unreadable:
+            self._failed_files.add(chunked.rel_path)
+            return None
+        rows = manifest_chunks(chunked.rel_path, chunked.chunks)
+        manifest = self.vectorizer.manifest
+        diff = manifest.diff(chunked.rel_path, rows) if manifest is not None else ChunkDiff(added=list(range(len(rows))))
+        return _FileWork(chunked, rows, diff, pending=len(diff.added))
+
+    async def _embed_stage(self, inq: asyncio.Queue, out: asyncio.Queue):
+        batch: List[_Slice] = []
+        texts = 0
+        while True:
+            item = await inq.get()
+            if item is _DONE:
+                break
+            work = self._plan(item)
+            if work is None:
+                continue
+            added = work.diff.added
+            if not added:
+                batch.append(_Slice(work, []))
+                continue
+            # Split large files so no batch exceeds embed_batch_size texts
+            for i in range(0, len(added), self.config.embed_batch_size):
+                part = added[i : i + self.config.embed_batch_size]
+                if texts + len(part) > self.config.embed_batch_size and texts:
+                    await out.put(await self._embed(batch))
+                    batch, texts = [], 0
+                batch.append(_Slice(work, part))
+                texts += len(part)
+        if batch:
+            await out.put(await self._embed(batch))
+        await out.put(_DONE)
+
+    async def _embed(self, batch: List[_Slice]) -> List[_Slice]:
+        texts = [s.work.chunked.chunks[i].content for s in batch for i in s.indices]
+        if not texts:
+            return batch
+        start = time.perf_counter()
+        try:
+            vectors = await asyncio.to_thread(self.embed_fn, texts)
+        except Exception as e:
+            logger.warning(f"Embedding batch of {len(texts)} chunks failed: {e}")
+            vectors = None
+        metrics = self.metrics["embed"]
+        metrics.busy_seconds += time.perf_counter() - start
+        if not isinstance(vectors, list) or len(vectors) != len(texts):
+            for s in batch:
+                s.work.failed = True
+            return batch
+        metrics.items += len(texts)
+        offset = 0
+        for s in batch:
+            s.vectors = vectors[offset : offset + len(s.indices)]
+            offset += len(s.indices)
+        return batch
+
+    # ---- stage 4: write ---------------------------------------------------------
+
+    async def _write_stage(self, inq: asyncio.Queue):
+        buffer: List[_Slice] = []
+        pending_chunks = 0
+        while True:
+            item = await inq.get()
+            if item is _DONE:
+                break
+            buffer.extend(item)
+            pending_chunks += sum(len(s.indices) for s in item)
+            if pending_chunks >= self.config.write_batch_size:
+                await asyncio.to_thread(self._write, buffer)
+                self._emit_progress()
+                buffer, pending_chunks = [], 0
+        if buffer:
+            await asyncio.to_thread(self._write, buffer)
+            self._emit_progress()
+
+    def _write(self, slices: List[_Slice]):
+        start = time.perf_counter()
+        collection = self.vectorizer.collection
+        live = [s for s in slices if not s.work.failed]
+        ids: List[str] = []
+        docs: List[str] = []
+        vectors: List[Any] = []
+        metas: List[Dict[str, Any]] = []
+        for s in live:
+            chunks, rows = s.work.chunked.chunks, s.work.rows
+            for i, vector in zip(s.indices, s.vectors):
+                ids.append(rows[i].chunk_id)
+                docs.append(chunks[i].content)
+                vectors.append(vector)
+                metas.append(self.vectorizer._metadata(chunks[i], self._label))
+
+        completed: List[_FileWork] = []
+        for s in live:
+            s.work.pending -= len(s.indices)
+            if s.work.pending == 0:
+                completed.append(s.work)
+        moved_ids: List[str] = []
+        moved_metas: List[Dict[str, Any]] = []
+        removed: List[str] = []
+        for work in completed:
+            for i in work.diff.moved:
+                moved_ids.append(work.rows[i].chunk_id)
+                moved_metas.append(self.vectorizer._metadata(work.chunked.chunks[i], self._label))
+            removed.extend(work.diff.removed)
+
+        try:
+            if collection is not None:
+                if ids:
+                    collection.upsert(ids=ids, documents=docs, embeddings=vectors, metadatas=metas)
+                if moved_ids:
+                    collection.update(ids=moved_ids, metadatas=moved_metas)
+                if removed:
+                    collection.delete(ids=removed)
+            manifest = self.vectorizer.manifest
+            if manifest is not None and completed:
+                manifest.replace_files(
+                    [(w.chunked.rel_path, w.chunked.file_hash, w.rows, self._label) for w in completed]
+                )
+        except Exception as e:
+            logger.warning(f"Vector store write of {len(ids)} chunks failed: {e}")
+            for s in live:
+                s.work.failed = True
+            live, completed = [], []
+
+        # A failed file never reaches the manifest, so the next run retries it
+        self._failed_files.update(s.work.chunked.rel_path for s in slices if s.work.failed)
+        for work in completed:
+            self.counts["files_processed"] += 1
+            self.counts["chunks_moved"] += len(work.diff.moved)
+            self.counts["chunks_unchanged"] += work.diff.unchanged
+            self.counts["chunks_deleted"] += len(work.diff.removed)
+        written = len(ids) if live else 0
+        self.counts["chunks_embedded"] += written
+        metrics = self.metrics["write"]
+        metrics.items += written
+        metrics.busy_seconds += time.perf_counter() - start
+
+
+def _head_commit(repo: Path) -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "HEAD"], cwd=repo, text=True, stderr=subprocess.DEVNULL
+        ).strip() or None
+    except (OSError, subprocess.CalledProcessError):
+        return None
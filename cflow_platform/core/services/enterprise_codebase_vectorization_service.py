@@ -6,13 +6,17 @@ Core Codebase Vectorization Service
 Generates embeddings for code chunks from a commit and stores them in Chroma,
 with optional Supabase dual-write via the existing sync service. Uses the core
 Apple Silicon accelerator.
+
+Vectorization is incremental: chunk ids are derived from file path and chunk
+content, and a per-file manifest of stored chunks means a commit only embeds
+new or modified chunks, re-labels chunks whose lines moved, and deletes the
+vectors of chunks (and files) that disappeared. Whole repositories are
+indexed through the parallel pipeline in codebase_vectorization_pipeline.
 """
 
-import hashlib
 import logging
 import re
 import subprocess
-from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, List, Optional
@@ -20,6 +24,25 @@ from typing import Any, Dict, List, Optional
 from cflow_platform.core.embeddings.apple_silicon_accelerator import (
     generate_accelerated_embeddings,
 )
+from cflow_platform.core.services.code_chunking import (
+    CodeChunk,
+    chunk_source,
+    language_for,
+    read_source,
+    should_index,
+    source_hash,
+)
+from cflow_platform.core.services.codebase_vectorization_pipeline import (
+    CodebaseVectorizationPipeline,
+    PipelineConfig,
+    ProgressFn,
+)
+from cflow_platform.core.services.codebase_vector_manifest import (
+    ChunkDiff,
+    CodebaseVectorManifest,
+    default_manifest_path,
+    manifest_chunks,
+)
 
 try:
     import chromadb  # type: ignore
@@ -31,20 +54,12 @@ except Exception:
 logger = logging.getLogger(__name__)
 
 
-@dataclass
-class CodeChunk:
-    content: str
-    file_path: str
-    start_line: int
-    end_line: int
-    language: str
-    hash: str
-
-
 class CoreCodebaseVectorizer:
-    def __init__(self, chroma_path: Optional[str] = None) -> None:
+    def __init__(self, chroma_path: Optional[str] = None, manifest_path: Optional[str] = None) -> None:
         self.chroma_client = None
         self.collection = None
+        # Only vectors that reach the store are recorded, so no store means no manifest
+        self.manifest: Optional[CodebaseVectorManifest] = None
         if CHROMA_AVAILABLE:
             path = chroma_path or ".cerebraflow/core/storage/chromadb"
             self.chroma_client = chromadb.PersistentClient(  # type: ignore
@@ -55,6 +70,7 @@ class CoreCodebaseVectorizer:
                 name="cflow_codebase",
                 metadata={"description": "CFlow codebase vectors"},
             )
+            self.manifest = CodebaseVectorManifest(Path(manifest_path) if manifest_path else default_manifest_path(path))
 
     def _git(self, args: List[str], repo_path: Optional[str]) -> str:
         cmd = ["git"] + args
@@ -63,90 +79,20 @@ class CoreCodebaseVectorizer:
         return subprocess.check_output(cmd, text=True).strip()
 
     def _changed_files(self, commit_hash: str, repo_path: Optional[str]) -> List[str]:
-        out = self._git(["diff-tree", "--no-commit-id", "--name-only", "-r", commit_hash], repo_path)
+        out = self._git(["diff-tree", "--root", "--no-commit-id", "--name-only", "-r", commit_hash], repo_path)
         return [l for l in out.splitlines() if l.strip()]
 
     def _should_process(self, file_path: str) -> bool:
-        exclude = [
-            "__pycache__",
-            ".git/",
-            "node_modules",
-            ".venv",
-            "venv",
-            ".DS_Store",
-        ]
-        if any(x in file_path for x in exclude):
-            return False
-        ext = Path(file_path).suffix.lower()
-        return ext in {
-            ".py",
-            ".ts",
-            ".tsx",
-            ".js",
-            ".jsx",
-            ".rs",
-            ".go",
-            ".java",
-            ".cpp",
-            ".c",
-            ".h",
-            ".hpp",
-            ".sql",
-            ".md",
-            ".json",
-            ".yaml",
-            ".yml",
-            ".toml",
-        }
+        return should_index(file_path)
 
     def _lang_for(self, file_path: str) -> str:
-        return {
-            ".py": "python",
-            ".ts": "typescript",
-            ".tsx": "typescript",
-            ".js": "javascript",
-            ".jsx": "javascript",
-            ".rs": "rust",
-            ".go": "go",
-            ".java": "java",
-            ".cpp": "cpp",
-            ".c": "c",
-            ".h": "c",
-            ".hpp": "cpp",
-            ".sql": "sql",
-            ".md": "markdown",
-            ".json": "json",
-            ".yaml": "yaml",
-            ".yml": "yaml",
-            ".toml": "toml",
-        }.get(Path(file_path).suffix.lower(), "unknown")
+        return language_for(file_path)
 
     def _chunk(self, content: str, file_path: str, language: str) -> List[CodeChunk]:
-        lines = content.split("\n")
-        size = 50
-        overlap = 5
-        chunks: List[CodeChunk] = []
-        i = 0
-        while i < len(lines):
-            part = lines[i : i + size]
-            txt = "\n".join(part)
-            if txt.strip():
-                h = hashlib.sha256(txt.encode("utf-8")).hexdigest()
-                chunks.append(
-                    CodeChunk(
-                        content=txt,
-                        file_path=file_path,
-                        start_line=i + 1,
-                        end_line=min(i + size, len(lines)),
-                        language=language,
-                        hash=h,
-                    )
-                )
-            i += size - overlap
-        return chunks
+        return chunk_source(content, file_path, language)
 
     def _read_file(self, path: Path) -> str:
-        return path.read_text(encoding="utf-8", errors="ignore")
+        return read_source(path)
 
     def _extract_keywords(self, content: str) -> List[str]:
         identifiers = re.findall(r"\b[a-zA-Z_][a-zA-Z0-9_]*\b", content)
@@ -154,59 +100,122 @@ class CoreCodebaseVectorizer:
         uniq = [w for w in set(identifiers) if len(w) > 2 and w.lower() not in common]
         return uniq[:20]
 
+    def _metadata(self, chunk: CodeChunk, commit_hash: str) -> Dict[str, Any]:
+        return {
+            "file_path": chunk.file_path,
+            "language": chunk.language,
+            "start": chunk.start_line,
+            "end": chunk.end_line,
+            "keywords": self._extract_keywords(chunk.content),
+            "commit": commit_hash,
+            "ts": datetime.utcnow().isoformat() + "Z",
+        }
+
+    def _delete_vectors(self, ids: List[str]) -> None:
+        if ids and self.collection is not None:
+            self.collection.delete(ids=ids)  # type: ignore
+
+    def _remove_file(self, rel: str) -> int:
+        if self.manifest is None:
+            return 0
+        ids = list(self.manifest.chunks(rel))
+        try:
+            self._delete_vectors(ids)
+        except Exception as e:
+            logger.warning(f"Vector store delete failed for {rel}: {e}")
+            return 0
+        self.manifest.remove_file(rel)
+        return len(ids)
+
+    def _sync_file(self, rel: str, content: str, commit_hash: str, stats: Dict[str, int]) -> None:
+        """Bring the stored vectors for one file in line with ``content``"""
+        file_hash = source_hash(content)
+        if self.manifest is not None and self.manifest.file_hash(rel) == file_hash:
+            stats["files_unchanged"] += 1
+            return
+        chunks = self._chunk(content, rel, self._lang_for(rel)) if content.strip() else []
+        rows = manifest_chunks(rel, chunks)
+        if self.manifest is not None:
+            diff = self.manifest.diff(rel, rows)
+        else:
+            diff = ChunkDiff(added=list(range(len(rows))))
+        added, moved, removed = diff.added, diff.moved, diff.removed
+
+        vecs: List[Any] = []
+        if added:
+            # Embed only new or modified chunks, in one batch
+            # Placeholder vectors would be recorded as this file's content for good
+            vecs = generate_accelerated_embeddings([chunks[i].content for i in added], allow_fallback=False)
+            if not isinstance(vecs, list) or len(vecs) != len(added):
+                logger.warning(f"Embedding failed for {rel}; leaving its vectors as they were")
+                stats["files_failed"] += 1
+                return
+        if self.collection is not None:
+            try:
+                if added:
+                    self.collection.upsert(  # type: ignore
+                        ids=[rows[i].chunk_id for i in added],
+                        documents=[chunks[i].content for i in added],
+                        embeddings=vecs,
+                        metadatas=[self._metadata(chunks[i], commit_hash) for i in added],
+                    )
+                if moved:
+                    self.collection.update(  # type: ignore
+                        ids=[rows[i].chunk_id for i in moved],
+                        metadatas=[self._metadata(chunks[i], commit_hash) for i in moved],
+                    )
+                self._delete_vectors(removed)
+            except Exception as e:
+                logger.warning(f"Vector store update failed for {rel}: {e}")
+                stats["files_failed"] += 1
+                return
+        if self.manifest is not None:
+            self.manifest.replace_file(rel, file_hash, rows, commit_hash)
+        stats["files_processed"] += 1
+        stats["chunks_embedded"] += len(added)
+        stats["chunks_moved"] += len(moved)
+        stats["chunks_unchanged"] += diff.unchanged
+        stats["chunks_deleted"] += len(removed)
+
     async def process_commit(
         self, commit_hash: str, repo_path: Optional[str] = None
     ) -> Dict[str, Any]:
         changed = self._changed_files(commit_hash, repo_path)
-        vectors_written = 0
-        files_processed = 0
+        stats = {
+            "files_processed": 0,
+            "files_unchanged": 0,
+            "files_deleted": 0,
+            "files_failed": 0,
+            "chunks_embedded": 0,
+            "chunks_moved": 0,
+            "chunks_unchanged": 0,
+            "chunks_deleted": 0,
+        }
         for rel in changed:
             if not self._should_process(rel):
                 continue
             full = (Path(repo_path) / rel) if repo_path else Path(rel)
-            if not full.exists() or not full.is_file():
+            if not full.is_file():
+                # Deleted (or renamed away) in this commit
+                removed = self._remove_file(rel)
+                if removed:
+                    stats["files_deleted"] += 1
+                    stats["chunks_deleted"] += removed
                 continue
-            content = self._read_file(full)
-            if not content.strip():
-                continue
-            language = self._lang_for(rel)
-            chunks = self._chunk(content, rel, language)
-            if not chunks:
-                continue
-            # Embed in batches to minimize overhead
-            texts = [c.content for c in chunks]
-            vecs = generate_accelerated_embeddings(texts)
-            if not isinstance(vecs, list) or not vecs:
-                continue
-            ids: List[str] = []
-            docs: List[str] = []
-            metas: List[Dict[str, Any]] = []
-            for c, v in zip(chunks, vecs):
-                ids.append(f"{commit_hash}_{c.hash}")
-                docs.append(c.content)
-                metas.append(
-                    {
-                        "file_path": c.file_path,
-                        "language": c.language,
-                        "start": c.start_line,
-                        "end": c.end_line,
-                        "keywords": self._extract_keywords(c.content),
-                        "commit": commit_hash,
-                        "ts": datetime.utcnow().isoformat() + "Z",
-                    }
-                )
-            if self.collection is not None:
-                # Best-effort add; ignore duplicates
-                try:
-                    self.collection.add(ids=ids, documents=docs, embeddings=vecs, metadatas=metas)  # type: ignore
-                except Exception:
-                    pass
-            vectors_written += len(ids)
-            files_processed += 1
+            self._sync_file(rel, self._read_file(full), commit_hash, stats)
         return {
             "commit": commit_hash,
-            "vectors_written": vectors_written,
-            "files_processed": files_processed,
+            "vectors_written": stats["chunks_embedded"],
+            **stats,
         }
 
-
+    async def vectorize_repository(
+        self,
+        repo_path: str,
+        config: Optional[PipelineConfig] = None,
+        progress: Optional[ProgressFn] = None,
+    ) -> Dict[str, Any]:
+        """Index every file under ``repo_path``; files already in the manifest are skipped"""
+        # The pipeline's default embed function fails files rather than store placeholders
+        pipeline = CodebaseVectorizationPipeline(self, config, progress=progress)
+        return await pipeline.run(repo_path)
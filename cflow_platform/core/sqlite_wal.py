@@ -0,0 +1,105 @@
+"""
+SQLite Helpers for Local Stores
+
+Caches and index manifests that keep their state in a small SQLite file
+shared by several threads and processes open it through this module:
+- WAL journal, ``synchronous=NORMAL`` and a busy timeout, so readers never
+  block the single writer and a crash loses at most the last transaction
+- A ``quick_check`` on open; a corrupt file (failed check, SQLITE_CORRUPT
+  or SQLITE_NOTADB) is moved to ``<name>.corrupt-<time>`` together with its
+  ``-wal``/``-shm`` files and an empty database is created in its place.
+  Operational errors (locked, unable to open) are raised instead: the file
+  is healthy and other processes may be using it
+- A ``meta`` schema version; on mismatch the listed tables are emptied
+  rather than migrated, since every store can be rebuilt from its source
+"""
+
+import logging
+import sqlite3
+import time
+from pathlib import Path
+from typing import Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Primary result codes of a damaged file (SQLITE_CORRUPT, SQLITE_NOTADB)
+_CORRUPT_CODES = {11, 26}
+
+
+class CorruptDatabaseError(sqlite3.DatabaseError):
+    """``PRAGMA quick_check`` reported damage"""
+
+
+def _is_corrupt(e: sqlite3.DatabaseError) -> bool:
+    if isinstance(e, CorruptDatabaseError):
+        return True
+    if isinstance(e, sqlite3.OperationalError):
+        return False
+    code = getattr(e, "sqlite_errorcode", None)
+    if code is not None:
+        return code & 0xFF in _CORRUPT_CODES
+    # Python < 3.11 exposes no result code
+    message = str(e).lower()
+    return "malformed" in message or "not a database" in message
+
+
+def _connect(path: Path, schema: str, schema_version: int, tables: Sequence[str]) -> sqlite3.Connection:
+    conn = sqlite3.connect(str(path), timeout=5.0, check_same_thread=False, isolation_level=None)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=5000")
+        if conn.execute("PRAGMA quick_check").fetchone()[0] != "ok":
+            raise CorruptDatabaseError("quick_check failed")
+        conn.executescript(schema)
+        row = conn.execute("SELECT value FROM meta WHERE name = 'schema_version'").fetchone()
+        if row is None:
+            conn.execute("INSERT OR IGNORE INTO meta(name, value) VALUES ('schema_version', ?)", (str(schema_version),))
+        elif int(row[0]) != schema_version:
+            conn.execute("BEGIN IMMEDIATE")
+            for table in tables:
+                conn.execute(f"DELETE FROM {table}")
+            conn.execute("UPDATE meta SET value = ? WHERE name = 'schema_version'", (str(schema_version),))
+            conn.execute("COMMIT")
+    except Exception:
+        conn.close()
+        raise
+    return conn
+
+
+def open_wal_database(
+    path: Path,
+    schema: str,
+    schema_version: int,
+    tables: Sequence[str],
+    description: str = "SQLite store",
+) -> Tuple[sqlite3.Connection, bool]:
+    """Open (or create) ``path`` and return ``(connection, recreated)``.
+
+    ``schema`` must create a ``meta(name, value)`` table; ``tables`` are
+    emptied when the stored schema version differs. ``recreated`` is True
+    when a corrupt file was moved aside, so callers can drop state kept
+    outside the database. ``sqlite3.OperationalError`` is raised as is.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        return _connect(path, schema, schema_version, tables), False
+    except sqlite3.DatabaseError as e:
+        if not _is_corrupt(e):
+            raise
+        broken = path.with_name(f"{path.name}.corrupt-{int(time.time())}")
+        logger.warning(f"{description} {path} unreadable ({e}); moving it to {broken}")
+        for suffix in ("", "-wal", "-shm"):
+            src = Path(str(path) + suffix)
+            if src.exists():
+                src.replace(Path(str(broken) + suffix))
+        return _connect(path, schema, schema_version, tables), True
+
+
+def rollback(conn: sqlite3.Connection) -> None:
+    """Roll back the open transaction, ignoring the error when there is none"""
+    try:
+        conn.execute("ROLLBACK")
+    except Exception:
+        pass
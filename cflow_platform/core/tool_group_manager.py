@@ -209,7 +209,8 @@ class ToolGroupManager:
         ToolGroup.SANDBOX: ToolGroupConfig(
             description="Sandbox execution environment",
             tools=[
-                "sandbox.run_python"
+                "sandbox.run_python",
+                "sandbox.pool_stats"
             ],
             required=False,
             client_types=["cursor", "web"],
@@ -1,9 +1,69 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List
+import hashlib
+import json
+import threading
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Dict, FrozenSet, List, Mapping, Optional, Tuple
 from .tool_group_manager import ToolGroupManager
 
 
+@dataclass(frozen=True)
+class ToolRegistrySnapshot:
+    """Immutable view of the registry built once per process.
+
+    Tool specs are shared between callers and must be treated as read-only.
+    ``tools`` keeps registration order (including duplicate registrations);
+    ``by_name`` resolves a name to its first registration.
+    """
+
+    tools: Tuple[Dict[str, Any], ...]
+    by_name: Mapping[str, Dict[str, Any]]
+    groups: Mapping[str, FrozenSet[str]]
+    bmad_tools: FrozenSet[str]
+    content_hash: str
+
+    def __len__(self) -> int:
+        return len(self.tools)
+
+    def __contains__(self, tool_name: object) -> bool:
+        return tool_name in self.by_name
+
+    def has_tool(self, tool_name: str) -> bool:
+        return tool_name in self.by_name
+
+    def get_tool(self, tool_name: str) -> Optional[Dict[str, Any]]:
+        return self.by_name.get(tool_name)
+
+    def get_schema(self, tool_name: str) -> Optional[Dict[str, Any]]:
+        tool = self.by_name.get(tool_name)
+        return tool["inputSchema"] if tool is not None else None
+
+    def tools_in_group(self, group_name: str) -> FrozenSet[str]:
+        return self.groups.get(group_name, frozenset())
+
+    @classmethod
+    def from_tools(cls, tools: List[Dict[str, Any]]) -> "ToolRegistrySnapshot":
+        by_name: Dict[str, Dict[str, Any]] = {}
+        groups: Dict[str, set] = {}
+        for tool in tools:
+            by_name.setdefault(tool["name"], tool)
+            groups.setdefault(tool.get("group", "unassigned"), set()).add(tool["name"])
+        canonical = json.dumps(tools, sort_keys=True, separators=(",", ":"), default=str)
+        return cls(
+            tools=tuple(tools),
+            by_name=MappingProxyType(by_name),
+            groups=MappingProxyType({name: frozenset(members) for name, members in groups.items()}),
+            bmad_tools=frozenset(name for name in by_name if name.startswith("bmad_")),
+            content_hash=hashlib.sha256(canonical.encode("utf-8")).hexdigest(),
+        )
+
+
+_snapshot: Optional[ToolRegistrySnapshot] = None
+_snapshot_lock = threading.Lock()
+
+
 class ToolRegistry:
     """Package-side MCP tool registry definitions for monorepo consumption.
 
@@ -11,8 +71,45 @@ class ToolRegistry:
     without requiring this package to import MCP libraries.
     """
 
+    @staticmethod
+    def get_snapshot() -> ToolRegistrySnapshot:
+        """Return the process-wide registry snapshot, building it on first use."""
+        global _snapshot
+        snapshot = _snapshot
+        if snapshot is None:
+            with _snapshot_lock:
+                if _snapshot is None:
+                    _snapshot = ToolRegistrySnapshot.from_tools(ToolRegistry._build_tools())
+                snapshot = _snapshot
+        return snapshot
+
+    @staticmethod
+    def refresh_snapshot() -> ToolRegistrySnapshot:
+        """Rebuild the snapshot, e.g. after tool group configuration changed."""
+        global _snapshot
+        with _snapshot_lock:
+            _snapshot = ToolRegistrySnapshot.from_tools(ToolRegistry._build_tools())
+            return _snapshot
+
     @staticmethod
     def get_tools_for_mcp() -> List[Dict[str, Any]]:
+        """Return the registered tool specs (a fresh list of shared, read-only dicts)."""
+        return list(ToolRegistry.get_snapshot().tools)
+
+    @staticmethod
+    def has_tool(tool_name: str) -> bool:
+        return ToolRegistry.get_snapshot().has_tool(tool_name)
+
+    @staticmethod
+    def get_tool(tool_name: str) -> Optional[Dict[str, Any]]:
+        return ToolRegistry.get_snapshot().get_tool(tool_name)
+
+    @staticmethod
+    def get_tool_schema(tool_name: str) -> Optional[Dict[str, Any]]:
+        return ToolRegistry.get_snapshot().get_schema(tool_name)
+
+    @staticmethod
+    def _build_tools() -> List[Dict[str, Any]]:
         tools: List[Dict[str, Any]] = []
 
         def tool(name: str, description: str, schema: Dict[str, Any] | None = None) -> Dict[str, Any]:
@@ -87,6 +184,7 @@ class ToolRegistry:
         # Sandbox tools
         tools += [
             tool("sandbox.run_python", "Execute Python in sandbox"),
+            tool("sandbox.pool_stats", "Sandbox worker pool statistics"),
         ]
 
         # Memory tools
@@ -858,12 +956,13 @@ class ToolRegistry:
     @staticmethod
     def get_tool_registry_info() -> Dict[str, Any]:
         """Get comprehensive information about the tool registry"""
-        tools = ToolRegistry.get_tools_for_mcp()
-        total = len(tools)
+        snapshot = ToolRegistry.get_snapshot()
+        total = len(snapshot)
         
         return {
             "registry_version": "1.0.0",
             "total_tools": total,
+            "content_hash": snapshot.content_hash,
             "supported_versions": ["1.0.0"],
             "next_version": "2.0.0",
             "deprecation_date": "2025-12-31T23:59:59Z",
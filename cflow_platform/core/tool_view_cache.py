@@ -0,0 +1,182 @@
+"""
+Precompiled Tool Views for BMAD WebMCP Server
+
+This module compiles the filtered tool list for each (client type, project type)
+pair once, serializes it to a ready-to-send JSON fragment and tags it with a
+stable digest for ETag/If-None-Match handling. Views are recompiled only when
+the tool registry snapshot or the client/project configuration they were built
+from changes.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, FrozenSet, Optional, Tuple
+
+from .client_tool_config import ClientToolConfig, ClientToolConfigManager
+from .project_tool_filter import ProjectToolFilter, ProjectToolFilterManager
+from .tool_group_manager import ToolGroup, ToolGroupManager
+from .tool_registry import ToolRegistry, ToolRegistrySnapshot
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class FilteredToolView:
+    """Filtered tool list for one client/project configuration"""
+    client_type: str
+    project_type: str
+    tools: Tuple[Dict[str, Any], ...]
+    tools_json: bytes
+    digest: str
+
+    def etag_for(self, *parts: Any) -> str:
+        """ETag for a response built from this view plus per-request echo fields"""
+        if not parts:
+            return f'"{self.digest}"'
+        suffix = hashlib.sha1("|".join(str(p) for p in parts).encode("utf-8")).hexdigest()[:12]
+        return f'"{self.digest}-{suffix}"'
+
+    def render(self, fields: Dict[str, Any]) -> bytes:
+        """Render a JSON object made of ``fields`` plus the precompiled ``tools`` array"""
+        head = json.dumps(fields, separators=(",", ":"), default=str)
+        if head == "{}":
+            return b'{"tools":' + self.tools_json + b"}"
+        return head[:-1].encode("utf-8") + b',"tools":' + self.tools_json + b"}"
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header value against an ETag (weak comparison)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+class FilteredToolViewCache:
+    """Caches compiled tool views keyed by resolved client and project type"""
+
+    def __init__(
+        self,
+        client_config_manager: Any = ClientToolConfigManager,
+        project_filter_manager: Any = ProjectToolFilterManager,
+        snapshot_provider: Callable[[], ToolRegistrySnapshot] = ToolRegistry.get_snapshot,
+    ):
+        self.client_config_manager = client_config_manager
+        self.project_filter_manager = project_filter_manager
+        self.snapshot_provider = snapshot_provider
+        self._views: Dict[Tuple[str, str], Tuple[Tuple[Any, ...], FilteredToolView]] = {}
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "compiles": 0, "invalidations": 0}
+
+    def _resolve(self, client_type: str, project_type: str) -> Tuple[ClientToolConfig, ProjectToolFilter]:
+        client_config = self.client_config_manager.get_config_for_client(client_type)
+        if not client_config:
+            logger.warning(f"Unknown client type: {client_type}, using default web config")
+            client_config = self.client_config_manager.get_config_for_client("web")
+
+        project_filter = self.project_filter_manager.get_filter_for_project_type(project_type)
+        if not project_filter:
+            logger.warning(f"Unknown project type: {project_type}, using default greenfield config")
+            project_filter = self.project_filter_manager.get_filter_for_project_type("greenfield")
+
+        return client_config, project_filter
+
+    @staticmethod
+    def _fingerprint(
+        snapshot: ToolRegistrySnapshot,
+        client_config: ClientToolConfig,
+        project_filter: ProjectToolFilter
+    ) -> Tuple[Any, ...]:
+        # Constant-size w.r.t. the tool count; catches in-place config edits
+        return (
+            snapshot.content_hash,
+            tuple(client_config.enabled_groups),
+            tuple(client_config.disabled_tools),
+            client_config.capabilities.max_tools,
+            tuple(project_filter.enabled_groups),
+            tuple(project_filter.disabled_tools),
+        )
+
+    def get_view(self, client_type: str, project_type: str) -> FilteredToolView:
+        """Return the compiled view, recompiling only if its inputs changed"""
+        client_config, project_filter = self._resolve(client_type, project_type)
+        snapshot = self.snapshot_provider()
+        key = (client_config.client_type.value, project_filter.project_type.value)
+        fingerprint = self._fingerprint(snapshot, client_config, project_filter)
+
+        cached = self._views.get(key)
+        if cached is not None and cached[0] == fingerprint:
+            self.stats["hits"] += 1
+            return cached[1]
+
+        with self._lock:
+            cached = self._views.get(key)
+            if cached is not None and cached[0] == fingerprint:
+                self.stats["hits"] += 1
+                return cached[1]
+            view = self._compile(key, snapshot, client_config, project_filter)
+            self._views[key] = (fingerprint, view)
+            self.stats["compiles"] += 1
+            return view
+
+    def invalidate(self) -> None:
+        """Drop all compiled views"""
+        with self._lock:
+            self._views.clear()
+            self.stats["invalidations"] += 1
+
+    @staticmethod
+    def _enabled_tool_names(enabled_groups: FrozenSet[str]) -> FrozenSet[str]:
+        names = set()
+        for group_name in enabled_groups:
+            try:
+                names.update(ToolGroupManager.TOOL_GROUPS[ToolGroup(group_name)].tools)
+            except (ValueError, KeyError):
+                # Handle case where group_name doesn't match enum
+                continue
+        return frozenset(names)
+
+    def _compile(
+        self,
+        key: Tuple[str, str],
+        snapshot: ToolRegistrySnapshot,
+        client_config: ClientToolConfig,
+        project_filter: ProjectToolFilter
+    ) -> FilteredToolView:
+        enabled_groups = frozenset(client_config.enabled_groups) & frozenset(project_filter.enabled_groups)
+        disabled = set(client_config.disabled_tools) | set(project_filter.disabled_tools)
+        disabled_exact = frozenset(p for p in disabled if not p.endswith("*"))
+        disabled_prefixes = tuple(p[:-1] for p in disabled if p.endswith("*"))
+        enabled_tools = self._enabled_tool_names(enabled_groups)
+        max_tools = client_config.capabilities.max_tools
+
+        filtered = []
+        for tool in snapshot.tools:
+            tool_name = tool["name"]
+            if tool_name in disabled_exact or tool_name.startswith(disabled_prefixes):
+                continue
+            if tool_name in enabled_tools:
+                filtered.append(tool)
+            if len(filtered) >= max_tools:
+                break
+
+        tools_json = json.dumps(filtered, separators=(",", ":"), default=str).encode("utf-8")
+        digest = hashlib.sha256(tools_json).hexdigest()[:32]
+        logger.info(f"Compiled {len(filtered)} tools for client_type={key[0]}, project_type={key[1]}")
+        return FilteredToolView(
+            client_type=key[0],
+            project_type=key[1],
+            tools=tuple(filtered),
+            tools_json=tools_json,
+            digest=digest,
+        )
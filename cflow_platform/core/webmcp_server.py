@@ -26,12 +26,14 @@ from .bmad_tool_router import BMADToolRouter
 from .tool_group_manager import ToolGroupManager
 from .client_tool_config import ClientToolConfigManager
 from .project_tool_filter import ProjectToolFilterManager
+from .tool_view_cache import FilteredToolViewCache, etag_matches
 from .master_tool_base import MasterToolManager
 from .bmad_master_tools import BMADTaskMasterTool, BMADPlanMasterTool, BMADDocMasterTool, BMADWorkflowMasterTool
 from .bmad_advanced_master_tools import BMADHILMasterTool, BMADGitMasterTool, BMADOrchestratorMasterTool, BMADExpansionMasterTool
 from .bmad_expansion_master_tools import BMADGameDevMasterTool, BMADDevOpsMasterTool, BMADCreativeMasterTool
 from .async_tool_executor import AsyncToolExecutor
 from .performance_cache import PerformanceCache, CacheConfig
+from .disk_cache import disk_cache_enabled, get_disk_tier
 from .fault_tolerance import CircuitBreaker, CircuitBreakerConfig
 from .load_balancer import LoadBalancer, LoadBalancerConfig
 from .plugin_architecture import PluginLoader, HotReloadManager
@@ -39,6 +41,7 @@ from .legacy_tool_migration import LegacyToolMigrationManager
 from .migration_validator import MigrationValidator
 from .legacy_tool_removal import LegacyToolRemovalManager
 from .performance_optimizer import PerformanceOptimizer
+from .embeddings.model_registry import start_model_warmup
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -74,6 +77,7 @@ tool_registry = ToolRegistry.get_tools_for_mcp()
 tool_group_manager = ToolGroupManager()
 client_config_manager = ClientToolConfigManager()
 project_filter_manager = ProjectToolFilterManager()
+tool_view_cache = FilteredToolViewCache(client_config_manager, project_filter_manager)
 
 # BMAD tool routing
 bmad_tool_router = BMADToolRouter()
@@ -83,7 +87,10 @@ master_tool_manager = MasterToolManager()
 
 # Performance components
 async_executor = AsyncToolExecutor()
-performance_cache = PerformanceCache(CacheConfig())
+performance_cache = PerformanceCache(
+    CacheConfig(),
+    disk_tier=get_disk_tier("performance_cache") if disk_cache_enabled() else None
+)
 load_balancer = LoadBalancer(LoadBalancerConfig())
 
 # Migration components
@@ -161,6 +168,12 @@ _initialize_master_tools()
 _initialize_migration_system()
 _initialize_removal_and_optimization_system()
 
+
+@app.on_event("startup")
+async def _warm_embedding_models():
+    """Preload embedding models in the background so the first search is not cold"""
+    start_model_warmup()
+
 @app.get("/")
 async def root():
     """Health check endpoint"""
@@ -320,26 +333,30 @@ async def initialize_mcp(request: Request):
         
         logger.info(f"MCP initialization request from client_type={client_type}, project_type={project_type}")
         
-        # Get filtered tools for client and project
-        filtered_tools = _filter_tools_for_client_and_project(
-            client_type, project_type, project_id
-        )
+        # Get the precompiled tool view for client and project
+        view = tool_view_cache.get_view(client_type, project_type)
         
         # Get client configuration
         client_config = client_config_manager.get_config_for_client(client_type)
-        
-        return {
+        fields = {
             "protocolVersion": "2024-11-05",
-            "tools": filtered_tools,
             "client_config": {
                 "client_type": client_type,
                 "project_type": project_type,
                 "max_tools": client_config.capabilities.max_tools if client_config else 100,
                 "enabled_groups": client_config.enabled_groups if client_config else [],
                 "project_specific": client_config.project_specific if client_config else False,
-                "tools_count": len(filtered_tools)
+                "tools_count": len(view.tools)
             }
         }
+        # Everything echoed besides the tools is part of the ETag, so a config
+        # edit that leaves the tool list alone still invalidates cached bodies
+        etag = view.etag_for("initialize", json.dumps(fields, sort_keys=True, default=str))
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers={"ETag": etag})
+        
+        body = view.render(fields)
+        return Response(content=body, media_type="application/json", headers={"ETag": etag})
         
     except Exception as e:
         logger.error(f"Error in MCP initialization: {e}")
@@ -354,18 +371,21 @@ async def list_tools():
     }
 
 @app.get("/mcp/tools/filtered")
-async def list_filtered_tools(client_type: str = "web", project_type: str = "greenfield", project_id: str = None):
+async def list_filtered_tools(request: Request, client_type: str = "web", project_type: str = "greenfield", project_id: str = None):
     """List filtered MCP tools based on client and project configuration"""
     try:
-        filtered_tools = _filter_tools_for_client_and_project(client_type, project_type, project_id)
+        view = tool_view_cache.get_view(client_type, project_type)
+        etag = view.etag_for("filtered", client_type, project_type, project_id)
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers={"ETag": etag})
         
-        return {
-            "tools": filtered_tools,
-            "count": len(filtered_tools),
+        body = view.render({
+            "count": len(view.tools),
             "client_type": client_type,
             "project_type": project_type,
             "project_id": project_id
-        }
+        })
+        return Response(content=body, media_type="application/json", headers={"ETag": etag})
         
     except Exception as e:
         logger.error(f"Error filtering tools: {e}")
@@ -383,8 +403,7 @@ async def call_tool(request: Request):
             raise HTTPException(status_code=400, detail="Tool name is required")
         
         # Validate tool exists
-        tool_exists = any(tool["name"] == tool_name for tool in tool_registry)
-        if not tool_exists:
+        if not ToolRegistry.has_tool(tool_name):
             raise HTTPException(status_code=404, detail=f"Tool '{tool_name}' not found")
         
         # Execute tool with BMAD routing
@@ -440,7 +459,7 @@ async def initialize_mcp(request: Request):
 @app.get("/mcp/tools/{tool_name}")
 async def get_tool_info(tool_name: str):
     """Get information about a specific tool"""
-    tool = next((t for t in tool_registry if t["name"] == tool_name), None)
+    tool = ToolRegistry.get_tool(tool_name)
     if not tool:
         raise HTTPException(status_code=404, detail=f"Tool '{tool_name}' not found")
     
@@ -986,80 +1005,12 @@ async def internal_error_handler(request: Request, exc: Exception):
 def _filter_tools_for_client_and_project(client_type: str, project_type: str, project_id: str = None) -> List[Dict[str, Any]]:
     """Filter tools based on client type and project requirements"""
     try:
-        # Get client configuration
-        client_config = client_config_manager.get_config_for_client(client_type)
-        if not client_config:
-            logger.warning(f"Unknown client type: {client_type}, using default web config")
-            client_config = client_config_manager.get_config_for_client("web")
-        
-        # Get project filter configuration
-        project_filter = project_filter_manager.get_filter_for_project_type(project_type)
-        if not project_filter:
-            logger.warning(f"Unknown project type: {project_type}, using default greenfield config")
-            project_filter = project_filter_manager.get_filter_for_project_type("greenfield")
-        
-        # Combine client and project enabled groups
-        client_enabled_groups = set(client_config.enabled_groups)
-        project_enabled_groups = set(project_filter.enabled_groups)
-        final_enabled_groups = client_enabled_groups.intersection(project_enabled_groups)
-        
-        # Combine disabled tools
-        client_disabled_tools = set(client_config.disabled_tools)
-        project_disabled_tools = set(project_filter.disabled_tools)
-        final_disabled_tools = client_disabled_tools.union(project_disabled_tools)
-        
-        # Filter tools
-        filtered_tools = []
-        max_tools = client_config.capabilities.max_tools
-        
-        for tool in tool_registry:
-            tool_name = tool["name"]
-            
-            # Check if tool is disabled
-            if _is_tool_disabled(tool_name, final_disabled_tools):
-                continue
-            
-            # Check if tool is in enabled groups
-            if _is_tool_in_enabled_groups(tool_name, final_enabled_groups):
-                filtered_tools.append(tool)
-            
-            # Stop if we've reached the max tool limit
-            if len(filtered_tools) >= max_tools:
-                break
-        
-        logger.info(f"Filtered {len(filtered_tools)} tools for client_type={client_type}, project_type={project_type}")
-        return filtered_tools
-        
+        return list(tool_view_cache.get_view(client_type, project_type).tools)
     except Exception as e:
         logger.error(f"Error filtering tools: {e}")
         # Return all tools as fallback
         return tool_registry
 
-def _is_tool_disabled(tool_name: str, disabled_tools: set) -> bool:
-    """Check if a tool is disabled based on patterns"""
-    for disabled_pattern in disabled_tools:
-        if disabled_pattern.endswith("*"):
-            # Wildcard pattern matching
-            if tool_name.startswith(disabled_pattern[:-1]):
-                return True
-        elif tool_name == disabled_pattern:
-            return True
-    return False
-
-def _is_tool_in_enabled_groups(tool_name: str, enabled_groups: set) -> bool:
-    """Check if a tool belongs to any of the enabled groups"""
-    for group_name in enabled_groups:
-        try:
-            # Convert string to ToolGroup enum
-            from .tool_group_manager import ToolGroup
-            group = ToolGroup(group_name)
-            if tool_group_manager.is_tool_in_group(tool_name, group):
-                return True
-        except ValueError:
-            # Handle case where group_name doesn't match enum
-            continue
-    return False
-
 def create_app() -> FastAPI:
     """Create and configure the FastAPI application"""
     return app
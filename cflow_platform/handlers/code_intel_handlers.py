@@ -2,10 +2,12 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from pathlib import Path
+import os
 from typing import Any, Dict, List, Optional
 
 from cflow_platform.core.code_intel.function_indexer import FunctionIndexer
-from cflow_platform.core.services.shared.singleton_embedding_service import get_embedding_service
+from cflow_platform.core.services.ai.embedding_service import get_embedding_service
+from cflow_platform.core.code_intel.callgraph_index import DEFAULT_MAX_PATHS
 from cflow_platform.core.code_intel.callgraph_store import FileCallGraphStore
 
 
@@ -79,11 +81,12 @@ class CodeIntelHandlers:
     async def handle_call_paths(self, args: Dict[str, Any]) -> Dict[str, Any]:
         target: str = args.get("to") or ""
         max_depth: int = int(args.get("maxDepth") or 6)
+        max_paths: int = int(args.get("maxPaths") or DEFAULT_MAX_PATHS)
         if not target:
             return {"status": "error", "message": "Missing 'to' target function name"}
         store = FileCallGraphStore()
         graph = store.load_graph()
-        paths = graph.call_paths_to(target, max_depth=max_depth)
+        paths = graph.call_paths_to(target, max_depth=max_depth, max_paths=max_paths)
         # Serialize as list of caller chains (file:name)
         out: List[List[dict]] = []
         for chain in paths:
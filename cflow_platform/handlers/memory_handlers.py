@@ -1,10 +1,24 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 from pathlib import Path
 from importlib.util import spec_from_file_location, module_from_spec
+import asyncio
 import json
+import logging
 import os
+import time
+
+from cflow_platform.core.memory.local_store import LocalMemoryStore
+
+logger = logging.getLogger(__name__)
+
+# Seconds to wait before retrying embeddings after the model failed to load
+_EMBED_RETRY_SECONDS = 300.0
+
+
+def _memory_vectors_enabled() -> bool:
+    return os.getenv("CFLOW_MEMORY_VECTORS", "1").strip().lower() not in {"0", "false", "no", "off"}
 
 
 class MemoryHandlers:
@@ -25,12 +39,30 @@ class MemoryHandlers:
     def _get_memory(self):
         if self._memory is not None:
             return self._memory
-        # Internal JSONL-backed memory (always used; no vendor path)
+        # Internal segmented JSONL store (always used; no vendor path). The
+        # old flat memory_items.jsonl is imported into it on first open.
         class _SimpleMemory:
             def __init__(self) -> None:
                 root = Path.cwd() / ".cerebraflow"
                 root.mkdir(parents=True, exist_ok=True)
-                self.path = root / "memory_items.jsonl"
+                self.store = LocalMemoryStore(root / "memory", legacy_path=root / "memory_items.jsonl")
+                self._embed_retry_at = 0.0
+
+            async def _embed(self, texts: List[str]) -> Optional[Tuple[List[List[float]], str]]:
+                """Embed through the shared batcher; None while embeddings are unavailable"""
+                if not _memory_vectors_enabled() or time.monotonic() < self._embed_retry_at:
+                    return None
+                try:
+                    from cflow_platform.core.embeddings.embedding_batcher import get_embedding_batcher
+                    from cflow_platform.core.services.ai.embedding_service import get_embedding_service
+
+                    service = await asyncio.to_thread(get_embedding_service)
+                    vectors = await get_embedding_batcher().embed_many(texts)
+                    return vectors, str(service.get_model_info().get("model_name") or "default")
+                except Exception as e:
+                    logger.info(f"Memory embeddings unavailable, using lexical search: {e}")
+                    self._embed_retry_at = time.monotonic() + _EMBED_RETRY_SECONDS
+                    return None
 
             async def add_memory(self, *, content: str, user_id: str, metadata: Dict[str, Any] | None = None) -> str:
                 item = {
@@ -39,26 +71,54 @@ class MemoryHandlers:
                     "content": content,
                     "metadata": metadata or {},
                 }
-                with self.path.open("a", encoding="utf-8") as f:
-                    f.write(json.dumps(item) + "\n")
+                embedded = await self._embed([content])
+                if embedded is None:
+                    self.store.add(item)
+                else:
+                    vectors, model = embedded
+                    self.store.add(item, vector=vectors[0], vector_namespace=model)
                 return item["id"]
 
-            async def search_memories(self, *, query: str, user_id: str, limit: int = 20, **_: Any) -> List[Dict[str, Any]]:
-                if not self.path.exists():
-                    return []
-                results: List[Dict[str, Any]] = []
-                needle = query.lower()
-                for line in self.path.read_text(encoding="utf-8").splitlines():
-                    try:
-                        obj = json.loads(line)
-                    except Exception:
-                        continue
-                    text = str(obj.get("content", ""))
-                    if needle in text.lower():
-                        results.append(obj)
-                        if len(results) >= limit:
-                            break
-                return results
+            async def search_memories(
+                self,
+                *,
+                query: str,
+                user_id: Optional[str],
+                limit: int = 20,
+                run_id: Optional[str] = None,
+                min_similarity_score: Optional[float] = None,
+                mode: str = "auto",
+                hybrid_weight: Optional[float] = None,
+                **_: Any,
+            ) -> Tuple[List[Dict[str, Any]], str, Optional[str]]:
+                """Results, the mode actually used, and why it differs from ``mode`` (if it does)"""
+                query_vector = None
+                fallback = None
+                if mode != "lexical":
+                    if not self.store.vector_count:
+                        fallback = "no stored memories have embeddings"
+                    else:
+                        embedded = await self._embed([query])
+                        if embedded is None:
+                            fallback = "query embedding unavailable"
+                        else:
+                            query_vector = embedded[0][0]
+                if mode == "hybrid" and hybrid_weight is None:
+                    hybrid_weight = 0.7
+                if query_vector is None:
+                    used = "lexical"
+                else:
+                    used = "hybrid" if hybrid_weight is not None else "vector"
+                results = self.store.search(
+                    query,
+                    user_id=user_id,
+                    limit=limit,
+                    run_id=run_id,
+                    query_vector=query_vector,
+                    hybrid_weight=hybrid_weight,
+                    min_similarity=min_similarity_score,
+                )
+                return results, used, fallback
 
             async def store_procedure_update(self, *, title: str, steps: List[Dict[str, Any]], justification: str, source: Optional[str]) -> str:
                 content = f"Procedure: {title}\nJustification: {justification}\nSteps: {json.dumps(steps)}"
@@ -70,10 +130,7 @@ class MemoryHandlers:
                 return await self.add_memory(content=content, user_id=os.getenv("CEREBRAL_USER_ID", "system"), metadata=md)  # type: ignore[return-value]
 
             async def get_stats(self) -> Dict[str, Any]:
-                count = 0
-                if self.path.exists():
-                    count = sum(1 for _ in self.path.open("r", encoding="utf-8"))
-                return {"items": count}
+                return self.store.get_stats()
 
         self._memory = _SimpleMemory()
         return self._memory
@@ -97,15 +154,31 @@ class MemoryHandlers:
         query = str(arguments.get("query", "")).strip()
         if not query:
             return {"success": False, "error": "query is required"}
-        user_id = str(arguments.get("userId", "system"))
+        # Without an explicit userId every user's memories are searched, as
+        # episodes and procedures are stored under CEREBRAL_USER_ID
+        user_id = str(arguments["userId"]) if arguments.get("userId") is not None else None
         limit = int(arguments.get("limit", 20))
         # Optional tuning
         min_score = arguments.get("min_score")
         kwargs = {}
         if isinstance(min_score, (int, float)):
             kwargs["min_similarity_score"] = float(min_score)
-        results = await mem.search_memories(query=query, user_id=user_id, limit=limit, **kwargs)
-        return {"success": True, "count": len(results), "results": results}
+        run_id = arguments.get("runId")
+        if run_id:
+            kwargs["run_id"] = str(run_id)
+        mode = str(arguments.get("mode", "auto")).strip().lower()
+        if mode not in {"auto", "lexical", "vector", "hybrid"}:
+            return {"success": False, "error": "mode must be one of auto, lexical, vector, hybrid"}
+        kwargs["mode"] = mode
+        hybrid_weight = arguments.get("hybridWeight")
+        if isinstance(hybrid_weight, (int, float)):
+            kwargs["hybrid_weight"] = float(hybrid_weight)
+        results, used_mode, fallback = await mem.search_memories(query=query, user_id=user_id, limit=limit, **kwargs)
+        response = {"success": True, "count": len(results), "results": results, "searchMode": used_mode}
+        if mode in {"vector", "hybrid"} and used_mode == "lexical":
+            # Explicitly requested similarity search could not run
+            response["warning"] = f"{mode} search unavailable ({fallback}); results are lexical only"
+        return response
 
     async def handle_memory_store_procedure(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
         if not self._is_dev_mode():
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 import json
 import os
 import shlex
@@ -11,8 +12,13 @@ import time
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
+from cflow_platform.core.sandbox_pool import get_sandbox_pool, sandbox_pool_enabled
+
 
 class SandboxHandlers:
+    async def handle_pool_stats(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        return {"status": "success", "enabled": sandbox_pool_enabled(), "pool": get_sandbox_pool().get_stats()}
+
     async def handle_run_python(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
         code: str = str(arguments.get("code", ""))
         if not code.strip():
@@ -26,6 +32,55 @@ class SandboxHandlers:
             map(str, arguments.get("fs_allowlist", [str(Path.cwd())]))
         )
 
+        def _policy(workdir: str) -> Dict[str, Any]:
+            return {
+                "network": "denied",
+                "fs_allowlist": filesystem_allowlist + [workdir],
+                "limits": {
+                    "cpu_sec": cpu_limit_sec,
+                    "time_sec": time_limit_sec,
+                    "mem_mb": mem_limit_mb,
+                },
+            }
+
+        # Warm path: code goes to a pooled worker over its pipe and runs in
+        # that worker's scratch directory, so nothing is written per call.
+        if arguments.get("warm", True) and sandbox_pool_enabled():
+            start = time.time()
+            try:
+                pooled = await asyncio.to_thread(
+                    get_sandbox_pool().run,
+                    code,
+                    time_limit_sec,
+                    cpu_limit_sec,
+                    mem_limit_mb,
+                    filesystem_allowlist,
+                )
+            except Exception:
+                # Fall back to a one-shot interpreter below
+                pooled = None
+            if pooled is not None:
+                elapsed_ms = int((time.time() - start) * 1000)
+                if pooled["timed_out"]:
+                    return {
+                        "status": "error",
+                        "error": "timeout",
+                        "stdout": pooled["stdout"],
+                        "stderr": pooled["stderr"],
+                        "time_ms": elapsed_ms,
+                        "warm": pooled["warm"],
+                        "policy": _policy(pooled["workdir"]),
+                    }
+                return {
+                    "status": "success" if pooled["exit_code"] == 0 else "error",
+                    "stdout": pooled["stdout"],
+                    "stderr": pooled["stderr"],
+                    "exit_code": pooled["exit_code"],
+                    "time_ms": elapsed_ms,
+                    "warm": pooled["warm"],
+                    "policy": _policy(pooled["workdir"]),
+                }
+
         # Create temp working directory
         with tempfile.TemporaryDirectory(prefix="cflow_sandbox_") as tmpdir:
             tmp_path = Path(tmpdir)
@@ -35,6 +90,8 @@ class SandboxHandlers:
 
             user_code_path.write_text(code, encoding="utf-8")
 
+            policy = _policy(str(tmp_path))
+
             wrapper_src = _build_wrapper_script(
                 user_code_path=user_code_path,
                 time_limit_sec=time_limit_sec,
@@ -85,15 +142,7 @@ class SandboxHandlers:
                     "stderr": proc.stderr,
                     "exit_code": proc.returncode,
                     "time_ms": elapsed_ms,
-                    "policy": {
-                        "network": "denied",
-                        "fs_allowlist": filesystem_allowlist + [str(tmp_path)],
-                        "limits": {
-                            "cpu_sec": cpu_limit_sec,
-                            "time_sec": time_limit_sec,
-                            "mem_mb": mem_limit_mb,
-                        },
-                    },
+                    "policy": policy,
                 }
             except subprocess.TimeoutExpired as e:
                 elapsed_ms = int((time.time() - start) * 1000)
@@ -105,15 +154,7 @@ class SandboxHandlers:
                     "stdout": stdout,
                     "stderr": stderr,
                     "time_ms": elapsed_ms,
-                    "policy": {
-                        "network": "denied",
-                        "fs_allowlist": filesystem_allowlist + [str(tmp_path)],
-                        "limits": {
-                            "cpu_sec": cpu_limit_sec,
-                            "time_sec": time_limit_sec,
-                            "mem_mb": mem_limit_mb,
-                        },
-                    },
+                    "policy": policy,
                 }
 
 
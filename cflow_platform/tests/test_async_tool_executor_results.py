@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from contextlib import asynccontextmanager
+
+import pytest
+
+from cflow_platform.core import async_tool_executor
+from cflow_platform.core.async_tool_executor import AsyncToolExecutor, Priority
+
+
+@asynccontextmanager
+async def _executor():
+    ex = AsyncToolExecutor(max_concurrent=4, max_thread_workers=2)
+    try:
+        yield ex
+    finally:
+        await ex.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_returns_worker_result():
+    async with _executor() as executor:
+        async def echo(args):
+            return {"status": "success", "echo": args["value"]}
+
+        executor.register_tool_handler("echo", echo)
+        results = await asyncio.gather(
+            *(executor.execute_tool("echo", {"value": i}) for i in range(10))
+        )
+        assert [r.result["echo"] for r in results] == list(range(10))
+        assert all(r.success and r.tool_name == "echo" for r in results)
+        assert executor.pending_results == {}
+
+
+@pytest.mark.asyncio
+async def test_sync_handlers_share_thread_pool():
+    async with _executor() as executor:
+        def which_thread(args):
+            return threading.current_thread().name
+
+        executor.register_tool_handler("which_thread", which_thread)
+        first = await executor.execute_tool("which_thread", {})
+        second = await executor.execute_tool("which_thread", {})
+        assert first.result.startswith("async-tool")
+        assert second.result.startswith("async-tool")
+
+
+@pytest.mark.asyncio
+async def test_unregistered_tools_use_direct_client(monkeypatch):
+    async with _executor() as executor:
+        async def fake_execute(tool_name, **kwargs):
+            return {"status": "success", "tool": tool_name, "kwargs": kwargs}
+
+        monkeypatch.setattr(async_tool_executor, "execute_mcp_tool", fake_execute)
+        result = await executor.execute_tool("sys_stats", {"verbose": True}, Priority.CRITICAL)
+        assert result.success
+        assert result.result == {"status": "success", "tool": "sys_stats", "kwargs": {"verbose": True}}
+
+
+@pytest.mark.asyncio
+async def test_timeout_cancels_running_handler():
+    async with _executor() as executor:
+        cancelled = asyncio.Event()
+
+        async def slow(args):
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+            return {"status": "success"}
+
+        executor.register_tool_handler("slow", slow)
+        result = await executor.execute_tool("slow", {}, timeout=0.05)
+        assert result.success is False
+        assert "timeout" in result.error.lower()
+        await asyncio.wait_for(cancelled.wait(), 1.0)
+        stats = await executor.get_execution_stats()
+        assert stats["timed_out_executions"] == 1
+
+
+@pytest.mark.asyncio
+async def test_cancel_queued_request():
+    async with _executor() as executor:
+        gate = asyncio.Event()
+
+        async def blocked(args):
+            await gate.wait()
+            return {"status": "success"}
+
+        executor.register_tool_handler("blocked", blocked)
+        pending = asyncio.create_task(executor.execute_tool("blocked", {}, request_id="req-1"))
+        await asyncio.sleep(0.01)
+        with pytest.raises(ValueError):
+            await executor.execute_tool("blocked", {}, request_id="req-1")
+        assert executor.cancel("req-1") is True
+        with pytest.raises(asyncio.CancelledError):
+            await pending
+        assert executor.cancel("req-1") is False
@@ -0,0 +1,125 @@
+import numpy as np
+import pytest
+
+from cflow_platform.core.embeddings.batch_autotuner import (
+    BatchSizeAutotuner,
+    encode_with_autotune,
+    length_bucket,
+)
+from cflow_platform.core.embeddings.cpu_backend import CPUBackendProfile, CPUEmbeddingBackend
+
+# Synthetic throughput curve peaking at batch 16
+_RATE = {4: 100.0, 8: 180.0, 16: 260.0, 32: 220.0, 64: 150.0, 128: 90.0}
+
+
+def _run(tuner: BatchSizeAutotuner, bucket: str = "le256", calls: int = 40) -> int:
+    size = 0
+    for _ in range(calls):
+        size = tuner.suggest("m", "cpu", bucket)
+        tuner.record("m", "cpu", bucket, size, items=256, seconds=256 / _RATE[size])
+    return size
+
+
+def test_converges_on_best_size_and_persists(tmp_path) -> None:
+    state = tmp_path / "tuning.json"
+    tuner = BatchSizeAutotuner(state_path=state, memory_pressure_pct=101)
+    assert _run(tuner) == 16
+    stats = tuner.get_stats()["m|cpu|le256"]
+    assert stats["best"] == 16
+    # Only the neighbourhood of the optimum was explored
+    assert set(stats["sizes"]) == {8, 16, 32}
+    tuner.save()
+
+    reloaded = BatchSizeAutotuner(state_path=state, memory_pressure_pct=101)
+    assert reloaded.suggest("m", "cpu", "le256") == 16
+    # Other buckets start from the default
+    assert reloaded.suggest("m", "cpu", "le4k") == 32
+
+
+def test_small_calls_do_not_count_for_large_sizes() -> None:
+    tuner = BatchSizeAutotuner(memory_pressure_pct=101)
+    tuner.record("m", "cpu", "le256", 32, items=3, seconds=0.01)
+    assert "m|cpu|le256" not in tuner.get_stats()
+
+
+def test_converges_when_calls_are_smaller_than_larger_candidates() -> None:
+    # The micro-batcher caps calls at 32 texts, so 64 can never be measured
+    rate = {16: 100.0, 32: 200.0, 64: 300.0}
+    tuner = BatchSizeAutotuner(memory_pressure_pct=101)
+    for _ in range(50):
+        size = tuner.suggest("m", "cpu", "le256", items=32)
+        tuner.record("m", "cpu", "le256", size, items=32, seconds=32 / rate[size])
+    stats = tuner.get_stats()["m|cpu|le256"]
+    assert stats["best"] == 32
+    assert set(stats["sizes"]) == {16, 32}
+
+    # A bigger call makes 64 measurable and resumes the climb
+    assert tuner.suggest("m", "cpu", "le256", items=128) == 64
+
+    # encode_with_autotune reports how many texts each call carries
+    fresh = BatchSizeAutotuner(memory_pressure_pct=101)
+    for _ in range(20):
+        encode_with_autotune(lambda size: size, "m", "cpu", ["x"] * 32, tuner=fresh)
+    settled = fresh.get_stats()["m|cpu|le256"]
+    # Real timings are noisy, so only check that it settled within reach
+    assert settled["best"] is not None and max(settled["sizes"]) <= 32
+
+
+def test_memory_pressure_halves_suggestion(monkeypatch) -> None:
+    tuner = BatchSizeAutotuner(memory_pressure_pct=101)
+    assert tuner.suggest("m", "cpu", "le256") == 32
+    monkeypatch.setattr(tuner, "memory_pressure", lambda: True)
+    assert tuner.suggest("m", "cpu", "le256") == 16
+
+
+def test_out_of_memory_caps_bucket_and_retries() -> None:
+    tuner = BatchSizeAutotuner(memory_pressure_pct=101)
+    attempts = []
+
+    def encode(size):
+        attempts.append(size)
+        if size > 8:
+            raise RuntimeError("CUDA out of memory. Tried to allocate 2.00 GiB")
+        return ["ok"] * size
+
+    texts = ["x"] * 100
+    assert encode_with_autotune(encode, "m", "cuda", texts, tuner=tuner) == ["ok"] * 8
+    assert attempts == [32, 16, 8]
+    assert tuner.get_stats()["m|cuda|le256"]["cap"] == 8
+    assert tuner.suggest("m", "cuda", "le256") <= 8
+
+    with pytest.raises(ValueError):
+        encode_with_autotune(lambda size: (_ for _ in ()).throw(ValueError("bad input")), "m", "cpu", texts, tuner=tuner)
+
+
+def test_candidates_limited_to_batches_the_cpu_backend_forms() -> None:
+    backend = CPUEmbeddingBackend(CPUBackendProfile(intra_op_threads=1, inter_op_threads=1, token_budget=8192))
+    # ~4k-character texts pad to 512 tokens, so the budget packs 16 per batch
+    assert backend.batch_limit("le4k") == 16
+    assert backend.batch_limit("le256") == 124
+
+    class _Model:
+        def __init__(self):
+            self.batches = []
+
+        def encode(self, texts, batch_size, convert_to_numpy=True):
+            self.batches.append(len(texts))
+            return np.zeros((len(texts), 2))
+
+    model = _Model()
+    tuner = BatchSizeAutotuner(memory_pressure_pct=101)
+    texts = ["a" * 4000] * 128
+    for _ in range(30):
+        encode_with_autotune(
+            lambda size: backend.encode(model, texts, max_batch_size=size),
+            "m", "cpu", texts, tuner=tuner, batch_limit=backend.batch_limit,
+        )
+    # Every timing recorded is for a batch size the backend really ran
+    assert max(tuner.get_stats()["m|cpu|le4k"]["sizes"]) <= 16
+    assert max(model.batches) <= 16
+
+
+def test_length_bucket() -> None:
+    assert length_bucket(["a" * 200] * 3) == "le256"
+    assert length_bucket(["a" * 2000, "a" * 3000, "a" * 10]) == "le4k"
+    assert length_bucket(["a" * 10000]) == "gt4k"
@@ -0,0 +1,74 @@
+import ast
+from pathlib import Path
+
+from cflow_platform.core.code_intel import function_extractor
+from cflow_platform.core.code_intel.callgraph_builder import build_call_edges, python_functions_and_edges
+from cflow_platform.core.code_intel.function_extractor import extract_functions
+
+SOURCE = '''
+import functools
+
+
+def helper(x):
+    return len(x)
+
+
+@functools.lru_cache(maxsize=compute_size())
+def outer(items, key=default_key()):
+    prepare(items)
+
+    def inner(item):
+        return transform(item)
+
+    result = [inner(i) for i in items]
+    return finish(result)
+
+
+class Service:
+    registry = build_registry()
+
+    def run(self):
+        self.client.send(helper("x"))
+'''
+
+
+def _edges(edges) -> set:
+    return {(e.caller.name, e.callee_name) for e in edges}
+
+
+def test_calls_belong_to_the_innermost_enclosing_function() -> None:
+    functions, edges = python_functions_and_edges(Path("svc.py"), SOURCE)
+
+    assert [f.name for f in functions] == ["helper", "outer", "inner", "run"]
+    assert _edges(edges) == {
+        ("helper", "len"),
+        ("outer", "prepare"),
+        ("outer", "inner"),
+        ("outer", "finish"),
+        ("inner", "transform"),
+        ("run", "send"),
+        ("run", "helper"),
+    }
+    # Decorator arguments, defaults and class bodies run outside any function body
+    assert not {"lru_cache", "compute_size", "default_key", "build_registry"} & {e.callee_name for e in edges}
+    inner = next(e for e in edges if e.callee_name == "transform")
+    assert inner.caller_id == f"svc.py:inner:{inner.caller.start_line}-{inner.caller.end_line}"
+
+
+def test_pre_parsed_tree_is_not_parsed_again(monkeypatch) -> None:
+    tree = ast.parse(SOURCE)
+    expected = python_functions_and_edges(Path("svc.py"), SOURCE)
+
+    def no_parse(_content):
+        raise AssertionError("parsed twice")
+
+    monkeypatch.setattr(function_extractor.ast, "parse", no_parse)
+    functions, edges = python_functions_and_edges(Path("svc.py"), tree=tree)
+    assert functions == expected[0] and _edges(edges) == _edges(expected[1])
+    assert _edges(build_call_edges(Path("svc.py"), tree=tree)) == _edges(edges)
+    assert extract_functions(Path("svc.py"), tree=tree) == functions
+
+
+def test_unparseable_source_yields_nothing() -> None:
+    assert python_functions_and_edges(Path("bad.py"), "def broken(:\n") == ([], [])
+    assert build_call_edges(Path("bad.py"), "def broken(:\n") == []
@@ -0,0 +1,109 @@
+import json
+
+from cflow_platform.core.code_intel.callgraph_index import CallGraphIndex, bounded_call_paths, write_index
+from cflow_platform.core.code_intel.callgraph_store import FileCallGraphStore, InMemoryCallGraph, StoredEdge
+
+
+def _edge(caller: str, callee: str, path: str = "app.py") -> StoredEdge:
+    return StoredEdge(caller_id=f"{path}:{caller}:1-9", caller_name=caller, caller_path=path, callee_name=callee)
+
+
+# main -> handle -> save -> write; cli -> save; loop <-> again -> write
+EDGES = [
+    _edge("main", "handle"),
+    _edge("handle", "save"),
+    _edge("handle", "save"),  # second call site, same edge
+    _edge("save", "write", "db.py"),
+    _edge("cli", "save", "cli.py"),
+    _edge("loop", "again"),
+    _edge("again", "loop"),
+    _edge("again", "write"),
+]
+
+
+def _names(chain) -> list:
+    return [e.caller_name for e in chain]
+
+
+def test_index_answers_callers_callees_and_paths(tmp_path) -> None:
+    stats = write_index(EDGES, tmp_path / "cg.idx")
+    assert stats["edges"] == 7  # duplicate call site interned once
+    index = CallGraphIndex(tmp_path / "cg.idx")
+
+    assert sorted(e.caller_name for e in index.callers_of("save")) == ["cli", "handle"]
+    assert [e.caller_path for e in index.callers_of("write")] == ["app.py", "db.py"]
+    assert index.callees_of("handle") == ["save"]
+    assert index.callers_of("missing") == [] and index.call_paths_to("missing") == []
+
+    paths = [_names(p) for p in index.call_paths_to("write")]
+    # Shortest chains first; the loop/again cycle terminates
+    assert paths == [["again", "loop"], ["save", "cli"], ["save", "handle", "main"]]
+    assert all(p[0].callee_name == "write" for p in index.call_paths_to("write"))
+    assert [_names(p) for p in index.call_paths_to("write", max_depth=2)] == [
+        ["again", "loop"], ["save", "handle"], ["save", "cli"],
+    ]
+    assert len(index.call_paths_to("write", max_paths=1)) == 1
+    index.close()
+
+
+def test_in_memory_graph_uses_the_same_bounded_walk() -> None:
+    g = InMemoryCallGraph()
+    for e in EDGES:
+        g.add_edge(e)
+    # The duplicate handle -> save call site reaches main only once
+    assert sorted(_names(p) for p in g.call_paths_to("write")) == [
+        ["again", "loop"], ["save", "cli"], ["save", "handle"], ["save", "handle", "main"],
+    ]
+    assert [e.caller_name for e in g.reverse_index()["save"]] == ["handle", "handle", "cli"]
+
+
+def test_bounded_walk_stops_early_on_wide_graphs() -> None:
+    fan = {0: list(range(1, 1001))}
+    expanded = []
+
+    def callers(edge):
+        expanded.append(edge)
+        return fan.get(edge, [])
+
+    assert len(bounded_call_paths([0], callers, lambda e: e, max_paths=5)) == 5
+    assert len(expanded) <= 6
+
+
+def test_store_rebuilds_stale_index_from_jsonl(tmp_path) -> None:
+    store = FileCallGraphStore(tmp_path / "callgraph.jsonl")
+    assert store.load_graph().call_paths_to("save") == []
+
+    store.save_edges(EDGES[:3])
+    assert store.index_path.exists()
+    assert [_names(p) for p in store.load_graph().call_paths_to("save")] == [["handle", "main"]]
+
+    # An edge list written by an older tool (no index update) is picked up on the next load
+    with store.path.open("a", encoding="utf-8") as f:
+        f.write(json.dumps(vars(_edge("cli", "save", "cli.py"))) + "\n")
+    assert sorted(_names(p) for p in store.load_graph().call_paths_to("save")) == [["cli"], ["handle", "main"]]
+
+    store.index_path.write_bytes(b"garbage")
+    assert len(store.load_graph().call_paths_to("save")) == 2
+    assert store.index_path.stat().st_size > len(b"garbage")
+
+
+def test_store_overlays_file_edge_updates_until_compacted(tmp_path) -> None:
+    store = FileCallGraphStore(tmp_path / "callgraph.jsonl")
+    store.save_edges(EDGES[:5])
+    base = store.path.read_bytes()
+
+    # cli.py now calls write directly; db.py is deleted
+    assert store.replace_file_edges({"cli.py": [_edge("cli", "write", "cli.py")], "db.py": []}) == 1
+    assert store.path.read_bytes() == base and store.delta_path.exists()
+    graph = store.load_graph()
+    assert sorted(_names(p) for p in graph.call_paths_to("write")) == [["cli"]]
+    assert [_names(p) for p in graph.call_paths_to("save")] == [["handle", "main"]]
+
+    # Later entries for a file win
+    store.replace_file_edges({"cli.py": [_edge("cli", "save", "cli.py")]})
+    assert sorted(_names(p) for p in store.load_graph().call_paths_to("save")) == [["cli"], ["handle", "main"]]
+
+    assert store.compact() == 4
+    assert not store.delta_path.exists()
+    assert sorted(e.caller_path for e in store.load_edges().edges) == ["app.py", "app.py", "app.py", "cli.py"]
+    assert sorted(_names(p) for p in store.load_graph().call_paths_to("save")) == [["cli"], ["handle", "main"]]
@@ -0,0 +1,97 @@
+from pathlib import Path
+
+from cflow_platform.core.code_intel.function_extractor import definition_spans
+from cflow_platform.core.services.code_chunking import (
+    CHUNKER_VERSION,
+    chunk_lines,
+    chunk_source,
+    source_hash,
+)
+
+
+def _function(name: str, body_lines: int) -> str:
+    body = "\n".join(f"    value_{i} = compute_{name}({i})" for i in range(body_lines))
+    return f"def {name}(arg):\n    \"\"\"{name} docs\"\"\"\n{body}\n    return arg\n"
+
+
+def _module() -> str:
+    return "\n".join(
+        [
+            "import os",
+            "",
+            "",
+            "# Helper that is big enough to stand alone",
+            _function("alpha", 60),
+            "",
+            _function("beta", 2),
+            "",
+            _function("gamma", 2),
+            "",
+            "@decorated",
+            _function("delta", 60),
+        ]
+    )
+
+
+def test_python_chunks_follow_definitions_and_keep_comments() -> None:
+    content = _module()
+    chunks = chunk_source(content, "pkg/mod.py", "python")
+    starts = [c.content.splitlines()[0] for c in chunks]
+
+    # alpha and delta stand alone; the small beta/gamma pair is packed together
+    assert starts == ["import os", "# Helper that is big enough to stand alone", "def beta(arg):", "@decorated"]
+    assert "def alpha(arg):" in chunks[1].content
+    assert "def gamma(arg):" in chunks[2].content
+    # Every non-blank line is embedded exactly once
+    embedded = [line for c in chunks for line in c.content.splitlines() if line.strip()]
+    assert embedded == [line for line in content.splitlines() if line.strip()]
+    assert all(c.content == "\n".join(content.split("\n")[c.start_line - 1 : c.end_line]) for c in chunks)
+
+
+def test_editing_one_function_leaves_other_chunks_unchanged() -> None:
+    before = chunk_source(_module(), "pkg/mod.py", "python")
+    edited = _module().replace("value_3 = compute_delta(3)", "value_3 = compute_delta(33)")
+    after = chunk_source(edited, "pkg/mod.py", "python")
+
+    assert [c.hash for c in before[:3]] == [c.hash for c in after[:3]]
+    assert before[3].hash != after[3].hash
+
+
+def test_oversized_class_is_split_at_its_methods() -> None:
+    methods = "\n".join(
+        "    " + line for n in range(6) for line in (_function(f"method_{n}", 30) + "\n").splitlines()
+    )
+    content = f"class Service:\n    \"\"\"Big class\"\"\"\n\n{methods}\n"
+    chunks = chunk_source(content, "svc.py", "python", max_chars=3072, standalone_chars=1536)
+
+    assert len(chunks) > 1
+    assert all(len(c.content) <= 3072 for c in chunks)
+    assert chunks[0].content.startswith("class Service:")
+    assert all(c.content.lstrip().startswith("def method_") for c in chunks[1:])
+
+
+def test_typescript_spans_and_other_languages_fall_back_to_line_windows() -> None:
+    ts = "\n".join(
+        [
+            "export class Store {",
+            "  get(key: string) {",
+            "    return this.items[key];",
+            "  }",
+            "}",
+            "",
+            "export async function load(path: string): Promise<void> {",
+            "  await read(path);",
+            "}",
+        ]
+    )
+    assert definition_spans(Path("store.ts"), ts) == [(1, 5), (7, 9)]
+    chunks = chunk_source(ts, "store.ts", "typescript", max_chars=80, standalone_chars=40)
+    assert [(c.start_line, c.end_line) for c in chunks] == [(1, 5), (7, 9)]
+
+    sql = "\n".join(f"select {i};" for i in range(120))
+    assert [c.hash for c in chunk_source(sql, "q.sql", "sql")] == [c.hash for c in chunk_lines(sql, "q.sql", "sql")]
+
+
+def test_source_hash_covers_chunker_version() -> None:
+    assert CHUNKER_VERSION >= 2
+    assert source_hash("x = 1") == source_hash("x = 1") != source_hash("x = 2")
@@ -0,0 +1,151 @@
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+pytest.importorskip("supabase")
+from supabase import create_client  # noqa: E402
+
+from cflow_platform.core.code_intel.function_extractor import FunctionInfo  # noqa: E402
+from cflow_platform.core.code_intel.supabase_writer import CodeFunctionWriter  # noqa: E402
+
+
+class _PostgrestStandIn:
+    """Just enough of PostgREST's bulk upsert (POST ?on_conflict=, Prefer: merge-duplicates)"""
+
+    def __init__(self) -> None:
+        self.tables = {}
+        self.posts = []
+        self.fail_next = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _reply(self, status, body=None):
+                payload = json.dumps(body).encode() if body is not None else b""
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_POST(self):
+                url = urlparse(self.path)
+                table = url.path.rsplit("/", 1)[-1]
+                key = parse_qs(url.query)["on_conflict"][0].split(",")
+                rows = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                with stand_in.lock:
+                    stand_in.in_flight += 1
+                    stand_in.max_in_flight = max(stand_in.max_in_flight, stand_in.in_flight)
+                time.sleep(0.02)
+                try:
+                    with stand_in.lock:
+                        stand_in.posts.append((table, len(rows)))
+                        if stand_in.fail_next:
+                            stand_in.fail_next -= 1
+                            return self._reply(503, {"message": "upstream unavailable", "code": "503"})
+                        assert "merge-duplicates" in self.headers.get("Prefer", "")
+                        stored = stand_in.tables.setdefault(table, {})
+                        out = []
+                        for row in rows:
+                            natural = tuple(row[k] for k in key)
+                            existing = stored.get(natural)
+                            merged = {**(existing or {"id": str(uuid.uuid4())}), **row}
+                            stored[natural] = merged
+                            out.append(merged)
+                    if "return=minimal" in self.headers.get("Prefer", ""):
+                        return self._reply(201)
+                    return self._reply(201, out)
+                finally:
+                    with stand_in.lock:
+                        stand_in.in_flight -= 1
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+
+@pytest.fixture
+def postgrest():
+    stand_in = _PostgrestStandIn()
+    yield stand_in
+    stand_in.server.shutdown()
+
+
+def _items(n, summary="s"):
+    fns = [FunctionInfo(f"f{i}", f"pkg/m{i % 7}.py", "python", i * 10, i * 10 + 5, f"def f{i}()", None) for i in range(n)]
+    return [(f, f"{summary} {f.name}", [float(i), 1.0]) for i, f in enumerate(fns)]
+
+
+def test_batched_upsert_is_idempotent(postgrest) -> None:
+    writer = CodeFunctionWriter(create_client(postgrest.url, "test-key"), batch_size=25, concurrency=3, backoff_seconds=0.01)
+    stats = writer.write(_items(100))
+    assert stats["functions"] == 100 and stats["embeddings"] == 100
+    # Two requests per batch instead of ~3 per function
+    assert stats["batches"] == 4 and stats["requests"] == 8 and stats["batches_failed"] == 0
+    assert sorted(postgrest.posts) == [("code_function_embeddings", 25)] * 4 + [("code_functions", 25)] * 4
+    assert postgrest.max_in_flight <= 3
+    ids = {k: r["id"] for k, r in postgrest.tables["code_functions"].items()}
+
+    # Re-indexing updates rows in place and keeps their ids
+    again = CodeFunctionWriter(create_client(postgrest.url, "test-key"), batch_size=25, concurrency=3)
+    assert again.write(_items(100, summary="changed"))["functions"] == 100
+    functions = postgrest.tables["code_functions"]
+    assert len(functions) == 100 and {k: r["id"] for k, r in functions.items()} == ids
+    assert all(r["summary"].startswith("changed") for r in functions.values())
+    embeddings = postgrest.tables["code_function_embeddings"]
+    assert len(embeddings) == 100 and {r["function_id"] for r in embeddings.values()} == set(ids.values())
+
+
+def test_duplicate_keys_collapse_and_transient_errors_retry(postgrest) -> None:
+    items = _items(10)
+    postgrest.fail_next = 2
+    writer = CodeFunctionWriter(create_client(postgrest.url, "test-key"), batch_size=50, backoff_seconds=0.01)
+    stats = writer.write(items + items[:3])
+    assert stats["functions"] == 10 and stats["retries"] == 2 and stats["batches_failed"] == 0
+    assert len(postgrest.tables["code_functions"]) == 10
+
+
+def test_exhausted_retries_fail_the_batch_not_the_run(postgrest) -> None:
+    postgrest.fail_next = 100
+    writer = CodeFunctionWriter(create_client(postgrest.url, "test-key"), batch_size=5, concurrency=2, max_retries=1, backoff_seconds=0.01)
+    stats = writer.write(_items(10))
+    assert stats["batches"] == 2 and stats["batches_failed"] == 2 and stats["functions"] == 0
+
+
+def test_same_function_in_other_tenant_or_repo_is_a_separate_row(postgrest) -> None:
+    client = create_client(postgrest.url, "test-key")
+    for tenant, repo in (("t1", "app"), ("t2", "app"), ("t1", "lib")):
+        writer = CodeFunctionWriter(client, batch_size=50)
+        writer.tenant_id, writer.repo = tenant, repo
+        assert writer.write(_items(5))["functions"] == 5
+    functions = postgrest.tables["code_functions"]
+    assert len(functions) == 15
+    ids = {r["id"] for r in functions.values()}
+    assert len(ids) == 15
+    assert {(r["tenant_id"], r["repo"]) for r in functions.values()} == {("t1", "app"), ("t2", "app"), ("t1", "lib")}
+
+
+def test_anon_key_only_warns_once(tmp_path, monkeypatch, caplog) -> None:
+    from cflow_platform.core.code_intel import function_indexer
+    from cflow_platform.core.code_intel.function_indexer import FunctionIndexer
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(function_indexer, "_warned_anon_only", False)
+    monkeypatch.setenv("SUPABASE_URL", "http://localhost:54321")
+    monkeypatch.setenv("SUPABASE_ANON_KEY", "anon")
+    monkeypatch.delenv("SUPABASE_SERVICE_ROLE_KEY", raising=False)
+    indexers = [FunctionIndexer(manifest_path=tmp_path / f"m{i}.sqlite3", callgraph_path=tmp_path / "cg.jsonl") for i in range(2)]
+    with caplog.at_level("WARNING", logger=function_indexer.__name__):
+        assert all(idx._ensure_supabase() is None for idx in indexers for _ in range(2))
+    warnings = [r.message for r in caplog.records if r.name == function_indexer.__name__]
+    assert len(warnings) == 1 and "SUPABASE_SERVICE_ROLE_KEY" in warnings[0]
@@ -0,0 +1,150 @@
+import os
+
+from cflow_platform.core.code_intel import function_indexer
+from cflow_platform.core.code_intel.extraction import FILES_PER_TASK, scan_paths
+from cflow_platform.core.code_intel.function_indexer import FunctionIndexer
+
+
+class _FakeCollection:
+    def __init__(self) -> None:
+        self.vectors = {}
+
+    def upsert(self, ids, documents, embeddings, metadatas):
+        self.vectors.update(zip(ids, metadatas))
+
+    def update(self, ids, metadatas):
+        self.vectors.update(zip(ids, metadatas))
+
+    def delete(self, ids):
+        for i in ids:
+            self.vectors.pop(i, None)
+
+
+A = "def load(path):\n    return open(path)\n\n\ndef parse(path):\n    return load(path).read()\n"
+B = "def main():\n    parse('x')\n"
+
+
+def _indexer(tmp_path, monkeypatch, embedded):
+    def fake_embed(summaries):
+        embedded.extend(summaries)
+        return [[float(len(s))] for s in summaries]
+
+    monkeypatch.setattr(function_indexer, "embed_summaries", fake_embed)
+    monkeypatch.setattr(FunctionIndexer, "_ensure_supabase", lambda self: None)
+    idx = FunctionIndexer(manifest_path=tmp_path / "manifest.sqlite3", callgraph_path=tmp_path / "callgraph.jsonl")
+    idx.collection = _FakeCollection()
+    return idx
+
+
+def _callers(idx, name):
+    return sorted(tuple(e.caller_name for e in chain) for chain in idx.callgraph.load_graph().call_paths_to(name))
+
+
+def test_sync_only_touches_changed_files(tmp_path, monkeypatch) -> None:
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    (repo / "a.py").write_text(A)
+    (repo / "b.py").write_text(B)
+    (repo / "notes.md").write_text("# not code")
+    embedded = []
+    idx = _indexer(tmp_path, monkeypatch, embedded)
+
+    first = idx.sync(repo)
+    assert first["files_indexed"] == 2 and first["indexed"] == 3
+    assert len(idx.collection.vectors) == 3
+    assert _callers(idx, "load") == [("parse", "main")]
+
+    # Nothing changed; a touched file is recognised by its content hash
+    embedded.clear()
+    os.utime(repo / "a.py", ns=(1, 1))
+    second = idx.sync(repo)
+    assert second["files_unchanged"] == 2 and second["files_indexed"] == 0
+    assert embedded == [] and "call_edges" not in second
+
+    # Appending a function embeds only that function and updates its file's edges
+    (repo / "b.py").write_text(B + "\n\ndef cli():\n    load('y')\n")
+    third = idx.sync(repo)
+    assert third["files_indexed"] == 1 and third["indexed"] == 1 and third["files_unchanged"] == 1
+    assert len(embedded) == 1 and "name: cli" in embedded[0]
+    assert _callers(idx, "load") == [("cli",), ("parse", "main")]
+
+    # Deleting a file drops its functions and edges
+    (repo / "a.py").unlink()
+    fourth = idx.sync(repo)
+    assert fourth["files_removed"] == 1 and fourth["functions_removed"] == 2
+    assert sorted(m["name"] for m in idx.collection.vectors.values()) == ["cli", "main"]
+    assert _callers(idx, "load") == [("cli",)]
+    assert idx.manifest.get_stats()["files"] == 1
+
+
+def test_moved_functions_keep_their_ids_and_edges_update_per_file(tmp_path, monkeypatch) -> None:
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    (repo / "a.py").write_text(A)
+    (repo / "b.py").write_text(B)
+    embedded = []
+    idx = _indexer(tmp_path, monkeypatch, embedded)
+    idx.sync(repo)
+    ids = set(idx.collection.vectors)
+    base = idx.callgraph.path.read_bytes()
+
+    # Shifting every function down embeds nothing and only refreshes line numbers
+    embedded.clear()
+    (repo / "a.py").write_text("import os\n\n\n" + A)
+    moved = idx.sync(repo)
+    assert moved["files_indexed"] == 1 and moved["indexed"] == 0 and embedded == []
+    assert set(idx.collection.vectors) == ids
+    assert sorted(m["start"] for m in idx.collection.vectors.values() if m["name"] != "main") == [4, 8]
+
+    # Only the changed file's edges are written; the edge list itself is untouched
+    (repo / "b.py").write_text("def main():\n    load('x')\n")
+    changed = idx.sync(repo)
+    assert changed["indexed"] == 1 and changed["call_edges"] == 1
+    assert idx.callgraph.path.read_bytes() == base
+    assert _callers(idx, "load") == [("main",), ("parse",)]
+
+
+def test_identical_definitions_get_distinct_ids(tmp_path, monkeypatch) -> None:
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    (repo / "a.py").write_text("try:\n    def f():\n        return 1\nexcept Exception:\n    def f():\n        return 1\n")
+    idx = _indexer(tmp_path, monkeypatch, [])
+    stats = idx.sync(repo)
+    assert stats["indexed"] == 2 and len(idx.collection.vectors) == 2
+
+
+def test_failed_embedding_is_retried_on_next_sync(tmp_path, monkeypatch) -> None:
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    (repo / "a.py").write_text(A)
+    idx = _indexer(tmp_path, monkeypatch, [])
+
+    def broken(summaries):
+        raise RuntimeError("model unavailable")
+
+    monkeypatch.setattr(function_indexer, "embed_summaries", broken)
+    failed = idx.sync(repo)
+    assert failed["files_failed"] == 1 and idx.manifest.get_stats()["files"] == 0
+
+    monkeypatch.setattr(function_indexer, "embed_summaries", lambda s: [[1.0]] * len(s))
+    retried = idx.sync(repo)
+    assert retried["files_indexed"] == 1 and retried["indexed"] == 2
+
+
+def test_process_pool_extraction_matches_serial(tmp_path, monkeypatch) -> None:
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    for n in range(FILES_PER_TASK + 8):
+        (repo / f"m{n}.py").write_text(f"def f{n}():\n    g{n}()\n\n\ndef g{n}():\n    return {n}\n")
+    tasks = [(str(p), None) for p in sorted(repo.iterdir())]
+
+    serial = list(scan_paths(tasks, jobs=1))
+    pooled = list(scan_paths(tasks, jobs=2))
+    assert [s.file_path for s in pooled] == [t[0] for t in tasks]
+    assert [(s.content_hash, s.functions, s.edges) for s in pooled] == [
+        (s.content_hash, s.functions, s.edges) for s in serial
+    ]
+
+    idx = _indexer(tmp_path, monkeypatch, [])
+    stats = idx.index_paths(sorted(repo.iterdir()), jobs=2)
+    assert stats["files_indexed"] == len(tasks) and stats["functions"] == 2 * len(tasks)
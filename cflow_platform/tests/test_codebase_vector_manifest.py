@@ -0,0 +1,104 @@
+import subprocess
+
+import pytest
+
+from cflow_platform.core.services import enterprise_codebase_vectorization_service as vectorization
+from cflow_platform.core.services.codebase_vector_manifest import CodebaseVectorManifest
+from cflow_platform.core.services.enterprise_codebase_vectorization_service import CoreCodebaseVectorizer
+
+
+class _FakeCollection:
+    def __init__(self) -> None:
+        self.vectors = {}
+        self.metadata = {}
+
+    def upsert(self, ids, documents, embeddings, metadatas):
+        for i, e, m in zip(ids, embeddings, metadatas):
+            self.vectors[i] = e
+            self.metadata[i] = m
+
+    def update(self, ids, metadatas):
+        for i, m in zip(ids, metadatas):
+            assert i in self.vectors
+            self.metadata[i] = m
+
+    def delete(self, ids):
+        for i in ids:
+            self.vectors.pop(i, None)
+            self.metadata.pop(i, None)
+
+
+def _git(repo, *args) -> str:
+    return subprocess.check_output(["git", *args], cwd=repo, text=True).strip()
+
+
+def _commit(repo, files) -> str:
+    for name, content in files.items():
+        path = repo / name
+        if content is None:
+            path.unlink()
+        else:
+            path.write_text(content)
+    _git(repo, "add", "-A")
+    _git(repo, "-c", "user.email=t@example.com", "-c", "user.name=t", "commit", "-q", "-m", "change")
+    return _git(repo, "rev-parse", "HEAD")
+
+
+@pytest.mark.asyncio
+async def test_commits_only_embed_changed_chunks_and_delete_stale_vectors(tmp_path, monkeypatch) -> None:
+    embedded = []
+
+    def fake_embeddings(texts, allow_fallback=True):
+        assert not allow_fallback
+        embedded.extend(texts)
+        return [[float(len(t))] for t in texts]
+
+    monkeypatch.setattr(vectorization, "generate_accelerated_embeddings", fake_embeddings)
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    _git(repo, "init", "-q")
+
+    svc = CoreCodebaseVectorizer.__new__(CoreCodebaseVectorizer)
+    svc.collection = _FakeCollection()
+    svc.manifest = CodebaseVectorManifest(tmp_path / "manifest.sqlite3")
+
+    big = [f"line_{i} = {i}" for i in range(200)]
+    first = await svc.process_commit(_commit(repo, {"big.toml": "\n".join(big), "gone.toml": "x = 1"}), str(repo))
+    assert first["chunks_embedded"] == 6  # 5 windows for big.toml + 1 for gone.toml
+    ids_before = set(svc.collection.vectors)
+
+    # Edit one line near the end: only the windows covering it are re-embedded
+    big[190] = "line_190 = 'changed'"
+    embedded.clear()
+    second_commit = _commit(repo, {"big.toml": "\n".join(big), "gone.toml": None})
+    second = await svc.process_commit(second_commit, str(repo))
+    assert second["chunks_embedded"] == 1 and second["chunks_unchanged"] == 4
+    assert second["chunks_deleted"] == 2 and second["files_deleted"] == 1
+    assert len(embedded) == 1 and "line_190 = 'changed'" in embedded[0]
+    assert len(svc.collection.vectors) == 5
+    assert len(ids_before & set(svc.collection.vectors)) == 4
+
+    # Replaying a commit whose files are already indexed costs nothing
+    embedded.clear()
+    third = await svc.process_commit(second_commit, str(repo))
+    assert third["files_unchanged"] == 1 and embedded == []
+    assert svc.manifest.get_stats()["chunks"] == 5
+
+
+@pytest.mark.asyncio
+async def test_commit_without_model_records_nothing(tmp_path, monkeypatch) -> None:
+    from cflow_platform.core.embeddings import apple_silicon_accelerator
+
+    accelerator = apple_silicon_accelerator.get_apple_silicon_accelerator()
+    monkeypatch.setattr(accelerator, "create_sentence_transformer", lambda *a, **k: None)
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    _git(repo, "init", "-q")
+    svc = CoreCodebaseVectorizer.__new__(CoreCodebaseVectorizer)
+    svc.collection = _FakeCollection()
+    svc.manifest = CodebaseVectorManifest(tmp_path / "manifest.sqlite3")
+
+    # The placeholder vectors must neither be stored nor mark the file as indexed
+    stats = await svc.process_commit(_commit(repo, {"a.toml": "x = 1"}), str(repo))
+    assert stats["files_failed"] == 1 and stats["chunks_embedded"] == 0
+    assert svc.collection.vectors == {} and svc.manifest.get_stats()["files"] == 0
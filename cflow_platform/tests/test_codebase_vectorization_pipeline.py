@@ -0,0 +1,121 @@
+import pytest
+
+from cflow_platform.core.services.codebase_vector_manifest import CodebaseVectorManifest
+from cflow_platform.core.services.codebase_vectorization_pipeline import (
+    CodebaseVectorizationPipeline,
+    PipelineConfig,
+)
+from cflow_platform.core.services.enterprise_codebase_vectorization_service import CoreCodebaseVectorizer
+
+
+class _FakeCollection:
+    def __init__(self) -> None:
+        self.vectors = {}
+        self.upserts = 0
+
+    def upsert(self, ids, documents, embeddings, metadatas):
+        self.upserts += 1
+        self.vectors.update(zip(ids, embeddings))
+
+    def update(self, ids, metadatas):
+        assert all(i in self.vectors for i in ids)
+
+    def delete(self, ids):
+        for i in ids:
+            self.vectors.pop(i, None)
+
+
+def _vectorizer(tmp_path) -> CoreCodebaseVectorizer:
+    svc = CoreCodebaseVectorizer.__new__(CoreCodebaseVectorizer)
+    svc.collection = _FakeCollection()
+    svc.manifest = CodebaseVectorManifest(tmp_path / "manifest.sqlite3")
+    return svc
+
+
+def _write_repo(root, files: int) -> None:
+    (root / "pkg").mkdir(parents=True)
+    (root / "node_modules").mkdir()
+    (root / "node_modules" / "dep.js").write_text("ignored = true")
+    for n in range(files):
+        body = "\n".join(f"value_{n}_{i} = {i}" for i in range(120))
+        (root / "pkg" / f"mod_{n}.toml").write_text(body)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("workers", [1, 2])
+async def test_pipeline_indexes_repository_and_resumes_from_manifest(tmp_path, workers) -> None:
+    repo = tmp_path / "repo"
+    _write_repo(repo, 12)
+    svc = _vectorizer(tmp_path)
+    batches = []
+
+    def embed(texts):
+        batches.append(len(texts))
+        return [[float(len(t))] for t in texts]
+
+    progress = []
+    config = PipelineConfig(workers=workers, files_per_task=3, embed_batch_size=8, write_batch_size=10)
+    first = await CodebaseVectorizationPipeline(svc, config, embed, progress.append).run(str(repo))
+
+    assert first["files_total"] == 12 and first["files_processed"] == 12
+    assert first["chunks_embedded"] == 36 == len(svc.collection.vectors)  # 3 windows per file
+    assert max(batches) <= 8 and sum(batches) == 36
+    assert progress and progress[-1]["chunks_embedded"] == 36
+    assert set(first["stages"]) == {"discover", "read_chunk", "embed", "write"}
+    assert first["stages"]["embed"]["items"] == 36
+
+    # Second run: one file edited, one deleted, the rest skipped by content hash
+    (repo / "pkg" / "mod_0.toml").write_text((repo / "pkg" / "mod_0.toml").read_text() + "\nextra = 1")
+    (repo / "pkg" / "mod_1.toml").unlink()
+    batches.clear()
+    second = await CodebaseVectorizationPipeline(svc, config, embed).run(str(repo))
+
+    assert second["files_unchanged"] == 10 and second["files_processed"] == 1
+    assert second["chunks_embedded"] == 1 and second["chunks_unchanged"] == 2
+    assert second["files_deleted"] == 1 and second["chunks_deleted"] == 4
+    assert len(svc.collection.vectors) == 33
+    assert svc.manifest.get_stats()["files"] == 11
+
+
+@pytest.mark.asyncio
+async def test_failed_embedding_leaves_files_for_the_next_run(tmp_path, monkeypatch) -> None:
+    from cflow_platform.core.embeddings import apple_silicon_accelerator
+
+    repo = tmp_path / "repo"
+    _write_repo(repo, 2)
+    svc = _vectorizer(tmp_path)
+    config = PipelineConfig(workers=1, embed_batch_size=4)
+
+    # No model: the default embed path must fail the files, not store placeholder vectors
+    accelerator = apple_silicon_accelerator.get_apple_silicon_accelerator()
+    monkeypatch.setattr(accelerator, "create_sentence_transformer", lambda *a, **k: None)
+    failed = await svc.vectorize_repository(str(repo), config)
+    assert failed["files_failed"] == 2 and failed["chunks_embedded"] == 0
+    assert svc.collection.vectors == {} and svc.manifest.get_stats()["files"] == 0
+
+    retried = await CodebaseVectorizationPipeline(svc, config, lambda texts: [[1.0]] * len(texts)).run(str(repo))
+    assert retried["files_processed"] == 2 and retried["files_failed"] == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_prune_is_not_counted_and_retried(tmp_path) -> None:
+    repo = tmp_path / "repo"
+    _write_repo(repo, 2)
+    svc = _vectorizer(tmp_path)
+    config = PipelineConfig(workers=1)
+    embed = lambda texts: [[1.0]] * len(texts)  # noqa: E731
+    await CodebaseVectorizationPipeline(svc, config, embed).run(str(repo))
+    (repo / "pkg" / "mod_1.toml").unlink()
+
+    def broken_delete(ids):
+        raise RuntimeError("vector store offline")
+
+    svc.collection.delete = broken_delete
+    failed = await CodebaseVectorizationPipeline(svc, config, embed).run(str(repo))
+    assert failed["files_deleted"] == 0 and failed["chunks_deleted"] == 0
+    assert svc.manifest.get_stats()["files"] == 2
+
+    del svc.collection.delete
+    pruned = await CodebaseVectorizationPipeline(svc, config, embed).run(str(repo))
+    assert pruned["files_deleted"] == 1 and pruned["chunks_deleted"] == 3
+    assert svc.manifest.get_stats()["files"] == 1
@@ -0,0 +1,64 @@
+import numpy as np
+
+from cflow_platform.core.embeddings.cpu_backend import (
+    CPUBackendProfile,
+    CPUEmbeddingBackend,
+    available_cpus,
+    cgroup_cpu_limit,
+    length_buckets,
+)
+
+
+def test_cgroup_quota_v2_and_v1(tmp_path) -> None:
+    v2 = tmp_path / "v2"
+    v2.mkdir()
+    (v2 / "cpu.max").write_text("150000 100000\n")
+    assert cgroup_cpu_limit(v2) == 1.5
+    assert available_cpus(v2) <= 2
+
+    (v2 / "cpu.max").write_text("max 100000\n")
+    assert cgroup_cpu_limit(v2) is None
+
+    v1 = tmp_path / "v1"
+    (v1 / "cpu").mkdir(parents=True)
+    (v1 / "cpu" / "cpu.cfs_quota_us").write_text("400000")
+    (v1 / "cpu" / "cpu.cfs_period_us").write_text("100000")
+    assert cgroup_cpu_limit(v1) == 4.0
+    (v1 / "cpu" / "cpu.cfs_quota_us").write_text("-1")
+    assert cgroup_cpu_limit(v1) is None
+
+
+def test_profile_from_environment(tmp_path, monkeypatch) -> None:
+    (tmp_path / "cpu.max").write_text("100000 100000")
+    monkeypatch.delenv("CFLOW_EMBED_CPU_THREADS", raising=False)
+    monkeypatch.setenv("CFLOW_EMBED_QUANTIZE", "1")
+    profile = CPUBackendProfile.from_environment(tmp_path)
+    assert profile.intra_op_threads == 1 and profile.inter_op_threads == 1
+    assert profile.quantize is True
+    assert CPUEmbeddingBackend(profile).namespace("all-MiniLM-L6-v2") == "all-MiniLM-L6-v2-int8"
+
+
+def test_length_buckets_pack_short_texts_densely() -> None:
+    texts = ["x" * 2000] * 4 + ["short"] * 40
+    batches = length_buckets(texts, token_budget=1024, max_batch_size=32)
+    assert sorted(i for b in batches for i in b) == list(range(len(texts)))
+    # Long texts (~500 tokens) go two per batch; short ones fill up to max_batch_size
+    assert [len(b) for b in batches] == [2, 2, 32, 8]
+
+
+class _FakeModel:
+    def __init__(self) -> None:
+        self.batch_sizes = []
+
+    def encode(self, texts, batch_size, convert_to_numpy=True):
+        self.batch_sizes.append(len(texts))
+        return np.array([[len(t), 1.0] for t in texts], dtype=np.float32)
+
+
+def test_bucketed_encode_restores_input_order() -> None:
+    model = _FakeModel()
+    profile = CPUBackendProfile(intra_op_threads=1, inter_op_threads=1, token_budget=64, max_batch_size=4)
+    texts = ["a" * n for n in (5, 300, 12, 1, 80, 40)]
+    vectors = CPUEmbeddingBackend(profile).encode(model, texts)
+    assert vectors[:, 0].tolist() == [5, 300, 12, 1, 80, 40]
+    assert len(model.batch_sizes) > 1 and sum(model.batch_sizes) == len(texts)
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import types
+
+import pytest
+
+from cflow_platform.core import direct_client
+from cflow_platform.core.direct_client import execute_mcp_tool
+
+
+@pytest.fixture
+def fake_linting(monkeypatch):
+    created = []
+
+    class LintingHandlers:
+        def __init__(self) -> None:
+            created.append(self)
+
+        async def handle_lint_status(self, args):
+            return {"status": "success", "args": args, "instance": id(self)}
+
+        async def handle_lint_full(self, args):
+            return {"status": "success", "instance": id(self)}
+
+    fake = types.SimpleNamespace(LintingHandlers=LintingHandlers)
+    real_loader = direct_client.load_handler_module
+    monkeypatch.setattr(
+        direct_client,
+        "load_handler_module",
+        lambda name: fake if name == "linting_handlers" else real_loader(name),
+    )
+    direct_client.clear_handler_cache()
+    yield created
+    direct_client.clear_handler_cache()
+
+
+@pytest.mark.asyncio
+async def test_handler_instance_reused_across_calls(fake_linting):
+    first = await execute_mcp_tool("lint_status", path="a")
+    second = await execute_mcp_tool("lint_full")
+    assert first["args"] == {"path": "a"}
+    assert first["instance"] == second["instance"]
+    assert len(fake_linting) == 1
+
+
+@pytest.mark.asyncio
+async def test_clear_handler_cache_rebuilds_instances(fake_linting):
+    await execute_mcp_tool("lint_status")
+    direct_client.clear_handler_cache()
+    await execute_mcp_tool("lint_status")
+    assert len(fake_linting) == 2
+
+
+@pytest.mark.asyncio
+async def test_unknown_tools_report_errors():
+    res = await execute_mcp_tool("__no_such_tool__")
+    assert res == {"status": "error", "message": "Unknown tool: __no_such_tool__"}
+    res = await execute_mcp_tool("bmad_no_such_tool")
+    assert res == {"status": "error", "message": "Unknown BMAD tool: bmad_no_such_tool"}
+
+
+def test_dispatch_table_covers_tool_families():
+    table = direct_client.get_dispatch_table()
+    for name in (
+        "sys_test",
+        "task_list",
+        "doc_research",
+        "enh_status",
+        "plan_list",
+        "sandbox.run_python",
+        "memory_search",
+        "bmad_prd_create",
+        "bmad_vault_get_config",
+        "bmad_template_load",
+        "bmad_performance_load_test",
+        "bmad_basic_prd_workflow",
+        "code.call_paths",
+        "code_reasoning.plan",
+    ):
+        assert name in table, name
+    # doc_research is owned by the enhanced research handlers
+    assert table["doc_research"].module_name == "enhanced_research_handlers"
+
+
+@pytest.mark.asyncio
+async def test_supabase_execute_sql_stub():
+    res = await execute_mcp_tool("mcp_supabase_execute_sql", query="select version()")
+    assert res["status"] == "success"
+    assert res["rows"] == 1
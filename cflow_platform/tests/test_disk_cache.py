@@ -0,0 +1,143 @@
+import time
+
+import pytest
+
+from cflow_platform.core.disk_cache import DiskCacheTier
+from cflow_platform.core.intelligent_cache import IntelligentCache
+from cflow_platform.core.performance_cache import CacheConfig, CacheStrategy, PerformanceCache
+from cflow_platform.core.predictive_cache import PredictiveCache
+
+
+def test_values_survive_reopen(tmp_path) -> None:
+    tier = DiskCacheTier("t", cache_dir=tmp_path)
+    assert tier.set("k", {"status": "success", "data": list(range(10))}, tags=["a"])
+    tier.close()
+
+    reopened = DiskCacheTier("t", cache_dir=tmp_path)
+    entry = reopened.get_entry("k")
+    assert entry is not None
+    assert entry["value"] == {"status": "success", "data": list(range(10))}
+    assert entry["tags"] == ["a"]
+    assert reopened.delete_tags(["a"]) == 1
+    assert reopened.get("k") is None
+
+
+def test_ttl_expiry_and_no_expiry(tmp_path) -> None:
+    tier = DiskCacheTier("t", cache_dir=tmp_path)
+    tier.set("short", 1, ttl_seconds=0.05)
+    tier.set("forever", 2, ttl_seconds=float("inf"))
+    time.sleep(0.1)
+    assert tier.get("short") is None
+    assert tier.get("forever") == 2
+    assert tier.get_entry("forever")["expires_at"] is None
+
+
+def test_size_cap_evicts_least_recently_accessed(tmp_path) -> None:
+    tier = DiskCacheTier("t", cache_dir=tmp_path, max_size_mb=0.01, compression_threshold=1 << 30)
+    for i in range(20):
+        tier.set(f"k{i}", "x" * 1000)
+    stats = tier.get_stats()
+    assert stats["total_size_bytes"] <= tier.max_size_bytes
+    assert stats["evictions"] > 0
+    assert tier.get("k19") is not None
+    assert tier.get("k0") is None
+
+
+def test_eviction_stops_when_nothing_can_be_removed(tmp_path) -> None:
+    tier = DiskCacheTier("t", cache_dir=tmp_path, max_size_mb=0.01, compression_threshold=1 << 30)
+    tier.set("k", "x" * 1000)
+    # Accounting drifted above what the file holds and deletes remove nothing
+    tier._total_size = tier.max_size_bytes * 10
+    tier._delete_keys = lambda keys: 0
+    with tier._lock:
+        tier._evict_to(0)
+    assert tier.get_stats()["total_size_bytes"] == len(tier._conn.execute("SELECT value FROM entries").fetchone()[0])
+
+
+def test_corrupt_file_is_replaced(tmp_path) -> None:
+    (tmp_path / "t.sqlite3").write_bytes(b"not a database" * 100)
+    tier = DiskCacheTier("t", cache_dir=tmp_path)
+    assert tier.set("k", 1)
+    assert tier.get("k") == 1
+    assert list(tmp_path.glob("t.sqlite3.corrupt-*"))
+
+
+@pytest.mark.asyncio
+async def test_intelligent_cache_serves_warm_entries_after_restart(tmp_path) -> None:
+    first = IntelligentCache(disk_tier=DiskCacheTier("ic", cache_dir=tmp_path))
+    await first.set("task_list", {"status": "open"}, {"status": "success", "tasks": [1, 2]}, dependencies=["tasks"])
+    await first.set("doc_research", {"q": "x"}, {"status": "success"}, tags=["docs"])
+    first.disk_tier.close()
+
+    second = IntelligentCache(disk_tier=DiskCacheTier("ic", cache_dir=tmp_path))
+    assert await second.get("task_list", {"status": "open"}) == {"status": "success", "tasks": [1, 2]}
+    assert second.get_stats().hit_count == 1
+
+    # Invalidation reaches entries that only live on disk
+    await second.invalidate(tags=["docs"])
+    assert await second.get("doc_research", {"q": "x"}) is None
+    await second.invalidate(dependencies=["tasks"])
+    assert await second.get("task_list", {"status": "open"}) is None
+
+
+@pytest.mark.asyncio
+async def test_performance_cache_memory_eviction_keeps_disk_copy(tmp_path) -> None:
+    cache = PerformanceCache(
+        CacheConfig(max_size=1, strategy=CacheStrategy.LRU),
+        disk_tier=DiskCacheTier("pc", cache_dir=tmp_path)
+    )
+    await cache.set("a", {"v": 1})
+    await cache.set("b", {"v": 2})
+    assert await cache.get("a") == {"v": 1}
+    assert cache.stats["disk_hits"] == 1
+
+    await cache.delete("a")
+    assert await cache.get("a") is None
+
+
+@pytest.mark.asyncio
+async def test_predictive_cache_keeps_ttl_on_disk(tmp_path) -> None:
+    cache = PredictiveCache(disk_tier=DiskCacheTier("pred", cache_dir=tmp_path))
+    await cache.set("short", {"v": 1}, ttl=0.05)
+    await cache.set("long", {"v": 2})
+    entry = cache.disk_tier.get_entry("short")
+    assert entry["expires_at"] is not None and entry["expires_at"] - entry["created_at"] == pytest.approx(0.05)
+    time.sleep(0.1)
+    assert await cache.get("short") is None
+
+    restarted = PredictiveCache(disk_tier=cache.disk_tier)
+    assert await restarted.get("short") is None
+    assert await restarted.get("long") == {"v": 2}
+
+
+@pytest.mark.asyncio
+async def test_intelligent_cache_writes_disk_off_loop_and_honours_racing_invalidation(tmp_path) -> None:
+    import asyncio
+    import threading
+
+    cache = IntelligentCache(disk_tier=DiskCacheTier("ic", cache_dir=tmp_path))
+    loop = asyncio.get_running_loop()
+    real_set = cache.disk_tier.set
+    threads = []
+
+    def slow_set(*args, **kwargs):
+        threads.append(threading.get_ident())
+        # An invalidation lands while this write is still in flight
+        asyncio.run_coroutine_threadsafe(cache.invalidate(tags=["t"]), loop).result()
+        return real_set(*args, **kwargs)
+
+    cache.disk_tier.set = slow_set
+    await cache.set("task_get", {"id": 1}, {"v": 1}, tags=["t"])
+    assert threads and threads[0] != threading.get_ident()
+    assert len(cache.disk_tier) == 0
+
+
+@pytest.mark.asyncio
+async def test_entries_without_ttl_never_expire_on_disk(tmp_path) -> None:
+    perf = PerformanceCache(CacheConfig(ttl_seconds=0), disk_tier=DiskCacheTier("pc", cache_dir=tmp_path))
+    await perf.set("k", {"v": 1})
+    assert perf.disk_tier.get_entry("k")["expires_at"] is None
+
+    pred = PredictiveCache(disk_tier=DiskCacheTier("pred", cache_dir=tmp_path))
+    await pred.set("k", {"v": 2})
+    assert pred.disk_tier.get_entry("k")["expires_at"] is None
@@ -0,0 +1,102 @@
+import asyncio
+import time
+
+import pytest
+
+from cflow_platform.core.embeddings.embedding_batcher import EmbeddingBatcher
+
+
+class _RecordingModel:
+    def __init__(self, fail: bool = False) -> None:
+        self.batches = []
+        self.fail = fail
+
+    def __call__(self, texts):
+        self.batches.append(list(texts))
+        if self.fail:
+            raise RuntimeError("model not loaded")
+        return [[float(len(t)), 1.0] for t in texts]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_share_full_batches() -> None:
+    model = _RecordingModel()
+    batcher = EmbeddingBatcher(model, max_batch_size=8, max_latency_ms=50)
+
+    vectors = await asyncio.gather(*(batcher.embed("x" * i) for i in range(20)))
+    assert [v[0] for v in vectors] == [float(i) for i in range(20)]
+    assert [len(b) for b in model.batches] == [8, 8, 4]
+
+    stats = batcher.get_stats()
+    assert stats["flush_on_size"] == 2 and stats["flush_on_deadline"] == 1
+    assert stats["max_queue_depth"] == 20 and stats["queue_depth"] == 0
+    assert stats["batch_fill"] == pytest.approx(20 / 24, abs=1e-3)
+
+
+@pytest.mark.asyncio
+async def test_partial_batch_flushes_at_deadline_and_dedupes() -> None:
+    model = _RecordingModel()
+    batcher = EmbeddingBatcher(model, max_batch_size=32, max_latency_ms=20)
+
+    start = time.perf_counter()
+    a, b, c = await asyncio.gather(batcher.embed("same"), batcher.embed("same"), batcher.embed("other"))
+    elapsed = time.perf_counter() - start
+    assert a == b == [4.0, 1.0] and c == [5.0, 1.0]
+    assert model.batches == [["same", "other"]]
+    assert 0.015 <= elapsed < 1.0
+    assert batcher.get_stats()["duplicates"] == 1
+
+
+@pytest.mark.asyncio
+async def test_failures_reach_every_caller_and_cancelled_callers_are_skipped() -> None:
+    failing = EmbeddingBatcher(_RecordingModel(fail=True), max_batch_size=4, max_latency_ms=5)
+    results = await asyncio.gather(failing.embed("a"), failing.embed("b"), return_exceptions=True)
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert failing.get_stats()["errors"] == 1
+
+    model = _RecordingModel()
+    batcher = EmbeddingBatcher(model, max_batch_size=4, max_latency_ms=10)
+    abandoned = batcher.submit("gone")
+    abandoned.cancel()
+    assert await batcher.embed("kept") == [4.0, 1.0]
+    assert model.batches == [["kept"]]
+
+
+@pytest.mark.asyncio
+async def test_service_sends_bulk_requests_straight_to_the_model(monkeypatch) -> None:
+    from cflow_platform.core.services.ai import embedding_service
+
+    model = _RecordingModel()
+    batcher = EmbeddingBatcher(model, max_batch_size=8, max_latency_ms=1)
+    monkeypatch.setattr(embedding_service, "get_embedding_batcher", lambda: batcher)
+    service = object.__new__(embedding_service.EmbeddingService)
+    direct = []
+    service.embed_documents = lambda texts: direct.append(list(texts)) or model(texts)
+
+    bulk = [f"doc {i}" for i in range(100)]
+    assert len(await service.generate_embeddings(bulk)) == 100
+    assert [len(b) for b in direct] == [100]
+    assert batcher.get_stats()["requests"] == 0
+
+    assert len(await service.generate_embeddings(["a", "b"])) == 2
+    assert batcher.get_stats()["requests"] == 2 and len(direct) == 1
+
+
+def test_kg_etl_embeds_all_texts_in_one_model_call(monkeypatch) -> None:
+    from cflow_platform.cli import kg_etl
+    from cflow_platform.core.services.ai import embedding_service
+
+    model = _RecordingModel()
+    service = object.__new__(embedding_service.EmbeddingService)
+    service.embed_documents = model
+    monkeypatch.setattr(embedding_service, "get_embedding_service", lambda: service)
+
+    texts = [f"task {i}" for i in range(100)]
+    assert len(kg_etl._embed_texts(texts)) == 100
+    assert [len(b) for b in model.batches] == [100]
+
+    def broken(texts):
+        raise RuntimeError("model unavailable")
+
+    service.embed_documents = broken
+    assert all(isinstance(e, RuntimeError) for e in kg_etl._embed_texts(["a", "b"]))
@@ -0,0 +1,104 @@
+import multiprocessing
+
+import numpy as np
+
+from cflow_platform.core.embeddings.embedding_cache import EmbeddingCache
+from cflow_platform.core.services.ai.embedding_service import EmbeddingService
+
+
+def _vec(seed: int, dim: int = 8) -> list:
+    return np.random.default_rng(seed).standard_normal(dim).astype(np.float32).tolist()
+
+
+def test_roundtrip_is_float16_precise_and_namespaced(tmp_path) -> None:
+    cache = EmbeddingCache("model-a", 8, cache_dir=tmp_path)
+    assert cache.put_many(["alpha", "beta", "alpha"], [_vec(1), _vec(2), _vec(1)]) == 2
+    assert cache.put_many(["alpha"], [_vec(1)]) == 0
+
+    alpha, missing = cache.get_many(["alpha", "gamma"])
+    assert missing is None
+    assert np.allclose(alpha, _vec(1), atol=1e-2)
+    assert cache.stats["hits"] == 1 and cache.stats["misses"] == 1
+
+    # Other models and dimensions never see these rows
+    assert EmbeddingCache("model-b", 8, cache_dir=tmp_path).get("alpha") is None
+    assert EmbeddingCache("model-a", 16, cache_dir=tmp_path).get("alpha") is None
+
+
+def test_lru_eviction_respects_byte_budget(tmp_path) -> None:
+    # 8 dims * 2 bytes = 16 bytes per row -> 4 rows
+    cache = EmbeddingCache("m", 8, cache_dir=tmp_path, max_size_mb=64 / (1024 * 1024))
+    assert cache.max_slots == 4
+    for i in range(4):
+        cache.put(f"t{i}", _vec(i))
+    cache.get("t0")  # t1 becomes least recently used
+    cache.put("t4", _vec(4))
+
+    assert cache.get("t1") is None
+    assert cache.get("t0") is not None and cache.get("t4") is not None
+    stats = cache.get_stats()
+    assert stats["entries"] == 4 and stats["evictions"] == 1
+    assert cache.vectors_path.stat().st_size == 4 * 16
+
+
+def test_reused_slot_is_never_served_for_another_text(tmp_path) -> None:
+    cache = EmbeddingCache("m", 8, cache_dir=tmp_path)
+    cache.put("alpha", _vec(1))
+    cache._slots[0] = 12345  # simulate a concurrent writer mid-rewrite
+    assert cache.get("alpha") is None
+    assert cache.stats["stale"] == 1
+
+
+def _writer(cache_dir: str, start: int) -> None:
+    cache = EmbeddingCache("shared", 8, cache_dir=cache_dir)
+    for i in range(start, start + 200):
+        cache.put(f"text-{i}", _vec(i))
+    cache.close()
+
+
+def test_concurrent_processes_share_one_namespace(tmp_path) -> None:
+    reader = EmbeddingCache("shared", 8, cache_dir=tmp_path)
+    ctx = multiprocessing.get_context("spawn")
+    procs = [ctx.Process(target=_writer, args=(str(tmp_path), n * 200)) for n in range(2)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join(60)
+        assert p.exitcode == 0
+
+    rows = reader.get_many([f"text-{i}" for i in range(400)])
+    assert all(r is not None for r in rows)
+    assert np.allclose(rows[399], _vec(399), atol=1e-2)
+    assert len(reader) == 400
+
+
+class _CountingAccelerator:
+    current_model = "fake-model"
+    current_dimensions = 8
+
+    def __init__(self) -> None:
+        self.calls = []
+
+    def cache_namespace(self) -> str:
+        return self.current_model
+
+    def generate_embeddings(self, texts):
+        self.calls.append(list(texts))
+        return [_vec(len(t)) for t in texts]
+
+
+def test_service_only_embeds_unseen_texts(tmp_path, monkeypatch) -> None:
+    monkeypatch.setenv("CFLOW_CACHE_DIR", str(tmp_path))
+    monkeypatch.setenv("CFLOW_EMBED_CACHE", "1")
+    service = EmbeddingService.__new__(EmbeddingService)
+    accelerator = _CountingAccelerator()
+    monkeypatch.setattr(service, "_initialized", True, raising=False)
+    monkeypatch.setattr(service, "_accelerator", accelerator, raising=False)
+    monkeypatch.setattr(service, "_embedding_cache", None, raising=False)
+    monkeypatch.setattr(service, "_cache_failed", False, raising=False)
+
+    first = service.embed_documents(["a", "bb", "a"])
+    second = service.embed_documents(["bb", "ccc"])
+    assert accelerator.calls == [["a", "bb"], ["ccc"]]
+    assert len(first) == 3 and np.allclose(second[0], first[1], atol=1e-2)
+    assert service.get_model_info()["cache"]["entries"] == 3
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import hashlib
+
+import pytest
+
+from cflow_platform.core import intelligent_cache
+from cflow_platform.core.intelligent_cache import FrequencySketch, IntelligentCache
+
+
+async def _touch_hot_then_scan(cache: IntelligentCache):
+    for _ in range(5):
+        for i in range(50):
+            if await cache.get("task_get", {"id": i}) is None:
+                await cache.set("task_get", {"id": i}, {"id": i})
+    for i in range(1000):
+        await cache.get("code.search_functions", {"scan": i})
+        await cache.set("code.search_functions", {"scan": i}, {"scan": i})
+    return [await cache.get("task_get", {"id": i}) for i in range(50)]
+
+
+@pytest.mark.asyncio
+async def test_tinylfu_keeps_hot_entries_through_a_scan():
+    survivors = await _touch_hot_then_scan(IntelligentCache(max_entries=200))
+    assert sum(v is not None for v in survivors) >= 45
+
+    lru_survivors = await _touch_hot_then_scan(IntelligentCache(max_entries=200, eviction_policy="lru"))
+    assert all(v is None for v in lru_survivors)
+
+
+@pytest.mark.asyncio
+async def test_sizes_are_measured_once_and_tracked_incrementally(monkeypatch):
+    dumps = []
+    real_dumps = intelligent_cache.pickle.dumps
+    monkeypatch.setattr(intelligent_cache.pickle, "dumps", lambda v: dumps.append(1) or real_dumps(v))
+
+    cache = IntelligentCache(max_entries=8, compression_threshold_kb=1)
+    await cache.set("task_get", {"id": 1}, {"data": "a" * 10})
+    await cache.set("task_get", {"id": 2}, {"data": "b" * 5000}, tags=["big"])
+    assert len(dumps) == 2
+
+    def _consistent():
+        stats = cache.get_stats()
+        assert stats.total_entries == len(cache._cache)
+        assert stats.total_size_bytes == sum(e.size_bytes for e in cache._cache.values())
+
+    _consistent()
+    assert cache._cache[cache._generate_cache_key("task_get", {"id": 2})].compressed
+
+    # Overwriting a key replaces its size instead of adding to it
+    await cache.set("task_get", {"id": 1}, {"data": "c" * 100})
+    _consistent()
+    assert cache.get_stats().total_entries == 2
+
+    await cache.invalidate(tags=["big"])
+    _consistent()
+    assert not cache._index.has_tag("big")
+
+    for i in range(20):
+        await cache.set("task_get", {"id": 100 + i}, {"i": i})
+    _consistent()
+    assert cache.get_stats().total_entries <= 8
+
+
+@pytest.mark.asyncio
+async def test_size_limit_evicts_by_bytes():
+    cache = IntelligentCache(max_size_mb=1, max_entries=100, enable_compression=False)
+    for i in range(10):
+        await cache.set("task_get", {"id": i}, {"blob": "x" * 200_000})
+    stats = cache.get_stats()
+    assert stats.total_size_bytes <= cache.max_size_bytes
+    assert stats.eviction_count > 0
+
+
+def test_frequency_sketch_counts_and_ages():
+    sketch = FrequencySketch(16)
+    key = hashlib.sha256(b"hot").hexdigest()
+    for _ in range(20):
+        sketch.increment(key)
+    assert sketch.frequency(key) == FrequencySketch.MAX_COUNT
+    assert sketch.frequency("not-a-hex-key") == 0
+    for i in range(sketch.sample_size):
+        sketch.increment(hashlib.sha256(str(i).encode()).hexdigest())
+    assert sketch.frequency(key) < FrequencySketch.MAX_COUNT
+
+
+def test_unknown_policy_rejected():
+    with pytest.raises(ValueError):
+        IntelligentCache(eviction_policy="fifo")
@@ -0,0 +1,106 @@
+import pytest
+
+from cflow_platform.core.disk_cache import DiskCacheTier
+from cflow_platform.core.intelligent_cache import IntelligentCache
+from cflow_platform.core.invalidation_index import InvalidationIndex, PrefixTrie, derive_dependencies, write_events
+
+
+def test_prefix_trie_lookup_and_pruning() -> None:
+    trie = PrefixTrie()
+    trie.add("task_get", "a")
+    trie.add("task_list", "b")
+    trie.add("doc_research", "c")
+    assert trie.with_prefix("task_") == {"a", "b"}
+    assert trie.exact("task_get") == {"a"}
+    assert trie.with_prefix("") == {"a", "b", "c"}
+
+    trie.discard("task_get", "a")
+    trie.discard("task_list", "b")
+    assert trie.with_prefix("task") == set()
+    assert "t" not in trie._root.children
+
+
+def test_index_remove_leaves_no_stale_references() -> None:
+    index = InvalidationIndex()
+    index.add("k1", "task_get", 'task_get:{"taskId": "1"}', tags=["t"], dependencies=["task:1"])
+    index.add("k1", "task_get", 'task_get:{"taskId": "1"}', tags=["u"], dependencies=["task:2"])
+    assert index.keys_for_tags(["t"]) == set()
+    assert index.keys_for_dependencies(["task:1"]) == set()
+    assert index.keys_for_dependencies(["task:2"]) == {"k1"}
+
+    index.remove("k1")
+    assert len(index) == 0
+    assert not index.has_tag("u")
+    assert index.match_pattern("task*") == set()
+
+
+def test_pattern_can_reach_into_arguments() -> None:
+    index = InvalidationIndex()
+    index.add("k1", "task_get", 'task_get:{"taskId": "1"}')
+    index.add("k2", "task_get", 'task_get:{"taskId": "2"}')
+    assert index.match_pattern('task_get:{"taskId": "1"') == {"k1"}
+    assert index.match_pattern("task_get") == {"k1", "k2"}
+    assert index.match_pattern("k2") == {"k2"}
+
+
+def test_entity_rules() -> None:
+    assert derive_dependencies("task_get", {"taskId": 42}) == ["task:42"]
+    assert derive_dependencies("task_list", {"status": "open"}) == ["task:*"]
+    assert derive_dependencies("task_update", {"taskId": 42}) == []
+    assert write_events("task_update", {"taskId": 42}) == [("task", "42")]
+    assert write_events("task_add", {"title": "x"}) == [("task", None)]
+    assert write_events("task_get", {"taskId": 42}) == []
+
+
+@pytest.mark.asyncio
+async def test_task_change_drops_only_affected_entries() -> None:
+    cache = IntelligentCache()
+    for task_id in range(50):
+        await cache.set("task_get", {"taskId": str(task_id)}, {"status": "success", "id": task_id})
+    await cache.set("task_list", {}, {"status": "success", "tasks": []})
+    await cache.set("doc_research", {"q": "x"}, {"status": "success"})
+
+    removed = await cache.invalidate_for_write("task_update", {"taskId": "7"})
+    assert removed == 2
+    assert await cache.get("task_get", {"taskId": "7"}) is None
+    assert await cache.get("task_list", {}) is None
+    assert await cache.get("task_get", {"taskId": "8"}) is not None
+    assert await cache.get("doc_research", {"q": "x"}) is not None
+
+    # A kind-wide event drops every task entry but nothing else
+    assert await cache.invalidate_entities([("task", None)]) == 49
+    assert await cache.get("doc_research", {"q": "x"}) is not None
+
+
+@pytest.mark.asyncio
+async def test_prefix_pattern_and_dependency_edges() -> None:
+    cache = IntelligentCache()
+    await cache.set("task_get", {"taskId": "1"}, {"status": "success"})
+    await cache.set("task_next", {}, {"status": "success"})
+    await cache.set("bmad_epic_get", {"doc_id": "e1"}, {"status": "success"})
+    await cache.set("doc_research", {"q": "x"}, {"status": "success"})
+
+    assert await cache.invalidate(pattern="task_*") == 2
+    assert await cache.get("doc_research", {"q": "x"}) is not None
+
+    # Updating the PRD also invalidates the epic derived from it
+    cache.link_dependencies("doc:prd1", "doc:e1")
+    assert await cache.invalidate_entities([("doc", "prd1")]) == 1
+    assert await cache.get("bmad_epic_get", {"doc_id": "e1"}) is None
+
+
+@pytest.mark.asyncio
+async def test_events_reach_disk_only_entries(tmp_path) -> None:
+    first = IntelligentCache(disk_tier=DiskCacheTier("inv", cache_dir=tmp_path))
+    await first.set("task_get", {"taskId": "1"}, {"status": "success"})
+    await first.set("task_get", {"taskId": "2"}, {"status": "success"})
+    await first.set("doc_research", {"q": "x"}, {"status": "success"})
+    first.disk_tier.close()
+
+    second = IntelligentCache(disk_tier=DiskCacheTier("inv", cache_dir=tmp_path))
+    await second.invalidate_for_write("task_status", {"taskId": "1"})
+    assert await second.get("task_get", {"taskId": "1"}) is None
+    assert await second.get("task_get", {"taskId": "2"}) is not None
+
+    await second.invalidate(pattern="doc_*")
+    assert await second.get("doc_research", {"q": "x"}) is None
@@ -0,0 +1,182 @@
+import json
+
+import pytest
+
+from cflow_platform.core.memory.local_store import LocalMemoryStore
+
+
+def _item(content: str, user: str = "system", run_id: str = None) -> dict:
+    metadata = {"run_id": run_id} if run_id else {}
+    return {"id": f"M{abs(hash(content)) % 10_000_000}", "user_id": user, "content": content, "metadata": metadata}
+
+
+def test_bm25_ranks_rarer_and_denser_matches_first(tmp_path) -> None:
+    store = LocalMemoryStore(tmp_path)
+    store.add(_item("cache eviction policy notes"))
+    store.add(_item("cache cache cache warmup"))
+    store.add(_item("vectorizer batching notes"))
+    for i in range(20):
+        store.add(_item(f"unrelated filler entry {i}"))
+
+    results = store.search("cache eviction", user_id="system", limit=5)
+    assert [r["content"] for r in results][:2] == ["cache eviction policy notes", "cache cache cache warmup"]
+    assert results[0]["score"] > results[1]["score"]
+    assert store.search("nothing matches this", user_id="system") == []
+
+
+def test_user_and_run_postings_filter_results(tmp_path) -> None:
+    store = LocalMemoryStore(tmp_path)
+    store.add(_item("checkpoint iteration one", user="alice", run_id="run-1"))
+    store.add(_item("checkpoint iteration two", user="alice", run_id="run-2"))
+    store.add(_item("checkpoint from bob", user="bob"))
+
+    assert {r["user_id"] for r in store.search("checkpoint", user_id="alice")} == {"alice"}
+    assert [r["content"] for r in store.search("checkpoint", user_id="alice", run_id="run-2")] == [
+        "checkpoint iteration two"
+    ]
+    assert store.search("checkpoint", user_id="carol") == []
+    stats = store.get_stats()
+    assert stats["items"] == 3 and stats["users"] == 2 and stats["runs"] == 2
+
+
+def test_sealed_segments_reload_from_index_files(tmp_path) -> None:
+    store = LocalMemoryStore(tmp_path, segment_max_bytes=400)
+    for i in range(30):
+        store.add(_item(f"episode {i} about topic{i % 3}", run_id=f"run-{i % 2}"))
+    assert store.get_stats()["segments"] > 1
+    assert list(tmp_path.glob("segment-*.idx"))
+    expected = [r["content"] for r in store.search("topic1", user_id="system", limit=50)]
+    store.close()
+
+    reopened = LocalMemoryStore(tmp_path, segment_max_bytes=400)
+    assert reopened.get_stats()["items"] == 30
+    assert [r["content"] for r in reopened.search("topic1", user_id="system", limit=50)] == expected
+    assert len(reopened.search("episode", user_id="system", run_id="run-0", limit=50)) == 15
+
+    manifest = json.loads((tmp_path / "manifest.json").read_text())
+    assert manifest["items"] == 30
+    assert manifest["runs"] == {"run-0": 15, "run-1": 15}
+
+
+def test_torn_append_is_truncated_on_open(tmp_path) -> None:
+    store = LocalMemoryStore(tmp_path)
+    store.add(_item("complete record"))
+    segment = next(tmp_path.glob("segment-*.jsonl"))
+    with segment.open("ab") as f:
+        f.write(b'{"id": "M1", "user_id": "system", "content": "half wri')
+
+    reopened = LocalMemoryStore(tmp_path)
+    assert reopened.get_stats()["items"] == 1
+    reopened.add(_item("after recovery"))
+    assert [r["content"] for r in reopened.search("recovery", user_id="system")] == ["after recovery"]
+
+
+def test_legacy_jsonl_imported_once(tmp_path) -> None:
+    legacy = tmp_path / "memory_items.jsonl"
+    legacy.write_text("\n".join(json.dumps(_item(f"legacy note {i}")) for i in range(5)) + "\n")
+
+    store = LocalMemoryStore(tmp_path / "memory", legacy_path=legacy)
+    assert store.get_stats()["items"] == 5
+    store.close()
+    assert LocalMemoryStore(tmp_path / "memory", legacy_path=legacy).get_stats()["items"] == 5
+
+
+def test_second_instance_sees_other_writers(tmp_path) -> None:
+    first = LocalMemoryStore(tmp_path)
+    second = LocalMemoryStore(tmp_path)
+    first.add(_item("written by first"))
+    second.add(_item("written by second"))
+    assert {r["content"] for r in first.search("written", user_id="system")} == {
+        "written by first",
+        "written by second",
+    }
+
+
+def test_second_instance_sees_other_writers_vectors(tmp_path) -> None:
+    first = LocalMemoryStore(tmp_path)
+    second = LocalMemoryStore(tmp_path)
+    # second opened before any vector existed, so it must pick up the matrix on refresh
+    first.add(_item("alpha note"), vector=[1.0, 0.0, 0.0])
+    first.add(_item("beta note"), vector=[0.0, 1.0, 0.0])
+    results = second.search("note", user_id="system", query_vector=[1.0, 0.0, 0.0])
+    assert [r["content"] for r in results] == ["alpha note", "beta note"]
+    assert results[0]["similarity"] == 1.0
+
+    first.add(_item("gamma note"), vector=[0.0, 0.0, 1.0])
+    top = second.search("note", user_id="system", query_vector=[0.0, 0.0, 1.0], limit=1)
+    assert top[0]["content"] == "gamma note" and top[0]["similarity"] == 1.0
+
+
+def test_vector_search_ranks_by_cosine_and_filters(tmp_path) -> None:
+    store = LocalMemoryStore(tmp_path)
+    store.add(_item("alpha note"), vector=[1.0, 0.0, 0.0])
+    store.add(_item("beta note"), vector=[0.7, 0.7, 0.0])
+    store.add(_item("gamma note", user="bob"), vector=[1.0, 0.1, 0.0])
+    store.add(_item("no vector note"))
+
+    results = store.search("note", user_id="system", query_vector=[1.0, 0.0, 0.0])
+    assert [r["content"] for r in results] == ["alpha note", "beta note"]
+    assert results[0]["similarity"] == 1.0
+
+    strict = store.search("note", user_id="system", query_vector=[1.0, 0.0, 0.0], min_similarity=0.9)
+    assert [r["content"] for r in strict] == ["alpha note"]
+
+    # Hybrid keeps lexical-only matches reachable
+    hybrid = store.search("vector", user_id="system", query_vector=[0.0, 0.0, 1.0], hybrid_weight=0.5)
+    assert hybrid[0]["content"] == "no vector note"
+
+
+def test_float16_vectors_persist_and_torn_rows_are_trimmed(tmp_path) -> None:
+    store = LocalMemoryStore(tmp_path, vector_dtype="float16")
+    for i in range(10):
+        store.add(_item(f"item {i}"), vector=[float(i), 1.0, 0.0, 0.0])
+    store.close()
+    matrix = next(tmp_path.glob("vectors-*.bin"))
+    with matrix.open("ab") as f:
+        f.write(b"\x00\x01\x02")
+
+    reopened = LocalMemoryStore(tmp_path)
+    assert reopened.get_stats()["vectors"] == 10
+    top = reopened.search("item", query_vector=[0.0, 1.0, 0.0, 0.0], limit=1)
+    assert top[0]["content"] == "item 0"
+    assert matrix.stat().st_size == 10 * 4 * 2
+
+
+def test_iter_records_yields_every_record_in_order(tmp_path) -> None:
+    legacy = tmp_path / "memory_items.jsonl"
+    legacy.write_text(json.dumps(_item("legacy note")) + "\n")
+    store = LocalMemoryStore(tmp_path / "memory", legacy_path=legacy, segment_max_bytes=200)
+    for i in range(5):
+        store.add(_item(f"segment note {i}"))
+    assert [r["content"] for r in store.iter_records()] == ["legacy note"] + [f"segment note {i}" for i in range(5)]
+
+
+@pytest.mark.asyncio
+async def test_vector_mode_reports_lexical_fallback(tmp_path, monkeypatch) -> None:
+    from cflow_platform.handlers.memory_handlers import MemoryHandlers
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("CFLOW_MEMORY_VECTORS", "0")
+    handlers = MemoryHandlers()
+    await handlers.handle_memory_add({"content": "lexical only note"})
+
+    vector = await handlers.handle_memory_search({"query": "note", "mode": "vector"})
+    assert vector["count"] == 1 and vector["searchMode"] == "lexical"
+    assert "no stored memories have embeddings" in vector["warning"]
+    auto = await handlers.handle_memory_search({"query": "note"})
+    assert auto["searchMode"] == "lexical" and "warning" not in auto
+
+
+@pytest.mark.asyncio
+async def test_search_without_user_id_finds_episodes_of_configured_user(tmp_path, monkeypatch) -> None:
+    from cflow_platform.handlers.memory_handlers import MemoryHandlers
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("CFLOW_MEMORY_VECTORS", "0")
+    monkeypatch.setenv("CEREBRAL_USER_ID", "alice")
+    handlers = MemoryHandlers()
+    await handlers._get_memory().store_episode(run_id="r1", task_id=None, content="deploy episode", metadata={})
+
+    assert (await handlers.handle_memory_search({"query": "deploy"}))["count"] == 1
+    assert (await handlers.handle_memory_search({"query": "deploy", "userId": "alice"}))["count"] == 1
+    assert (await handlers.handle_memory_search({"query": "deploy", "userId": "bob"}))["count"] == 0
@@ -0,0 +1,133 @@
+import threading
+import time
+
+import numpy as np
+
+from cflow_platform.core.embeddings import apple_silicon_accelerator, enhanced_apple_silicon_accelerator
+from cflow_platform.core.embeddings import model_registry
+from cflow_platform.core.embeddings.model_registry import ModelRegistry, model_memory_bytes
+
+
+class _Tensor:
+    def __init__(self, n: int) -> None:
+        self.n = n
+
+    def numel(self) -> int:
+        return self.n
+
+    def element_size(self) -> int:
+        return 4
+
+
+class _FakeModel:
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    def parameters(self):
+        return [_Tensor(1024 * 1024)]
+
+    def buffers(self):
+        return [_Tensor(256)]
+
+    def encode(self, texts, batch_size=32, **_):
+        return np.ones((len(texts), 4), dtype=np.float32)
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return 4
+
+
+def test_concurrent_first_requests_share_one_load() -> None:
+    registry = ModelRegistry(idle_seconds=60)
+    loads = []
+
+    def loader():
+        loads.append(1)
+        time.sleep(0.05)
+        return _FakeModel("m")
+
+    key = ModelRegistry.key("m")
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(registry.get(key, loader))) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(loads) == 1 and len({id(r) for r in results}) == 1
+    stats = registry.get_stats()
+    assert stats["loads"] == 1 and stats["models"][0]["hits"] == 3
+    assert stats["resident_memory_mb"] == round((4 * 1024 * 1024 + 1024) / (1024 * 1024), 1)
+
+
+def test_failed_loads_do_not_leave_load_locks_behind() -> None:
+    registry = ModelRegistry(idle_seconds=60)
+
+    def broken():
+        raise RuntimeError("no weights")
+
+    for n in range(3):
+        try:
+            registry.get(ModelRegistry.key(f"broken{n}"), broken)
+        except RuntimeError:
+            pass
+        registry.get(ModelRegistry.key(f"missing{n}"), lambda: None)
+    assert registry._loading == {}
+    assert registry.get_stats()["load_failures"] == 6
+
+    # A later load of the same key still works
+    assert registry.get(ModelRegistry.key("broken0"), lambda: _FakeModel("ok")).name == "ok"
+    assert registry._loading == {}
+
+
+def test_idle_unload_skips_leased_models() -> None:
+    registry = ModelRegistry(idle_seconds=0)
+    busy, idle = ModelRegistry.key("busy"), ModelRegistry.key("idle")
+    registry.acquire(busy, lambda: _FakeModel("busy"))
+    registry.get(idle, lambda: _FakeModel("idle"))
+
+    assert registry.unload_idle() == 1
+    assert busy in registry and idle not in registry
+    registry.release(busy)
+    assert registry.unload_idle() == 1 and len(registry) == 0
+
+
+def test_idle_model_limit_evicts_least_recently_used() -> None:
+    registry = ModelRegistry(idle_seconds=60, max_idle_models=2)
+    keys = [ModelRegistry.key(f"m{i}") for i in range(3)]
+    registry.get(keys[0], lambda: _FakeModel("m0"))
+    registry.get(keys[1], lambda: _FakeModel("m1"))
+    registry.get(keys[0], lambda: _FakeModel("m0"))  # m1 is now least recently used
+    registry.get(keys[2], lambda: _FakeModel("m2"))
+
+    assert keys[1] not in registry and keys[0] in registry and keys[2] in registry
+    assert registry.get_stats()["unloads"] == 1
+
+
+def test_accelerators_share_resident_models(monkeypatch) -> None:
+    registry = ModelRegistry(idle_seconds=60)
+    loads = []
+
+    def fake_sentence_transformer(name, *_, **__):
+        loads.append(name)
+        return _FakeModel(name)
+
+    monkeypatch.setattr(model_registry, "_registry", registry)
+    for module in (apple_silicon_accelerator, enhanced_apple_silicon_accelerator):
+        monkeypatch.setattr(module, "SENTENCE_TRANSFORMERS_AVAILABLE", True)
+        monkeypatch.setattr(module, "SentenceTransformer", fake_sentence_transformer, raising=False)
+    monkeypatch.setenv("CFLOW_EMBED_CACHE", "0")
+
+    core = apple_silicon_accelerator.CerebraFlowAppleSiliconAccelerator()
+    enhanced = enhanced_apple_silicon_accelerator.EnhancedAppleSiliconAccelerator()
+    assert core.generate_embeddings(["a", "b"], model_name="shared-model", batch_size=2) is not None
+    assert enhanced.generate_embeddings(["c"], model_name="shared-model", batch_size=1) is not None
+    enhanced.create_optimized_model("shared-model", target_dimensions=768)
+
+    assert loads == ["shared-model"]
+    entry = enhanced.get_comprehensive_metrics()["model_registry"]["models"][0]
+    assert entry["name"] == "shared-model" and entry["refcount"] == 0
+    assert core.get_performance_metrics()["model_registry"]["resident_models"] == 1
+
+
+def test_memory_of_unknown_model_types_is_zero() -> None:
+    assert model_memory_bytes(object()) == 0
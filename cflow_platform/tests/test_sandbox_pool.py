@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from cflow_platform.core.sandbox_pool import SandboxPoolConfig, SandboxWorkerPool
+
+
+@pytest.fixture
+def pool():
+    p = SandboxWorkerPool(SandboxPoolConfig(size=1, max_runs_per_worker=3))
+    yield p
+    p.shutdown()
+
+
+def _run(pool: SandboxWorkerPool, tmp_path: Path, code: str, **limits):
+    return pool.run(
+        code,
+        limits.get("time_limit_sec", 3),
+        limits.get("cpu_limit_sec", 3),
+        limits.get("mem_limit_mb", 256),
+        [str(tmp_path)],
+    )
+
+
+def test_worker_is_reused_and_state_does_not_leak(pool, tmp_path: Path):
+    first = _run(pool, tmp_path, "leak = 1\nprint('hello')")
+    second = _run(pool, tmp_path, "print('leak' in globals())")
+    assert first["stdout"] == "hello\n" and first["exit_code"] == 0
+    assert second["stdout"] == "False\n"
+    assert (first["warm"], second["warm"]) == (False, True)
+    assert pool.get_stats()["workers_started"] == 1
+
+
+def test_guards_apply_in_warm_workers(pool, tmp_path: Path, tmp_path_factory):
+    outside = tmp_path_factory.mktemp("outside") / "secret.txt"
+    outside.write_text("secret", encoding="utf-8")
+    code = f"""
+import socket
+from pathlib import Path
+try:
+    socket.socket()
+except OSError:
+    print('net denied')
+try:
+    Path({str(outside)!r}).read_text()
+except PermissionError:
+    print('fs denied')
+print(Path('leftover.txt').exists())
+Path('leftover.txt').write_text('ok')
+Path({str(tmp_path / "inside.txt")!r}).write_text('ok')
+"""
+    for _ in range(2):
+        res = _run(pool, tmp_path, code)
+        assert res["stdout"] == "net denied\nfs denied\nFalse\n"
+    assert (tmp_path / "inside.txt").read_text() == "ok"
+
+
+def test_job_state_does_not_reach_later_jobs(pool, tmp_path: Path, tmp_path_factory):
+    outside = tmp_path_factory.mktemp("outside") / "secret.txt"
+    outside.write_text("secret", encoding="utf-8")
+    tamper = """
+import __main__, builtins, os, signal, socket, sys
+sys.modules['__main__'].FS_ALLOWLIST = ['/']
+__main__._is_path_allowed = lambda path: True
+builtins.open = print
+socket.socket = object
+os.environ['CFLOW_LEAK'] = '1'
+signal.signal(signal.SIGALRM, signal.SIG_IGN)
+import threading
+threading.Thread(target=lambda: __import__('time').sleep(30), daemon=True).start()
+"""
+    assert _run(pool, tmp_path, tamper)["exit_code"] == 0
+    probe = f"""
+import os, socket
+from pathlib import Path
+print(os.environ.get('CFLOW_LEAK'))
+try:
+    Path({str(outside)!r}).read_text()
+except PermissionError:
+    print('fs denied')
+try:
+    socket.socket()
+except OSError:
+    print('net denied')
+"""
+    res = _run(pool, tmp_path, probe)
+    assert res["stdout"] == "None\nfs denied\nnet denied\n"
+    assert res["warm"] is True
+    assert pool.get_stats()["workers_started"] == 1
+
+
+def test_workers_recycled_after_max_runs(pool, tmp_path: Path):
+    for _ in range(3):
+        _run(pool, tmp_path, "pass")
+    assert pool.get_stats()["recycled"].get("max_runs") == 1
+
+
+def test_limit_breach_reports_error_and_keeps_worker(pool, tmp_path: Path):
+    res = _run(pool, tmp_path, "while True:\n    pass", time_limit_sec=1, cpu_limit_sec=1)
+    assert res["exit_code"] == 124
+    assert "limit exceeded" in res["stderr"]
+    ok = _run(pool, tmp_path, "import sys\nprint('err', file=sys.stderr)\nsys.exit(2)")
+    assert ok["stderr"] == "err\n" and ok["exit_code"] == 2
+    assert ok["warm"] is True
+
+
+def test_child_ignoring_limits_is_killed(pool, tmp_path: Path):
+    code = "import signal, time\nsignal.signal(signal.SIGALRM, signal.SIG_IGN)\ntime.sleep(30)"
+    res = _run(pool, tmp_path, code, time_limit_sec=1)
+    assert res["timed_out"] is True
+    assert _run(pool, tmp_path, "print('next')")["stdout"] == "next\n"
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import asyncio
+import types
+
+import pytest
+
+from cflow_platform.core import direct_client
+from cflow_platform.core.intelligent_cache import (
+    CacheStrategy,
+    IntelligentCache,
+    SingleFlight,
+    single_flight_enabled,
+)
+
+
+def test_opt_in_follows_strategy_table():
+    assert single_flight_enabled("task_list")
+    assert single_flight_enabled("doc_research")
+    assert not single_flight_enabled("task_add")  # NO_CACHE
+    assert not single_flight_enabled("sandbox.run_python")  # not listed
+    assert not single_flight_enabled("default")
+    assert single_flight_enabled("custom", {"custom": CacheStrategy.SHORT_TERM})
+
+
+@pytest.mark.asyncio
+async def test_single_flight_shares_result_and_survives_caller_cancel():
+    flight = SingleFlight()
+    calls = []
+    gate = asyncio.Event()
+
+    async def work():
+        calls.append(1)
+        await gate.wait()
+        return {"n": len(calls)}
+
+    first = asyncio.create_task(flight.do("k", work))
+    others = [asyncio.create_task(flight.do("k", work)) for _ in range(4)]
+    await asyncio.sleep(0)
+    first.cancel()
+    gate.set()
+    results = await asyncio.gather(*others)
+    assert calls == [1]
+    assert all(r is results[0] for r in results)
+    assert (flight.executions, flight.coalesced, flight.in_flight()) == (1, 4, 0)
+    # Once finished the key is forgotten
+    assert await flight.do("k", work) == {"n": 2}
+
+
+@pytest.mark.asyncio
+async def test_cache_miss_executes_once_and_errors_are_not_cached():
+    cache = IntelligentCache()
+    calls = []
+
+    async def load():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"status": "success", "tasks": []}
+
+    results = await asyncio.gather(*(cache.get_or_execute("task_list", {"s": 1}, load) for _ in range(5)))
+    assert len(calls) == 1
+    assert all(r == {"status": "success", "tasks": []} for r in results)
+    assert await cache.get_or_execute("task_list", {"s": 1}, load) == results[0]
+    assert len(calls) == 1
+    assert cache.get_stats().coalesced_count == 4
+
+    async def fail():
+        calls.append(1)
+        return {"status": "error", "message": "down"}
+
+    await cache.get_or_execute("task_list", {"s": 2}, fail)
+    await cache.get_or_execute("task_list", {"s": 2}, fail)
+    assert len(calls) == 3
+
+
+@pytest.mark.asyncio
+async def test_execute_mcp_tool_coalesces_read_only_tools(monkeypatch):
+    runs = []
+
+    class LintingHandlers:
+        async def handle_lint_status(self, args):
+            runs.append(args)
+            await asyncio.sleep(0.01)
+            return {"status": "success", "args": args}
+
+    fake = types.SimpleNamespace(LintingHandlers=LintingHandlers)
+    real_loader = direct_client.load_handler_module
+    monkeypatch.setattr(
+        direct_client,
+        "load_handler_module",
+        lambda name: fake if name == "linting_handlers" else real_loader(name),
+    )
+    direct_client.clear_handler_cache()
+    try:
+        same = [direct_client.execute_mcp_tool("lint_status", path="a") for _ in range(3)]
+        results = await asyncio.gather(*same, direct_client.execute_mcp_tool("lint_status", path="b"))
+    finally:
+        direct_client.clear_handler_cache()
+    assert sorted(r["path"] for r in runs) == ["a", "b"]
+    assert [r["args"]["path"] for r in results] == ["a", "a", "a", "b"]
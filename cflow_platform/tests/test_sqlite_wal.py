@@ -0,0 +1,39 @@
+import sqlite3
+
+import pytest
+
+from cflow_platform.core import sqlite_wal
+from cflow_platform.core.sqlite_wal import open_wal_database
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS items (k TEXT PRIMARY KEY);
+"""
+
+
+def test_corrupt_file_is_moved_aside(tmp_path) -> None:
+    path = tmp_path / "store.sqlite3"
+    path.write_bytes(b"not a database at all" * 100)
+    conn, recreated = open_wal_database(path, SCHEMA, 1, ("items",))
+    assert recreated
+    assert conn.execute("SELECT COUNT(*) FROM items").fetchone()[0] == 0
+    assert len(list(tmp_path.glob("store.sqlite3.corrupt-*"))) == 1
+
+
+def test_operational_errors_leave_the_file_alone(tmp_path, monkeypatch) -> None:
+    path = tmp_path / "store.sqlite3"
+    conn, _ = open_wal_database(path, SCHEMA, 1, ("items",))
+    conn.execute("INSERT INTO items VALUES ('kept')")
+    conn.close()
+
+    def locked(*args):
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(sqlite_wal, "_connect", locked)
+    with pytest.raises(sqlite3.OperationalError):
+        open_wal_database(path, SCHEMA, 1, ("items",))
+    assert not list(tmp_path.glob("*.corrupt-*"))
+
+    monkeypatch.undo()
+    conn, recreated = open_wal_database(path, SCHEMA, 1, ("items",))
+    assert not recreated and conn.execute("SELECT k FROM items").fetchall() == [("kept",)]
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import asyncio
+import json
+
+import pytest
+
+from cflow_platform.core.server.stdio import (
+    JsonRpcError,
+    JsonRpcStdioServer,
+    MessageFramer,
+    METHOD_NOT_FOUND,
+)
+
+
+class _Writer:
+    def __init__(self) -> None:
+        self.lines = []
+
+    def write(self, data: bytes) -> None:
+        self.lines.extend(json.loads(line) for line in data.splitlines())
+
+    async def drain(self) -> None:
+        await asyncio.sleep(0)
+
+
+async def _serve(server: JsonRpcStdioServer, *chunks: bytes):
+    reader = asyncio.StreamReader()
+    writer = _Writer()
+    serving = asyncio.create_task(server.serve(reader, writer))
+    for chunk in chunks:
+        reader.feed_data(chunk)
+        await asyncio.sleep(0)
+    reader.feed_eof()
+    await asyncio.wait_for(serving, 2.0)
+    return writer.lines
+
+
+def _req(request_id, method, **params) -> bytes:
+    return json.dumps({"jsonrpc": "2.0", "id": request_id, "method": method, "params": params}).encode() + b"\n"
+
+
+async def _handler(method, params):
+    if method == "sleep":
+        await asyncio.sleep(params["seconds"])
+        return params["seconds"]
+    if method == "echo":
+        return params
+    if method == "boom":
+        raise RuntimeError("boom")
+    raise JsonRpcError(METHOD_NOT_FOUND, f"Method not found: {method}")
+
+
+def test_framer_handles_split_and_oversized_messages():
+    framer = MessageFramer(max_message_bytes=16)
+    assert framer.feed(b'{"a"') == []
+    assert framer.feed(b':1}\n{"b":2}\n\n{"c"') == [b'{"a":1}', b'{"b":2}']
+    assert framer.feed(b"x" * 20) == [None]
+    assert framer.feed(b"yyy\n{}\n") == [b"{}"]
+    assert framer.feed(b'{"d":4}') == []
+    assert framer.flush() == [b'{"d":4}']
+
+
+@pytest.mark.asyncio
+async def test_slow_request_does_not_block_later_ones():
+    server = JsonRpcStdioServer(_handler, max_in_flight=4)
+    lines = await _serve(server, _req(1, "sleep", seconds=0.2) + _req(2, "echo", x=1))
+    assert [line["id"] for line in lines] == [2, 1]
+    assert lines[0]["result"] == {"x": 1}
+    assert lines[1]["result"] == 0.2
+
+
+@pytest.mark.asyncio
+async def test_in_flight_limit_is_respected():
+    server = JsonRpcStdioServer(_handler, max_in_flight=2)
+    payload = b"".join(_req(i, "sleep", seconds=0.02) for i in range(6))
+    lines = await _serve(server, payload)
+    assert sorted(line["id"] for line in lines) == list(range(6))
+    assert server.stats["max_in_flight_seen"] == 2
+
+
+@pytest.mark.asyncio
+async def test_batches_notifications_and_errors():
+    server = JsonRpcStdioServer(_handler, max_in_flight=2)
+    batch = [
+        {"jsonrpc": "2.0", "id": "a", "method": "echo", "params": {"v": 1}},
+        {"jsonrpc": "2.0", "method": "echo", "params": {"v": 2}},
+        {"jsonrpc": "2.0", "id": "b", "method": "missing"},
+        {"jsonrpc": "2.0", "id": "c", "method": "boom"},
+        5,
+    ]
+    lines = await _serve(
+        server,
+        json.dumps(batch).encode() + b"\n",
+        b"not json\n",
+        b"[]\n",
+        b'{"jsonrpc": "2.0", "method": "echo"}\n',
+    )
+    by_kind = {type(line).__name__: line for line in lines}
+    responses = {r["id"]: r for r in by_kind["list"]}
+    assert set(responses) == {"a", "b", "c", None}
+    assert responses["a"]["result"] == {"v": 1}
+    assert responses["b"]["error"]["code"] == METHOD_NOT_FOUND
+    assert responses["c"]["error"]["code"] == -32603
+    assert responses[None]["error"]["code"] == -32600
+    codes = sorted(line["error"]["code"] for line in lines if isinstance(line, dict))
+    assert codes == [-32700, -32600]
+
+
+@pytest.mark.asyncio
+async def test_slow_reader_throttles_intake():
+    calls = []
+
+    async def handler(method, params):
+        calls.append(params["i"])
+        return params["i"]
+
+    class _StalledWriter(_Writer):
+        def __init__(self) -> None:
+            super().__init__()
+            self.unblocked = asyncio.Event()
+
+        async def drain(self) -> None:
+            await self.unblocked.wait()
+
+    server = JsonRpcStdioServer(handler, max_in_flight=2, max_pending_writes=1)
+    reader = asyncio.StreamReader()
+    writer = _StalledWriter()
+    serving = asyncio.create_task(server.serve(reader, writer))
+    reader.feed_data(b"".join(_req(i, "echo", i=i) for i in range(20)))
+    reader.feed_eof()
+    await asyncio.sleep(0.05)
+    # One response being written, one queued, two holding slots
+    assert len(calls) <= 4
+    writer.unblocked.set()
+    await asyncio.wait_for(serving, 2.0)
+    assert sorted(line["id"] for line in writer.lines) == list(range(20))
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import pytest
+
+from cflow_platform.core.tool_registry import ToolRegistry, ToolRegistrySnapshot
+
+
+def test_snapshot_is_built_once_and_matches_tool_list():
+    snapshot = ToolRegistry.get_snapshot()
+    assert ToolRegistry.get_snapshot() is snapshot
+    tools = ToolRegistry.get_tools_for_mcp()
+    assert [t["name"] for t in tools] == [t["name"] for t in snapshot.tools]
+    # Callers get their own list; mutating it does not touch the snapshot
+    tools.clear()
+    assert len(ToolRegistry.get_tools_for_mcp()) == len(snapshot)
+
+
+def test_name_index_and_schema_lookup():
+    snapshot = ToolRegistry.get_snapshot()
+    assert ToolRegistry.has_tool("sys_test")
+    assert "sys_test" in snapshot
+    assert not ToolRegistry.has_tool("__no_such_tool__")
+    assert ToolRegistry.get_tool("__no_such_tool__") is None
+    tool = ToolRegistry.get_tool("sys_test")
+    assert tool is not None and tool["name"] == "sys_test"
+    assert ToolRegistry.get_tool_schema("sys_test") == tool["inputSchema"]
+    with pytest.raises(TypeError):
+        snapshot.by_name["x"] = {}  # type: ignore[index]
+
+
+def test_groups_and_bmad_membership():
+    snapshot = ToolRegistry.get_snapshot()
+    for group_name, members in snapshot.groups.items():
+        for name in members:
+            assert snapshot.by_name[name]["group"] == group_name
+    assert snapshot.bmad_tools == {n for n in snapshot.by_name if n.startswith("bmad_")}
+    assert snapshot.tools_in_group("__none__") == frozenset()
+
+
+def test_content_hash_is_stable_and_content_sensitive():
+    tools = [{"name": "a", "description": "A", "inputSchema": {}, "group": "core"}]
+    first = ToolRegistrySnapshot.from_tools(tools)
+    assert ToolRegistrySnapshot.from_tools([dict(t) for t in tools]).content_hash == first.content_hash
+    changed = [dict(tools[0], description="changed")]
+    assert ToolRegistrySnapshot.from_tools(changed).content_hash != first.content_hash
+    assert ToolRegistry.get_tool_registry_info()["content_hash"] == ToolRegistry.get_snapshot().content_hash
+
+
+def test_refresh_snapshot_replaces_instance():
+    before = ToolRegistry.get_snapshot()
+    after = ToolRegistry.refresh_snapshot()
+    assert after is not before
+    assert after.content_hash == before.content_hash
+    assert ToolRegistry.get_snapshot() is after
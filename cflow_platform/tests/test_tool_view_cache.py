@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import copy
+import json
+
+from cflow_platform.core.client_tool_config import ClientToolConfigManager
+from cflow_platform.core.project_tool_filter import ProjectToolFilterManager
+from cflow_platform.core.tool_group_manager import ToolGroup, ToolGroupManager
+from cflow_platform.core.tool_registry import ToolRegistry
+from cflow_platform.core.tool_view_cache import FilteredToolViewCache, etag_matches
+
+
+def _reference_filter(client_type: str, project_type: str):
+    """Per-tool loop the webmcp server used before views were precompiled."""
+    client = ClientToolConfigManager.get_config_for_client(client_type) or ClientToolConfigManager.get_config_for_client("web")
+    project = ProjectToolFilterManager.get_filter_for_project_type(project_type) or ProjectToolFilterManager.get_filter_for_project_type("greenfield")
+    enabled = set(client.enabled_groups) & set(project.enabled_groups)
+    disabled = set(client.disabled_tools) | set(project.disabled_tools)
+    out = []
+    for tool in ToolRegistry.get_tools_for_mcp():
+        name = tool["name"]
+        if any(name.startswith(p[:-1]) if p.endswith("*") else name == p for p in disabled):
+            continue
+        for group_name in enabled:
+            try:
+                if ToolGroupManager.is_tool_in_group(name, ToolGroup(group_name)):
+                    out.append(tool)
+                    break
+            except ValueError:
+                continue
+        if len(out) >= client.capabilities.max_tools:
+            break
+    return out
+
+
+def test_views_match_reference_filter():
+    cache = FilteredToolViewCache()
+    for client_type in ClientToolConfigManager.get_all_client_types() + ["unknown"]:
+        for project_type in ProjectToolFilterManager.get_all_project_types() + ["unknown"]:
+            view = cache.get_view(client_type, project_type)
+            expected = _reference_filter(client_type, project_type)
+            assert [t["name"] for t in view.tools] == [t["name"] for t in expected]
+            assert json.loads(view.tools_json) == expected
+
+
+def test_views_are_reused_until_inputs_change():
+    class Clients:
+        configs = {k.value: copy.deepcopy(v) for k, v in ClientToolConfigManager.CLIENT_CONFIGS.items()}
+
+        @classmethod
+        def get_config_for_client(cls, client_type):
+            return cls.configs.get(client_type)
+
+    cache = FilteredToolViewCache(client_config_manager=Clients)
+    first = cache.get_view("web", "greenfield")
+    assert cache.get_view("web", "greenfield") is first
+    # Unknown client types resolve to the web view instead of growing the cache
+    assert cache.get_view("nope", "greenfield") is first
+    assert cache.stats["compiles"] == 1
+
+    dropped = first.tools[0]["name"]
+    Clients.configs["web"].disabled_tools.append(dropped)
+    second = cache.get_view("web", "greenfield")
+    assert second is not first
+    assert dropped not in [t["name"] for t in second.tools]
+    assert second.digest != first.digest
+
+    cache.invalidate()
+    assert cache.get_view("web", "greenfield") is not second
+
+
+def test_render_and_etag():
+    view = FilteredToolViewCache().get_view("cursor", "greenfield")
+    body = json.loads(view.render({"count": len(view.tools), "project_id": None}))
+    assert body["count"] == len(body["tools"]) == len(view.tools)
+    assert body["project_id"] is None
+    assert json.loads(view.render({}))["tools"] == json.loads(view.tools_json)
+
+    etag = view.etag_for("filtered", "cursor", "greenfield", None)
+    assert etag == view.etag_for("filtered", "cursor", "greenfield", None)
+    assert etag != view.etag_for("filtered", "cursor", "greenfield", "p1")
+    assert etag_matches(etag, etag)
+    assert etag_matches(f'"other", W/{etag}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches(None, etag)
+    assert not etag_matches('"other"', etag)
+
+
+def test_etag_covers_echoed_config_when_tools_are_unchanged():
+    config = copy.deepcopy(ClientToolConfigManager.get_config_for_client("web"))
+    view = FilteredToolViewCache().get_view("web", "greenfield")
+
+    def initialize_etag():
+        # Mirrors /mcp/initialize: the echoed client_config goes into the ETag
+        fields = {"client_config": {"enabled_groups": config.enabled_groups, "project_specific": config.project_specific}}
+        return view.etag_for("initialize", json.dumps(fields, sort_keys=True, default=str))
+
+    before = initialize_etag()
+    config.project_specific = not config.project_specific
+    assert FilteredToolViewCache().get_view("web", "greenfield").digest == view.digest
+    assert initialize_etag() != before
@@ -0,0 +1,34 @@
+-- Code Intelligence natural keys for batched upserts
+-- The indexer upserts code_functions on (tenant_id, repo, path, name,
+-- start_line, end_line) and code_function_embeddings on (function_id, model).
+-- PostgREST's on_conflict needs a unique index on exactly those columns.
+-- Upserts update existing rows, so the indexer writes with the service role.
+
+-- 1. Drop duplicates left by the old select-then-insert path (newest row wins).
+--    Rows of different tenants or repos are never duplicates of each other.
+delete from code_functions cf
+using code_functions newer
+where cf.tenant_id is not distinct from newer.tenant_id
+  and cf.repo is not distinct from newer.repo
+  and cf.path = newer.path
+  and cf.name = newer.name
+  and cf.start_line = newer.start_line
+  and cf.end_line = newer.end_line
+  and (cf.created_at, cf.id) < (newer.created_at, newer.id);
+
+-- Every re-index inserted another embedding row per function
+delete from code_function_embeddings e
+using code_function_embeddings newer
+where e.function_id = newer.function_id
+  and e.model is not distinct from newer.model
+  and (e.created_at, e.id) < (newer.created_at, newer.id);
+
+-- 2. Natural keys (nulls not distinct: single-tenant installs leave tenant_id null)
+drop index if exists uq_code_functions_natural_key;
+create unique index uq_code_functions_natural_key
+  on code_functions(tenant_id, repo, path, name, start_line, end_line) nulls not distinct;
+
+update code_function_embeddings set model = 'unknown' where model is null;
+alter table code_function_embeddings alter column model set not null;
+create unique index if not exists uq_code_function_embeddings_function_model
+  on code_function_embeddings(function_id, model);